@@ -2,30 +2,129 @@
 Database configuration and session management.
 
 Uses SQLite in-memory database by default for easy demo/testing.
-Can be configured to use Supabase PostgreSQL via DATABASE_URL environment variable.
+Set SQLITE_PATH to keep data in a SQLite file instead (WAL mode, tuned
+pragmas), or DATABASE_URL to use Supabase PostgreSQL. DATABASE_READ_URL
+adds read replicas for read-only endpoints (see get_read_db).
+
+Two engines share the same database:
+- ``engine`` / ``SessionLocal`` (sync) for startup, seeding and scripts
+- ``async_engine`` / ``AsyncSessionLocal`` (aiosqlite / asyncpg) for request
+  handlers, so queries don't block the event loop
 """
 
 import os
 import time
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import OperationalError
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+logger = logging.getLogger(__name__)
 
 # Get database URL from environment, default to in-memory SQLite
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
+# (or a SQLite file when SQLITE_PATH is set)
+SQLITE_PATH = os.getenv("SQLITE_PATH")
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"sqlite:///{SQLITE_PATH}" if SQLITE_PATH else "sqlite:///:memory:",
+)
 
 # Determine if using SQLite
 is_sqlite = DATABASE_URL.startswith("sqlite")
-is_memory = ":memory:" in DATABASE_URL
+is_memory = ":memory:" in DATABASE_URL or "mode=memory" in DATABASE_URL
+is_sqlite_file = is_sqlite and not is_memory
+
+# A plain :memory: database is private to one connection. Name it and use a
+# shared cache so the sync and async engines see the same tables.
+if is_memory:
+    DATABASE_URL = "sqlite:///file:budget_demo?mode=memory&cache=shared&uri=true"
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio equivalent."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg:", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+
+def pool_settings() -> dict:
+    """
+    Connection pool options for network databases, read from the environment.
+
+    DB_POOL_SIZE (default 5), DB_MAX_OVERFLOW (10), DB_POOL_TIMEOUT seconds (30)
+    and DB_POOL_RECYCLE seconds (3600). Connections are pre-pinged when they
+    are checked out of the pool, so a dropped connection is replaced
+    transparently instead of failing the request.
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+        "pool_pre_ping": True,
+    }
+
+
+def sqlite_pragmas(file_backed: bool) -> list[str]:
+    """
+    PRAGMA statements run on every new SQLite connection.
+
+    File databases use WAL journaling so readers don't wait for writers,
+    synchronous=NORMAL (durable at checkpoints; a power cut can lose only
+    the last transactions, never corrupt the file), memory-mapped reads and
+    a larger page cache. SQLITE_MMAP_SIZE is in bytes (default 256 MB) and
+    SQLITE_CACHE_SIZE_KB per connection (default 64 MB).
+    """
+    pragmas = ["PRAGMA foreign_keys=ON"]
+    if file_backed:
+        pragmas += [
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+            # Negative cache_size is in KiB rather than pages
+            f"PRAGMA cache_size=-{int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))}",
+            "PRAGMA busy_timeout=5000",
+        ]
+    return pragmas
+
+
+# Connections for a SQLite file. Both engines keep SQLITE_POOL_SIZE open;
+# the sync engine can open SQLITE_MAX_OVERFLOW more when every worker
+# thread needs one (8 + 32 covers the default 40-thread FastAPI/anyio
+# threadpool). The async pool is kept small: SQLite has a single writer,
+# and with many connections queued on the write lock the (unfair) busy
+# handler lets some wait past busy_timeout.
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "32"))
+
+# Retries when a request can't get a connection at all (database restarting,
+# failover); waits DB_RETRY_BACKOFF_SECONDS, then doubles each attempt
+DB_CONNECT_RETRIES = int(os.getenv("DB_CONNECT_RETRIES", "2"))
+DB_RETRY_BACKOFF_SECONDS = float(os.getenv("DB_RETRY_BACKOFF_SECONDS", "0.2"))
 
 # Create SQLAlchemy engine with appropriate settings
 if is_sqlite:
     # SQLite-specific configuration
     # StaticPool ensures all connections share the SAME in-memory database
-    # (without it, each connection gets its own empty database)
-    pool_args = {"poolclass": StaticPool} if is_memory else {}
+    # (without it, each connection gets its own empty database).
+    # A file database gets a regular connection pool, so with WAL each
+    # worker thread can read on its own connection while another writes.
+    if is_memory:
+        pool_args = {"poolclass": StaticPool}
+    else:
+        pool_args = {"poolclass": QueuePool, "pool_size": SQLITE_POOL_SIZE, "max_overflow": SQLITE_MAX_OVERFLOW}
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},  # Allow multi-threading
@@ -33,23 +132,49 @@ if is_sqlite:
         **pool_args,
     )
     
-    # Enable foreign key constraints for SQLite
+    # Enable foreign key constraints (and WAL tuning for files) for SQLite
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_conn, connection_record):
         cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for pragma in sqlite_pragmas(is_sqlite_file):
+            cursor.execute(pragma)
         cursor.close()
 else:
     # PostgreSQL/Supabase configuration
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,  # Enable connection health checks
-        pool_recycle=3600,   # Recycle connections after 1 hour
-    )
+    engine = create_engine(DATABASE_URL, **pool_settings())
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers
+if is_sqlite:
+    # One pooled connection for the in-memory database: concurrent sessions
+    # must not interleave statements on a shared connection. Each aiosqlite
+    # connection runs on its own thread, so a file database gets a pool.
+    async_pool_size = 1 if is_memory else SQLITE_POOL_SIZE
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=async_pool_size,
+        max_overflow=0,
+    )
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def set_async_sqlite_pragma(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for pragma in sqlite_pragmas(is_sqlite_file):
+            cursor.execute(pragma)
+        cursor.close()
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_settings())
+
+# expire_on_commit=False: attribute access after commit would need a lazy
+# (implicit IO) refresh, which AsyncSession can't do
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Create declarative base for ORM models
 Base = declarative_base()
 
@@ -62,54 +187,200 @@ def init_db(seed_demo_data: bool = True):
     Args:
         seed_demo_data: Whether to seed demo historical price data (default: True)
     """
-    from models.db_models import User, WeeklyPlan, HistoricalPriceData
+    from models.db_models import (
+        User, WeeklyPlan, HistoricalPriceData, ShoppingList, UserGeoProfile, SchedulerLock,
+        FuelPriceSeries, FuelPriceCycle,
+    )
     Base.metadata.create_all(bind=engine)
     
     # Seed demo data if requested (only for in-memory database)
     if seed_demo_data and is_sqlite:
-        from seed_data import seed_all
+        from seed_data import load_snapshot, seed_all
         db = SessionLocal()
         try:
             # Check if data already exists
             existing_count = db.query(HistoricalPriceData).count()
             if existing_count == 0:
-                seed_all(db)
+                # The prepared snapshot loads in one transaction; fall back
+                # to building the rows if it has been deleted
+                if not load_snapshot(db):
+                    seed_all(db)
         finally:
             db.close()
 
 
 def get_db():
     """
-    Dependency injection for database sessions with retry logic.
-    
-    Retries connection once on failure before raising exception.
-    
+    Dependency injection for sync database sessions.
+
+    Connection health is checked by the pool (pre-ping on checkout), so
+    there's no per-request test query.
+
     Yields:
         Session: SQLAlchemy database session
-        
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Whether *error* means the database couldn't be reached, so a retry may
+    succeed: an OperationalError, any driver error SQLAlchemy flagged as
+    invalidating the connection, or a socket-level OSError (asyncpg raises
+    these directly when the server is down).
+    """
+    if isinstance(error, (OperationalError, OSError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+async def connect_with_retry(db: AsyncSession) -> None:
+    """
+    Check out a connection for *db*, retrying with exponential backoff.
+
+    Waits with asyncio.sleep so other requests keep running meanwhile.
+    Only connection errors (see is_connection_error) are retried.
+
     Raises:
-        OperationalError: If connection fails after retry
+        DBAPIError or OSError: If no connection could be made after all retries
     """
-    db = None
-    retry_count = 0
-    max_retries = 1
-    
-    while retry_count <= max_retries:
+    for attempt in range(DB_CONNECT_RETRIES + 1):
         try:
-            db = SessionLocal()
-            # Test connection (skip for in-memory SQLite)
-            if not is_sqlite:
-                db.execute("SELECT 1")
-            yield db
-            break
-        except OperationalError as e:
-            if db:
-                db.close()
-            retry_count += 1
-            if retry_count > max_retries:
-                raise e
-            # Wait briefly before retry
-            time.sleep(0.5)
-        finally:
-            if db:
-                db.close()
+            await db.connection()
+            return
+        except (DBAPIError, OSError) as e:
+            await db.rollback()
+            if attempt == DB_CONNECT_RETRIES or not is_connection_error(e):
+                raise
+            delay = DB_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            logger.warning(f"Database connection failed, retrying in {delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+
+@asynccontextmanager
+async def async_session():
+    """
+    A short-lived async session, for handlers that only sometimes need
+    the database or must not hold a connection across slow work.
+
+    For network databases the connection is checked out up front, with
+    retry and backoff, so a brief outage doesn't fail the request halfway
+    through. SQLite connects lazily on the first query.
+    """
+    async with AsyncSessionLocal() as db:
+        if not is_sqlite:
+            await connect_with_retry(db)
+        yield db
+
+
+async def get_async_db():
+    """
+    Dependency injection for async database sessions (see async_session).
+
+    Yields:
+        AsyncSession: SQLAlchemy asyncio session
+    """
+    async with async_session() as db:
+        yield db
+
+
+# ── Read replicas ────────────────────────────────────────────────────
+# Heavy reads that tolerate slight staleness (leaderboard, price history)
+# can go to replicas listed in DATABASE_READ_URL (comma-separated). Each
+# entry: {"url": str, "engine": AsyncEngine, "session": async_sessionmaker,
+#         "down_until": monotonic time before which it is skipped}
+_read_replicas: list[dict] = []
+_replica_cycle = itertools.cycle([])
+
+# How long a replica that failed its health check is skipped
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+# How long to wait for a replica connection before using the primary
+REPLICA_CONNECT_TIMEOUT = float(os.getenv("REPLICA_CONNECT_TIMEOUT", "2"))
+
+
+def _create_replica_engine(url: str):
+    async_url = to_async_url(url)
+    if not async_url.startswith("sqlite"):
+        return create_async_engine(async_url, **pool_settings())
+
+    replica_engine = create_async_engine(async_url, echo=False)
+
+    @event.listens_for(replica_engine.sync_engine, "connect")
+    def set_replica_pragma(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA query_only=ON")  # Writes belong on the primary
+        cursor.close()
+
+    return replica_engine
+
+
+def configure_read_replicas(urls: list[str]) -> None:
+    """
+    Replace the set of read replicas.
+
+    A local SQLite copy works as a stand-in replica; open it with
+    ``?mode=ro&uri=true`` so a missing file fails the health check
+    instead of being created empty, e.g.
+    ``sqlite:///file:replica.db?mode=ro&uri=true``.
+    """
+    global _replica_cycle
+    _read_replicas.clear()
+    for url in urls:
+        replica_engine = _create_replica_engine(url)
+        _read_replicas.append({
+            "url": url,
+            "engine": replica_engine,
+            "session": async_sessionmaker(
+                replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+            ),
+            "down_until": 0.0,
+        })
+    _replica_cycle = itertools.cycle(range(len(_read_replicas)))
+
+
+configure_read_replicas(
+    [u.strip() for u in os.getenv("DATABASE_READ_URL", "").split(",") if u.strip()]
+)
+
+
+async def _open_replica_session() -> AsyncSession | None:
+    """Return a connected session on the next healthy replica, or None."""
+    now = time.monotonic()
+    for _ in range(len(_read_replicas)):
+        replica = _read_replicas[next(_replica_cycle)]
+        if replica["down_until"] > now:
+            continue
+        db = replica["session"]()
+        try:
+            await asyncio.wait_for(db.connection(), REPLICA_CONNECT_TIMEOUT)
+            return db
+        except (OperationalError, OSError, asyncio.TimeoutError) as e:
+            await db.close()
+            replica["down_until"] = now + REPLICA_RETRY_SECONDS
+            logger.warning(f"Read replica unavailable, using primary for {REPLICA_RETRY_SECONDS:.0f}s: {e}")
+    return None
+
+
+async def get_read_db():
+    """
+    Dependency injection for read-only async database sessions.
+
+    Use for endpoints that only read and can tolerate replica lag. Picks
+    the next healthy replica round-robin; falls back to the primary when
+    none are configured or all fail their health check.
+
+    Yields:
+        AsyncSession: Session on a replica, or on the primary
+    """
+    db = await _open_replica_session() if _read_replicas else None
+    on_primary = db is None
+    if on_primary:
+        db = AsyncSessionLocal()
+    async with db:
+        if on_primary and not is_sqlite:
+            await connect_with_retry(db)
+        yield db
@@ -19,8 +19,6 @@ from exceptions import (
     DatabaseError
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
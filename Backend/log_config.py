@@ -0,0 +1,219 @@
+"""
+Application logging: structured, sampled and off the request thread.
+
+configure() (called by main.py at import) sets up the root logger:
+
+- Records are put on a queue by a QueueHandler and written by a
+  QueueListener thread, so a slow stdout pipe or disk never blocks a
+  request. If the queue is full the record is dropped and counted, not
+  waited on.
+- Output is one JSON object per line (LOG_FORMAT=json, the default) with
+  time, level, logger and message, plus any fields passed with
+  ``extra=``; LOG_FORMAT=text gives the plain format for local runs.
+- High-volume INFO and DEBUG messages can be sampled per logger: with
+  LOG_SAMPLE="services.strands_tools.list_manager=10", one in ten records
+  from each logging call in that logger (or its children) is kept.
+  Warnings and errors are always kept.
+
+Request and response bodies (chat messages, shopping lists, upstream
+responses) are only logged with LOG_BODIES=true; otherwise body() logs
+their size. Log calls on hot paths should pass arguments lazily
+(``logger.info("... %s", value)``) so sampled-out records are never
+formatted.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from itertools import count
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+
+from metrics import LOG_RECORDS_DROPPED
+
+LOG_BODIES = False          # Set from the environment by configure()
+BODY_LIMIT = 500            # Characters of a body logged with LOG_BODIES
+DRAIN_TIMEOUT = 5.0         # Seconds shutdown() waits for queued records to be written
+
+# Keep one in N records per logging call: list_manager logs every item
+# change, httpx and the MCP client every upstream request
+DEFAULT_SAMPLE = {"services.strands_tools.list_manager": 10, "httpx": 10, "mcp": 10}
+
+# LogRecord attributes that are not ``extra=`` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: QueueListener | None = None
+_handler: QueueHandler | None = None
+
+
+def parse_sample(spec: str) -> Dict[str, int]:
+    """Parse LOG_SAMPLE ("logger=N,other.logger=M") into {logger: N}."""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, every = part.partition("=")
+        if not every.strip().isdigit() or int(every) < 1:
+            raise ValueError(f"Invalid LOG_SAMPLE entry {part!r}: expected logger=N with N >= 1")
+        rates[name.strip()] = int(every)
+    return rates
+
+
+def body(value: Any) -> Any:
+    """
+    *value* for a log field if LOG_BODIES is on (strings truncated to
+    BODY_LIMIT), otherwise just its size.
+    """
+    if LOG_BODIES:
+        return value[:BODY_LIMIT] if isinstance(value, str) else value
+    if isinstance(value, str):
+        return f"<{len(value)} chars>"
+    try:
+        return f"<{len(value)} items>"
+    except TypeError:
+        return "<redacted>"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in N INFO and DEBUG records from each logging call.
+
+    Rates are per logger name and apply to its children. Records are
+    counted per call site (file and line), so a rare message isn't
+    crowded out by a frequent one from the same logger.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = rates
+        # Maps logger name -> rate (None if unsampled), resolved on first use
+        self._resolved: Dict[str, int | None] = {}
+        # Maps (pathname, lineno) -> record counter
+        self._counters: Dict[tuple, count] = {}
+
+    def _rate(self, name: str) -> int | None:
+        if name not in self._resolved:
+            rate, prefix = None, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate(record.name)
+        if rate is None or rate == 1:
+            return True
+        counter = self._counters.setdefault((record.pathname, record.lineno), count())
+        if next(counter) % rate == 0:
+            record.sampled = rate
+            return True
+        LOG_RECORDS_DROPPED.inc(logger=record.name, reason="sampled")
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with ``extra=`` fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_FIELDS})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what can't safely cross threads: the message
+        # arguments (which may be mutated after the call) and the
+        # traceback. Formatting the output happens on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(logger=record.name, reason="queue_full")
+
+
+class _Listener(QueueListener):
+    """QueueListener whose stop() gives up after DRAIN_TIMEOUT if the output is stuck."""
+
+    def stop(self) -> None:
+        try:
+            self.queue.put(self._sentinel, timeout=DRAIN_TIMEOUT)
+        except queue.Full:
+            return  # The listener thread is a daemon; leave it behind
+        self._thread.join(DRAIN_TIMEOUT)
+        self._thread = None
+
+
+def configure(stream=None, fmt: str | None = None, sample: Dict[str, int] | None = None) -> None:
+    """
+    Route the root logger through the queue (idempotent).
+
+    Reads LOG_LEVEL (default INFO), LOG_FORMAT, LOG_SAMPLE, LOG_BODIES and
+    LOG_QUEUE_SIZE (default 10000) from the environment.
+
+    Args:
+        stream: where the listener writes (default stderr)
+        fmt: "json" or "text" (default LOG_FORMAT, or json)
+        sample: {logger: N} rates (default DEFAULT_SAMPLE updated with LOG_SAMPLE)
+    """
+    global _listener, _handler, LOG_BODIES
+    shutdown()
+    LOG_BODIES = os.getenv("LOG_BODIES", "false").lower() in ("1", "true", "yes")
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if (fmt or os.getenv("LOG_FORMAT", "json")) == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    if sample is None:
+        sample = {**DEFAULT_SAMPLE, **parse_sample(os.getenv("LOG_SAMPLE", ""))}
+    _handler = _NonBlockingQueueHandler(queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+    _handler.addFilter(SamplingFilter(sample))
+    _listener = _Listener(_handler.queue, output)
+
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root.addHandler(_handler)
+    _listener.start()
+
+
+def shutdown() -> None:
+    """Write out queued records and stop the listener thread."""
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
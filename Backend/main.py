@@ -4,16 +4,23 @@ FastAPI Budget Optimization Backend
 Main application entry point with CORS middleware configuration.
 """
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from database import init_db
-from routers import user, transport, weekly_plan, leaderboard, chat
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_read_db, init_db, is_memory, is_sqlite_file
+from routers import user, transport, weekly_plan, leaderboard, chat, shopping_list
+import log_config
 from error_handlers import register_exception_handlers
+from exceptions import NotFoundError
+from metrics import MetricsMiddleware, instrument_database, render as render_metrics
 
 # Load environment variables
 load_dotenv()
 
+# JSON logs, written off the request thread
+log_config.configure()
+
 # Create FastAPI app
 app = FastAPI(
     title="Budget Optimization Backend",
@@ -88,6 +95,10 @@ Common status codes:
             "name": "leaderboard",
             "description": "User rankings based on optimization performance"
         },
+        {
+            "name": "shopping-list",
+            "description": "Server-side shopping lists with versioned delta sync"
+        },
         {
             "name": "chat",
             "description": "AI chat assistant powered by Strands agent"
@@ -108,6 +119,7 @@ app.include_router(transport.router)
 app.include_router(weekly_plan.router)
 app.include_router(leaderboard.router)
 app.include_router(chat.router)
+app.include_router(shopping_list.router)
 
 # Configure CORS middleware
 app.add_middleware(
@@ -118,14 +130,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and per-request DB query totals, served on /metrics
+instrument_database()
+app.add_middleware(MetricsMiddleware)
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and external connections on application startup."""
     init_db(seed_demo_data=True)
-    print("✓ Database initialized (in-memory SQLite)")
+    if is_memory:
+        print("✓ Database initialized (in-memory SQLite)")
+    elif is_sqlite_file:
+        print("✓ Database initialized (SQLite file, WAL mode)")
+    else:
+        print("✓ Database initialized (PostgreSQL)")
     print("✓ Demo data seeded: 8 items @ 4 weeks, 6 users, 14 weekly plans")
 
+    # Index stored geo profiles and fuel price cycles
+    from services import fuel_price_cycle, fuel_price_history, geo_profile
+    print(f"✓ {geo_profile.load_index()} geo profiles loaded")
+    print(f"✓ {fuel_price_cycle.reload()} fuel price cycles loaded")
+
+    # Periodic maintenance, off the request path
+    from services import tool_cache
+    from services.scheduler import scheduler
+    if not scheduler.jobs:
+        scheduler.add_interval("chat_session_cleanup", chat.cleanup_sessions, 60, in_thread=False)
+        scheduler.add_interval("tool_cache_prune", tool_cache.prune, 5 * 60, jitter=30)
+        scheduler.add_interval("fuel_price_history_flush", fuel_price_history.flush, 60, jitter=10)
+        scheduler.add_interval(
+            "fuel_price_cycle_analysis", fuel_price_cycle.run_batch, 60 * 60, jitter=5 * 60, single_instance=True,
+        )
+        scheduler.add_interval("fuel_price_cycle_reload", fuel_price_cycle.reload, 10 * 60, jitter=60)
+        if geo_profile.enabled():
+            scheduler.add_interval(
+                "geo_profile_refresh", geo_profile.refresh_stale, geo_profile.REFRESH_INTERVAL_SECONDS,
+                jitter=5 * 60, single_instance=True,
+            )
+    scheduler.start()
+    print(f"✓ Scheduler started ({len(scheduler.jobs)} jobs)")
+
     # Create the Coles MCP client (Agent will connect on first use)
     from services.agent import get_mcp_client
     try:
@@ -138,8 +183,14 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanly shut down long-lived connections."""
+    from services import fuel_price_history, geo_profile, prefetch
     from services.agent import shutdown_mcp_client
+    from services.scheduler import scheduler
+    await scheduler.shutdown()
+    fuel_price_history.flush()
     shutdown_mcp_client()
+    prefetch.shutdown()
+    geo_profile.shutdown()
     print("✓ MCP client shut down")
 
 
@@ -163,49 +214,57 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", tags=["system"], response_class=Response)
+async def metrics():
+    """
+    Metrics in Prometheus text format.
+
+    Request latency per route, database queries and time per request,
+    agent tool execution time and external HTTP call time.
+    """
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/trace/{session_id}", tags=["system"])
+async def debug_trace(session_id: str):
+    """
+    Debug endpoint returning the recent chat turn traces for a session.
+
+    Each trace has a span per model call, tool invocation (with an
+    arguments hash, duration and payload sizes) and shopping-list lock
+    wait, plus total time per span kind.
+    """
+    from services.agent_trace import get_traces
+
+    traces = get_traces(session_id)
+    if not traces:
+        raise NotFoundError(f"No chat traces for session {session_id}")
+    return {"sessionId": session_id, "turns": traces}
+
+
+@app.get("/debug/scheduler", tags=["system"])
+async def debug_scheduler():
+    """
+    Debug endpoint listing the scheduled maintenance jobs.
+
+    Shows each job's schedule, next run, run/failure/skip counts and the
+    last run's duration and error.
+    """
+    from services.scheduler import scheduler
+
+    return {"owner": scheduler.owner, "jobs": scheduler.status()}
+
+
 @app.get("/debug/historical-prices", tags=["system"])
-async def debug_historical_prices():
+async def debug_historical_prices(db: AsyncSession = Depends(get_read_db)):
     """
     Debug endpoint to view seeded historical price data.
     Shows available items and sample prices.
+
+    Served from a read replica when DATABASE_READ_URL is set.
     """
-    from database import SessionLocal
-    from models.db_models import HistoricalPriceData
-    from sqlalchemy import func
-    
-    db = SessionLocal()
-    try:
-        # Get total count
-        total_count = db.query(HistoricalPriceData).count()
-        
-        # Get distinct items
-        items = db.query(HistoricalPriceData.item_name).distinct().all()
-        item_names = [item[0] for item in items]
-        
-        # Get sample data for each item (latest 3 records)
-        samples = {}
-        for item_name in item_names:
-            records = (
-                db.query(HistoricalPriceData)
-                .filter(HistoricalPriceData.item_name == item_name)
-                .order_by(HistoricalPriceData.recorded_date.desc())
-                .limit(3)
-                .all()
-            )
-            samples[item_name] = [
-                {
-                    "price": record.price,
-                    "store": record.store_name,
-                    "date": record.recorded_date.strftime("%Y-%m-%d")
-                }
-                for record in records
-            ]
-        
-        return {
-            "total_records": total_count,
-            "items_available": item_names,
-            "sample_data": samples,
-            "note": "This data is used for price predictions in grocery optimization"
-        }
-    finally:
-        db.close()
+    from services.historical_price_service import get_price_history_overview
+
+    overview = await get_price_history_overview(db)
+    overview["note"] = "This data is used for price predictions in grocery optimization"
+    return overview
@@ -0,0 +1,402 @@
+"""
+In-process request, database, tool and upstream timing metrics.
+
+Counters and histograms live in this process and are rendered in the
+Prometheus text exposition format on GET /metrics, so Prometheus (or a
+plain curl) can see where request time goes:
+
+- http_requests_total / http_request_duration_seconds per route template
+- http_request_db_queries / http_request_db_seconds: database queries and
+  time spent in them, per request
+- db_query_duration_seconds: every query, by statement type
+- agent_tool_call_duration_seconds: Strands tool execution in the agent
+- external_http_request_duration_seconds: calls to Google, NSW FuelCheck
+  and n8n
+- bedrock_input_tokens_total / bedrock_output_tokens_total: model tokens,
+  with input split into uncached, prompt-cache read and prompt-cache write
+- tool_cache_lookups_total / prefetch_*_total: agent location lookups
+  served from the tool cache, and how many speculative prefetches were
+  used or wasted
+- chat_turns_total / chat_turn_duration_seconds: chat turns answered by
+  the list-command fast path or by the agent, and the agent time the fast
+  path saved
+- chat_model_tier_turns_total / chat_model_tier_turn_duration_seconds:
+  agent turns and their latency per model tier (small or large)
+- log_records_dropped_total: log records dropped by sampling or because
+  the log queue was full (log_config)
+
+Query timing uses SQLAlchemy cursor events on every Engine, so the sync,
+async and read-replica engines are all covered. Per-request totals are
+collected through a context variable set by MetricsMiddleware; it is
+inherited by the threadpool and by tasks started while handling the
+request.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Seconds; from a cached leaderboard read to a multi-tool chat turn
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Queries per request
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with a fixed set of label names.
+
+    If "outcome" is one of the label names, time() fills it in with "ok"
+    or "error" depending on whether the block raised.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts, sum, count]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the with-block takes."""
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            if "outcome" in self.labelnames:
+                labels["outcome"] = outcome
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(labels[name] for name in self.labelnames))
+        return series[2] if series else 0
+
+    def sum(self, **labels) -> float:
+        series = self._series.get(tuple(labels[name] for name in self.labelnames))
+        return series[1] if series else 0.0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """The metrics rendered on /metrics."""
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"),
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request.", ("method", "route"),
+))
+HTTP_REQUEST_DB_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request.", ("route",), COUNT_BUCKETS,
+))
+HTTP_REQUEST_DB_SECONDS = REGISTRY.register(Histogram(
+    "http_request_db_seconds", "Time spent in database queries per HTTP request.", ("route",),
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Database query execution time.", ("operation",),
+))
+TOOL_CALL_DURATION = REGISTRY.register(Histogram(
+    "agent_tool_call_duration_seconds", "Chat agent tool execution time.", ("tool", "status"),
+))
+EXTERNAL_HTTP_DURATION = REGISTRY.register(Histogram(
+    "external_http_request_duration_seconds", "Calls to external HTTP services.", ("service", "outcome"),
+))
+MODEL_INPUT_TOKENS = REGISTRY.register(Counter(
+    "bedrock_input_tokens_total",
+    "Model input tokens: uncached, read from the prompt cache, or written to it.", ("model", "kind"),
+))
+MODEL_OUTPUT_TOKENS = REGISTRY.register(Counter(
+    "bedrock_output_tokens_total", "Model output tokens.", ("model",),
+))
+TOOL_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "tool_cache_lookups_total",
+    "Agent tool lookups served from the tool cache (hit), by an in-flight call (joined) or upstream (miss).",
+    ("cache", "outcome"),
+))
+PREFETCH_REQUESTS = REGISTRY.register(Counter(
+    "prefetch_requests_total", "Speculative location lookups started for a new chat session.", ("cache",),
+))
+PREFETCH_USED = REGISTRY.register(Counter(
+    "prefetch_used_total", "Prefetched lookups a tool call later used.", ("cache",),
+))
+PREFETCH_WASTED = REGISTRY.register(Counter(
+    "prefetch_wasted_total", "Prefetched lookups that expired or failed before any tool call used them.", ("cache",),
+))
+GEO_PROFILE_HITS = REGISTRY.register(Counter(
+    "geo_profile_hits_total", "Location tool lookups answered from a user's precomputed geo profile.", ("lookup",),
+))
+SCHEDULER_JOB_DURATION = REGISTRY.register(Histogram(
+    "scheduler_job_duration_seconds", "Scheduled maintenance job runs.", ("job", "outcome"),
+))
+SCHEDULER_JOB_SKIPPED = REGISTRY.register(Counter(
+    "scheduler_job_skipped_total", "Scheduled job runs skipped because another instance holds the job's lease.", ("job",),
+))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "log_records_dropped_total", "Log records not written: sampled out, or the log queue was full.",
+    ("logger", "reason"),
+))
+CHAT_TURNS = REGISTRY.register(Counter(
+    "chat_turns_total", "Chat turns, by whether the fast path or the agent answered.", ("path",),
+))
+CHAT_TURN_DURATION = REGISTRY.register(Histogram(
+    "chat_turn_duration_seconds", "Time to answer a chat turn.", ("path",),
+))
+CHAT_MODEL_TIER_TURNS = REGISTRY.register(Counter(
+    "chat_model_tier_turns_total", "Agent turns per model tier, and why the tier was chosen.", ("tier", "reason"),
+))
+CHAT_MODEL_TIER_DURATION = REGISTRY.register(Histogram(
+    "chat_model_tier_turn_duration_seconds", "Agent turn time per model tier.", ("tier",),
+))
+CHAT_FAST_PATH_SAVED = REGISTRY.register(Counter(
+    "chat_fast_path_saved_seconds_total",
+    "Agent time saved by the fast path: mean agent turn time minus fast-path time, per hit.",
+))
+
+
+def render() -> str:
+    """All metrics in Prometheus text format."""
+    return REGISTRY.render()
+
+
+def track_external(service: str):
+    """Time a call to an external HTTP service: ``with track_external("google_places"): ...``"""
+    return EXTERNAL_HTTP_DURATION.time(service=service)
+
+
+def record_token_usage(model: str, usage: dict) -> None:
+    """Add one turn's token usage (see services.agent.turn_token_usage)."""
+    for kind in ("input", "cache_read", "cache_write"):
+        if usage.get(kind):
+            MODEL_INPUT_TOKENS.inc(usage[kind], model=model, kind="uncached" if kind == "input" else kind)
+    if usage.get("output"):
+        MODEL_OUTPUT_TOKENS.inc(usage["output"], model=model)
+
+
+def record_chat_turn(path: str, seconds: float) -> None:
+    """
+    Count a chat turn answered by *path* ("fast_path" or "agent").
+
+    A fast-path hit also adds its saving against the mean agent turn so
+    far, once there is one to compare with.
+    """
+    CHAT_TURNS.inc(path=path)
+    CHAT_TURN_DURATION.observe(seconds, path=path)
+    if path == "fast_path":
+        agent_turns = CHAT_TURN_DURATION.count(path="agent")
+        if agent_turns:
+            mean_agent = CHAT_TURN_DURATION.sum(path="agent") / agent_turns
+            CHAT_FAST_PATH_SAVED.inc(max(mean_agent - seconds, 0.0))
+
+
+def record_model_tier(tier: str, reason: str, seconds: float) -> None:
+    """Count an agent turn answered by model *tier* ("small" or "large")."""
+    CHAT_MODEL_TIER_TURNS.inc(tier=tier, reason=reason)
+    CHAT_MODEL_TIER_DURATION.observe(seconds, tier=tier)
+
+
+def prefetch_hit_rate(cache: str) -> float:
+    """Share of *cache*'s prefetches that a tool call used."""
+    started = PREFETCH_REQUESTS.value(cache=cache)
+    return PREFETCH_USED.value(cache=cache) / started if started else 0.0
+
+
+def fast_path_hit_rate() -> float:
+    """Share of chat turns answered without the agent."""
+    hits = CHAT_TURNS.value(path="fast_path")
+    total = hits + CHAT_TURNS.value(path="agent")
+    return hits / total if total else 0.0
+
+
+# ── Per-request database totals ──────────────────────────────────────
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    """Database totals for the request being handled, if any."""
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    DB_QUERY_DURATION.observe(elapsed, operation=operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+_db_instrumented = False
+
+
+def instrument_database() -> None:
+    """Time every query on every SQLAlchemy engine. Safe to call more than once."""
+    global _db_instrumented
+    if _db_instrumented:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _db_instrumented = True
+
+
+# ── HTTP middleware ──────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and database totals per request.
+
+    Requests are labelled by route template (/chat/session/{session_id}),
+    not by raw path, so the number of series stays bounded; paths that
+    match no route are grouped as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_REQUEST_DB_QUERIES.observe(stats.db_queries, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.db_seconds, route=route)
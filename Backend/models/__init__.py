@@ -12,6 +12,16 @@ from .schemas import (
     TransportComparisonRequest,
     PetrolStation,
     TransportComparisonResponse,
+    GeoPoint,
+    PricedLocation,
+    RouteFrontierRequest,
+    RouteOption,
+    RouteFrontierResponse,
+    TripStore,
+    TripStation,
+    TripPlanRequest,
+    PlannedStop,
+    TripPlanResponse,
     WeeklyPlanRequest,
     WeeklyPlanResponse,
     LeaderboardEntry,
@@ -32,6 +42,16 @@ __all__ = [
     "TransportComparisonRequest",
     "PetrolStation",
     "TransportComparisonResponse",
+    "GeoPoint",
+    "PricedLocation",
+    "RouteFrontierRequest",
+    "RouteOption",
+    "RouteFrontierResponse",
+    "TripStore",
+    "TripStation",
+    "TripPlanRequest",
+    "PlannedStop",
+    "TripPlanResponse",
     "WeeklyPlanRequest",
     "WeeklyPlanResponse",
     "LeaderboardEntry",
@@ -3,7 +3,7 @@ SQLAlchemy ORM models for database tables.
 """
 
 from datetime import datetime
-from sqlalchemy import String, Float, Integer, DateTime, ForeignKey, Index
+from sqlalchemy import JSON, String, Float, Integer, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from database import Base
 
@@ -50,3 +50,84 @@ class HistoricalPriceData(Base):
     __table_args__ = (
         Index('idx_historical_price_item_date', 'item_name', 'recorded_date'),
     )
+
+
+class ShoppingList(Base):
+    """A user's shopping list, stored server-side and versioned for delta sync."""
+    __tablename__ = "shopping_lists"
+
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.user_id"), primary_key=True)
+    items: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserGeoProfile(Base):
+    """
+    Location data precomputed for a user's home address.
+
+    Built in the background after onboarding and refreshed on a schedule,
+    so the agent's location tools can answer for the home address without
+    calling Google. ``stores`` maps chain name to its nearest stores, and
+    every store and station has a ``travel`` entry per mode.
+    """
+    __tablename__ = "user_geo_profiles"
+
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.user_id"), primary_key=True)
+    home_address: Mapped[str] = mapped_column(String, nullable=False)  # Address the profile was built for
+    latitude: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    stores: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    stations: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+
+
+class SchedulerLock(Base):
+    """Lease that lets one app instance at a time run a single-instance scheduled job."""
+    __tablename__ = "scheduler_locks"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)  # Job name
+    owner: Mapped[str] = mapped_column(String, nullable=False)   # host:pid:id of the holding instance
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class FuelPriceSeries(Base):
+    """
+    One station's fuel prices for one calendar month, as packed change points.
+
+    ``minutes`` (minutes since the start of ``month``) and ``prices``
+    (tenths of a cent per litre) are little-endian uint16 arrays. A price
+    is only appended when it differs from the previous one, so a month of
+    history for a station is a few hundred bytes.
+    """
+    __tablename__ = "fuel_price_series"
+
+    station_code: Mapped[str] = mapped_column(String, primary_key=True)
+    fuel_type: Mapped[str] = mapped_column(String, primary_key=True)   # FuelCheck code, e.g. U91
+    month: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    region: Mapped[str] = mapped_column(String, nullable=False)
+    minutes: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, default=b"")
+    prices: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, default=b"")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_fuel_price_series_fuel_month', 'fuel_type', 'month'),
+    )
+
+
+class FuelPriceCycle(Base):
+    """Where a region's fuel prices are in their cycle, from the latest batch analysis."""
+    __tablename__ = "fuel_price_cycles"
+
+    fuel_type: Mapped[str] = mapped_column(String, primary_key=True)
+    region: Mapped[str] = mapped_column(String, primary_key=True)
+    stations: Mapped[int] = mapped_column(Integer, nullable=False)
+    phase: Mapped[str] = mapped_column(String, nullable=False)      # rising, falling, bottom or no_cycle
+    advice: Mapped[str] = mapped_column(String, nullable=False)     # fill_up_now, wait or no_pattern
+    current: Mapped[float] = mapped_column(Float, nullable=False)   # Regional median, cents per litre
+    trough: Mapped[float] = mapped_column(Float, nullable=False)
+    peak: Mapped[float] = mapped_column(Float, nullable=False)
+    position: Mapped[float | None] = mapped_column(Float, nullable=True)   # 0 at trough, 1 at peak
+    cycle_days: Mapped[float | None] = mapped_column(Float, nullable=True)
+    last_hike: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -72,6 +72,95 @@ class TransportComparisonResponse(BaseModel):
     stations: list[PetrolStation]
 
 
+# Route optimization schemas
+class GeoPoint(BaseModel):
+    """Schema for a latitude/longitude coordinate."""
+    latitude: float = Field(..., ge=-90, le=90, description="Latitude in decimal degrees", examples=[-33.9173])
+    longitude: float = Field(..., ge=-180, le=180, description="Longitude in decimal degrees", examples=[151.2313])
+
+
+class PricedLocation(GeoPoint):
+    """Schema for a store or petrol station with the cost of shopping there."""
+    cost: float = Field(..., ge=0, description="Cost of the purchase at this location in dollars", examples=[45.00])
+
+
+class RouteFrontierRequest(BaseModel):
+    """Request schema for grocery + fuel route options."""
+    origin: GeoPoint = Field(..., description="Where the trip starts (usually the user's home)")
+    coles: list[PricedLocation] = Field(default_factory=list, description="Candidate Coles stores")
+    woolworths: list[PricedLocation] = Field(default_factory=list, description="Candidate Woolworths stores")
+    servos: list[PricedLocation] = Field(..., min_length=1, description="Candidate petrol stations")
+    weight: float | None = Field(None, ge=0, le=1, description="Optional slider position (0 = shortest, 1 = cheapest) to pick a recommended route", examples=[0.5])
+
+
+class RouteOption(BaseModel):
+    """Schema for a single grocery + servo trip."""
+    total_distance_km: float = Field(..., description="Total trip distance in kilometers", examples=[1.27])
+    total_cost: float = Field(..., description="Grocery cost plus fuel cost", examples=[68.00])
+    grocery_type: str = Field(..., description="Grocery store brand", examples=["Woolworths"])
+    grocery_coords: tuple[float, float] = Field(..., description="Grocery store (latitude, longitude)")
+    grocery_cost: float = Field(..., description="Cost at the grocery store", examples=[45.00])
+    servo_coords: tuple[float, float] = Field(..., description="Petrol station (latitude, longitude)")
+    servo_cost: float = Field(..., description="Cost at the petrol station", examples=[23.00])
+    route_order: str = Field(..., description="Which stop is visited first", examples=["Address -> Servo -> Grocery"])
+    weighted_score: float | None = Field(None, description="Normalised score for the requested weight (lower is better)", examples=[0.066])
+
+
+class RouteFrontierResponse(BaseModel):
+    """Response schema for the cost/distance Pareto frontier."""
+    routes: list[RouteOption] = Field(..., description="Non-dominated trips sorted by cost ascending")
+    recommended: RouteOption | None = Field(None, description="Best route for the requested weight, if one was given")
+    min_distance_km: float
+    max_distance_km: float
+    min_cost: float
+    max_cost: float
+    candidate_count: int = Field(..., description="Number of store + servo combinations considered")
+
+
+# Trip planning schemas
+class TripStore(GeoPoint):
+    """Schema for a candidate grocery store in a multi-stop trip."""
+    name: str = Field(..., min_length=1, description="Store name", examples=["Coles Kensington"])
+    prices: dict[str, float] = Field(default_factory=dict, description="Item name -> price at this store; missing items aren't stocked", examples=[{"Milk (1L)": 3.10, "Bread (Loaf)": 3.80}])
+
+
+class TripStation(GeoPoint):
+    """Schema for a candidate petrol station in a multi-stop trip."""
+    name: str = Field(..., min_length=1, description="Station name", examples=["7-Eleven Kensington"])
+    price_per_litre: float = Field(..., gt=0, description="Fuel price in dollars per litre", examples=[1.85])
+
+
+class TripPlanRequest(BaseModel):
+    """Request schema for multi-stop trip planning."""
+    origin: GeoPoint = Field(..., description="Where the trip starts and (optionally) ends")
+    items: list[str] = Field(default_factory=list, description="Items that must all be bought", examples=[["Milk (1L)", "Bread (Loaf)"]])
+    stores: list[TripStore] = Field(default_factory=list, description="Candidate grocery stores")
+    stations: list[TripStation] = Field(default_factory=list, description="Candidate petrol stations")
+    fuel_litres: float = Field(0, ge=0, description="Litres of fuel to buy (0 = no fuel stop)", examples=[30.0])
+    cost_per_km: float = Field(0.128, ge=0, description="Travel cost in dollars per kilometre (default: 8 L/100 km at $1.60/L)", examples=[0.128])
+    return_home: bool = Field(True, description="Include the trip back to the origin")
+
+
+class PlannedStop(BaseModel):
+    """Schema for one stop on a planned trip."""
+    name: str
+    kind: str = Field(..., description="'store' or 'station'", examples=["store"])
+    latitude: float
+    longitude: float
+    items: list[str] = Field(..., description="Items to buy at this stop")
+    spend: float = Field(..., description="Money spent at this stop (items or fuel)")
+
+
+class TripPlanResponse(BaseModel):
+    """Response schema for the cheapest multi-stop trip."""
+    stops: list[PlannedStop] = Field(..., description="Stops in visiting order")
+    item_cost: float
+    fuel_cost: float
+    travel_distance_km: float
+    travel_cost: float
+    total_cost: float = Field(..., description="item_cost + fuel_cost + travel_cost")
+    subsets_evaluated: int = Field(..., description="Store/station combinations considered")
+
 # Weekly plan schemas
 class WeeklyPlanRequest(BaseModel):
     """Request schema for recording weekly plan."""
@@ -107,6 +196,24 @@ class LeaderboardResponse(BaseModel):
     leaderboard: list[LeaderboardEntry]
 
 
+# Shopping list schemas
+class ShoppingListOpsRequest(BaseModel):
+    """Request schema for editing a stored shopping list."""
+    ops: list[dict] = Field(
+        ..., description="Operations: upsert (item), remove (name) or clear",
+        examples=[[{"op": "upsert", "item": {"name": "Milk", "quantity": 2, "price": 3.1}}, {"op": "remove", "name": "Bread"}]],
+    )
+    since: int | None = Field(None, ge=0, description="List version the client last saw")
+
+
+class ShoppingListResponse(BaseModel):
+    """Response schema for a stored shopping list: the whole list or the changes since a version."""
+    user_id: str
+    version: int
+    items: list[dict] | None = Field(None, description="The whole list, when the client needs it")
+    ops: list[dict] | None = Field(None, description="Operations since the client's version")
+
+
 # Error response schemas
 class ErrorDetail(BaseModel):
     """Schema for field-specific error details."""
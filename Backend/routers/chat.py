@@ -12,51 +12,99 @@ import re
 import uuid
 import time
 import logging
-from typing import Dict
+from contextlib import nullcontext
+from copy import deepcopy
+from typing import Dict, Literal
 
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 
-from services.agent import create_agent
-from services.shopping_list_context import set_list, get_list, reset_list, lock as list_lock
+import database
+from log_config import body
+
+from metrics import record_chat_turn, record_model_tier, record_token_usage
+from services.agent import create_agent, create_tier_model, turn_token_usage
+from services.agent_trace import discard_traces, trace_turn
+from services.intent_parser import apply_list_commands, parse_list_command
+from services.list_prompt import ListContextState, build_turn_context, remember_list
+from services.model_router import choose_tier
+from services import prefetch, shopping_list_store
+from services.shopping_list_context import set_list, get_list, reset_list, locked, use_stored_list
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 # ── Session store ────────────────────────────────────────────────────
-# Maps sessionId -> {"agent": Agent, "last_used": timestamp}
+# Maps sessionId -> {"agent": Agent, "last_used": timestamp,
+#                    "models": {tier: Model}, "tier_override": tier | None,
+#                    "context": ListContextState}
 _sessions: Dict[str, dict] = {}
 SESSION_TTL_SECONDS = 30 * 60  # 30 minutes of inactivity before eviction
 
 
-def _cleanup_sessions():
-    """Remove sessions that have been idle longer than SESSION_TTL_SECONDS."""
+def cleanup_sessions() -> int:
+    """
+    Remove sessions that have been idle longer than SESSION_TTL_SECONDS.
+
+    Runs as a scheduled job (see main.py); returns how many were removed.
+    """
     now = time.time()
     expired = [
         sid for sid, data in _sessions.items()
         if now - data["last_used"] > SESSION_TTL_SECONDS
     ]
     for sid in expired:
-        logger.info(f"Evicting idle session: {sid}")
+        logger.info("Evicting idle session %s", sid, extra={"session_id": sid})
         del _sessions[sid]
+        discard_traces(sid)
+        prefetch.cancel(sid)
+    return len(expired)
 
 
-def _get_or_create_agent(session_id: str | None):
-    """Return an existing agent for the session, or create a new one."""
-    _cleanup_sessions()
-
-    if session_id and session_id in _sessions:
-        logger.info(f"Reusing agent for session: {session_id}")
-        _sessions[session_id]["last_used"] = time.time()
-        return session_id, _sessions[session_id]["agent"]
+def _get_or_create_agent(session_id: str | None, message: str, model_tier: str | None = None):
+    """
+    Return the session's agent, or create a new one, set up to answer *message*.
 
-    # New session
-    new_id = session_id or str(uuid.uuid4())
-    agent = create_agent()
-    _sessions[new_id] = {"agent": agent, "last_used": time.time()}
-    logger.info(f"Created new agent for session: {new_id}")
-    return new_id, agent
+    The agent's model is switched to the tier services.model_router
+    picks for the message; each session creates a tier's model once and
+    the conversation history carries over between tiers. *model_tier*
+    ("small", "large", or "auto" to go back to the classifier) pins the
+    session's tier from this turn on.
+    """
+    session = _sessions.get(session_id) if session_id else None
+    if session is not None:
+        logger.debug("Reusing agent for session %s", session_id)
+        session["last_used"] = time.time()
+    if model_tier is not None and session is not None:
+        session["tier_override"] = None if model_tier == "auto" else model_tier
+
+    override = session["tier_override"] if session is not None else model_tier
+    decision = choose_tier(message, override)
+
+    if session is None:
+        # New session
+        session_id = session_id or str(uuid.uuid4())
+        agent = create_agent(decision.tier)
+        session = {
+            "agent": agent,
+            "last_used": time.time(),
+            "models": {decision.tier: agent.model},
+            "tier_override": None if model_tier in (None, "auto") else model_tier,
+            "context": ListContextState(),
+        }
+        _sessions[session_id] = session
+        logger.info("Created new agent for session %s", session_id, extra={"session_id": session_id})
+    elif decision.tier not in session["models"]:
+        session["models"][decision.tier] = create_tier_model(decision.tier)
+
+    agent = session["agent"]
+    agent.model = session["models"][decision.tier]
+    logger.info(
+        "Model tier for session %s: %s (%s)", session_id, decision.tier, decision.reason,
+        extra={"session_id": session_id, "tier": decision.tier, "tier_reason": decision.reason},
+    )
+    return session_id, agent, decision
 
 
 # ── Helpers ───────────────────────────────────────────────────────────
@@ -105,9 +153,7 @@ def _backfill_prices(shopping_list: list[dict], reply_text: str) -> list[dict]:
                 price = float(match.group(1))
                 if price > 0:
                     shopping_list[idx]["price"] = price
-                    logger.info(
-                        f"Backfilled price for '{name}': ${price:.2f}"
-                    )
+                    logger.info("Backfilled price for %r: $%.2f", name, price)
                     break  # Found a price for this item, move on
 
     return shopping_list
@@ -122,6 +168,12 @@ class ChatRequest(BaseModel):
     audioData: str | None = None
     sessionId: str | None = None  # Optional: reuse conversation
     homeAddress: str | None = None  # User's home address from registration
+    modelTier: Literal["auto", "small", "large"] | None = None  # Pin the session's model tier
+    # Server-side list: with userId, shoppingList is ignored (except to seed
+    # an empty stored list); send the last listVersion seen and any edits
+    userId: str | None = None
+    listVersion: int | None = None
+    listOps: list[dict] = []
 
 
 class ChatResponse(BaseModel):
@@ -129,6 +181,70 @@ class ChatResponse(BaseModel):
     reply: str
     updatedList: list[dict] = []
     sessionId: str  # Return so frontend can send it back next turn
+    listVersion: int | None = None  # Set for server-side lists
+    listOps: list[dict] | None = None  # Changes since the request's listVersion, instead of updatedList
+
+
+# ── Server-side lists ────────────────────────────────────────────────
+
+async def _load_stored_list(request: ChatRequest) -> list[dict]:
+    """Load the user's stored list and apply the client's edits to it."""
+    async with database.async_session() as db:
+        stored = await shopping_list_store.load(db, request.userId)
+    if stored.version == 0 and not stored.items and request.shoppingList:
+        # First request from a client that kept the list itself
+        shopping_list_store.replace(request.userId, request.shoppingList)
+    if request.listOps:
+        shopping_list_store.apply(request.userId, request.listOps)
+    return shopping_list_store.cached(request.userId).items
+
+
+async def _save_stored_list(request: ChatRequest, final_list: list[dict]) -> dict:
+    """Save the user's list; the list fields of the response."""
+    shopping_list_store.replace(request.userId, final_list)
+    async with database.async_session() as db:
+        await shopping_list_store.flush(db, request.userId)
+    state = shopping_list_store.sync_state(request.userId, request.listVersion)
+    if "ops" in state:
+        return {"updatedList": [], "listVersion": state["version"], "listOps": state["ops"]}
+    return {"updatedList": state["items"], "listVersion": state["version"]}
+
+
+# ── Fast path ────────────────────────────────────────────────────────
+
+def _try_fast_path(request: ChatRequest) -> ChatResponse | None:
+    """
+    Answer a plain list command ("add 2 milk", "clear my list") without
+    the agent, or return None to hand the message to the agent.
+
+    If the session already has an agent, the exchange is added to its
+    history so later turns know about the change.
+    """
+    commands = parse_list_command(request.message)
+    if commands is None:
+        return None
+
+    shopping_list = deepcopy(request.shoppingList)
+    reply = apply_list_commands(shopping_list, commands)
+    if reply is None:
+        return None
+
+    session_id = request.sessionId or str(uuid.uuid4())
+    session = _sessions.get(session_id)
+    if session is not None:
+        session["last_used"] = time.time()
+        session["agent"].messages.extend([
+            {"role": "user", "content": [{"text": f"User message: {request.message}"}]},
+            {"role": "assistant", "content": [{"text": reply}]},
+        ])
+        if session["context"].shopping_list is not None:
+            remember_list(session["context"], shopping_list)
+
+    logger.info(
+        "Fast path handled list command (session=%s)", session_id,
+        extra={"session_id": session_id, "reply": body(reply), "items": len(shopping_list)},
+    )
+    return ChatResponse(reply=reply, updatedList=shopping_list, sessionId=session_id)
 
 
 # ── Endpoint ─────────────────────────────────────────────────────────
@@ -140,9 +256,18 @@ async def chat(request: ChatRequest):
 
     The Strands agent will reason about the message and decide which
     tools to call (fuel lookup, Coles prices, Maps, or list management).
+    Plain list commands ("add 2 milk", "remove bread", "clear my list")
+    are applied directly without calling the agent.
 
     Passing the returned ``sessionId`` on subsequent requests keeps the
     conversation context alive so the agent remembers earlier messages.
+    Each turn goes to a small or a large Bedrock model depending on how
+    much planning it needs; ``modelTier`` pins the session to one of them.
+
+    With ``userId`` the list is kept server-side: the client sends the
+    ``listVersion`` it last saw plus its own edits as ``listOps``, and gets
+    back the new ``listVersion`` and the operations since its version
+    (or the whole list in ``updatedList`` if those are no longer known).
 
     Args:
         request: Contains message, current shoppingList, optional audioData,
@@ -155,42 +280,76 @@ async def chat(request: ChatRequest):
     Raises:
         HTTPException 500: If the agent encounters an error
     """
-    try:
-        session_id, agent = _get_or_create_agent(request.sessionId)
-
-        # Build context including the current shopping list and home address
-        context_parts = []
-        if request.homeAddress:
-            context_parts.append(
-                f"[USER_HOME_ADDRESS={request.homeAddress}] — "
-                f"Whenever you call a tool that needs the user's location or "
-                f"start address, pass the exact string \"{request.homeAddress}\"."
-            )
-        if request.shoppingList:
-            context_parts.append(
-                f"The user's current shopping list: {request.shoppingList}"
-            )
-        context_parts.append(f"User message: {request.message}")
-
-        context = "\n\n".join(context_parts)
+    start = time.perf_counter()
+    if request.userId:
+        request.shoppingList = await _load_stored_list(request)
+
+    fast_response = _try_fast_path(request)
+    if fast_response is not None:
+        if request.userId:
+            list_fields = await _save_stored_list(request, fast_response.updatedList)
+            fast_response = fast_response.model_copy(update=list_fields)
+        record_chat_turn("fast_path", time.perf_counter() - start)
+        return fast_response
 
-        logger.info(f"Processing chat message (session={session_id}): {request.message[:100]}...")
-        logger.info(f"Home address received: '{request.homeAddress}'")
+    try:
+        session_id, agent, tier = _get_or_create_agent(request.sessionId, request.message, request.modelTier)
+
+        # The agent keeps its history, so send the home address and the
+        # shopping list once, then only what changed since its last turn
+        context_state = _sessions[session_id]["context"]
+        if request.homeAddress and request.homeAddress != context_state.home_address:
+            # Geocode, nearby stores and fuel prices, while the model thinks
+            prefetch.start(session_id, request.homeAddress)
+        context = build_turn_context(
+            request.message,
+            request.shoppingList,
+            request.homeAddress,
+            context_state,
+            agent.conversation_manager.removed_message_count,
+        )
 
-        # Seed the shared shopping list so manage_list can read/write it
-        with list_lock:
-            set_list(request.shoppingList)
-        logger.info(f"Seeded shopping list with {len(request.shoppingList)} items")
+        # Message text and the home address are personal: log their size only
+        logger.info(
+            "Processing chat message (session=%s)", session_id,
+            extra={"session_id": session_id, "chat_message": body(request.message),
+                   "home_address": body(request.homeAddress or ""), "items": len(request.shoppingList)},
+        )
 
-        try:
-            # Invoke the agent — it keeps its own message history internally
-            response = agent(context)
-        finally:
-            # Read back the (possibly updated) shopping list
-            with list_lock:
-                final_list = get_list()
-                reset_list()
-            logger.info(f"Final shopping list has {len(final_list)} items: {[i.get('name') for i in final_list]}")
+        # Trace the turn (model calls, tools, list-lock waits) for /debug/trace
+        stored_list = use_stored_list(request.userId) if request.userId else nullcontext()
+        with trace_turn(session_id, request.message) as trace, stored_list:
+            trace.root.attributes.update({"model.tier": tier.tier, "model.tier_reason": tier.reason})
+            # Seed the shared shopping list so manage_list can read/write it
+            with locked("chat.seed_list"):
+                set_list(request.shoppingList)
+            logger.debug("Seeded shopping list with %d items", len(request.shoppingList))
+
+            try:
+                # Invoke the agent — it keeps its own message history internally
+                response = agent(context)
+            except Exception:
+                context_state.shopping_list = None  # resend everything next turn
+                raise
+            finally:
+                # Read back the (possibly updated) shopping list
+                with locked("chat.read_list"):
+                    final_list = get_list()
+                    reset_list()
+                logger.info(
+                    "Final shopping list has %d items", len(final_list),
+                    extra={"session_id": session_id, "items": len(final_list), "shopping_list": body(final_list)},
+                )
+
+            # Cached vs uncached input tokens, to see what prompt caching saves
+            usage = turn_token_usage(agent)
+            record_token_usage(agent.model.get_config().get("model_id", ""), usage)
+            trace.root.attributes.update({f"tokens.{kind}": count for kind, count in usage.items()})
+            logger.info(
+                "Turn tokens (session=%s): %d uncached input, %d cache read, %d cache write, %d output",
+                session_id, usage["input"], usage["cache_read"], usage["cache_write"], usage["output"],
+                extra={"session_id": session_id, "tokens": usage},
+            )
 
         # Strip any <thinking>...</thinking> tags the model may leak
         reply_text = re.sub(r"<thinking>.*?</thinking>\s*", "", str(response), flags=re.DOTALL).strip()
@@ -200,11 +359,18 @@ async def chat(request: ChatRequest):
         # price lookup, resulting in items with price=0.  If the reply
         # mentions a dollar amount next to an item name, backfill it.
         final_list = _backfill_prices(final_list, reply_text)
-
+        remember_list(context_state, final_list)
+        list_fields = {"updatedList": final_list}
+        if request.userId:
+            list_fields = await _save_stored_list(request, final_list)
+
+        elapsed = time.perf_counter() - start
+        record_chat_turn("agent", elapsed)
+        record_model_tier(tier.tier, tier.reason, elapsed)
         return ChatResponse(
             reply=reply_text,
-            updatedList=final_list,
             sessionId=session_id,
+            **list_fields,
         )
 
     except Exception as e:
@@ -5,8 +5,8 @@ Handles HTTP request/response for leaderboard functionality.
 """
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_read_db
 from models.schemas import LeaderboardResponse
 from services.leaderboard_service import calculate_leaderboard
 
@@ -61,7 +61,7 @@ router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
     }
 )
 async def get_leaderboard(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> LeaderboardResponse:
     """
     Get the ranked leaderboard of users by average optimization score.
@@ -132,6 +132,8 @@ async def get_leaderboard(
 
     - Only users with at least one recorded weekly plan appear on the leaderboard
     - The leaderboard updates in real-time as users record new weekly plans
+      (served from a read replica when DATABASE_READ_URL is set, so it may
+      lag slightly behind the primary)
     - Users with negative average scores still appear (they're just ranked lower)
     - Ties in average_score are handled by database ordering
     """
@@ -0,0 +1,69 @@
+"""
+Shopping list router for server-side lists with delta sync.
+
+Handles HTTP request/response for reading and editing a user's stored
+shopping list. The chat endpoint works on the same list when it is
+given a userId.
+"""
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models.schemas import ShoppingListOpsRequest, ShoppingListResponse
+from services import shopping_list_store
+
+router = APIRouter(prefix="/shopping-list", tags=["shopping-list"])
+
+
+@router.get(
+    "/{user_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=ShoppingListResponse,
+    response_model_exclude_none=True,
+)
+async def get_shopping_list(
+    user_id: str,
+    since: int | None = Query(None, ge=0, description="List version the client last saw"),
+    db: AsyncSession = Depends(get_async_db),
+) -> ShoppingListResponse:
+    """
+    Get a user's stored shopping list, or the changes since a version.
+
+    Without ``since`` (or when the changes since it are no longer kept)
+    the whole list is returned in ``items``; otherwise ``ops`` lists the
+    operations to apply to the client's copy.
+
+    ## Error Responses
+
+    - **404 Not Found**: User does not exist
+    """
+    await shopping_list_store.load(db, user_id)
+    return ShoppingListResponse(user_id=user_id, **shopping_list_store.sync_state(user_id, since))
+
+
+@router.post(
+    "/{user_id}/ops",
+    status_code=status.HTTP_200_OK,
+    response_model=ShoppingListResponse,
+    response_model_exclude_none=True,
+)
+async def apply_shopping_list_ops(
+    user_id: str,
+    request: ShoppingListOpsRequest,
+    db: AsyncSession = Depends(get_async_db),
+) -> ShoppingListResponse:
+    """
+    Apply the client's edits to a user's stored shopping list.
+
+    Returns the new version and the changes since ``since`` (including
+    the client's own edits), or the whole list.
+
+    ## Error Responses
+
+    - **400 Bad Request**: Malformed operation
+    - **404 Not Found**: User does not exist
+    """
+    await shopping_list_store.load(db, user_id)
+    shopping_list_store.apply(user_id, request.ops)
+    await shopping_list_store.flush(db, user_id)
+    return ShoppingListResponse(user_id=user_id, **shopping_list_store.sync_state(user_id, request.since))
@@ -5,14 +5,23 @@ Handles HTTP request/response for transport cost comparison with petrol stations
 """
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models.schemas import (
     TransportComparisonRequest,
     TransportComparisonResponse,
-    PetrolStation
+    PetrolStation,
+    RouteFrontierRequest,
+    RouteFrontierResponse,
+    RouteOption,
+    TripPlanRequest,
+    TripPlanResponse,
+    PlannedStop,
 )
 from services.transport_service import compare_transport_costs
+from services.route_service import get_route_frontier
+from services.trip_planner import plan_trip
 
 router = APIRouter(prefix="/transport", tags=["transport"])
 
@@ -88,7 +97,7 @@ router = APIRouter(prefix="/transport", tags=["transport"])
 )
 async def compare_transport_endpoint(
     request: TransportComparisonRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> TransportComparisonResponse:
     """
     Compare fuel costs at nearby petrol stations for optimal refueling.
@@ -187,3 +196,219 @@ async def compare_transport_endpoint(
     stations = [PetrolStation(**station) for station in result["stations"]]
     
     return TransportComparisonResponse(stations=stations)
+
+
+@router.post(
+    "/plan-trip",
+    status_code=status.HTTP_200_OK,
+    response_model=TripPlanResponse,
+    responses={
+        200: {
+            "description": "Trip planned",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "stops": [
+                            {
+                                "name": "Woolworths Randwick",
+                                "kind": "store",
+                                "latitude": -33.9145,
+                                "longitude": 151.2417,
+                                "items": ["Bread (Loaf)"],
+                                "spend": 3.50
+                            },
+                            {
+                                "name": "Coles Kensington",
+                                "kind": "store",
+                                "latitude": -33.9110,
+                                "longitude": 151.2250,
+                                "items": ["Milk (1L)"],
+                                "spend": 3.10
+                            }
+                        ],
+                        "item_cost": 6.60,
+                        "fuel_cost": 0.00,
+                        "travel_distance_km": 4.21,
+                        "travel_cost": 0.54,
+                        "total_cost": 7.14,
+                        "subsets_evaluated": 3
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Validation error - Invalid input",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "error_code": "VALIDATION_ERROR",
+                        "message": "No store stocks: Tim Tams"
+                    }
+                }
+            }
+        }
+    }
+)
+async def plan_trip_endpoint(request: TripPlanRequest) -> TripPlanResponse:
+    """
+    Plan the cheapest multi-stop shopping trip.
+
+    Picks which stores (and, if fuel is needed, which petrol station) to
+    visit and in what order, minimising item cost + fuel purchase + travel
+    cost. Each item is bought at the cheapest visited store that stocks it,
+    so splitting a list between Coles and Woolworths happens only when the
+    savings outweigh the extra driving.
+
+    ## Request Body
+
+    - **origin** (object, required): `latitude` / `longitude` of home
+    - **items** (list): Item names that must all be bought
+    - **stores** (list): Candidate stores with coordinates and a `prices` map
+    - **stations** (list): Candidate petrol stations with `price_per_litre`
+    - **fuel_litres** (number): Litres to buy at one station (0 = no fuel stop)
+    - **cost_per_km** (number): Travel cost per km (default $0.128)
+    - **return_home** (bool): Include the drive home (default true)
+
+    ## Limits
+
+    At most 10 candidate stores + stations per request; the planner checks
+    every subset and visiting order (Held–Karp), which stays well under
+    100 ms at that size.
+
+    ## Error Responses
+
+    - **400 Bad Request**: Invalid input data
+        - `VALIDATION_ERROR`: Too many stops, an item no store stocks,
+          fuel requested without stations, or nothing to plan
+    """
+    plan = await run_in_threadpool(
+        plan_trip,
+        origin=(request.origin.latitude, request.origin.longitude),
+        items=request.items,
+        stores=[store.model_dump() for store in request.stores],
+        stations=[station.model_dump() for station in request.stations],
+        fuel_litres=request.fuel_litres,
+        cost_per_km=request.cost_per_km,
+        return_home=request.return_home,
+    )
+
+    return TripPlanResponse(
+        stops=[PlannedStop(**stop) for stop in plan["stops"]],
+        item_cost=plan["item_cost"],
+        fuel_cost=plan["fuel_cost"],
+        travel_distance_km=plan["travel_distance_km"],
+        travel_cost=plan["travel_cost"],
+        total_cost=plan["total_cost"],
+        subsets_evaluated=plan["subsets_evaluated"],
+    )
+
+@router.post(
+    "/routes",
+    status_code=status.HTTP_200_OK,
+    response_model=RouteFrontierResponse,
+    responses={
+        200: {
+            "description": "Route options calculated",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "routes": [
+                            {
+                                "total_distance_km": 1.36,
+                                "total_cost": 68.00,
+                                "grocery_type": "Woolworths",
+                                "grocery_coords": [-37.766, 144.922],
+                                "grocery_cost": 45.00,
+                                "servo_coords": [-37.77, 144.91],
+                                "servo_cost": 23.00,
+                                "route_order": "Address -> Servo -> Grocery",
+                                "weighted_score": None
+                            },
+                            {
+                                "total_distance_km": 0.73,
+                                "total_cost": 80.00,
+                                "grocery_type": "Coles",
+                                "grocery_coords": [-37.764632, 144.921957],
+                                "grocery_cost": 50.00,
+                                "servo_coords": [-37.766, 144.915],
+                                "servo_cost": 30.00,
+                                "route_order": "Address -> Grocery -> Servo",
+                                "weighted_score": None
+                            }
+                        ],
+                        "recommended": None,
+                        "min_distance_km": 0.73,
+                        "max_distance_km": 7.95,
+                        "min_cost": 68.00,
+                        "max_cost": 100.00,
+                        "candidate_count": 50
+                    }
+                }
+            }
+        },
+        400: {
+            "description": "Validation error - Invalid input",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "error_code": "VALIDATION_ERROR",
+                        "message": "At least one Coles or Woolworths store is required"
+                    }
+                }
+            }
+        }
+    }
+)
+async def route_frontier_endpoint(request: RouteFrontierRequest) -> RouteFrontierResponse:
+    """
+    List every grocery + fuel trip worth considering, from cheapest to shortest.
+
+    Scores every (grocery store, petrol station) pair in both visiting orders
+    and returns the Pareto frontier: trips where no other trip is both
+    cheaper and shorter. The weighted "best" route for any distance/cost
+    slider position is always one of these, so the frontend can re-rank
+    locally without calling the API again.
+
+    Frontiers are cached per origin and candidate set for a few minutes.
+
+    ## Request Body
+
+    - **origin** (object, required): `latitude` / `longitude` of the trip start
+    - **coles** / **woolworths** (list): Candidate stores with `latitude`, `longitude`, `cost`
+    - **servos** (list, required): Candidate petrol stations with `latitude`, `longitude`, `cost`
+    - **weight** (number, optional): Slider position, 0 = shortest only, 1 = cheapest only.
+      When given, `recommended` holds the best route for that weight.
+
+    ## Selecting a route on the client
+
+    Normalise each route with the returned bounds and take the lowest score:
+    ```
+    score = (1 - weight) × (distance - min_distance_km) / (max_distance_km - min_distance_km)
+          + weight × (cost - min_cost) / (max_cost - min_cost)
+    ```
+
+    ## Error Responses
+
+    - **400 Bad Request**: No grocery stores supplied
+        - `VALIDATION_ERROR`: At least one Coles or Woolworths store is required
+    """
+    frontier = get_route_frontier(
+        origin=(request.origin.latitude, request.origin.longitude),
+        coles=[(s.latitude, s.longitude, s.cost) for s in request.coles],
+        woolworths=[(s.latitude, s.longitude, s.cost) for s in request.woolworths],
+        servos=[(s.latitude, s.longitude, s.cost) for s in request.servos],
+    )
+
+    recommended = None
+    if request.weight is not None:
+        recommended = RouteOption(**frontier.select(request.weight))
+
+    return RouteFrontierResponse(
+        routes=[RouteOption(**route) for route in frontier.routes],
+        recommended=recommended,
+        min_distance_km=round(frontier.min_distance, 2),
+        max_distance_km=round(frontier.max_distance, 2),
+        min_cost=round(frontier.min_cost, 2),
+        max_cost=round(frontier.max_cost, 2),
+        candidate_count=frontier.candidate_count,
+    )
@@ -5,9 +5,10 @@ Handles HTTP request/response for user management.
 """
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models.schemas import UserOnboardRequest, UserResponse
+from services import geo_profile
 from services.user_service import create_user
 
 router = APIRouter(prefix="/onboard", tags=["users"])
@@ -61,7 +62,7 @@ router = APIRouter(prefix="/onboard", tags=["users"])
 )
 async def onboard_user(
     user_data: UserOnboardRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> UserResponse:
     """
     Create a new user account for budget optimization.
@@ -84,6 +85,9 @@ async def onboard_user(
     - **home_address**: User's home address
     - **created_at**: Timestamp of account creation
 
+    The user's geo profile (nearest stores and stations, and travel times
+    to them) is built in the background after the response.
+
     ## Error Responses
 
     - **400 Bad Request**: Invalid input data
@@ -122,7 +126,9 @@ async def onboard_user(
         weekly_budget=user_data.weekly_budget,
         home_address=user_data.home_address
     )
-    
+    # Precompute stores and travel times near the new home in the background
+    geo_profile.schedule_build(user.user_id)
+
     return UserResponse(
         user_id=user.user_id,
         name=user.name,
@@ -5,8 +5,8 @@ Handles HTTP request/response for weekly plan management.
 """
 
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models.schemas import WeeklyPlanRequest, WeeklyPlanResponse
 from services.weekly_plan_service import record_weekly_plan
 
@@ -70,7 +70,7 @@ router = APIRouter(prefix="/weekly-plan", tags=["weekly-plan"])
 )
 async def record_weekly_plan_endpoint(
     request: WeeklyPlanRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> WeeklyPlanResponse:
     """
     Record actual spending for the week and calculate optimization score.
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Agent orchestration overhead, measured offline.
+
+Replays a recorded conversation through the real Strands agent (same
+tools, same system prompt) with the fake Bedrock model and the local
+MCP/upstream stubs. With model and upstream latency at zero, what is left
+is the agent's own cost: building the agent and loading MCP tools,
+formatting requests, dispatching tool calls and parsing results.
+
+Latencies can be added back to see how they combine with that overhead.
+
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_agent.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_agent.py --recording weekly_shop --conversations 50
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_agent.py --model-latency-ms 400 --upstream-latency-ms 150
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import time
+
+
+def _ms(samples: list[float]) -> str:
+    return f"median {statistics.median(samples) * 1000:8.2f} ms   p95 {sorted(samples)[int(len(samples) * 0.95)] * 1000:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", default="grocery_and_fuel", help="Name or path of the recording to replay")
+    parser.add_argument("--conversations", type=int, default=20, help="Conversations to replay (default: 20)")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Fake model time per call")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="Stub upstream/MCP time per call")
+    args = parser.parse_args()
+
+    from stubs.fake_bedrock import load_recording
+    from stubs.upstreams import StubUpstreams
+
+    recording = load_recording(args.recording)
+    stubs = StubUpstreams(latency_ms=args.upstream_latency_ms).start()
+    os.environ.update(stubs.env())
+    os.environ["BEDROCK_MODEL_ID"] = "fake"
+    os.environ["FAKE_BEDROCK_RECORDING"] = args.recording
+    os.environ["FAKE_BEDROCK_LATENCY_MS"] = str(args.model_latency_ms)
+    logging.disable(logging.INFO)
+
+    from database import init_db
+    from services.agent import create_agent, shutdown_mcp_client
+    from services.shopping_list_context import lock, reset_list
+
+    # manage_list checks prices against the seeded history
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db(seed_demo_data=True)
+
+    create_times, turn_times, overheads = [], [], []
+    model_calls = tool_calls = 0
+    try:
+        for _ in range(args.conversations):
+            start = time.perf_counter()
+            agent = create_agent()
+            create_times.append(time.perf_counter() - start)
+
+            for turn in recording["turns"]:
+                calls_before = agent.model.calls
+                start = time.perf_counter()
+                # The agent prints tool calls and replies; keep the report readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    agent(turn["user"])
+                elapsed = time.perf_counter() - start
+                turn_times.append(elapsed)
+
+                calls = agent.model.calls - calls_before
+                tools = sum(len(step.get("tool_calls", [])) for step in turn["steps"])
+                model_calls += calls
+                tool_calls += tools
+                # Tools in one step run in parallel, so count upstream time once per round
+                rounds = sum(1 for step in turn["steps"] if "tool_calls" in step)
+                simulated = (calls * args.model_latency_ms + rounds * args.upstream_latency_ms) / 1000
+                overheads.append(max(elapsed - simulated, 0.0) / max(calls, 1))
+
+            with lock:
+                reset_list()
+    finally:
+        shutdown_mcp_client()
+        stubs.stop()
+
+    turns = len(turn_times)
+    print(
+        f"{args.conversations} conversations × {len(recording['turns'])} turns: "
+        f"{model_calls} model calls, {tool_calls} tool calls"
+    )
+    print(f"{'first create_agent':<24} {create_times[0] * 1000:8.2f} ms (starts the MCP client)")
+    if len(create_times) > 1:
+        print(f"{'create_agent':<24} {_ms(create_times[1:])}")
+    print(f"{'turn':<24} {_ms(turn_times)}")
+    print(f"{'overhead per model call':<24} {_ms(overheads)}")
+    print(f"{'model calls per turn':<24} {model_calls / turns:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
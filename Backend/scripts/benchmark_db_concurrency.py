@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Requests per second for the database-backed endpoints under mixed load.
+
+Drives the app in-process through httpx's ASGI transport, so the numbers
+reflect how much the event loop can overlap, not network overhead. The mix
+is onboarding, weekly-plan recording, leaderboard reads and /health (which
+shows how long non-DB requests wait behind blocking queries).
+
+Run it on two checkouts to compare before/after a change:
+
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_db_concurrency.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_db_concurrency.py --concurrency 64 --requests 5000
+    DATABASE_URL=postgresql://... PYTHONPATH=. ./venv/bin/python scripts/benchmark_db_concurrency.py
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+MIX = [
+    ("onboard", 0.2),
+    ("weekly-plan", 0.3),
+    ("leaderboard", 0.4),
+    ("health", 0.1),
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(concurrency: int, total: int, seed: int) -> None:
+    import httpx
+    from database import init_db
+    from main import app
+
+    init_db(seed_demo_data=True)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rng = random.Random(seed)
+    kinds = rng.choices([k for k, _ in MIX], weights=[w for _, w in MIX], k=total)
+    latencies: dict[str, list[float]] = {k: [] for k, _ in MIX}
+    errors = 0
+    user_ids: list[str] = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # A few users so weekly-plan requests have someone to record against
+        for i in range(concurrency):
+            resp = await client.post("/onboard", json={
+                "name": f"Bench {i}", "weekly_budget": 150.0, "home_address": "1 Bench St"
+            })
+            user_ids.append(resp.json()["user_id"])
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for n, kind in enumerate(kinds):
+            queue.put_nowait((n, kind))
+
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    n, kind = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                if kind == "onboard":
+                    resp = await client.post("/onboard", json={
+                        "name": f"User {n}", "weekly_budget": 120.0, "home_address": f"{n} Load St"
+                    })
+                elif kind == "weekly-plan":
+                    resp = await client.post("/weekly-plan/record", json={
+                        "user_id": user_ids[n % len(user_ids)], "optimal_cost": 80.0, "actual_cost": 95.0
+                    })
+                elif kind == "leaderboard":
+                    resp = await client.get("/leaderboard")
+                else:
+                    resp = await client.get("/health")
+                latencies[kind].append(time.perf_counter() - start)
+                if resp.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{total} requests, concurrency {concurrency}: {total / elapsed:,.0f} req/s ({errors} errors)")
+    print(f"{'endpoint':<12} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for kind, samples in latencies.items():
+        if samples:
+            print(
+                f"{kind:<12} {len(samples):>6} {percentile(samples, 50) * 1000:>8.2f} "
+                f"{percentile(samples, 95) * 1000:>8.2f} {statistics.mean(samples) * 1000:>8.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32)")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (default: 2000)")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the request mix")
+    args = parser.parse_args()
+
+    # Default to a throwaway SQLite file so concurrent connections can overlap
+    if "DATABASE_URL" not in os.environ:
+        tmp = tempfile.mkdtemp(prefix="bench_db_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    print(f"Database: {os.environ['DATABASE_URL']}", file=sys.stderr)
+
+    asyncio.run(run(args.concurrency, args.requests, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+"""
+Throughput and p50/p95/p99 latency for the main HTTP endpoints, with every
+upstream replaced by a local stub.
+
+Starts the stub upstreams (n8n, Google, NSW FuelCheck, a Coles/Woolworths
+MCP server) and runs the chat agent on the scripted fake Bedrock model, so
+the numbers measure this backend rather than the network. Requests are
+driven in-process through httpx's ASGI transport against a throwaway
+SQLite file.
+
+Each endpoint is warmed up, then measured in several rounds (taking turns
+with the other endpoints, so a slow spell on the machine doesn't land on
+one endpoint). Statistics are over every measured request; each one's
+"spread" is how much it varied between rounds.
+
+Results are written as JSON. When a baseline file exists the run is
+compared against it and exits with status 1 if any endpoint's p50/p95/p99
+latency rose, or its throughput fell, by more than the threshold, or by
+more than the baseline's own spread for that metric if that is larger
+(so a noisy metric can't fail the gate by noise alone). Percentiles with
+fewer than 20 requests above them are reported but not compared. Without a
+baseline (or with --update-baseline) the results become the baseline.
+Baselines are machine-specific: record one on the machine that compares.
+
+Geo profiles are not built for the benchmark users (GEO_PROFILE=off), so
+background lookups don't overlap the timings; background prefetches from
+/chat are drained before the stubs stop.
+
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_endpoints.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_endpoints.py --requests 500 --concurrency 16
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_endpoints.py --threshold 0.1 --baseline bench/main.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ENDPOINTS = ["onboard", "weekly-plan", "leaderboard", "transport-compare", "chat"]
+LATENCY_METRICS = ["p50_ms", "p95_ms", "p99_ms"]
+ROUND_METRICS = ["throughput_rps", "mean_ms", *LATENCY_METRICS]
+# A percentile is only compared when at least this many requests are at or
+# above it; p99 of 100 requests is just the slowest one
+MIN_TAIL_SAMPLES = 20
+HOME_ADDRESS = "UNSW Sydney, Kensington NSW 2052"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarise(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Per-endpoint statistics, latencies in milliseconds."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def combine_rounds(rounds: list[tuple[list[float], int, float]]) -> dict:
+    """
+    One endpoint's statistics over several rounds of (latencies, errors,
+    elapsed seconds).
+
+    Percentiles and throughput are over every request; each one's
+    "spread" is the range of its per-round values as a fraction of the
+    overall value.
+    """
+    latencies = [latency for round_latencies, _, _ in rounds for latency in round_latencies]
+    combined = summarise(latencies, sum(r[1] for r in rounds), sum(r[2] for r in rounds))
+    per_round = [summarise(*r) for r in rounds]
+    combined["rounds"] = len(rounds)
+    combined["spread"] = {
+        metric: round((max(r[metric] for r in per_round) - min(r[metric] for r in per_round)) / combined[metric], 3)
+        if combined[metric] else 0.0
+        for metric in ROUND_METRICS
+    }
+    return combined
+
+
+def has_tail(metric: str, requests: int) -> bool:
+    """Whether *requests* samples put at least MIN_TAIL_SAMPLES at or above a pNN_ms percentile."""
+    return requests * (100 - int(metric[1:3])) / 100 >= MIN_TAIL_SAMPLES
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Regressions beyond *threshold* (a fraction, e.g. 0.2 = 20%), or beyond
+    the baseline's spread for a metric when that is wider.
+
+    Endpoints missing from either side are skipped, and so are percentiles
+    with too few requests behind them (see has_tail).
+    """
+    regressions = []
+    for name, current in results["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        spread = base.get("spread", {})
+        for metric in LATENCY_METRICS:
+            if not has_tail(metric, min(current["requests"], base["requests"])):
+                continue
+            allowed = max(threshold, spread.get(metric, 0.0))
+            if base[metric] > 0 and current[metric] > base[metric] * (1 + allowed):
+                regressions.append(
+                    f"{name} {metric}: {current[metric]:.2f} ms vs baseline {base[metric]:.2f} ms "
+                    f"(+{current[metric] / base[metric] - 1:.0%}, allowed +{allowed:.0%})"
+                )
+        allowed = max(threshold, spread.get("throughput_rps", 0.0))
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - allowed):
+            regressions.append(
+                f"{name} throughput: {current['throughput_rps']:.1f} req/s vs baseline "
+                f"{base['throughput_rps']:.1f} req/s ({current['throughput_rps'] / base['throughput_rps'] - 1:.0%}, "
+                f"allowed -{allowed:.0%})"
+            )
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name} errors: {current['errors']} vs baseline {base['errors']}")
+    return regressions
+
+
+async def _drive(
+    client, endpoint: str, total: int, concurrency: int, user_ids: list[str],
+) -> tuple[list[float], int, float]:
+    """
+    Send *total* requests to one endpoint from *concurrency* workers.
+
+    Returns the latencies, the error count and the elapsed seconds.
+    """
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for n in range(total):
+        queue.put_nowait(n)
+
+    async def send(n: int):
+        if endpoint == "onboard":
+            return await client.post("/onboard", json={
+                "name": f"Bench {n}", "weekly_budget": 150.0, "home_address": f"{n} Bench St, Sydney NSW 2000"
+            })
+        if endpoint == "weekly-plan":
+            return await client.post("/weekly-plan/record", json={
+                "user_id": user_ids[n % len(user_ids)], "optimal_cost": 80.0, "actual_cost": 95.0
+            })
+        if endpoint == "leaderboard":
+            return await client.get("/leaderboard")
+        if endpoint == "transport-compare":
+            return await client.post("/transport/compare", json={
+                "user_id": user_ids[n % len(user_ids)], "destination": HOME_ADDRESS, "fuel_amount_needed": 40.0
+            })
+        return await client.post("/chat", json={
+            "message": "Add milk to my list and check fuel prices near me",
+            "shoppingList": [{"name": "Bread", "quantity": 1, "price": 2.60}],
+            "homeAddress": HOME_ADDRESS,
+        })
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                n = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            resp = await send(n)
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run(args) -> dict:
+    import httpx
+    import services.agent as agent
+    from database import init_db
+    from main import app
+    from services import prefetch
+
+    init_db(seed_demo_data=True)
+
+    results = {"endpoints": {}}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        user_ids = []
+        for i in range(max(args.concurrency, 8)):
+            resp = await client.post("/onboard", json={
+                "name": f"Bench user {i}", "weekly_budget": 150.0, "home_address": HOME_ADDRESS
+            })
+            user_ids.append(resp.json()["user_id"])
+
+        rounds = {endpoint: [] for endpoint in args.endpoints}
+        # The agent prints each tool call; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            for endpoint in args.endpoints:
+                warmup = min(args.warmup, args.chat_requests if endpoint == "chat" else args.requests)
+                if warmup:
+                    await _drive(client, endpoint, warmup, args.concurrency, user_ids)
+            for _ in range(args.rounds):
+                for endpoint in args.endpoints:
+                    total = args.chat_requests if endpoint == "chat" else args.requests
+                    rounds[endpoint].append(await _drive(client, endpoint, total, args.concurrency, user_ids))
+        results["endpoints"] = {endpoint: combine_rounds(stats) for endpoint, stats in rounds.items()}
+
+    # Let /chat's background prefetches finish while the stubs are still up
+    prefetch.shutdown(wait=True)
+    agent.shutdown_mcp_client()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="Requests per endpoint per round (default: 400)")
+    parser.add_argument("--chat-requests", type=int, default=80, help="Requests to /chat per round (default: 80)")
+    parser.add_argument("--rounds", type=int, default=3, help="Measured rounds per endpoint (default: 3)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per endpoint first (default: 50)")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--upstream-latency-ms", type=float, default=5.0, help="Added to every stub response")
+    parser.add_argument("--model-latency-ms", type=float, default=20.0, help="Fake model time per call")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, default=Path("benchmark_baseline.json"))
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed regression (default: 0.2 = 20%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    args = parser.parse_args()
+
+    from stubs.upstreams import StubUpstreams
+
+    stubs = StubUpstreams(latency_ms=args.upstream_latency_ms).start()
+    os.environ.update(stubs.env())
+    os.environ["BEDROCK_MODEL_ID"] = "fake"
+    os.environ["FAKE_BEDROCK_LATENCY_MS"] = str(args.model_latency_ms)
+    # Onboarding would otherwise start background geocode and Places lookups
+    os.environ["GEO_PROFILE"] = "off"
+    if "DATABASE_URL" not in os.environ:
+        tmp = tempfile.mkdtemp(prefix="bench_endpoints_")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    logging.disable(logging.INFO)
+
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        stubs.stop()
+
+    results["generated_at"] = datetime.utcnow().isoformat()
+    results["config"] = {
+        "requests": args.requests,
+        "chat_requests": args.chat_requests,
+        "rounds": args.rounds,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "upstream_latency_ms": args.upstream_latency_ms,
+        "model_latency_ms": args.model_latency_ms,
+    }
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    print(f"{'endpoint':<18} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'p50 spread':>11}")
+    for name, stats in results["endpoints"].items():
+        print(
+            f"{name:<18} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>7} "
+            f"{stats['spread']['p50_ms']:>10.0%}"
+        )
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline recorded in {args.baseline}")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != results["config"]:
+        print("Warning: baseline was recorded with different settings", file=sys.stderr)
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%} against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fuel price cycle analysis over months of station history.
+
+Loads synthetic fuel price change points (synthetic_data.generate_fuel_prices),
+packed into monthly series, into a temporary SQLite database, then times
+services.fuel_price_cycle.analyse: reading and unpacking the history,
+building the stations × days price matrix, regional medians and hike
+detection.
+
+Usage:
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_fuel_cycles.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_fuel_cycles.py --stations 5000 --days 180
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from models.db_models import FuelPriceSeries
+from services import fuel_price_cycle, fuel_price_history
+from synthetic_data import DEFAULT_BATCH_SIZE, Base, create_load_engine, generate_fuel_prices
+
+
+def _time(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stations", type=int, default=3000, help="Fuel stations")
+    parser.add_argument("--days", type=int, default=120, help="Days of price history")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_load_engine(f"sqlite:///{os.path.join(directory, 'fuel.db')}")
+        Base.metadata.create_all(bind=engine, tables=[FuelPriceSeries.__table__])
+
+        load_time = time.perf_counter()
+        points = list(generate_fuel_prices(args.stations, args.days, args.seed, now))
+        rows = fuel_price_history.series_rows(points)
+        with engine.connect() as conn:
+            for i in range(0, len(rows), DEFAULT_BATCH_SIZE):
+                conn.execute(FuelPriceSeries.__table__.insert(), rows[i:i + DEFAULT_BATCH_SIZE])
+            conn.commit()
+        load_time = time.perf_counter() - load_time
+        size = sum(len(row["minutes"]) + len(row["prices"]) for row in rows)
+        print(f"Loaded {len(points):,} price changes for {args.stations:,} stations over {args.days} days "
+              f"as {len(rows):,} monthly series ({size / 1e6:.1f} MB packed) in {load_time:.1f}s")
+
+        with Session(engine) as db:
+            # Time the pieces on the same data analyse() reads
+            original = fuel_price_cycle.daily_prices
+            timings = {}
+
+            def timed_daily_prices(*a, **kw):
+                seconds, result = _time(lambda: original(*a, **kw))
+                timings["matrix"] = seconds
+                return result
+
+            fuel_price_cycle.daily_prices = timed_daily_prices
+            try:
+                total, results = _time(lambda: fuel_price_cycle.analyse(db, "U91", now, window_days=args.days))
+            finally:
+                fuel_price_cycle.daily_prices = original
+        engine.dispose()
+
+    print(f"analyse(): {total * 1000:.0f} ms total, {timings['matrix'] * 1000:.0f} ms building the "
+          f"{args.stations:,} × {args.days + 1} daily price matrix")
+    for region in results:
+        print(f"  {region['region']:<12} {region['stations']:>5} stations  phase={region['phase']:<9} "
+              f"advice={region['advice']:<11} cycle={region['cycle_days']} days")
+
+
+if __name__ == "__main__":
+    main()
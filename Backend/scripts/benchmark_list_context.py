@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Input tokens spent on shopping-list context, full list versus changes only.
+
+Plays conversations with a 50-item shopping list through the real Strands
+agent, with the fake Bedrock model and the local upstream stubs. Between
+turns the user edits one item in the app. Each conversation runs twice:
+
+- full:  every turn repeats the home address and the whole list as a
+         Python repr (the chat router's previous prompt)
+- delta: services.list_prompt, the compact list on the first turn and
+         only the changes after that
+
+The fake model estimates tokens at four characters per token, over the
+system prompt, tool specs and the whole history, for every model call,
+so the totals show how repeated context compounds as the conversation
+grows. Model latency is roughly proportional to input tokens, so use
+--model-latency-ms to add a fixed per-call delay on top if needed.
+
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_list_context.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_list_context.py --items 100 --turns 12
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import time
+
+HOME = "UNSW Sydney, Kensington NSW 2052"
+
+
+def _full_context(message: str, shopping_list: list[dict], home_address: str) -> str:
+    """The chat router's prompt before services.list_prompt."""
+    return "\n\n".join([
+        f"[USER_HOME_ADDRESS={home_address}] — "
+        f"Whenever you call a tool that needs the user's location or "
+        f"start address, pass the exact string \"{home_address}\".",
+        f"The user's current shopping list: {shopping_list}",
+        f"User message: {message}",
+    ])
+
+
+def _play(mode: str, args, recording: dict) -> dict:
+    from services.agent import create_agent, turn_token_usage
+    from services.list_prompt import ListContextState, build_turn_context, remember_list
+    from services.shopping_list_context import get_list, lock, reset_list, set_list
+
+    totals = {"input": [], "context_chars": [], "seconds": []}
+    for _ in range(args.conversations):
+        agent = create_agent()
+        state = ListContextState()
+        shopping_list = [
+            {"name": f"Product {i}", "quantity": 1 + i % 3, "price": round(1.2 + i * 0.37, 2)}
+            for i in range(args.items)
+        ]
+        for turn in range(args.turns):
+            message = recording["turns"][turn % len(recording["turns"])]["user"]
+            if mode == "full":
+                context = _full_context(message, shopping_list, HOME)
+            else:
+                context = build_turn_context(
+                    message, shopping_list, HOME, state, agent.conversation_manager.removed_message_count,
+                )
+
+            with lock:
+                set_list(shopping_list)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent(context)
+            totals["seconds"].append(time.perf_counter() - start)
+            with lock:
+                shopping_list = get_list()
+                reset_list()
+            remember_list(state, shopping_list)
+
+            usage = turn_token_usage(agent)
+            totals["input"].append(usage["input"] + usage["cache_read"] + usage["cache_write"])
+            totals["context_chars"].append(len(context))
+
+            # The user bumps one item's quantity in the app before the next turn
+            shopping_list[turn % len(shopping_list)]["quantity"] += 1
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="Items on the shopping list (default: 50)")
+    parser.add_argument("--turns", type=int, default=8, help="Turns per conversation (default: 8)")
+    parser.add_argument("--conversations", type=int, default=5, help="Conversations per mode (default: 5)")
+    parser.add_argument("--recording", default="grocery_and_fuel", help="Name or path of the recording to replay")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Fake model time per call")
+    args = parser.parse_args()
+
+    from stubs.fake_bedrock import load_recording
+    from stubs.upstreams import StubUpstreams
+
+    recording = load_recording(args.recording)
+    stubs = StubUpstreams().start()
+    os.environ.update(stubs.env())
+    os.environ["BEDROCK_MODEL_ID"] = "fake"
+    os.environ["BEDROCK_PROMPT_CACHE"] = "off"
+    os.environ["FAKE_BEDROCK_RECORDING"] = args.recording
+    os.environ["FAKE_BEDROCK_LATENCY_MS"] = str(args.model_latency_ms)
+    logging.disable(logging.INFO)
+
+    from database import init_db
+    from services.agent import shutdown_mcp_client
+
+    # manage_list checks prices against the seeded history
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db(seed_demo_data=True)
+
+    try:
+        results = {mode: _play(mode, args, recording) for mode in ("full", "delta")}
+    finally:
+        shutdown_mcp_client()
+        stubs.stop()
+
+    print(f"{args.items}-item list, {args.conversations} conversations × {args.turns} turns")
+    print(f"{'':<8} {'context chars/turn':>20} {'input tokens/turn':>19} {'turn median':>14}")
+    for mode, totals in results.items():
+        print(
+            f"{mode:<8} {statistics.mean(totals['context_chars']):20.0f} "
+            f"{statistics.mean(totals['input']):19.0f} "
+            f"{statistics.median(totals['seconds']) * 1000:11.2f} ms"
+        )
+    saved = 1 - sum(results["delta"]["input"]) / sum(results["full"]["input"])
+    print(f"input tokens saved: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
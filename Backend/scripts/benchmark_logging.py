@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Logging overhead per chat turn.
+
+Plays chat turns through POST /chat (the real router and Strands agent,
+with the fake Bedrock model and the local upstream stubs) with a 50-item
+shopping list, under three logging setups:
+
+- off:   logging disabled, the baseline
+- sync:  a StreamHandler on the root logger at INFO, writing on the
+         request thread (what logging.basicConfig gave us)
+- queue: log_config.configure(): JSON records on a queue, written by a
+         listener thread, with per-logger sampling
+
+For each it reports the median turn time, and the time the request
+thread spent inside logging calls, records and bytes written per turn.
+Logs go to a temporary file; --write-latency-ms adds a delay to every
+write, as when stdout is a pipe the log collector is slow to drain.
+
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_logging.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_logging.py --turns 200 --write-latency-ms 1
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+HOME = "UNSW Sydney, Kensington NSW 2052"
+
+
+class _SlowFile(io.TextIOWrapper):
+    """A log file whose writes take *latency* seconds each."""
+
+    latency = 0.0
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return super().write(text)
+
+
+def _timed_logging(spent: list[float]):
+    """Wrap Logger._log to add the time each call takes on this thread to *spent*."""
+    original = logging.Logger._log
+
+    def _log(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            spent[0] += time.perf_counter() - start
+
+    logging.Logger._log = _log
+    return original
+
+
+def _play(mode: str, args, client, path: str) -> dict:
+    import log_config
+
+    root = logging.getLogger()
+    stream = _SlowFile(open(path, "wb"), encoding="utf-8", write_through=True)
+    stream.latency = args.write_latency_ms / 1000
+    handler = None
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+        root.addHandler(handler)
+    else:
+        log_config.configure(stream=stream)
+    root.setLevel(logging.INFO)
+
+    shopping_list = [
+        {"name": f"Product {i}", "quantity": 1 + i % 3, "price": round(1.2 + i * 0.37, 2)}
+        for i in range(args.items)
+    ]
+    spent = [0.0]
+    original = _timed_logging(spent)
+    turn_times, logging_times = [], []
+    session_id = None
+    try:
+        for turn in range(args.turns):
+            if turn % args.turns_per_session == 0:
+                session_id = None
+            spent[0] = 0.0
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = client.post("/chat", json={
+                    "message": "Add milk and check fuel", "shoppingList": shopping_list,
+                    "homeAddress": HOME, "sessionId": session_id,
+                })
+            turn_times.append(time.perf_counter() - start)
+            logging_times.append(spent[0])
+            session_id = response.json()["sessionId"]
+    finally:
+        logging.Logger._log = original
+        logging.disable(logging.NOTSET)
+        if handler is not None:
+            root.removeHandler(handler)
+        log_config.shutdown()
+        stream.close()
+
+    with open(path, "rb") as written:
+        lines = written.read().splitlines()
+    return {
+        "turn": statistics.median(turn_times),
+        "logging": statistics.mean(logging_times),
+        "records": len(lines) / args.turns,
+        "bytes": sum(len(line) + 1 for line in lines) / args.turns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100, help="Chat turns per setup (default: 100)")
+    parser.add_argument("--turns-per-session", type=int, default=5, help="Turns before starting a new session")
+    parser.add_argument("--items", type=int, default=50, help="Items on the shopping list (default: 50)")
+    parser.add_argument("--write-latency-ms", type=float, default=0.0, help="Delay per log write")
+    args = parser.parse_args()
+
+    from stubs.upstreams import StubUpstreams
+
+    stubs = StubUpstreams().start()
+    os.environ.update(stubs.env())
+    os.environ["BEDROCK_MODEL_ID"] = "fake"
+    os.environ.setdefault("GEO_PROFILE", "off")
+
+    from fastapi.testclient import TestClient
+
+    from database import init_db
+    from main import app
+    from services.agent import shutdown_mcp_client
+
+    # manage_list checks prices against the seeded history
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db(seed_demo_data=True)
+
+    results = {}
+    try:
+        client = TestClient(app)
+        with tempfile.TemporaryDirectory() as directory:
+            import log_config
+            log_config.shutdown()  # main configures logging at import; each setup installs its own
+            for handler in logging.getLogger().handlers[:]:
+                logging.getLogger().removeHandler(handler)
+            _play("off", args, client, os.path.join(directory, "warmup.log"))
+            for mode in ("off", "sync", "queue"):
+                results[mode] = _play(mode, args, client, os.path.join(directory, f"{mode}.log"))
+    finally:
+        shutdown_mcp_client()
+        stubs.stop()
+
+    print(f"{args.turns} chat turns, {args.items}-item list, {args.write_latency_ms:g} ms per log write")
+    print(f"{'':<6} {'turn median':>12} {'in logging/turn':>16} {'records/turn':>13} {'bytes/turn':>11}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<6} {result['turn'] * 1000:9.2f} ms {result['logging'] * 1000:13.3f} ms "
+            f"{result['records']:13.1f} {result['bytes']:11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
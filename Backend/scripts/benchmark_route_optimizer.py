@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized route optimizer against the scalar reference.
+
+Generates random stores and servos around Sydney and times both
+implementations of ``find_balanced_route``.
+
+Usage:
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_route_optimizer.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_route_optimizer.py --stores 1000 --stations 1000
+"""
+
+import argparse
+import random
+import time
+
+from services.route_optimizer import find_balanced_route, find_balanced_route_reference
+
+SYDNEY_CBD = (-33.8688, 151.2093)
+
+
+def _random_sites(rng: random.Random, count: int, cost_range: tuple[float, float]) -> list[tuple]:
+    """Random (lat, lon, cost) tuples within ~25 km of the CBD."""
+    return [
+        (
+            SYDNEY_CBD[0] + rng.uniform(-0.25, 0.25),
+            SYDNEY_CBD[1] + rng.uniform(-0.25, 0.25),
+            round(rng.uniform(*cost_range), 2),
+        )
+        for _ in range(count)
+    ]
+
+
+def _time(fn, repeats: int) -> float:
+    """Best wall-clock time of *repeats* calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=1000, help="Grocery stores (split Coles/Woolworths)")
+    parser.add_argument("--stations", type=int, default=1000, help="Petrol stations")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per implementation")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    coles = _random_sites(rng, args.stores // 2, (40, 60))
+    woolworths = _random_sites(rng, args.stores - args.stores // 2, (40, 60))
+    servos = _random_sites(rng, args.stations, (20, 50))
+
+    def vectorized():
+        return find_balanced_route(SYDNEY_CBD, coles, woolworths, servos, weight=0.5)
+
+    def reference():
+        return find_balanced_route_reference(SYDNEY_CBD, coles, woolworths, servos, weight=0.5)
+
+    pairs = args.stores * args.stations
+    print(f"Benchmarking {args.stores} stores × {args.stations} stations ({pairs:,} pairs)")
+
+    vec_time = _time(vectorized, args.repeats)
+    print(f"  vectorized: {vec_time * 1000:9.1f} ms")
+
+    ref_time = _time(reference, 1)
+    print(f"  reference:  {ref_time * 1000:9.1f} ms")
+    print(f"  speedup:    {ref_time / vec_time:9.1f}x")
+
+    vec_best, ref_best = vectorized(), reference()
+    print(f"  best score: vectorized={vec_best['weighted_score']} reference={ref_best['weighted_score']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark spatially pruned route frontiers against the brute-force path.
+
+Scatters stores and petrol stations across NSW, then times
+``pareto_frontier`` over every pair versus ``pruned_pareto_frontier``
+with a prebuilt grid index, for a user in Sydney.
+
+Usage:
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_spatial_pruning.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_spatial_pruning.py --stores 5000 --stations 3000
+"""
+
+import argparse
+import random
+import time
+
+from services.route_optimizer import (
+    build_route_candidates,
+    farthest_servos,
+    pareto_frontier,
+    pruned_pareto_frontier,
+)
+from services.spatial_index import GridIndex
+
+SYDNEY_CBD = (-33.8688, 151.2093)
+NSW_LAT = (-37.5, -28.2)
+NSW_LON = (141.0, 153.6)
+
+
+def _random_sites(rng: random.Random, count: int, cost_range: tuple[float, float], brand=None) -> list[tuple]:
+    """Random priced locations spread uniformly over NSW."""
+    sites = []
+    for _ in range(count):
+        site = (rng.uniform(*NSW_LAT), rng.uniform(*NSW_LON), round(rng.uniform(*cost_range), 2))
+        sites.append(site + (brand,) if brand else site)
+    return sites
+
+
+def _time(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=3000, help="Grocery stores")
+    parser.add_argument("--stations", type=int, default=2000, help="Petrol stations")
+    parser.add_argument("--seed-k", type=int, default=8, help="Nearest/cheapest seeds per type")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    groceries = _random_sites(rng, args.stores, (40, 60), brand="Coles")
+    servos = _random_sites(rng, args.stations, (100, 130))
+
+    pairs = args.stores * args.stations
+    print(f"Benchmarking {args.stores} stores × {args.stations} stations across NSW ({pairs:,} pairs)")
+
+    brute_time, brute = _time(lambda: pareto_frontier(build_route_candidates(SYDNEY_CBD, groceries, servos)))
+    print(f"  brute force:     {brute_time * 1000:9.1f} ms")
+
+    index_time, (grocery_index, servo_index, farthest) = _time(
+        lambda: (GridIndex(groceries), GridIndex(servos), farthest_servos(groceries, servos))
+    )
+    print(f"  index build:     {index_time * 1000:9.1f} ms  (once per store list)")
+
+    pruned_time, pruned = _time(lambda: pruned_pareto_frontier(
+        SYDNEY_CBD, groceries, servos, grocery_index, servo_index, seed_k=args.seed_k, farthest=farthest,
+    ))
+    print(f"  pruned query:    {pruned_time * 1000:9.1f} ms  ({pruned.scored_count:,} pairs scored)")
+    print(f"  speedup:         {brute_time / pruned_time:9.1f}x")
+
+    same = brute.cost.tolist() == pruned.cost.tolist() and (
+        (brute.min_distance, brute.max_distance, brute.min_cost, brute.max_cost)
+        == (pruned.min_distance, pruned.max_distance, pruned.min_cost, pruned.max_cost)
+    )
+    print(f"  frontier routes: brute={len(brute.routes)} pruned={len(pruned.routes)} identical={same}")
+
+
+if __name__ == "__main__":
+    main()
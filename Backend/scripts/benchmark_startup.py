@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Cold-start cost of demo seeding: building rows with seed_all vs loading the
+pre-built seed snapshot.
+
+Each run uses a fresh in-memory database, so table creation is included
+and nothing is cached between repetitions. A final pass times the whole
+app startup (importing main and running init_db) in a new interpreter.
+
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_startup.py
+    PYTHONPATH=. ./venv/bin/python scripts/benchmark_startup.py --repeat 50
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def _time_seed(loader, repeat: int) -> list[float]:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+    from database import Base
+    import models.db_models  # noqa: F401
+
+    samples = []
+    for _ in range(repeat):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        start = time.perf_counter()
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db, contextlib.redirect_stdout(io.StringIO()):
+            loader(db)
+        samples.append(time.perf_counter() - start)
+        engine.dispose()
+    return samples
+
+
+def _time_app_startup(repeat: int) -> list[float]:
+    """Import main and run init_db in a fresh interpreter each time."""
+    code = (
+        "import time; t = time.perf_counter()\n"
+        "import main; from database import init_db; init_db()\n"
+        "print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [".", os.environ.get("PYTHONPATH")])))
+    env.pop("DATABASE_URL", None)
+    env.pop("SQLITE_PATH", None)
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<24} median {statistics.median(samples) * 1000:8.2f} ms   "
+        f"min {min(samples) * 1000:8.2f} ms   (n={len(samples)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Seeding repetitions (default: 20)")
+    parser.add_argument("--startup-repeat", type=int, default=3, help="Fresh-interpreter startups (default: 3)")
+    args = parser.parse_args()
+
+    from seed_data import SNAPSHOT_PATH, load_snapshot, seed_all
+
+    if not SNAPSHOT_PATH.exists():
+        sys.exit(f"{SNAPSHOT_PATH.name} is missing; run: python seed_data.py --write-snapshot")
+
+    seeded = _time_seed(seed_all, args.repeat)
+    loaded = _time_seed(load_snapshot, args.repeat)
+    _report("seed_all (ORM objects)", seeded)
+    _report("load_snapshot", loaded)
+    print(f"{'speed-up':<24} {statistics.median(seeded) / statistics.median(loaded):8.1f}x")
+
+    if args.startup_repeat:
+        _report("app startup (init_db)", _time_app_startup(args.startup_repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,21 @@ for historical prices, making the grocery optimization demo work immediately.
 """
 
 from datetime import datetime, timedelta
+from pathlib import Path
+import argparse
+import json
 import random
+from sqlalchemy import DateTime, Integer, select
 from sqlalchemy.orm import Session
 from models.db_models import HistoricalPriceData
 
+# Pre-built rows for seed_all, bulk-loaded on startup instead of building ORM
+# objects. Regenerate with: python seed_data.py --write-snapshot
+SNAPSHOT_PATH = Path(__file__).with_name("seed_snapshot.json")
+SNAPSHOT_RANDOM_SEED = 2052
+# Insert order respects foreign keys (weekly_plans -> users)
+SNAPSHOT_TABLES = ("historical_price_data", "users", "weekly_plans")
+
 
 def seed_historical_prices(db: Session) -> None:
     """
@@ -407,3 +418,132 @@ def seed_all(db: Session) -> None:
     
     # 3. Seed weekly plans for leaderboard
     seed_weekly_plans(db, user_ids)
+
+
+def _snapshot_columns(table) -> list:
+    """Columns stored in the snapshot; integer primary keys are left to the database."""
+    return [
+        column for column in table.columns
+        if not (column.primary_key and isinstance(column.type, Integer))
+    ]
+
+
+def write_snapshot(db: Session, path: Path = SNAPSHOT_PATH) -> dict[str, int]:
+    """
+    Dump the seeded tables to a snapshot file.
+
+    Rows are stored as column lists plus a ``generated_at`` timestamp so
+    load_snapshot can shift every date forward to "now".
+
+    Returns:
+        Row count per table
+    """
+    from database import Base
+
+    snapshot = {"generated_at": datetime.utcnow().isoformat(), "tables": {}}
+    for name in SNAPSHOT_TABLES:
+        table = Base.metadata.tables[name]
+        columns = _snapshot_columns(table)
+        rows = db.execute(select(*columns).order_by(*table.primary_key.columns)).all()
+        snapshot["tables"][name] = {
+            "columns": [c.name for c in columns],
+            "rows": [
+                [v.isoformat() if isinstance(v, datetime) else v for v in row]
+                for row in rows
+            ],
+        }
+
+    Path(path).write_text(json.dumps(snapshot, separators=(",", ":")) + "\n")
+    return {name: len(t["rows"]) for name, t in snapshot["tables"].items()}
+
+
+def load_snapshot(
+    db: Session,
+    path: Path = SNAPSHOT_PATH,
+    tables: tuple[str, ...] = SNAPSHOT_TABLES,
+) -> bool:
+    """
+    Bulk-load demo data from a snapshot file.
+
+    Each table is inserted with a single executemany and the whole load is
+    one transaction. Dates are shifted by the time since the snapshot was
+    generated, so the price history always covers the last 4 weeks.
+
+    Args:
+        db: Database session
+        path: Snapshot file
+        tables: Tables to load (default: all of them)
+
+    Returns:
+        False if the snapshot file doesn't exist, True once loaded
+    """
+    from database import Base
+
+    path = Path(path)
+    if not path.exists():
+        return False
+
+    snapshot = json.loads(path.read_text())
+    shift = datetime.utcnow() - datetime.fromisoformat(snapshot["generated_at"])
+
+    loaded = []
+    for name in SNAPSHOT_TABLES:
+        if name not in tables:
+            continue
+        table = Base.metadata.tables[name]
+        data = snapshot["tables"][name]
+        date_columns = [
+            i for i, column in enumerate(data["columns"])
+            if isinstance(table.c[column].type, DateTime)
+        ]
+        rows = []
+        for row in data["rows"]:
+            for i in date_columns:
+                if row[i] is not None:
+                    row[i] = datetime.fromisoformat(row[i]) + shift
+            rows.append(dict(zip(data["columns"], row)))
+        if rows:
+            db.execute(table.insert(), rows)
+        loaded.append(f"{len(rows)} {name}")
+
+    db.commit()
+    print(f"✓ Loaded seed snapshot: {', '.join(loaded)}")
+    return True
+
+
+def regenerate_snapshot(path: Path = SNAPSHOT_PATH) -> dict[str, int]:
+    """
+    Rebuild the snapshot by running seed_all against a scratch in-memory database.
+
+    The random generator is seeded so regenerating gives the same prices.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from database import Base
+    import models.db_models  # noqa: F401 - registers the tables
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    state = random.getstate()
+    random.seed(SNAPSHOT_RANDOM_SEED)
+    try:
+        with Session(engine) as db:
+            seed_all(db)
+            return write_snapshot(db, path)
+    finally:
+        random.setstate(state)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Demo data seeding")
+    parser.add_argument(
+        "--write-snapshot", action="store_true",
+        help=f"Regenerate {SNAPSHOT_PATH.name} from seed_all",
+    )
+    args = parser.parse_args()
+    if args.write_snapshot:
+        counts = regenerate_snapshot()
+        print(f"✓ Wrote {SNAPSHOT_PATH.name}: {counts}")
+    else:
+        parser.print_help()
@@ -14,14 +14,18 @@ import os
 import logging
 
 from strands import Agent
+from strands.hooks import AfterToolCallEvent, HookProvider, HookRegistry
+from strands.models import CacheConfig, Model
 from strands.models.bedrock import BedrockModel
 from strands.tools.mcp import MCPClient
 from mcp.client.streamable_http import streamablehttp_client
 
 from services.strands_tools.fuel_lookup import lookup_fuel_prices
 from services.strands_tools.google_places import find_nearby_stores
-from services.strands_tools.google_routes import get_directions
+from services.strands_tools.google_routes import get_directions, get_route_matrix
 from services.strands_tools.list_manager import manage_list
+from services.agent_trace import TraceHooks
+from metrics import TOOL_CALL_DURATION
 
 logger = logging.getLogger(__name__)
 
@@ -64,18 +68,132 @@ def shutdown_mcp_client():
 
 # ── Bedrock model ────────────────────────────────────────────────────
 
-def _get_model() -> BedrockModel:
-    """Lazy-create the Bedrock model so that env vars from .env are loaded first."""
-    region = os.getenv("AWS_REGION", "ap-southeast-2")
-    model_id = os.getenv("BEDROCK_MODEL_ID", "amazon.nova-lite-v1:0")
+# Prompt-cache checkpoints Bedrock accepts, by model family (matched
+# anywhere in the model id, so cross-region ids like "apac.amazon.nova-…"
+# count). A checkpoint after the ~4k-token system prompt (and after the
+# tool specs, where supported) lets every later model call in a session
+# read that prefix from the cache instead of reprocessing it. Conversation
+# history gets a rolling checkpoint on the last user message as well.
+PROMPT_CACHE_SECTIONS = {
+    "anthropic.claude": ("system", "tools"),
+    "amazon.nova": ("system",),  # Nova doesn't cache tool definitions
+}
+
+
+def prompt_cache_sections(model_id: str) -> set[str]:
+    """Prompt sections to checkpoint for *model_id*.
+
+    BEDROCK_PROMPT_CACHE overrides PROMPT_CACHE_SECTIONS: "off" disables
+    caching, or give the sections explicitly ("system", "system,tools").
+    The default, "auto", uses the table.
+    """
+    setting = os.getenv("BEDROCK_PROMPT_CACHE", "auto").strip().lower()
+    if setting in ("off", "none", "false", "0"):
+        return set()
+    if setting != "auto":
+        return {section.strip() for section in setting.split(",") if section.strip()}
+    for family, sections in PROMPT_CACHE_SECTIONS.items():
+        if family in model_id:
+            return set(sections)
+    return set()
+
+
+def prompt_cache_config(model_id: str) -> CacheConfig | None:
+    """Strands cache settings for *model_id*, or None when it isn't cached."""
+    sections = prompt_cache_sections(model_id)
+    if not sections:
+        return None
+    return CacheConfig(
+        strategy="anthropic",  # explicit cache points; "auto" only enables Claude
+        system_prompt_ttl="system" in sections,
+        tools_ttl="tools" in sections,
+    )
+
+
+# Model ids per tier (see services.model_router). BEDROCK_SMALL_MODEL_ID
+# and BEDROCK_LARGE_MODEL_ID set them; BEDROCK_MODEL_ID still sets the
+# small tier, and a fake BEDROCK_MODEL_ID fakes both.
+DEFAULT_TIER_MODELS = {
+    "small": "amazon.nova-lite-v1:0",
+    "large": "amazon.nova-pro-v1:0",
+}
+
+
+def tier_model_id(tier: str) -> str:
+    """The Bedrock model id that serves *tier* ("small" or "large")."""
+    explicit = os.getenv(f"BEDROCK_{tier.upper()}_MODEL_ID")
+    if explicit:
+        return explicit
+    base = os.getenv("BEDROCK_MODEL_ID")
+    if base and (tier == "small" or base.startswith("fake")):
+        return base
+    return DEFAULT_TIER_MODELS[tier]
+
+
+def _get_model(tier: str = "small") -> Model:
+    """Lazy-create the Bedrock model for *tier* so that env vars from .env are loaded first.
 
-    logger.info(f"Initialising Bedrock model: {model_id} in {region}")
+    BEDROCK_MODEL_ID=fake swaps in the scripted model from stubs.fake_bedrock,
+    for running and profiling the agent offline.
+    """
+    region = os.getenv("AWS_REGION", "ap-southeast-2")
+    model_id = tier_model_id(tier)
+    cache_config = prompt_cache_config(model_id)
+
+    if model_id.startswith("fake"):
+        from stubs.fake_bedrock import create_fake_model
+        logger.info(f"Using scripted fake Bedrock model for the {tier} tier")
+        model = create_fake_model(model_id if model_id != "fake" else "fake-bedrock")
+        if cache_config:
+            model.update_config(cache_config=cache_config)
+        return model
+
+    sections = sorted(prompt_cache_sections(model_id)) or "off"
+    logger.info(f"Initialising {tier} Bedrock model: {model_id} in {region} (prompt cache: {sections})")
+    extra = {"cache_config": cache_config} if cache_config else {}
     return BedrockModel(
         model_id=model_id,
         region_name=region,
+        **extra,
     )
 
 
+def turn_token_usage(agent: Agent) -> dict:
+    """
+    Token usage of the agent's last invocation (one chat turn).
+
+    Bedrock reports input tokens read from and written to the prompt
+    cache separately from the uncached input tokens.
+    """
+    invocations = agent.event_loop_metrics.agent_invocations
+    usage = invocations[-1].usage if invocations else {}
+    return {
+        "input": usage.get("inputTokens", 0),
+        "cache_read": usage.get("cacheReadInputTokens", 0),
+        "cache_write": usage.get("cacheWriteInputTokens", 0),
+        "output": usage.get("outputTokens", 0),
+    }
+
+
+# ── Tool timing ──────────────────────────────────────────────────────
+
+class ToolTimingHooks(HookProvider):
+    """Record every tool call's execution time in agent_tool_call_duration_seconds."""
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(AfterToolCallEvent, self._record)
+
+    def _record(self, event: AfterToolCallEvent) -> None:
+        if event.duration is None:  # cancelled before it ran
+            return
+        failed = event.exception is not None or event.result.get("status") == "error"
+        TOOL_CALL_DURATION.observe(
+            event.duration,
+            tool=event.tool_use["name"],
+            status="error" if failed else "success",
+        )
+
+
 # ── System prompt ────────────────────────────────────────────────────
 
 SYSTEM_PROMPT = """You are Koko, a friendly koala mascot that helps university students save money on groceries and fuel in Australia.
@@ -92,6 +210,7 @@ FUEL TOOL:
 
 DIRECTIONS TOOL (direct — fast):
 - get_directions: Get directions, distance, and travel time between two locations. Supports travel_mode: DRIVE, WALK, TRANSIT (bus). Returns distance in metres, duration in seconds, and a human-readable summary.
+- get_route_matrix: Get distance and travel time from several origins to several destinations in ONE call. Use it instead of repeated get_directions calls when comparing stores or fuel stations.
 
 SHOPPING LIST TOOL:
 - manage_list: Add, remove, or update items on the user's shopping list.
@@ -109,6 +228,7 @@ Efficiency rules — REUSE DATA from earlier in the conversation:
 Tool-chaining strategy:
 - When the user asks for grocery prices: call get_coles_products for each item (you CAN call these in parallel since they are independent queries). Then call manage_list for each item with the price from the results.
 - When the user also wants the nearest store: call find_nearby_stores with their home address to get nearby Coles/Woolworths stores with coordinates.
+- When the user wants to compare how far several stores/stations are: call get_route_matrix once with their home address as the origin and all the store/station addresses as destinations.
 - When the user asks for directions: use get_directions with their home address as start and the store address as end.
 - When the user asks for fuel prices AND directions to a station, first call lookup_fuel_prices to find the cheapest station, then use get_directions to navigate there from the home address.
 
@@ -169,17 +289,26 @@ CRITICAL RULES (never violate):
 3. NEVER add fuel/petrol to the shopping list via manage_list. Fuel is NOT a grocery item. Only mention fuel costs in your text response."""
 
 
-def create_agent() -> Agent:
+def create_tier_model(tier: str) -> Model:
+    """A new model for *tier*, to switch a session's agent to that tier."""
+    return _get_model(tier)
+
+
+def create_agent(tier: str = "small") -> Agent:
     """
     Create and return a new Strands Agent instance with all tools.
 
     The Coles MCP is passed as a ToolProvider so the agent can call
     get_coles_products / get_woolworths_products directly.
 
+    Args:
+        tier: Model tier to start with. The chat router swaps
+            ``agent.model`` between tiers per turn; the history is kept.
+
     Returns:
         Agent: Configured Strands Agent ready to process messages.
     """
-    model = _get_model()
+    model = _get_model(tier)
     mcp = get_mcp_client()
 
     return Agent(
@@ -189,7 +318,9 @@ def create_agent() -> Agent:
             mcp,                    # Coles MCP → get_coles_products, get_woolworths_products
             find_nearby_stores,     # Google Places API (direct)
             get_directions,         # Google Routes API (direct)
+            get_route_matrix,       # Google Route Matrix API (direct, batched)
             lookup_fuel_prices,     # n8n webhook (until fuel API key is provided)
             manage_list,            # In-process shopping list
         ],
+        hooks=[ToolTimingHooks(), TraceHooks()],
     )
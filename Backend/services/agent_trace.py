@@ -0,0 +1,275 @@
+"""
+Per-turn traces of the chat agent.
+
+Each /chat turn gets a trace: a root span for the turn, with child spans
+for every Bedrock model call, every tool invocation (arguments hash,
+duration, payload sizes, status) and every wait for the shopping-list
+lock. That shows whether a slow turn went on the model, the Coles MCP,
+Google, or manage_list waiting on the lock and its DB writes.
+
+The current trace lives in a context variable; Strands copies the context
+into the agent's event loop thread and into tool threads, so hooks and
+tools record into the right turn. Outside a chat turn (scripts,
+benchmarks) recording is a no-op.
+
+The last TRACE_HISTORY turns of each session are kept in memory and served
+by GET /debug/trace/{session_id}. Set AGENT_TRACE_FILE to also append each
+turn to a file as OpenTelemetry (OTLP/JSON) spans, one export request per
+line, for loading into Jaeger or an OTel collector.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from strands.hooks import (
+    AfterModelCallEvent,
+    AfterToolCallEvent,
+    BeforeModelCallEvent,
+    BeforeToolCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+logger = logging.getLogger(__name__)
+
+TRACE_HISTORY = int(os.getenv("AGENT_TRACE_HISTORY", "20"))
+AGENT_TRACE_FILE = os.getenv("AGENT_TRACE_FILE")
+
+# OTLP span kinds
+_OTEL_KIND = {"turn": 2, "model": 3, "tool": 3, "lock": 1}  # SERVER, CLIENT, INTERNAL
+
+_current: ContextVar["TurnTrace | None"] = ContextVar("agent_trace", default=None)
+_traces: dict[str, deque] = {}
+_traces_lock = threading.Lock()
+_file_lock = threading.Lock()
+
+
+def _new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def args_hash(arguments) -> str:
+    """Short stable hash of tool arguments, to spot repeated calls without logging them."""
+    encoded = json.dumps(arguments, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _size(payload) -> int:
+    return len(json.dumps(payload, default=str).encode())
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    status: str = "ok"
+    span_id: str = field(default_factory=_new_span_id)
+    parent_span_id: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self, origin_ns: int) -> dict:
+        return {
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "offsetMs": round((self.start_ns - origin_ns) / 1e6, 3),
+            "durationMs": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def _otel_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class TurnTrace:
+    """Spans recorded during one chat turn."""
+
+    def __init__(self, session_id: str, message: str):
+        self.trace_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.root = Span(
+            "chat.turn", "turn", time.time_ns(),
+            attributes={"session.id": session_id, "message.bytes": len(message.encode())},
+        )
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> Span:
+        span.parent_span_id = self.root.span_id
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def to_dict(self) -> dict:
+        spans = sorted(self.spans, key=lambda s: s.start_ns)
+        by_kind: dict[str, float] = {}
+        for span in spans:
+            by_kind[span.kind] = round(by_kind.get(span.kind, 0.0) + span.duration_ms, 3)
+        return {
+            "traceId": self.trace_id,
+            "sessionId": self.session_id,
+            "startTime": self.root.start_ns / 1e9,
+            "durationMs": round(self.root.duration_ms, 3),
+            "status": self.root.status,
+            "totalsMs": by_kind,
+            "spans": [span.to_dict(self.root.start_ns) for span in [self.root] + spans],
+        }
+
+    def to_otel(self) -> dict:
+        """The turn as an OTLP/JSON ExportTraceServiceRequest."""
+        otel_spans = []
+        for span in [self.root] + self.spans:
+            otel_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": _OTEL_KIND.get(span.kind, 1),
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [
+                    {"key": key, "value": _otel_value(value)}
+                    for key, value in {"koko.span_kind": span.kind, **span.attributes}.items()
+                ],
+                "status": {"code": 2 if span.status == "error" else 1},
+            }
+            if span.parent_span_id:
+                otel_span["parentSpanId"] = span.parent_span_id
+            otel_spans.append(otel_span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": "budget-optimization-backend"}},
+            ]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": otel_spans}],
+        }]}
+
+
+# ── Turn lifecycle ───────────────────────────────────────────────────
+
+def current_trace() -> TurnTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def trace_turn(session_id: str, message: str):
+    """Record a chat turn; spans from hooks and tools inside the block join it."""
+    trace = TurnTrace(session_id, message)
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException:
+        trace.root.status = "error"
+        raise
+    finally:
+        _current.reset(token)
+        trace.root.end_ns = time.time_ns()
+        with _traces_lock:
+            _traces.setdefault(session_id, deque(maxlen=TRACE_HISTORY)).append(trace)
+        if AGENT_TRACE_FILE:
+            _export(trace, AGENT_TRACE_FILE)
+
+
+def _export(trace: TurnTrace, path: str) -> None:
+    try:
+        line = json.dumps(trace.to_otel())
+        with _file_lock, open(path, "a") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"Could not export agent trace to {path}: {e}")
+
+
+def record_span(name: str, kind: str, start_ns: int, end_ns: int, status: str = "ok", **attributes) -> None:
+    """Add a finished span to the current turn, if there is one."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(Span(name, kind, start_ns, end_ns, attributes, status))
+
+
+def get_traces(session_id: str) -> list[dict]:
+    """Recent turn traces for a session, oldest first."""
+    with _traces_lock:
+        traces = list(_traces.get(session_id, ()))
+    return [trace.to_dict() for trace in traces]
+
+
+def discard_traces(session_id: str) -> None:
+    with _traces_lock:
+        _traces.pop(session_id, None)
+
+
+# ── Strands hooks ────────────────────────────────────────────────────
+
+class TraceHooks(HookProvider):
+    """Record model calls and tool invocations as spans of the current turn."""
+
+    def __init__(self):
+        self._model_start: int | None = None
+        self._tool_starts: dict[str, int] = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeModelCallEvent, self._before_model)
+        registry.add_callback(AfterModelCallEvent, self._after_model)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool)
+        registry.add_callback(AfterToolCallEvent, self._after_tool)
+
+    def _before_model(self, event: BeforeModelCallEvent) -> None:
+        self._model_start = time.time_ns()
+
+    def _after_model(self, event: AfterModelCallEvent) -> None:
+        start, self._model_start = self._model_start, None
+        if start is None or current_trace() is None:
+            return
+        attributes = {
+            "model.id": event.agent.model.get_config().get("model_id", ""),
+            "messages": len(event.agent.messages),
+        }
+        if event.stop_response is not None:
+            attributes["stop_reason"] = event.stop_response.stop_reason
+            attributes["response.bytes"] = _size(event.stop_response.message)
+        record_span(
+            "model.call", "model", start, time.time_ns(),
+            status="error" if event.exception is not None else "ok",
+            **attributes,
+        )
+
+    def _before_tool(self, event: BeforeToolCallEvent) -> None:
+        self._tool_starts[event.tool_use["toolUseId"]] = time.time_ns()
+
+    def _after_tool(self, event: AfterToolCallEvent) -> None:
+        start = self._tool_starts.pop(event.tool_use["toolUseId"], None)
+        if start is None or current_trace() is None:
+            return
+        failed = event.exception is not None or event.result.get("status") == "error"
+        record_span(
+            f"tool.{event.tool_use['name']}", "tool", start, time.time_ns(),
+            status="error" if failed else "ok",
+            **{
+                "tool.name": event.tool_use["name"],
+                "tool.args_hash": args_hash(event.tool_use.get("input", {})),
+                "tool.input.bytes": _size(event.tool_use.get("input", {})),
+                "tool.output.bytes": _size(event.result.get("content", [])),
+            },
+        )
@@ -0,0 +1,352 @@
+"""
+Fuel price cycle detection: fill up now, or wait?
+
+Petrol prices in Sydney and the other NSW metro areas move in cycles:
+stations lift prices sharply within a day or two, then prices drift
+down over several weeks until the next hike. run_batch(), a scheduled
+job, works out where each region is in its cycle from the stored price
+history (services.fuel_price_history):
+
+1. Expand every station's change points to a stations × days matrix of
+   daily prices, forward-filled.
+2. Take the regional median per day; a region's stations hike together,
+   so one station's discount doesn't hide the cycle.
+3. Mark hikes where the median rises by HIKE_CENTS or more within
+   HIKE_DAYS days, and measure the typical cycle length between them.
+4. Place today's median between the trough before the last hike and the
+   peak after it, and advise filling up now near the bottom of the
+   cycle (or when a hike is due), and waiting otherwise.
+
+Steps 1-3 are numpy array operations over all stations and regions at
+once, so months of history for thousands of stations take well under a
+second. Results go to the fuel_price_cycles table and an in-memory map;
+lookup() and for_stations() read the map, so the fuel tool can attach
+the advice to its response without touching the database.
+"""
+
+import logging
+import os
+import threading
+import warnings
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import SessionLocal
+from models.db_models import FuelPriceCycle, FuelPriceSeries
+from services.fuel_price_history import PACKED, month_start, region_for
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = int(os.getenv("FUEL_CYCLE_WINDOW_DAYS", "120"))
+LOOKBACK_DAYS = 14          # History before the window that seeds the first day's prices
+HIKE_CENTS = float(os.getenv("FUEL_CYCLE_HIKE_CENTS", "8"))
+HIKE_DAYS = 2
+MIN_STATIONS = 3            # Regions with fewer stations are not analysed
+RISING_DAYS = 2             # Days after a hike starts that prices are still going up
+BOTTOM_POSITION = 0.25      # Position in the cycle (0 trough, 1 peak) that counts as the bottom
+HIKE_DUE_DAYS = 2
+MAX_AGE = timedelta(days=2)  # Older analyses aren't attached to fuel lookups
+
+MINUTES_PER_DAY = 24 * 60
+
+# Maps (fuel_type, region) -> cycle status
+_cycles: Dict[tuple[str, str], dict] = {}
+_lock = threading.Lock()
+
+
+# ── Vectorised analysis ──────────────────────────────────────────────
+
+def daily_prices(station_idx: np.ndarray, day_idx: np.ndarray, prices: np.ndarray,
+                 n_stations: int, n_days: int) -> np.ndarray:
+    """
+    Stations × days matrix of each station's price at the end of each day.
+
+    Inputs are change points in time order; a station's price carries
+    forward until its next change, and is NaN before its first.
+    Change points before day 0 count as day 0.
+    """
+    flat = station_idx * n_days + np.clip(day_idx, 0, n_days - 1)
+    # Keep the last change point of each station-day
+    flat_reversed = flat[::-1]
+    cells, first = np.unique(flat_reversed, return_index=True)
+    matrix = np.full(n_stations * n_days, np.nan)
+    matrix[cells] = prices[::-1][first]
+    matrix = matrix.reshape(n_stations, n_days)
+
+    known_day = np.where(np.isnan(matrix), 0, np.arange(n_days))
+    np.maximum.accumulate(known_day, axis=1, out=known_day)
+    return matrix[np.arange(n_stations)[:, None], known_day]
+
+
+def regional_medians(matrix: np.ndarray, region_idx: np.ndarray, n_regions: int) -> tuple[np.ndarray, np.ndarray]:
+    """Regions × days median of the station prices, and the number of stations per region."""
+    order = np.argsort(region_idx, kind="stable")
+    bounds = np.searchsorted(region_idx[order], np.arange(n_regions + 1))
+    grouped = matrix[order]
+    medians = np.full((n_regions, matrix.shape[1]), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Days before any station in a region has a price
+        for region in range(n_regions):
+            block = grouped[bounds[region]:bounds[region + 1]]
+            if len(block):
+                medians[region] = np.nanmedian(block, axis=0)
+    return medians, np.diff(bounds)
+
+
+def hike_starts(series: np.ndarray) -> np.ndarray:
+    """Boolean regions × days array, True on the first day of each price hike."""
+    rise = np.full(series.shape, np.nan)
+    rise[:, HIKE_DAYS:] = series[:, HIKE_DAYS:] - series[:, :-HIKE_DAYS]
+    with np.errstate(invalid="ignore"):
+        hiking = rise >= HIKE_CENTS
+    previous = np.zeros_like(hiking)
+    previous[:, 1:] = hiking[:, :-1]
+    return hiking & ~previous
+
+
+def cycle_status(series: np.ndarray, starts: np.ndarray) -> dict | None:
+    """
+    Where one region's daily median *series* (last day is today) is in its cycle.
+
+    Returns None if the region has no prices.
+    """
+    known = np.flatnonzero(~np.isnan(series))
+    if not len(known):
+        return None
+    today = len(series) - 1
+    current = float(series[known[-1]])
+    hikes = np.flatnonzero(starts)
+    if not len(hikes):
+        return {
+            "phase": "no_cycle", "advice": "no_pattern", "current": current,
+            "trough": float(np.nanmin(series)), "peak": float(np.nanmax(series)),
+            "position": None, "cycle_days": None, "days_since_hike": None, "next_hike_in_days": None,
+        }
+
+    last = int(hikes[-1])
+    before = series[hikes[-2] if len(hikes) > 1 else 0:last + 1]
+    trough = float(np.nanmin(before)) if not np.isnan(before).all() else current
+    peak = float(np.nanmax(series[last:]))
+    position = float(np.clip((current - trough) / (peak - trough), 0, 1)) if peak > trough else None
+    cycle_days = float(np.median(np.diff(hikes))) if len(hikes) > 1 else None
+    since = today - last
+    next_hike_in = max(cycle_days - since, 0) if cycle_days is not None else None
+
+    if since <= RISING_DAYS:
+        phase = "rising"
+    elif (position is not None and position <= BOTTOM_POSITION) or (
+            next_hike_in is not None and next_hike_in <= HIKE_DUE_DAYS):
+        phase = "bottom"
+    else:
+        phase = "falling"
+    return {
+        "phase": phase,
+        "advice": "fill_up_now" if phase == "bottom" else "wait",
+        "current": current,
+        "trough": trough,
+        "peak": peak,
+        "position": position,
+        "cycle_days": cycle_days,
+        "days_since_hike": since,
+        "next_hike_in_days": next_hike_in,
+    }
+
+
+def analyse(db, fuel_type: str, now: datetime | None = None, window_days: int = WINDOW_DAYS) -> list[dict]:
+    """
+    Cycle status of every region with enough stations for *fuel_type*.
+
+    Returns:
+        One dict per region with region, stations, phase, advice, the
+        current/trough/peak regional median (cents per litre), position
+        (0 trough, 1 peak), cycle_days, days_since_hike, next_hike_in_days
+        and last_hike
+    """
+    now = now or datetime.utcnow()
+    start = (now - timedelta(days=window_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = db.execute(
+        select(FuelPriceSeries.station_code, FuelPriceSeries.region, FuelPriceSeries.month,
+               FuelPriceSeries.minutes, FuelPriceSeries.prices)
+        .where(FuelPriceSeries.fuel_type == fuel_type,
+               FuelPriceSeries.month >= month_start(start - timedelta(days=LOOKBACK_DAYS)),
+               FuelPriceSeries.month <= now)
+        .order_by(FuelPriceSeries.station_code, FuelPriceSeries.month)
+    ).all()
+    if not rows:
+        return []
+
+    # Unpack every series at once: one array of points, and per point the
+    # station and its row's offset from the window start in minutes
+    codes, regions, months, minutes, prices = zip(*rows)
+    lengths = np.fromiter((len(m) // PACKED.itemsize for m in minutes), int, len(rows))
+    stations: Dict[str, int] = {}
+    row_station = np.fromiter((stations.setdefault(code, len(stations)) for code in codes), int, len(rows))
+    region_ids: Dict[str, int] = {}
+    row_region = np.fromiter((region_ids.setdefault(r, len(region_ids)) for r in regions), int, len(rows))
+    station_region = np.zeros(len(stations), dtype=int)
+    station_region[row_station] = row_region
+    row_offset = np.fromiter(((month - start).total_seconds() // 60 for month in months), int, len(rows))
+
+    point_minutes = np.repeat(row_offset, lengths) + np.frombuffer(b"".join(minutes), PACKED)
+    point_prices = np.frombuffer(b"".join(prices), PACKED) / 10
+    station_idx = np.repeat(row_station, lengths)
+    keep = point_minutes <= (now - start).total_seconds() // 60
+    day_idx = point_minutes[keep] // MINUTES_PER_DAY
+    n_days = (now - start).days + 1
+
+    matrix = daily_prices(station_idx[keep], day_idx, point_prices[keep], len(stations), n_days)
+    medians, counts = regional_medians(matrix, station_region, len(region_ids))
+    starts = hike_starts(medians)
+
+    results = []
+    for name, region in sorted(region_ids.items()):
+        if counts[region] < MIN_STATIONS:
+            continue
+        status = cycle_status(medians[region], starts[region])
+        if status is None:
+            continue
+        since = status["days_since_hike"]
+        results.append({
+            "region": name,
+            "stations": int(counts[region]),
+            **status,
+            "last_hike": (start + timedelta(days=n_days - 1 - since)) if since is not None else None,
+        })
+    return results
+
+
+# ── Batch job and lookups ────────────────────────────────────────────
+
+def _to_dict(row: FuelPriceCycle) -> dict:
+    return {
+        "fuel_type": row.fuel_type,
+        "region": row.region,
+        "stations": row.stations,
+        "phase": row.phase,
+        "advice": row.advice,
+        "current": row.current,
+        "trough": row.trough,
+        "peak": row.peak,
+        "position": row.position,
+        "cycle_days": row.cycle_days,
+        "last_hike": row.last_hike,
+        "computed_at": row.computed_at,
+    }
+
+
+def _store(rows: list[FuelPriceCycle]) -> None:
+    with _lock:
+        for row in rows:
+            _cycles[(row.fuel_type, row.region)] = _to_dict(row)
+
+
+def run_batch(now: datetime | None = None) -> int:
+    """
+    Analyse every fuel type with recent history and store the results (a scheduled job).
+
+    Returns how many region results were stored.
+    """
+    now = now or datetime.utcnow()
+    db = SessionLocal()
+    try:
+        fuel_types = db.scalars(
+            select(FuelPriceSeries.fuel_type)
+            .where(FuelPriceSeries.month >= month_start(now - timedelta(days=WINDOW_DAYS)))
+            .distinct()
+        ).all()
+        stored = []
+        for fuel_type in fuel_types:
+            for result in analyse(db, fuel_type, now):
+                row = db.get(FuelPriceCycle, (fuel_type, result["region"])) or FuelPriceCycle(
+                    fuel_type=fuel_type, region=result["region"],
+                )
+                for key in ("stations", "phase", "advice", "current", "trough", "peak",
+                            "position", "cycle_days", "last_hike"):
+                    setattr(row, key, result[key])
+                row.computed_at = now
+                db.add(row)
+                stored.append(row)
+        db.commit()
+        _store(stored)
+        logger.info(f"Fuel price cycles: analysed {len(stored)} regions")
+        return len(stored)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Fuel price cycle analysis failed: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def reload() -> int:
+    """Load the stored results into memory (on startup, and on instances that don't run the batch)."""
+    db = SessionLocal()
+    try:
+        rows = db.scalars(select(FuelPriceCycle)).all()
+        _store(rows)
+        return len(rows)
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to load fuel price cycles: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def clear() -> None:
+    with _lock:
+        _cycles.clear()
+
+
+def _summary(cycle: dict, next_hike_in: float | None) -> str:
+    region = cycle["region"].replace("_", " ").title()
+    current = f"{cycle['current']:.1f} c/L"
+    if cycle["phase"] == "bottom":
+        when = f"; the next hike is due in about {next_hike_in:.0f} days" if next_hike_in is not None else ""
+        return f"{region} prices are near the bottom of the cycle ({current}{when}). Fill up now."
+    if cycle["phase"] == "rising":
+        return (f"{region} prices have just been hiked ({current}). "
+                "Buy only what you need and fill up once they come down.")
+    if cycle["phase"] == "falling":
+        return (f"{region} prices are falling after the last hike ({current}, down from "
+                f"{cycle['peak']:.1f}). Waiting a few days should be cheaper.")
+    return f"No regular price cycle found for {region} recently."
+
+
+def lookup(fuel_type: str, region: str, now: datetime | None = None) -> dict | None:
+    """
+    The latest cycle status for a region, for attaching to a fuel lookup.
+
+    Returns None if there is none, or it is older than MAX_AGE.
+    """
+    with _lock:
+        cycle = _cycles.get((fuel_type, region))
+    now = now or datetime.utcnow()
+    if cycle is None or now - cycle["computed_at"] > MAX_AGE:
+        return None
+    since = (now - cycle["last_hike"]).days if cycle["last_hike"] else None
+    next_hike_in = max(cycle["cycle_days"] - since, 0) if since is not None and cycle["cycle_days"] else None
+    return {
+        "region": region,
+        "phase": cycle["phase"],
+        "advice": cycle["advice"],
+        "summary": _summary(cycle, next_hike_in),
+        "regional_median_cents_per_litre": round(cycle["current"], 1),
+        "position_in_cycle": round(cycle["position"], 2) if cycle["position"] is not None else None,
+        "cycle_days": cycle["cycle_days"],
+        "days_since_hike": since,
+        "next_hike_in_days": next_hike_in,
+    }
+
+
+def for_stations(fuel_type: str, stations: list[dict]) -> dict | None:
+    """lookup() for the region most of *stations* are in."""
+    regions = Counter(region_for(station.get("address", "")) for station in stations)
+    regions.pop(None, None)
+    if not regions:
+        return None
+    return lookup(fuel_type, regions.most_common(1)[0][0])
@@ -0,0 +1,212 @@
+"""
+Fuel price history: every station price the fuel tool sees, kept over time.
+
+lookup_fuel_prices calls record() with the stations it fetched. Prices
+are buffered in memory and written by flush(), a scheduled job, so the
+tool never waits on the database.
+
+History is stored compactly: one fuel_price_series row per station, fuel
+type and calendar month, holding packed arrays of change points. A price
+is appended only when it differs from the previous one in that row, so
+a month of a station's prices is a few hundred bytes, and
+services.fuel_price_cycle reads months of history for thousands of
+stations as a few thousand rows it unpacks straight into numpy.
+
+Stations are grouped into regions by postcode (region_for), since fuel
+price cycles run city-wide.
+"""
+
+import logging
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable
+
+import numpy as np
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import SessionLocal
+from models.db_models import FuelPriceSeries
+
+logger = logging.getLogger(__name__)
+
+# Metro areas with their own price cycle, by NSW postcode range
+REGIONS = (
+    ("sydney", 2000, 2249),
+    ("sydney", 2555, 2574),      # Macarthur
+    ("sydney", 2745, 2786),      # Western Sydney and the Blue Mountains
+    ("central_coast", 2250, 2263),
+    ("newcastle", 2264, 2327),
+    ("wollongong", 2500, 2534),
+)
+MAX_PENDING = 50_000
+LOAD_CHUNK = 500                # Series per query when flushing
+PACKED = np.dtype("<u2")        # Minutes into the month; tenths of a cent per litre
+
+_POSTCODE = re.compile(r"\b(2\d{3})\b\s*$")
+
+# Observations waiting for flush(): (station_code, fuel_type, region, price, seen_at)
+_pending: list[tuple] = []
+_lock = threading.Lock()
+
+
+def region_for(address: str) -> str | None:
+    """
+    Price-cycle region of an NSW address, from the postcode at its end.
+
+    Metro areas are named; elsewhere stations are grouped by the first
+    three digits of the postcode. None if there is no postcode.
+    """
+    match = _POSTCODE.search(address.strip()) if address else None
+    if match is None:
+        return None
+    postcode = int(match.group(1))
+    for name, low, high in REGIONS:
+        if low <= postcode <= high:
+            return name
+    return f"nsw_{match.group(1)[:3]}x"
+
+
+def month_start(when: datetime) -> datetime:
+    return when.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def unpack(minutes: bytes, prices: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """A stored series as (minutes into the month, cents per litre) arrays."""
+    return np.frombuffer(minutes, PACKED), np.frombuffer(prices, PACKED) / 10
+
+
+def _append(month: datetime, minutes: bytes, prices: bytes,
+            points: Iterable[tuple[datetime, float]]) -> tuple[bytes, bytes, int]:
+    """
+    Append the (time, cents per litre) *points* that change a packed series.
+
+    Points are in time order, within *month*. Returns the new minutes and
+    prices and how many points were appended.
+    """
+    last = int(np.frombuffer(prices[-PACKED.itemsize:], PACKED)[0]) if prices else None
+    new_minutes, new_prices = [], []
+    for when, price in points:
+        tenths = int(round(price * 10))
+        if tenths != last:
+            new_minutes.append(int((when - month).total_seconds() // 60))
+            new_prices.append(tenths)
+            last = tenths
+    if not new_prices:
+        return minutes, prices, 0
+    return (minutes + np.array(new_minutes, PACKED).tobytes(),
+            prices + np.array(new_prices, PACKED).tobytes(), len(new_prices))
+
+
+def series_rows(points: Iterable[dict]) -> list[dict]:
+    """
+    Pack change points into fuel_price_series rows, for loading history in bulk.
+
+    Args:
+        points: dicts with station_code, fuel_type, region, price and
+            recorded_at, in time order for each station
+
+    Returns:
+        Row dicts for an insert into FuelPriceSeries.__table__
+    """
+    grouped = defaultdict(list)
+    for point in points:
+        grouped[(point["station_code"], point["fuel_type"], month_start(point["recorded_at"]))].append(point)
+    now = datetime.utcnow()
+    rows = []
+    for (code, fuel_type, month), station_points in grouped.items():
+        minutes, prices, _ = _append(month, b"", b"", ((p["recorded_at"], p["price"]) for p in station_points))
+        rows.append({
+            "station_code": code, "fuel_type": fuel_type, "month": month,
+            "region": station_points[-1]["region"], "minutes": minutes, "prices": prices, "updated_at": now,
+        })
+    return rows
+
+
+def record(fuel_type: str, stations: list[dict], seen_at: datetime | None = None) -> int:
+    """
+    Queue the prices from a fuel lookup for the next flush.
+
+    Stations without a code, price or recognisable postcode are skipped.
+    Returns how many prices were queued.
+    """
+    seen_at = seen_at or datetime.utcnow()
+    rows = []
+    for station in stations:
+        code, price = station.get("station_code"), station.get("price_cents_per_litre")
+        region = region_for(station.get("address", ""))
+        if code is None or price is None or region is None:
+            continue
+        rows.append((str(code), fuel_type, region, float(price), seen_at))
+    with _lock:
+        room = MAX_PENDING - len(_pending)
+        if room < len(rows):
+            logger.warning(f"Fuel price history buffer full; dropping {len(rows) - max(room, 0)} prices")
+        _pending.extend(rows[:max(room, 0)])
+    return len(rows)
+
+
+def _load_series(db, keys: list[tuple]) -> dict[tuple, FuelPriceSeries]:
+    """Stored series for (station_code, fuel_type, month) *keys*, locked for update."""
+    loaded = {}
+    for i in range(0, len(keys), LOAD_CHUNK):
+        for series in db.scalars(
+            select(FuelPriceSeries)
+            .where(tuple_(FuelPriceSeries.station_code, FuelPriceSeries.fuel_type,
+                          FuelPriceSeries.month).in_(keys[i:i + LOAD_CHUNK]))
+            .with_for_update()
+        ):
+            loaded[(series.station_code, series.fuel_type, series.month)] = series
+    return loaded
+
+
+def flush() -> int:
+    """
+    Append queued prices that changed to the stored series (a scheduled job).
+
+    Returns how many change points were stored. On a database error the
+    queued prices are put back for the next flush.
+    """
+    with _lock:
+        batch = _pending[:]
+        _pending.clear()
+    if not batch:
+        return 0
+
+    grouped = defaultdict(list)
+    for code, fuel_type, region, price, seen_at in sorted(batch, key=lambda row: row[4]):
+        grouped[(code, fuel_type, month_start(seen_at))].append((region, seen_at, price))
+
+    db = SessionLocal()
+    try:
+        stored = _load_series(db, sorted(grouped))
+        changes = 0
+        for (code, fuel_type, month), points in grouped.items():
+            series = stored.get((code, fuel_type, month))
+            if series is None:
+                series = FuelPriceSeries(station_code=code, fuel_type=fuel_type, month=month,
+                                         minutes=b"", prices=b"")
+                db.add(series)
+            series.region = points[-1][0]
+            series.minutes, series.prices, appended = _append(
+                month, series.minutes, series.prices, ((seen_at, price) for _, seen_at, price in points),
+            )
+            changes += appended
+        db.commit()
+        return changes
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Failed to store fuel price history: {e}")
+        with _lock:
+            _pending[:0] = batch[:max(MAX_PENDING - len(_pending), 0)]
+        return 0
+    finally:
+        db.close()
+
+
+def clear() -> None:
+    """Forget queued prices."""
+    with _lock:
+        _pending.clear()
@@ -0,0 +1,335 @@
+"""
+Per-user geo profiles: location data precomputed for a home address.
+
+Most chat turns ask about the user's own neighbourhood, so the agent
+geocodes the same home address, searches for the same nearby stores and
+routes to them again every session. After onboarding, schedule_build()
+works all of that out once in the background: the home coordinates, the
+nearest Coles and Woolworths stores, the nearest fuel stations, and
+travel distance and time to each of them per travel mode. The profile is
+stored in the user_geo_profiles table and rebuilt by refresh_stale(), a
+scheduled job, when it gets old or the user moves.
+
+Profiles are indexed in memory by normalised home address. The location
+tools call home_coordinates(), home_stores() and home_route(); when the
+location they were given is a user's home address they answer from the
+profile instead of calling Google. Fuel prices change through the day and
+are always fetched live; only the stations' locations are profiled.
+Set GEO_PROFILE=off to disable building profiles.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import SessionLocal
+from metrics import GEO_PROFILE_HITS
+from models.db_models import User, UserGeoProfile
+from services.route_matrix_service import (
+    clean_location,
+    compute_route_matrix,
+    normalise_travel_mode,
+    parse_lat_lng,
+)
+from services.route_optimizer import haversine_distance
+from services.tool_cache import normalise_key
+
+logger = logging.getLogger(__name__)
+
+CHAINS = ("Coles", "Woolworths")
+NEAREST_STORES = int(os.getenv("GEO_PROFILE_STORES", "3"))          # Per chain
+NEAREST_STATIONS = int(os.getenv("GEO_PROFILE_STATIONS", "3"))
+TRAVEL_MODES = ("DRIVE", "WALK", "TRANSIT")
+MAX_AGE = timedelta(days=int(os.getenv("GEO_PROFILE_MAX_AGE_DAYS", "7")))
+REFRESH_BATCH = int(os.getenv("GEO_PROFILE_REFRESH_BATCH", "50"))
+REFRESH_INTERVAL_SECONDS = int(os.getenv("GEO_PROFILE_REFRESH_SECONDS", str(6 * 60 * 60)))
+WORKERS = int(os.getenv("GEO_PROFILE_WORKERS", "2"))
+
+_executor: ThreadPoolExecutor | None = None
+# Maps normalised home address -> {user_id: profile} for everyone living
+# there (most recently indexed last), and user_id -> that address key
+_by_address: Dict[str, Dict[str, dict]] = {}
+_by_user: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("GEO_PROFILE", "on").strip().lower() not in ("off", "false", "0", "no")
+
+
+# ── Building ─────────────────────────────────────────────────────────
+
+def _lat_lng(place: dict) -> str:
+    return f"{place['latitude']},{place['longitude']}"
+
+
+def _nearest(places: list[dict], home: tuple[float, float], count: int) -> list[dict]:
+    """The *count* places closest to *home* in a straight line, skipping unplaced ones."""
+    placed = [p for p in places if p.get("latitude") is not None and p.get("longitude") is not None]
+    placed.sort(key=lambda p: haversine_distance(home, (p["latitude"], p["longitude"])))
+    return placed[:count]
+
+
+def _add_travel(home: tuple[float, float], places: list[dict]) -> None:
+    """Set each place's ``travel`` to its distance and time from *home* per mode."""
+    for place in places:
+        place["travel"] = {}
+    if not places:
+        return
+    origin = f"{home[0]},{home[1]}"
+    for mode in TRAVEL_MODES:
+        row = compute_route_matrix([origin], [_lat_lng(p) for p in places], mode)["rows"][0]
+        for place, cell in zip(places, row):
+            if "error" not in cell:
+                place["travel"][mode] = {
+                    "distance_metres": cell["distance_metres"],
+                    "duration_seconds": cell["duration_seconds"],
+                }
+
+
+def build_profile(home_address: str) -> dict | None:
+    """
+    Work out the geo profile for *home_address* from the upstream APIs.
+
+    Bypasses the tool cache and existing profiles, so a refresh sees
+    current data.
+
+    Returns:
+        dict with latitude, longitude, stores (chain -> nearest stores)
+        and stations, or None if the address can't be geocoded
+    """
+    from services.strands_tools.fuel_lookup import _fetch_fuel_prices, _fetch_geocode
+    from services.strands_tools.google_places import _fetch_nearby_stores
+
+    coords = _fetch_geocode(home_address)
+    if coords is None:
+        return None
+
+    stores = {}
+    for chain in CHAINS:
+        found = _fetch_nearby_stores(home_address, chain)
+        if "error" in found:
+            logger.warning(f"Geo profile: {chain} search failed: {found['error']}")
+        stores[chain] = _nearest(found.get("nearby_stores", []), coords, NEAREST_STORES)
+
+    prices = _fetch_fuel_prices(home_address, "U91")
+    if "error" in prices:
+        logger.warning(f"Geo profile: fuel station search failed: {prices['error']}")
+    unique = {s["address"] or s["name"]: s for s in prices.get("stations", [])}
+    stations = [
+        {key: station.get(key) for key in ("name", "brand", "address", "latitude", "longitude")}
+        for station in _nearest(list(unique.values()), coords, NEAREST_STATIONS)
+    ]
+
+    _add_travel(coords, [store for chain_stores in stores.values() for store in chain_stores] + stations)
+    return {"latitude": coords[0], "longitude": coords[1], "stores": stores, "stations": stations}
+
+
+def _to_dict(row: UserGeoProfile) -> dict:
+    return {
+        "user_id": row.user_id,
+        "home_address": row.home_address,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "stores": row.stores,
+        "stations": row.stations,
+        "refreshed_at": row.refreshed_at.isoformat() if row.refreshed_at else None,
+    }
+
+
+def _index(profile: dict) -> None:
+    user_id = profile["user_id"]
+    key = normalise_key(profile["home_address"])
+    with _lock:
+        previous = _by_user.get(user_id)
+        residents = _by_address.get(previous) if previous is not None else None
+        if residents is not None:
+            residents.pop(user_id, None)
+            if not residents:
+                del _by_address[previous]
+        _by_user[user_id] = key
+        _by_address.setdefault(key, {})[user_id] = profile
+
+
+def refresh_user(user_id: str) -> bool:
+    """
+    Build (or rebuild) a user's geo profile and store it.
+
+    No database connection is held while the upstream APIs are called.
+
+    Returns:
+        True if the profile was stored; failures are logged, not raised,
+        since this runs in the background
+    """
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        home_address = user.home_address if user is not None else None
+    except SQLAlchemyError as e:
+        logger.error(f"Geo profile: failed to load user {user_id}: {e}")
+        return False
+    finally:
+        db.close()
+    if home_address is None:
+        logger.warning(f"Geo profile: user {user_id} not found")
+        return False
+
+    built = build_profile(home_address)
+    if built is None:
+        logger.warning(f"Geo profile: could not geocode home address for user {user_id}")
+        return False
+
+    db = SessionLocal()
+    try:
+        row = db.get(UserGeoProfile, user_id) or UserGeoProfile(user_id=user_id)
+        row.home_address = home_address
+        row.latitude = built["latitude"]
+        row.longitude = built["longitude"]
+        row.stores = built["stores"]
+        row.stations = built["stations"]
+        row.refreshed_at = datetime.utcnow()
+        db.add(row)
+        db.commit()
+        _index(_to_dict(row))
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Geo profile: failed to store profile for user {user_id}: {e}")
+        return False
+    finally:
+        db.close()
+    logger.info(f"Geo profile stored for user {user_id}")
+    return True
+
+
+def refresh_stale(max_age: timedelta = MAX_AGE, limit: int = REFRESH_BATCH) -> int:
+    """
+    Rebuild missing, old and out-of-date profiles, oldest first.
+
+    A profile is out of date when the user's home address has changed
+    since it was built. Returns how many profiles were rebuilt.
+    """
+    cutoff = datetime.utcnow() - max_age
+    db = SessionLocal()
+    try:
+        user_ids = db.scalars(
+            select(User.user_id)
+            .outerjoin(UserGeoProfile, UserGeoProfile.user_id == User.user_id)
+            .where(or_(
+                UserGeoProfile.user_id.is_(None),
+                UserGeoProfile.refreshed_at < cutoff,
+                UserGeoProfile.home_address != User.home_address,
+            ))
+            .order_by(UserGeoProfile.refreshed_at.is_not(None), UserGeoProfile.refreshed_at)
+            .limit(limit)
+        ).all()
+    except SQLAlchemyError as e:
+        logger.error(f"Geo profile: failed to find stale profiles: {e}")
+        return 0
+    finally:
+        db.close()
+    return sum(refresh_user(user_id) for user_id in user_ids)
+
+
+def load_index() -> int:
+    """Index every stored profile (call on app startup); returns how many."""
+    db = SessionLocal()
+    try:
+        rows = db.scalars(select(UserGeoProfile)).all()
+        for row in rows:
+            _index(_to_dict(row))
+        return len(rows)
+    except SQLAlchemyError as e:
+        logger.error(f"Geo profile: failed to load profiles: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def clear_index() -> None:
+    with _lock:
+        _by_address.clear()
+        _by_user.clear()
+
+
+# ── Background work ──────────────────────────────────────────────────
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="geo-profile")
+    return _executor
+
+
+def schedule_build(user_id: str) -> Future | None:
+    """Build a new user's profile in the background; returns its future."""
+    if not enabled():
+        return None
+    return _get_executor().submit(refresh_user, user_id)
+
+
+def shutdown(wait: bool = False) -> None:
+    """Cancel queued builds and stop the worker threads (call on app shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+
+
+# ── Lookups for the tools ────────────────────────────────────────────
+
+def lookup(location: str) -> dict | None:
+    """The profile whose home address is *location*, if any."""
+    with _lock:
+        residents = _by_address.get(normalise_key(clean_location(location)))
+        return next(reversed(residents.values())) if residents else None
+
+
+def home_coordinates(location: str) -> tuple[float, float] | None:
+    """(latitude, longitude) of *location* if it is a profiled home address."""
+    profile = lookup(location)
+    if profile is None:
+        return None
+    GEO_PROFILE_HITS.inc(lookup="geocode")
+    return (profile["latitude"], profile["longitude"])
+
+
+def home_stores(location: str, store_type: str) -> list[dict] | None:
+    """The profiled nearest *store_type* stores to *location*, if it is a home address."""
+    profile = lookup(location)
+    if profile is None:
+        return None
+    chain = next((c for c in profile["stores"] if c.lower() == store_type.strip().lower()), None)
+    if chain is None or not profile["stores"][chain]:
+        return None
+    GEO_PROFILE_HITS.inc(lookup="nearby_stores")
+    return [dict(store) for store in profile["stores"][chain]]
+
+
+def home_route(start: str, end: str, travel_mode: str) -> dict | None:
+    """
+    Profiled distance and time from a home address to one of its stores or stations.
+
+    *end* matches a place by address or by "lat,lng". Returns a dict with
+    distance_metres and duration_seconds, or None if it isn't profiled.
+    """
+    profile = lookup(start)
+    if profile is None:
+        return None
+    mode = normalise_travel_mode(travel_mode)
+    end_key = normalise_key(clean_location(end))
+    end_point = parse_lat_lng(end)
+    places = [s for chain_stores in profile["stores"].values() for s in chain_stores] + profile["stations"]
+    for place in places:
+        same_point = end_point is not None and end_point == (place.get("latitude"), place.get("longitude"))
+        if same_point or normalise_key(place.get("address") or "") == end_key:
+            travel = place.get("travel", {}).get(mode)
+            if travel is not None:
+                GEO_PROFILE_HITS.inc(lookup="route")
+            return travel
+    return None
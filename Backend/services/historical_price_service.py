@@ -7,7 +7,8 @@ for price prediction enrichment.
 
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from models.db_models import HistoricalPriceData
 
 
@@ -48,6 +49,49 @@ async def get_historical_average(db: Session, item_name: str) -> float | None:
     return None
 
 
+async def get_price_history_overview(db: AsyncSession, samples_per_item: int = 3) -> dict:
+    """
+    Summarise stored price history: record count, items and latest prices.
+
+    Read-only, so it can run on a read replica.
+
+    Args:
+        db: Async database session (replica or primary)
+        samples_per_item: Latest records to return for each item
+
+    Returns:
+        Dictionary with total_records, items_available and sample_data
+        (item name -> list of {price, store, date})
+    """
+    total_count = (await db.execute(select(func.count(HistoricalPriceData.id)))).scalar_one()
+
+    items = await db.execute(select(HistoricalPriceData.item_name).distinct())
+    item_names = [row[0] for row in items]
+
+    samples = {}
+    for item_name in item_names:
+        records = await db.execute(
+            select(HistoricalPriceData)
+            .where(HistoricalPriceData.item_name == item_name)
+            .order_by(HistoricalPriceData.recorded_date.desc())
+            .limit(samples_per_item)
+        )
+        samples[item_name] = [
+            {
+                "price": record.price,
+                "store": record.store_name,
+                "date": record.recorded_date.strftime("%Y-%m-%d")
+            }
+            for record in records.scalars()
+        ]
+
+    return {
+        "total_records": total_count,
+        "items_available": item_names,
+        "sample_data": samples,
+    }
+
+
 async def seed_demo_data(db: Session) -> None:
     """
     Seed database with 4 weeks of demo historical price data.
@@ -0,0 +1,176 @@
+"""
+Deterministic parser for simple shopping-list commands.
+
+Messages like "add 2 milk", "remove bread", "set eggs to 3" or "clear my
+list" don't need Bedrock: the chat router recognises them here and applies
+them with the same list logic as the manage_list tool, answering in
+milliseconds instead of a model round trip.
+
+The parser is deliberately conservative. Anything it can't read with
+certainty (prices, stores, questions, several clauses, an item name that
+matches more than one list entry) returns None and goes to the agent.
+"""
+
+import re
+from dataclasses import dataclass
+
+from services.strands_tools.list_manager import apply_list_action
+
+
+@dataclass(frozen=True)
+class ListCommand:
+    action: str  # "add", "remove", "update" or "clear"
+    item_name: str = ""
+    quantity: int = 1
+
+
+_NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "a dozen": 12,
+}
+_QUANTITY = r"(?P<qty>\d{1,3}|" + "|".join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r")"
+
+_POLITE = r"(?:(?:please|pls|can you|could you|koko)[, ]+)*"
+_LIST = r"(?:(?:my|the)\s+)?(?:shopping\s+|grocery\s+)?list"
+_END = r"\s*(?:,?\s*please)?\s*[.!]*\s*$"
+
+_ADD = re.compile(
+    rf"^{_POLITE}(?:add|put)\s+(?:{_QUANTITY}(?:\s*x)?\s+(?:of\s+|packs?\s+of\s+)?)?(?P<items>.+?)"
+    rf"(?:\s+(?:to|on|onto)\s+{_LIST})?{_END}",
+    re.IGNORECASE,
+)
+# "take" only counts with "off" ("take bread off my list", not "take the bus")
+_REMOVE = re.compile(
+    rf"^{_POLITE}(?P<verb>remove|delete|take)\s+(?:the\s+)?(?P<items>.+?)"
+    rf"(?P<suffix>\s+(?:from|off)\s+{_LIST}|\s+off)?{_END}",
+    re.IGNORECASE,
+)
+_UPDATE = re.compile(
+    rf"^{_POLITE}(?:set|change|update)\s+(?:the\s+)?(?:quantity of\s+)?(?P<items>.+?)"
+    rf"\s+(?:quantity\s+)?to\s+(?P<qty>\d{{1,3}}){_END}",
+    re.IGNORECASE,
+)
+_CLEAR = re.compile(
+    rf"^{_POLITE}(?:clear|empty|reset|wipe)\s+(?:out\s+)?{_LIST}{_END}",
+    re.IGNORECASE,
+)
+
+# A plain item: letters, spaces, hyphens and apostrophes, at most 4 words
+_ITEM = re.compile(r"^[a-z][a-z'\- ]{0,40}$", re.IGNORECASE)
+# Words that mean the request is more than a list edit
+_AGENT_WORDS = {
+    "price", "prices", "cheap", "cheapest", "cost", "costs", "deal", "deals", "budget",
+    "fuel", "petrol", "near", "nearby", "store", "stores", "coles", "woolworths", "aldi",
+    "directions", "route", "drive", "walk", "bus", "recipe", "check", "find", "show",
+    "tell", "compare", "search", "look", "what", "how", "where", "which", "why",
+    "for", "from", "with", "to", "at", "in", "on", "if", "then", "also", "every", "all",
+    "my", "list", "me", "us", "i", "you", "it", "them", "that", "this", "some", "more", "less",
+}
+
+
+def _split_items(text: str) -> list[str] | None:
+    """Item names in *text*, or None if any part isn't a plain item."""
+    parts = [p.strip() for p in re.split(r"\s*,\s*|\s+and\s+|\s*&\s*", text) if p.strip()]
+    if not parts:
+        return None
+    for part in parts:
+        words = part.lower().split()
+        if not _ITEM.match(part) or len(words) > 4 or _AGENT_WORDS.intersection(words):
+            return None
+    return parts
+
+
+def _quantity(value: str | None) -> int:
+    if value is None:
+        return 1
+    return int(value) if value.isdigit() else _NUMBER_WORDS[value.lower()]
+
+
+def parse_list_command(message: str) -> list[ListCommand] | None:
+    """
+    The list commands in *message*, or None if it isn't a plain list edit.
+
+    A quantity applies to a single item only ("add 2 milk"); "add 2 milk
+    and bread" is ambiguous and goes to the agent.
+    """
+    text = " ".join(message.strip().split())
+    if not text or "?" in text or len(text) > 120:
+        return None
+
+    if _CLEAR.match(text):
+        return [ListCommand("clear")]
+
+    match = _UPDATE.match(text)
+    if match:
+        items = _split_items(match.group("items"))
+        if items is None or len(items) != 1:
+            return None
+        return [ListCommand("update", items[0], int(match.group("qty")))]
+
+    match = _ADD.match(text)
+    if match:
+        items = _split_items(match.group("items"))
+        if items is None or (match.group("qty") and len(items) > 1):
+            return None
+        quantity = _quantity(match.group("qty"))
+        if quantity < 1:
+            return None
+        return [ListCommand("add", item, quantity) for item in items]
+
+    match = _REMOVE.match(text)
+    if match:
+        items = _split_items(match.group("items"))
+        if items is None or (match.group("verb").lower() == "take" and not match.group("suffix")):
+            return None
+        return [ListCommand("remove", item) for item in items]
+
+    return None
+
+
+def _display_name(name: str) -> str:
+    return " ".join(word[:1].upper() + word[1:] for word in name.split())
+
+
+def _resolve(shopping_list: list[dict], item_name: str) -> str | None:
+    """
+    The list entry *item_name* refers to, or None if that's ambiguous.
+
+    Exact (case-insensitive) names win; otherwise a single entry containing
+    the words ("bread" → "Bread (Loaf)"). Unknown items resolve to
+    themselves.
+    """
+    wanted = item_name.lower()
+    names = [item.get("name", "") for item in shopping_list]
+    exact = [name for name in names if name.lower() == wanted]
+    if exact:
+        return exact[0]
+    partial = [name for name in names if re.search(rf"\b{re.escape(wanted)}\b", name.lower())]
+    if len(partial) == 1:
+        return partial[0]
+    if len(partial) > 1:
+        return None
+    return _display_name(item_name)
+
+
+def apply_list_commands(shopping_list: list[dict], commands: list[ListCommand]) -> str | None:
+    """
+    Apply *commands* to *shopping_list* in place and return the reply.
+
+    Returns None, leaving the list untouched, when an item name is
+    ambiguous against the list; the agent handles those.
+    """
+    resolved = []
+    for command in commands:
+        if command.action == "clear":
+            resolved.append((command, ""))
+            continue
+        name = _resolve(shopping_list, command.item_name)
+        if name is None:
+            return None
+        resolved.append((command, name))
+
+    messages = [
+        apply_list_action(shopping_list, command.action, name, command.quantity)
+        for command, name in resolved
+    ]
+    return ". ".join(messages) + "."
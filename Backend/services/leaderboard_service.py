@@ -4,14 +4,14 @@ Leaderboard service for calculating user rankings.
 Handles leaderboard calculation based on average optimization scores.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.db_models import User, WeeklyPlan
 from models.schemas import LeaderboardEntry
 from exceptions import DatabaseError
 
 
-async def calculate_leaderboard(db: Session) -> list[LeaderboardEntry]:
+async def calculate_leaderboard(db: AsyncSession) -> list[LeaderboardEntry]:
     """
     Calculate and return ranked leaderboard.
 
@@ -24,7 +24,7 @@ async def calculate_leaderboard(db: Session) -> list[LeaderboardEntry]:
     6. Join with User table to get usernames
 
     Args:
-        db: Database session
+        db: Async database session
 
     Returns:
         List of LeaderboardEntry objects sorted by rank
@@ -36,7 +36,7 @@ async def calculate_leaderboard(db: Session) -> list[LeaderboardEntry]:
         # Query to calculate average scores and join with user data
         # Using subquery to calculate average scores per user
         subquery = (
-            db.query(
+            select(
                 WeeklyPlan.user_id,
                 func.avg(WeeklyPlan.optimization_score).label('average_score')
             )
@@ -46,15 +46,16 @@ async def calculate_leaderboard(db: Session) -> list[LeaderboardEntry]:
         
         # Join with User table to get usernames and order by average_score
         results = (
-            db.query(
-                User.user_id,
-                User.name.label('username'),
-                subquery.c.average_score
+            await db.execute(
+                select(
+                    User.user_id,
+                    User.name.label('username'),
+                    subquery.c.average_score
+                )
+                .join(subquery, User.user_id == subquery.c.user_id)
+                .order_by(subquery.c.average_score.desc())
             )
-            .join(subquery, User.user_id == subquery.c.user_id)
-            .order_by(subquery.c.average_score.desc())
-            .all()
-        )
+        ).all()
         
         # Assign ranks
         leaderboard = []
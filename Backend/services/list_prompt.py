@@ -0,0 +1,127 @@
+"""
+Compact shopping-list and home-address context for the chat agent's prompt.
+
+Every chat request carries the user's whole shopping list and home
+address. A session's agent keeps its conversation history, so once it has
+seen them, repeating them each turn only grows the input (a 50-item list
+as Python dicts is ~1,000 tokens per turn, re-read on every later model
+call). Instead the first turn gets the list in a compact one-line form,
+and later turns get only what changed since the agent last saw it:
+
+    Shopping list (3 items, name xqty $price): Milk x2 $3.10; Bread x1 $2.60; Eggs x12
+
+    Shopping list changes since last turn (+ added, - removed, ~ changed):
+    +Apples x6 $4.50; -Bread; ~Milk x3 $3.10
+
+The full list and the address are sent again whenever the conversation
+manager has dropped old messages, since the snapshot the changes build
+on may be gone.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class ListContextState:
+    """What a session's agent has been told so far."""
+
+    shopping_list: list[dict] | None = None  # None until a snapshot is sent
+    home_address: str | None = None
+    removed_messages: int = 0  # conversation_manager.removed_message_count at the snapshot
+
+
+def _format_price(price) -> str:
+    try:
+        price = float(price or 0)
+    except (TypeError, ValueError):
+        return ""
+    return f" ${price:.2f}" if price > 0 else ""
+
+
+def encode_item(item: dict) -> str:
+    """One item as "Name xQty $price" (price left out when unknown)."""
+    return f"{item.get('name', '')} x{item.get('quantity', 1)}{_format_price(item.get('price'))}"
+
+
+def encode_list(items: list[dict]) -> str:
+    """The whole list on one line."""
+    body = "; ".join(encode_item(item) for item in items) or "empty"
+    return f"Shopping list ({len(items)} items, name xqty $price): {body}"
+
+
+def _by_name(items: list[dict]) -> dict[str, dict] | None:
+    keyed = {str(item.get("name", "")).strip().lower(): item for item in items}
+    return keyed if len(keyed) == len(items) else None
+
+
+def list_changes(previous: list[dict], current: list[dict]) -> list[str] | None:
+    """
+    The changes from *previous* to *current*, one entry per item.
+
+    Returns None when items can't be matched up by name (duplicate
+    names); the caller sends the whole list instead.
+    """
+    before, after = _by_name(previous), _by_name(current)
+    if before is None or after is None:
+        return None
+    changes = [f"+{encode_item(item)}" for key, item in after.items() if key not in before]
+    changes += [f"-{item.get('name', '')}" for key, item in before.items() if key not in after]
+    changes += [
+        f"~{encode_item(item)}" for key, item in after.items()
+        if key in before and encode_item(item) != encode_item(before[key])
+    ]
+    return changes
+
+
+def build_turn_context(
+    message: str,
+    shopping_list: list[dict],
+    home_address: str | None,
+    state: ListContextState,
+    removed_messages: int = 0,
+) -> str:
+    """
+    The prompt for one chat turn, updating *state* to what it tells the agent.
+
+    Args:
+        message: The user's message
+        shopping_list: The list the client sent with this turn
+        home_address: The user's home address, if known
+        state: The session's ListContextState
+        removed_messages: The agent's conversation_manager.removed_message_count
+    """
+    resend = state.shopping_list is None or removed_messages > state.removed_messages
+    if resend:
+        state.shopping_list = None
+        state.home_address = None
+        state.removed_messages = removed_messages
+
+    parts = []
+    if home_address and home_address != state.home_address:
+        parts.append(
+            f"[USER_HOME_ADDRESS={home_address}] — "
+            f"Whenever you call a tool that needs the user's location or "
+            f"start address, pass the exact string \"{home_address}\"."
+        )
+        state.home_address = home_address
+
+    full = encode_list(shopping_list)
+    if state.shopping_list is None:
+        if shopping_list:
+            parts.append(full)
+    else:
+        changes = list_changes(state.shopping_list, shopping_list)
+        if changes is None:
+            parts.append(full)
+        elif changes:
+            delta = "Shopping list changes since last turn (+ added, - removed, ~ changed): " + "; ".join(changes)
+            parts.append(delta if len(delta) < len(full) else full)
+    state.shopping_list = [dict(item) for item in shopping_list]
+
+    parts.append(f"User message: {message}")
+    return "\n\n".join(parts)
+
+
+def remember_list(state: ListContextState, shopping_list: list[dict]) -> None:
+    """Record the list as the agent left it (after its manage_list calls)."""
+    state.shopping_list = [dict(item) for item in shopping_list]
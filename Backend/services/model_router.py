@@ -0,0 +1,69 @@
+"""
+Local classifier that picks the Bedrock model tier for a chat turn.
+
+Most turns don't need the strongest model: "thanks", "what about
+walking?" or a single price lookup are answered just as well by a small,
+fast model. Turns that plan across several tools (groceries plus fuel
+plus directions, comparing stores, a whole trip) go to the large model.
+
+The classifier only looks at the message text, so it costs microseconds.
+It leans towards the large model: a planning word or a second tool domain
+is enough to escalate. A session can pin a tier instead (see
+routers/chat.py).
+"""
+
+import re
+from dataclasses import dataclass
+
+SMALL = "small"
+LARGE = "large"
+MODEL_TIERS = (SMALL, LARGE)
+
+# Words that point at one of the agent's tool domains
+_DOMAINS = {
+    "grocery": {
+        "price", "prices", "cost", "costs", "cheap", "cheaper", "cheapest", "coles",
+        "woolworths", "aldi", "groceries", "grocery", "buy", "special", "specials", "deal", "deals",
+        "add", "remove", "list",  # a price lookup then manage_list is one workflow
+    },
+    "fuel": {"fuel", "petrol", "diesel", "e10", "u91", "u95", "u98", "servo", "fill"},
+    "stores": {"store", "stores", "supermarket", "supermarkets", "shop", "shops", "nearest", "nearby", "closest"},
+    "travel": {"directions", "route", "drive", "driving", "walk", "walking", "bus", "transit", "far", "distance"},
+}
+# Words that ask for a plan or comparison rather than a single answer
+_PLANNING = {
+    "plan", "planning", "trip", "compare", "comparison", "optimise", "optimize", "best",
+    "total", "budget", "week", "weekly", "itinerary", "both", "versus", "vs",
+}
+# Longer messages usually carry several requests
+LONG_MESSAGE_WORDS = 40
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class TierDecision:
+    tier: str    # "small" or "large"
+    reason: str  # "chat", "single_tool", "multi_tool", "planning", "long" or "override"
+
+
+def classify_turn(message: str) -> TierDecision:
+    """The model tier for *message*, and why."""
+    words = _WORD.findall(message.lower())
+    vocabulary = set(words)
+    domains = [name for name, domain_words in _DOMAINS.items() if vocabulary & domain_words]
+
+    if len(words) > LONG_MESSAGE_WORDS:
+        return TierDecision(LARGE, "long")
+    if len(domains) > 1:
+        return TierDecision(LARGE, "multi_tool")
+    if domains and vocabulary & _PLANNING:
+        return TierDecision(LARGE, "planning")
+    return TierDecision(SMALL, "single_tool" if domains else "chat")
+
+
+def choose_tier(message: str, override: str | None = None) -> TierDecision:
+    """*override* if the session pinned a tier, otherwise classify_turn()."""
+    if override in MODEL_TIERS:
+        return TierDecision(override, "override")
+    return classify_turn(message)
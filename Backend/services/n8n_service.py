@@ -8,9 +8,9 @@ import httpx
 import logging
 from typing import Any, Dict
 from exceptions import ServiceUnavailableError
+from log_config import body
+from metrics import track_external
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -42,20 +42,23 @@ async def call_n8n_webhook(
     - Validates response status
     """
     # Log the outgoing request
-    logger.info(f"Calling n8n webhook: {webhook_url}")
-    logger.debug(f"Request payload: {payload}")
+    logger.info("Calling n8n webhook: %s", webhook_url)
+    logger.debug("n8n request payload", extra={"payload": body(payload)})
     
     try:
         async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                webhook_url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
+            with track_external("n8n"):
+                response = await client.post(
+                    webhook_url,
+                    json=payload,
+                    headers={"Content-Type": "application/json"}
+                )
             
             # Log the response
-            logger.info(f"n8n webhook response status: {response.status_code}")
-            logger.info(f"Response body: {response.text[:500]}")
+            logger.info(
+                "n8n webhook response status: %d", response.status_code,
+                extra={"status": response.status_code, "response_body": body(response.text)},
+            )
             
             # Handle non-200 responses
             if response.status_code != 200:
@@ -0,0 +1,101 @@
+"""
+Speculative prefetch of location data for new chat sessions.
+
+When a chat session first sees a home address, the agent usually goes on
+to geocode it, search for nearby stores and look up fuel prices, one tool
+call after another. start() runs those lookups concurrently in the
+background as soon as the address arrives, while the model is still
+thinking about its first reply. Results land in services.tool_cache, so
+the agent's tool calls are answered from the cache, or join a lookup
+that is still in flight.
+
+Prefetches are per session and cancellable: a new address for the
+session, or the session expiring, cancels lookups that haven't started.
+A lookup that is already running finishes and is cached anyway. Set
+CHAT_PREFETCH=off to disable prefetching.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+
+from services.strands_tools.fuel_lookup import fuel_prices, geocode
+from services.strands_tools.google_places import nearby_stores
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = int(os.getenv("CHAT_PREFETCH_WORKERS", "8"))
+
+# The lookups the agent makes for a home address, with its default arguments
+PREFETCHES = {
+    "geocode": lambda address: geocode(address, prefetch=True),
+    "nearby_stores": lambda address: nearby_stores(address, prefetch=True),
+    "fuel_prices": lambda address: fuel_prices(address, prefetch=True),
+}
+
+_executor: ThreadPoolExecutor | None = None
+# Maps session_id -> (address, futures of its lookups)
+_pending: Dict[str, tuple[str, list[Future]]] = {}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("CHAT_PREFETCH", "on").strip().lower() not in ("off", "false", "0", "no")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+    return _executor
+
+
+def _run(name: str, address: str) -> None:
+    try:
+        PREFETCHES[name](address)
+    except Exception as e:
+        logger.warning(f"Prefetch {name} for '{address}' failed: {e}")
+
+
+def start(session_id: str, address: str) -> list[Future]:
+    """
+    Prefetch location data for *address* in the background.
+
+    Cancels the session's earlier prefetch if it was for another address;
+    a repeat for the same address does nothing.
+    """
+    if not enabled() or not address:
+        return []
+    with _lock:
+        previous = _pending.get(session_id)
+        if previous is not None and previous[0] == address:
+            return previous[1]
+    cancel(session_id)
+
+    logger.info(f"Prefetching location data for session {session_id}")
+    executor = _get_executor()
+    futures = [executor.submit(_run, name, address) for name in PREFETCHES]
+    with _lock:
+        _pending[session_id] = (address, futures)
+    return futures
+
+
+def cancel(session_id: str) -> int:
+    """Cancel the session's prefetches that haven't started; returns how many."""
+    with _lock:
+        pending = _pending.pop(session_id, None)
+    if pending is None:
+        return 0
+    return sum(future.cancel() for future in pending[1])
+
+
+def shutdown(wait: bool = False) -> None:
+    """Cancel queued prefetches and stop the worker threads (call on app shutdown)."""
+    global _executor
+    with _lock:
+        _pending.clear()
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
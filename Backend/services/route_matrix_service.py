@@ -0,0 +1,348 @@
+"""
+Route matrix service: travel distance and time for many origins × destinations.
+
+Costs a whole matrix in one Google Routes ``computeRouteMatrix`` request
+instead of one ``computeRoutes`` call per pair. Each cell is cached on its
+own, so a later query that shares some origin/destination pairs only asks
+Google for the cells it hasn't seen.
+
+When the Routes API is unavailable (no key, network error, upstream error)
+cells between coordinate locations are estimated from the haversine
+distance with a road-detour factor and a typical speed per travel mode.
+"""
+
+import os
+import re
+import time
+import logging
+from typing import Dict
+
+import httpx
+
+from metrics import track_external
+from services.route_optimizer import haversine_distance
+
+logger = logging.getLogger(__name__)
+
+ROUTE_MATRIX_URL = os.getenv(
+    "GOOGLE_ROUTE_MATRIX_URL",
+    "https://routes.googleapis.com/distanceMatrix/v2:computeRouteMatrix",
+)
+
+TRAVEL_MODES = ("DRIVE", "WALK", "TRANSIT", "TWO_WHEELER", "BICYCLE")
+
+# computeRouteMatrix accepts at most 625 elements per request (100 for TRANSIT),
+# and at most 50 origins and destinations in total given as addresses
+MAX_MATRIX_ELEMENTS = 625
+MAX_TRANSIT_MATRIX_ELEMENTS = 100
+MAX_ADDRESS_WAYPOINTS = 50
+
+# ── Offline estimator ────────────────────────────────────────────────
+# Roads are longer than the straight line; 1.3 is a common urban detour factor
+ROAD_DETOUR_FACTOR = 1.3
+# Typical door-to-door speeds in km/h
+ESTIMATED_SPEED_KMH = {
+    "DRIVE": 35.0,
+    "TWO_WHEELER": 35.0,
+    "TRANSIT": 20.0,
+    "BICYCLE": 15.0,
+    "WALK": 5.0,
+}
+
+# ── Cell cache ───────────────────────────────────────────────────────
+# Maps (origin, destination, mode) -> {"cell": dict, "created": timestamp}
+_cell_cache: Dict[tuple, dict] = {}
+CELL_TTL_SECONDS = 30 * 60  # Traffic changes; don't trust a route for longer
+CELL_CACHE_MAX_ENTRIES = 10_000
+
+_API_KEY = None  # Lazy-loaded from env
+
+_LAT_LNG_PATTERN = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def get_api_key() -> str:
+    """The Google Routes API key (GOOGLE_ROUTES_API_KEY), or "" if unset."""
+    global _API_KEY
+    if _API_KEY is None:
+        _API_KEY = os.getenv("GOOGLE_ROUTES_API_KEY", "")
+    return _API_KEY
+
+
+def clean_location(loc: str) -> str:
+    """Strip [USER_HOME_ADDRESS=...] wrapper if the agent passed the tag verbatim."""
+    m = re.search(r"\[USER_HOME_ADDRESS=(.+?)\]", loc)
+    return (m.group(1) if m else loc).strip()
+
+
+def normalise_travel_mode(travel_mode: str) -> str:
+    """Map agent-friendly mode names onto Google Routes travel modes."""
+    mode = travel_mode.upper().replace("WALKING", "WALK").replace("BUS", "TRANSIT").replace("PUBLIC_TRANSPORT", "TRANSIT")
+    return mode if mode in TRAVEL_MODES else "DRIVE"
+
+
+def format_duration(seconds: int) -> str:
+    """Convert seconds to a human-readable duration string."""
+    if seconds < 60:
+        return f"{seconds} seconds"
+    mins = seconds // 60
+    if mins < 60:
+        return f"{mins} minute{'s' if mins != 1 else ''}"
+    hours = mins // 60
+    remaining_mins = mins % 60
+    if remaining_mins:
+        return f"{hours} hour{'s' if hours != 1 else ''} {remaining_mins} min"
+    return f"{hours} hour{'s' if hours != 1 else ''}"
+
+
+def format_distance(distance_m: int) -> str:
+    """Convert metres to a human-readable distance string."""
+    if distance_m >= 1000:
+        return f"{distance_m / 1000:.1f} km"
+    return f"{distance_m} m"
+
+
+def parse_lat_lng(location: str) -> tuple[float, float] | None:
+    """Return (lat, lng) if *location* is a "lat,lng" string, else None."""
+    m = _LAT_LNG_PATTERN.match(location)
+    if not m:
+        return None
+    lat, lng = float(m.group(1)), float(m.group(2))
+    if -90 <= lat <= 90 and -180 <= lng <= 180:
+        return (lat, lng)
+    return None
+
+
+def _waypoint(location: str) -> dict:
+    """Build a computeRouteMatrix waypoint from an address or "lat,lng" string."""
+    coords = parse_lat_lng(location)
+    if coords:
+        return {"waypoint": {"location": {"latLng": {"latitude": coords[0], "longitude": coords[1]}}}}
+    return {"waypoint": {"address": location}}
+
+
+def _make_cell(distance_m: int, duration_secs: int, source: str) -> dict:
+    return {
+        "distance_metres": distance_m,
+        "distance_text": format_distance(distance_m),
+        "duration_seconds": duration_secs,
+        "duration_text": format_duration(duration_secs),
+        "source": source,
+    }
+
+
+def estimate_cell(origin: str, destination: str, mode: str) -> dict:
+    """
+    Estimate one cell from straight-line distance.
+
+    Only works for "lat,lng" locations; addresses can't be placed offline.
+    """
+    a, b = parse_lat_lng(origin), parse_lat_lng(destination)
+    if a is None or b is None:
+        return {"error": "Route unavailable and location is not a lat,lng pair", "source": "estimate"}
+
+    km = haversine_distance(a, b) * ROAD_DETOUR_FACTOR
+    duration_secs = int(round(km / ESTIMATED_SPEED_KMH[mode] * 3600))
+    return _make_cell(int(round(km * 1000)), duration_secs, "estimate")
+
+
+def _request_matrix(origins: list[str], destinations: list[str], mode: str) -> dict[tuple[int, int], dict]:
+    """
+    Fetch one computeRouteMatrix block from Google.
+
+    Returns:
+        Cells keyed by (origin_index, destination_index). Pairs with no
+        route are returned with an "error" key.
+
+    Raises:
+        httpx.HTTPError: Request failed or returned a non-2xx status
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": get_api_key(),
+        "X-Goog-FieldMask": "originIndex,destinationIndex,duration,distanceMeters,status,condition",
+    }
+    body = {
+        "origins": [_waypoint(o) for o in origins],
+        "destinations": [_waypoint(d) for d in destinations],
+        "travelMode": mode,
+    }
+    if mode == "DRIVE":
+        body["routingPreference"] = "TRAFFIC_AWARE"
+
+    with track_external("google_route_matrix"), httpx.Client(timeout=20) as client:
+        resp = client.post(ROUTE_MATRIX_URL, headers=headers, json=body)
+        resp.raise_for_status()
+        elements = resp.json()
+
+    cells = {}
+    for element in elements:
+        key = (element.get("originIndex", 0), element.get("destinationIndex", 0))
+        if element.get("condition") != "ROUTE_EXISTS":
+            cells[key] = {"error": "No route found", "source": "google"}
+            continue
+        duration_str = element.get("duration", "0s")
+        duration_secs = int(duration_str.rstrip("s")) if duration_str.endswith("s") else 0
+        cells[key] = _make_cell(element.get("distanceMeters", 0), duration_secs, "google")
+    return cells
+
+
+def _evict_expired(now: float) -> None:
+    """Drop stale cells, then the oldest ones if the cache is still full."""
+    expired = [k for k, v in _cell_cache.items() if now - v["created"] > CELL_TTL_SECONDS]
+    for k in expired:
+        del _cell_cache[k]
+    overflow = len(_cell_cache) - CELL_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        for k in sorted(_cell_cache, key=lambda k: _cell_cache[k]["created"])[:overflow]:
+            del _cell_cache[k]
+
+
+def clear_route_matrix_cache() -> None:
+    """Empty the cell cache."""
+    _cell_cache.clear()
+
+
+def _chunks(indices: list[int], locations: list[str], size: int, max_addresses: int) -> list[list[int]]:
+    """
+    Split *indices* into runs of at most *size*, each naming at most
+    *max_addresses* locations that are addresses rather than "lat,lng".
+    """
+    chunks, chunk, addresses = [], [], 0
+    for index in indices:
+        is_address = parse_lat_lng(locations[index]) is None
+        if chunk and (len(chunk) == size or addresses + is_address > max_addresses):
+            chunks.append(chunk)
+            chunk, addresses = [], 0
+        chunk.append(index)
+        addresses += is_address
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _plan_blocks(
+    need_origins: list[int],
+    need_dests: list[int],
+    origins: list[str],
+    destinations: list[str],
+    limit: int,
+) -> list[tuple[list[int], list[int]]]:
+    """
+    Split the origins × destinations still needed into (origin indices,
+    destination indices) blocks within the element limit and the
+    address waypoint limit.
+
+    When both sides have addresses, destinations get up to half the
+    address budget (more if there are fewer address origins) and each
+    block's origins get the rest.
+    """
+    address_origins = sum(parse_lat_lng(origins[i]) is None for i in need_origins)
+    dest_addresses = MAX_ADDRESS_WAYPOINTS - min(address_origins, MAX_ADDRESS_WAYPOINTS // 2)
+    blocks = []
+    for dest_chunk in _chunks(need_dests, destinations, limit, dest_addresses):
+        used = sum(parse_lat_lng(destinations[j]) is None for j in dest_chunk)
+        origin_size = max(1, limit // len(dest_chunk))
+        for origin_chunk in _chunks(need_origins, origins, origin_size, MAX_ADDRESS_WAYPOINTS - used):
+            blocks.append((origin_chunk, dest_chunk))
+    return blocks
+
+
+def compute_route_matrix(
+    origins: list[str],
+    destinations: list[str],
+    travel_mode: str = "DRIVE",
+) -> dict:
+    """
+    Travel distance and time from every origin to every destination.
+
+    Cached cells are reused. The remaining cells are fetched in as few
+    computeRouteMatrix requests as the element and address waypoint
+    limits allow: only the origins and destinations with at least one
+    missing cell are sent. If Google can't be reached, missing cells fall
+    back to the straight-line estimator.
+
+    Args:
+        origins: Addresses or "lat,lng" strings
+        destinations: Addresses or "lat,lng" strings
+        travel_mode: DRIVE, WALK, TRANSIT (bus), TWO_WHEELER or BICYCLE
+
+    Returns:
+        dict with ``rows`` (one list of cells per origin, in destination
+        order) plus cache/upstream counters. Each cell has distance and
+        duration (metres/seconds and text) and ``source`` of "google",
+        "cache", "estimate" or "exact" (origin equals destination), or an
+        ``error`` key.
+    """
+    mode = normalise_travel_mode(travel_mode)
+    origins = [clean_location(o) for o in origins]
+    destinations = [clean_location(d) for d in destinations]
+
+    now = time.time()
+    cells: dict[tuple[int, int], dict] = {}
+    missing = []
+    for i, origin in enumerate(origins):
+        for j, destination in enumerate(destinations):
+            if origin == destination:
+                cells[(i, j)] = _make_cell(0, 0, "exact")
+                continue
+            entry = _cell_cache.get((origin, destination, mode))
+            if entry and now - entry["created"] <= CELL_TTL_SECONDS:
+                cells[(i, j)] = dict(entry["cell"], source="cache")
+            else:
+                missing.append((i, j))
+
+    cache_hits = sum(1 for c in cells.values() if c.get("source") == "cache")
+    upstream_elements = 0
+    estimated = 0
+
+    if missing:
+        need_origins = sorted({i for i, _ in missing})
+        need_dests = sorted({j for _, j in missing})
+        limit = MAX_TRANSIT_MATRIX_ELEMENTS if mode == "TRANSIT" else MAX_MATRIX_ELEMENTS
+
+        fetched: dict[tuple[int, int], dict] = {}
+        if get_api_key():
+            try:
+                for origin_chunk, dest_chunk in _plan_blocks(need_origins, need_dests, origins, destinations, limit):
+                    logger.info(
+                        f"Google Route Matrix: {len(origin_chunk)} origins × "
+                        f"{len(dest_chunk)} destinations ({mode})"
+                    )
+                    block = _request_matrix(
+                        [origins[i] for i in origin_chunk],
+                        [destinations[j] for j in dest_chunk],
+                        mode,
+                    )
+                    upstream_elements += len(origin_chunk) * len(dest_chunk)
+                    for (bi, bj), cell in block.items():
+                        fetched[(origin_chunk[bi], dest_chunk[bj])] = cell
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Google Route Matrix API error: {e.response.status_code} - {e.response.text[:300]}")
+            except Exception as e:
+                logger.error(f"Google Route Matrix lookup failed: {e}")
+        else:
+            logger.warning("No GOOGLE_ROUTES_API_KEY — estimating route matrix offline")
+
+        _evict_expired(now)
+        # The sub-matrix can include pairs that were already cached; refresh those too
+        for (i, j), cell in fetched.items():
+            if "error" not in cell and origins[i] != destinations[j]:
+                _cell_cache[(origins[i], destinations[j], mode)] = {"cell": cell, "created": now}
+
+        for i, j in missing:
+            cell = fetched.get((i, j))
+            if cell is None:
+                cell = estimate_cell(origins[i], destinations[j], mode)
+                estimated += 1
+            cells[(i, j)] = cell
+
+    rows = [[cells[(i, j)] for j in range(len(destinations))] for i in range(len(origins))]
+    return {
+        "travel_mode": mode,
+        "origins": origins,
+        "destinations": destinations,
+        "rows": rows,
+        "cache_hits": cache_hits,
+        "upstream_elements": upstream_elements,
+        "estimated_cells": estimated,
+    }
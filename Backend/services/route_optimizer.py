@@ -0,0 +1,571 @@
+"""
+Route optimizer for combined grocery + fuel trips.
+
+Ports the prototype in ``closest-store.py`` into an importable service.
+Given the user's location, a set of grocery stores and a set of petrol
+stations (servos), it scores every (store, servo) pair in both visiting
+orders and picks the route that best balances travel distance and cost.
+
+Two implementations are provided:
+  - ``find_balanced_route_reference``: the original pure-Python double loop,
+    kept as the correctness oracle for tests and benchmarks.
+  - ``find_balanced_route``: a NumPy implementation that builds the full
+    store × servo distance matrix and scores every candidate in one pass.
+
+``pareto_frontier`` returns every trip that is not beaten on both cost and
+distance, so any distance/cost weighting can be answered from it later
+without rescoring all candidates.
+
+All coordinates are ``(latitude, longitude)`` in decimal degrees.
+Stores and servos are ``(latitude, longitude, cost)`` tuples.
+"""
+
+from dataclasses import dataclass
+from math import radians, sin, cos, sqrt, atan2
+
+import numpy as np
+
+# Radius of earth in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+ROUTE_GROCERY_FIRST = "Address -> Grocery -> Servo"
+ROUTE_SERVO_FIRST = "Address -> Servo -> Grocery"
+
+# Store × servo pairs per block when measuring store-to-servo distances
+EXTREMES_CHUNK_PAIRS = 1_000_000
+# Servos are grouped into cells this many degrees wide for FarthestServos
+FARTHEST_CELL_DEGREES = 1.0
+# Stores whose trips are scored per block when searching for the longest trip
+LONGEST_TRIP_BLOCK_ROWS = 64
+# Widen upper bounds slightly so floating-point noise never skips the longest trip
+_UPPER_BOUND_SLACK = 1 + 1e-9
+
+
+def haversine_distance(coord1: tuple[float, float], coord2: tuple[float, float]) -> float:
+    """
+    Calculate the great circle distance between two points.
+
+    Args:
+        coord1: (latitude, longitude) of the first point
+        coord2: (latitude, longitude) of the second point
+
+    Returns:
+        Distance in kilometers
+    """
+    lat1, lon1 = coord1
+    lat2, lon2 = coord2
+
+    # Convert to radians
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat / 2) ** 2 + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_matrix(points_a: np.ndarray, points_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise great circle distances between two sets of points.
+
+    Args:
+        points_a: Array of shape (N, 2) with (latitude, longitude) rows
+        points_b: Array of shape (M, 2) with (latitude, longitude) rows
+
+    Returns:
+        Array of shape (N, M) with distances in kilometers
+    """
+    a_rad = np.radians(np.asarray(points_a, dtype=float).reshape(-1, 2))
+    b_rad = np.radians(np.asarray(points_b, dtype=float).reshape(-1, 2))
+
+    lat1 = a_rad[:, 0][:, None]
+    lon1 = a_rad[:, 1][:, None]
+    lat2 = b_rad[:, 0][None, :]
+    lon2 = b_rad[:, 1][None, :]
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def combine_groceries(coles_with_cost: list[tuple], woolworths_with_cost: list[tuple]) -> list[tuple]:
+    """Merge Coles and Woolworths stores into (lat, lon, cost, brand) tuples."""
+    return [(c[0], c[1], c[2], "Coles") for c in coles_with_cost] + \
+           [(w[0], w[1], w[2], "Woolworths") for w in woolworths_with_cost]
+
+
+@dataclass
+class RouteCandidates:
+    """
+    Every (grocery, servo) trip for one user location, stored as matrices.
+
+    Row ``i`` is ``groceries[i]`` and column ``j`` is ``servos[j]``.
+    ``distance`` holds the shorter of the two visiting orders and
+    ``grocery_first`` records which order that was.
+    """
+    groceries: list[tuple]
+    servos: list[tuple]
+    distance: np.ndarray
+    cost: np.ndarray
+    grocery_first: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return int(self.distance.size)
+
+    def route(self, grocery_idx: int, servo_idx: int) -> dict:
+        """Describe the trip for one (grocery, servo) pair."""
+        grocery = self.groceries[grocery_idx]
+        servo = self.servos[servo_idx]
+        return {
+            'total_distance_km': round(float(self.distance[grocery_idx, servo_idx]), 2),
+            'total_cost': round(float(self.cost[grocery_idx, servo_idx]), 2),
+            'grocery_type': grocery[3],
+            'grocery_coords': (grocery[0], grocery[1]),
+            'grocery_cost': grocery[2],
+            'servo_coords': (servo[0], servo[1]),
+            'servo_cost': servo[2],
+            'route_order': (
+                ROUTE_GROCERY_FIRST if self.grocery_first[grocery_idx, servo_idx]
+                else ROUTE_SERVO_FIRST
+            ),
+        }
+
+
+def build_route_candidates(
+    address: tuple[float, float],
+    groceries: list[tuple],
+    servos_with_cost: list[tuple],
+) -> RouteCandidates:
+    """
+    Cost every (grocery, servo) pair in both visiting orders at once.
+
+    The grocery→servo leg is shared by both orders, so each trip is
+    ``d(grocery, servo) + min(d(address, grocery), d(address, servo))``.
+    Only three distance computations are needed: address→groceries (G),
+    address→servos (S) and groceries→servos (G × S).
+
+    Args:
+        address: User location as (latitude, longitude)
+        groceries: (lat, lon, cost, brand) tuples, see ``combine_groceries``
+        servos_with_cost: (lat, lon, cost) tuples
+
+    Returns:
+        RouteCandidates with (G, S) distance, cost and order matrices
+    """
+    grocery_arr = np.array([g[:3] for g in groceries], dtype=float).reshape(-1, 3)
+    servo_arr = np.array([s[:3] for s in servos_with_cost], dtype=float).reshape(-1, 3)
+    origin = np.array([address], dtype=float)
+
+    to_grocery = haversine_matrix(origin, grocery_arr[:, :2])[0]
+    to_servo = haversine_matrix(origin, servo_arr[:, :2])[0]
+    grocery_to_servo = haversine_matrix(grocery_arr[:, :2], servo_arr[:, :2])
+
+    # Route 1: Address -> Grocery -> Servo
+    route1 = to_grocery[:, None] + grocery_to_servo
+    # Route 2: Address -> Servo -> Grocery
+    route2 = to_servo[None, :] + grocery_to_servo
+
+    grocery_first = route1 < route2
+    return RouteCandidates(
+        groceries=list(groceries),
+        servos=list(servos_with_cost),
+        distance=np.where(grocery_first, route1, route2),
+        cost=grocery_arr[:, 2][:, None] + servo_arr[:, 2][None, :],
+        grocery_first=grocery_first,
+    )
+
+
+def _normalise(values: np.ndarray) -> np.ndarray:
+    """Scale values to the 0-1 range (all zeros when there is no spread)."""
+    low = values.min()
+    high = values.max()
+    if high > low:
+        return (values - low) / (high - low)
+    return np.zeros_like(values)
+
+
+def find_balanced_route(address, coles_with_cost, woolworths_with_cost, servos_with_cost, weight=0.5):
+    """
+    Find the route that balances both distance and cost using weighted scoring.
+
+    Vectorized equivalent of ``find_balanced_route_reference``.
+
+    Args:
+        address: User location as (latitude, longitude)
+        coles_with_cost: (lat, lon, cost) tuples for Coles stores
+        woolworths_with_cost: (lat, lon, cost) tuples for Woolworths stores
+        servos_with_cost: (lat, lon, cost) tuples for petrol stations
+        weight: balance between distance and cost (0-1)
+                0.0 = prioritize distance only
+                0.5 = equal balance
+                1.0 = prioritize cost only
+
+    Returns:
+        Best route based on weighted score, or None when there are no
+        stores or no servos to choose from
+    """
+    groceries = combine_groceries(coles_with_cost, woolworths_with_cost)
+    if not groceries or not servos_with_cost:
+        return None
+
+    candidates = build_route_candidates(address, groceries, servos_with_cost)
+    return best_weighted_route(candidates, weight)
+
+
+def best_weighted_route(candidates: RouteCandidates, weight: float = 0.5) -> dict | None:
+    """
+    Pick the lowest weighted-score route from precomputed candidates.
+
+    Ties resolve to the first pair in grocery-major order, matching the
+    reference loop.
+    """
+    if candidates.size == 0:
+        return None
+
+    # weight=0 means distance only, weight=1 means cost only
+    scores = ((1 - weight) * _normalise(candidates.distance)) + (weight * _normalise(candidates.cost))
+    grocery_idx, servo_idx = np.unravel_index(int(np.argmin(scores)), scores.shape)
+
+    best_route = candidates.route(grocery_idx, servo_idx)
+    best_route['weighted_score'] = round(float(scores[grocery_idx, servo_idx]), 3)
+    return best_route
+
+
+@dataclass
+class RouteFrontier:
+    """
+    Cost/distance Pareto frontier of trips for one user location.
+
+    ``routes`` is sorted by cost ascending (so distance descending); no
+    route on it is both cheaper and shorter than another. ``distance`` and
+    ``cost`` hold the unrounded values for each route, and the bounds are
+    taken over *all* candidates so weighted scores normalise exactly as
+    ``best_weighted_route`` does. ``scored_count`` is how many candidates
+    were actually scored (fewer than ``candidate_count`` when pruned).
+    """
+    routes: list[dict]
+    distance: np.ndarray
+    cost: np.ndarray
+    min_distance: float
+    max_distance: float
+    min_cost: float
+    max_cost: float
+    candidate_count: int
+    scored_count: int = 0
+
+    def select(self, weight: float = 0.5) -> dict | None:
+        """
+        Return the best weighted-score route for any slider position.
+
+        The weighted optimum always lies on the frontier, so this only
+        scores the frontier routes instead of every candidate pair.
+        """
+        if not self.routes:
+            return None
+
+        dist_span = self.max_distance - self.min_distance
+        cost_span = self.max_cost - self.min_cost
+        norm_dist = (self.distance - self.min_distance) / dist_span if dist_span > 0 else np.zeros_like(self.distance)
+        norm_cost = (self.cost - self.min_cost) / cost_span if cost_span > 0 else np.zeros_like(self.cost)
+
+        scores = ((1 - weight) * norm_dist) + (weight * norm_cost)
+        best = int(np.argmin(scores))
+
+        route = dict(self.routes[best])
+        route['weighted_score'] = round(float(scores[best]), 3)
+        return route
+
+
+def pareto_frontier(candidates: RouteCandidates) -> RouteFrontier:
+    """
+    Compute the cost/distance Pareto frontier of all candidate trips.
+
+    Sorts candidates by (cost, distance) and keeps each one whose distance
+    is strictly shorter than every cheaper-or-equal candidate before it.
+    O(n log n) in the number of candidate pairs.
+
+    Args:
+        candidates: Output of ``build_route_candidates``
+
+    Returns:
+        RouteFrontier sorted by cost ascending
+    """
+    if candidates.size == 0:
+        empty = np.empty(0)
+        return RouteFrontier([], empty, empty, 0.0, 0.0, 0.0, 0.0, 0, 0)
+
+    distance = candidates.distance.ravel()
+    cost = candidates.cost.ravel()
+
+    # Primary key cost, secondary key distance (lexsort sorts by the last key first)
+    order = np.lexsort((distance, cost))
+    sorted_distance = distance[order]
+
+    # Shortest distance among all cheaper-or-equal candidates seen so far
+    shortest_before = np.minimum.accumulate(np.concatenate(([np.inf], sorted_distance[:-1])))
+    frontier_idx = order[sorted_distance < shortest_before]
+
+    shape = candidates.distance.shape
+    routes = [candidates.route(*np.unravel_index(int(k), shape)) for k in frontier_idx]
+
+    return RouteFrontier(
+        routes=routes,
+        distance=distance[frontier_idx],
+        cost=cost[frontier_idx],
+        min_distance=float(distance.min()),
+        max_distance=float(distance.max()),
+        min_cost=float(cost.min()),
+        max_cost=float(cost.max()),
+        candidate_count=candidates.size,
+        scored_count=candidates.size,
+    )
+
+
+@dataclass
+class FarthestServos:
+    """
+    Distance from each grocery to its farthest servo in each coarse cell.
+
+    Doesn't depend on the user's location, so it is built once per store
+    and servo list (see ``farthest_servos``) and reused by ``longest_trip``
+    for every origin. Row ``i`` is ``groceries[i]``; column ``k`` covers
+    the servos ``order[starts[k]:starts[k + 1]]``.
+    """
+    order: np.ndarray
+    starts: np.ndarray
+    distance: np.ndarray
+
+
+def pruned_pareto_frontier(
+    address: tuple[float, float],
+    groceries: list[tuple],
+    servos_with_cost: list[tuple],
+    grocery_index=None,
+    servo_index=None,
+    seed_k: int = 8,
+    farthest: FarthestServos | None = None,
+) -> RouteFrontier:
+    """
+    Pareto frontier that skips stores and servos which provably can't be on it.
+
+    1. Seed a frontier from the ``seed_k`` nearest and ``seed_k`` cheapest
+       groceries × servos, so the bound covers both ends of the frontier.
+    2. Every trip through grocery ``g`` is at least ``d(address, g)`` long
+       (triangle inequality) and costs at least ``cost_g`` plus the cheapest
+       servo. If a seed route is no dearer than that and strictly shorter,
+       every trip through ``g`` is dominated, so ``g`` is dropped. Servos are
+       pruned the same way.
+    3. Score the surviving groceries × servos as usual.
+
+    The frontier routes are the same as ``pareto_frontier`` over every
+    pair, and the normalisation bounds and ``candidate_count`` still cover
+    every pair, so ``select`` scores don't depend on whether the list was
+    pruned. The shortest and cheapest trips are on the frontier; the
+    dearest is the dearest store plus the dearest servo, and the longest
+    comes from ``longest_trip``.
+
+    Args:
+        address: User location as (latitude, longitude)
+        groceries: (lat, lon, cost, brand) tuples, see ``combine_groceries``
+        servos_with_cost: (lat, lon, cost) tuples
+        grocery_index: Prebuilt ``GridIndex`` over *groceries* (built if omitted)
+        servo_index: Prebuilt ``GridIndex`` over *servos_with_cost* (built if omitted)
+        seed_k: Nearest (and cheapest) stores and servos used to seed the bound
+        farthest: Prebuilt ``farthest_servos`` for these stores (computed if omitted)
+
+    Returns:
+        RouteFrontier with bounds over all candidates
+    """
+    from services.spatial_index import GridIndex, frontier_distance_bound
+
+    if not groceries or not servos_with_cost:
+        return pareto_frontier(build_route_candidates(address, groceries, servos_with_cost))
+    if grocery_index is None:
+        grocery_index = GridIndex(groceries)
+    if servo_index is None:
+        servo_index = GridIndex(servos_with_cost)
+    if farthest is None:
+        farthest = farthest_servos(groceries, servos_with_cost)
+
+    seed_groceries = np.union1d(grocery_index.nearest(address, seed_k), grocery_index.cheapest_k(seed_k))
+    seed_servos = np.union1d(servo_index.nearest(address, seed_k), servo_index.cheapest_k(seed_k))
+    seed = pareto_frontier(build_route_candidates(
+        address,
+        [groceries[i] for i in seed_groceries],
+        [servos_with_cost[j] for j in seed_servos],
+    ))
+
+    bound = frontier_distance_bound(seed.cost, seed.distance)
+    keep_groceries = grocery_index.within_bound(address, bound, cost_offset=servo_index.cheapest)
+    keep_servos = servo_index.within_bound(address, bound, cost_offset=grocery_index.cheapest)
+
+    frontier = pareto_frontier(build_route_candidates(
+        address,
+        [groceries[i] for i in keep_groceries],
+        [servos_with_cost[j] for j in keep_servos],
+    ))
+    frontier.min_distance = float(frontier.distance.min())
+    frontier.max_distance = longest_trip(address, groceries, servos_with_cost, farthest)
+    frontier.min_cost = float(frontier.cost.min())
+    frontier.max_cost = max(g[2] for g in groceries) + max(s[2] for s in servos_with_cost)
+    frontier.candidate_count = len(groceries) * len(servos_with_cost)
+    return frontier
+
+
+def farthest_servos(
+    groceries: list[tuple],
+    servos_with_cost: list[tuple],
+    cell_degrees: float = FARTHEST_CELL_DEGREES,
+    chunk_pairs: int = EXTREMES_CHUNK_PAIRS,
+) -> FarthestServos:
+    """
+    Group servos into ``cell_degrees`` lat/lon cells and measure each
+    grocery's farthest servo per cell, ``chunk_pairs`` pairs at a time so
+    memory stays flat.
+    """
+    grocery_arr = np.array([g[:2] for g in groceries], dtype=float).reshape(-1, 2)
+    servo_arr = np.array([s[:2] for s in servos_with_cost], dtype=float).reshape(-1, 2)
+
+    _, cell = np.unique(np.floor(servo_arr / cell_degrees), axis=0, return_inverse=True)
+    cell = cell.ravel()
+    order = np.argsort(cell, kind="stable")
+    starts = np.flatnonzero(np.diff(cell[order], prepend=-1))
+    servo_arr = servo_arr[order]
+
+    distance = np.zeros((len(grocery_arr), len(starts)))
+    rows = max(1, chunk_pairs // max(len(servo_arr), 1))
+    for start in range(0, len(grocery_arr), rows):
+        pairs = haversine_matrix(grocery_arr[start:start + rows], servo_arr)
+        distance[start:start + rows] = np.maximum.reduceat(pairs, starts, axis=1)
+    return FarthestServos(order=order, starts=starts, distance=distance)
+
+
+def longest_trip(
+    address: tuple[float, float],
+    groceries: list[tuple],
+    servos_with_cost: list[tuple],
+    farthest: FarthestServos,
+    block_rows: int = LONGEST_TRIP_BLOCK_ROWS,
+) -> float:
+    """
+    Longest trip distance over every (grocery, servo) pair, as computed by
+    ``build_route_candidates``.
+
+    A trip through grocery ``g`` and a servo in cell ``k`` is ``d(g, s)``
+    plus the shorter of ``d(address, g)`` and ``d(address, s)``, so it is
+    at most ``farthest.distance[g, k]`` plus the shorter of
+    ``d(address, g)`` and the farthest servo in ``k`` from the address.
+    Groceries are scored ``block_rows`` at a time in order of that bound,
+    stopping once no remaining grocery can beat the longest trip found, so
+    usually only the first block is scored.
+    """
+    grocery_arr = np.array([g[:2] for g in groceries], dtype=float).reshape(-1, 2)
+    servo_arr = np.array([s[:2] for s in servos_with_cost], dtype=float).reshape(-1, 2)
+    origin = np.array([address], dtype=float)
+    to_grocery = haversine_matrix(origin, grocery_arr)[0]
+    to_servo = haversine_matrix(origin, servo_arr)[0]
+
+    cell_reach = np.maximum.reduceat(to_servo[farthest.order], farthest.starts)
+    upper = (farthest.distance + np.minimum(to_grocery[:, None], cell_reach[None, :])).max(axis=1)
+    order = np.argsort(-upper)
+    longest = -np.inf
+    for start in range(0, len(order), block_rows):
+        rows = order[start:start + block_rows]
+        if upper[rows[0]] * _UPPER_BOUND_SLACK < longest:
+            break
+        trips = haversine_matrix(grocery_arr[rows], servo_arr)
+        trips += np.minimum(to_grocery[rows, None], to_servo[None, :])
+        longest = max(longest, float(trips.max()))
+    return longest
+
+
+def find_balanced_route_reference(address, coles_with_cost, woolworths_with_cost, servos_with_cost, weight=0.5):
+    """
+    Scalar reference implementation from ``closest-store.py``.
+
+    Loops over every (grocery, servo) pair in pure Python. Kept so the
+    vectorized version can be checked against it; use
+    ``find_balanced_route`` everywhere else.
+    """
+    all_groceries = combine_groceries(coles_with_cost, woolworths_with_cost)
+
+    # First pass: collect all routes to find min/max for normalization
+    all_routes = []
+
+    for grocery_lat, grocery_lon, grocery_cost, grocery_type in all_groceries:
+        grocery_coord = (grocery_lat, grocery_lon)
+
+        for servo_lat, servo_lon, servo_cost in servos_with_cost:
+            servo_coord = (servo_lat, servo_lon)
+
+            # Calculate total cost
+            total_cost = grocery_cost + servo_cost
+
+            # Route 1: Address -> Grocery -> Servo
+            route1_dist = (haversine_distance(address, grocery_coord) + haversine_distance(grocery_coord, servo_coord))
+
+            # Route 2: Address -> Servo -> Grocery
+            route2_dist = (haversine_distance(address, servo_coord) + haversine_distance(servo_coord, grocery_coord))
+
+            # Take the shorter route
+            if route1_dist < route2_dist:
+                total_dist = route1_dist
+                route_order = ROUTE_GROCERY_FIRST
+            else:
+                total_dist = route2_dist
+                route_order = ROUTE_SERVO_FIRST
+
+            all_routes.append({
+                'distance': total_dist,
+                'cost': total_cost,
+                'grocery_type': grocery_type,
+                'grocery_coords': grocery_coord,
+                'grocery_cost': grocery_cost,
+                'servo_coords': servo_coord,
+                'servo_cost': servo_cost,
+                'route_order': route_order
+            })
+
+    if not all_routes:
+        return None
+
+    # Find min/max for normalization
+    min_dist = min(r['distance'] for r in all_routes)
+    max_dist = max(r['distance'] for r in all_routes)
+    min_cost = min(r['cost'] for r in all_routes)
+    max_cost = max(r['cost'] for r in all_routes)
+
+    # Calculate weighted scores
+    best_score = float('inf')
+    best_route = None
+
+    for route in all_routes:
+        # Normalize distance and cost to 0-1 range
+        norm_dist = (route['distance'] - min_dist) / (max_dist - min_dist) if max_dist > min_dist else 0
+        norm_cost = (route['cost'] - min_cost) / (max_cost - min_cost) if max_cost > min_cost else 0
+
+        # weight=0 means distance only, weight=1 means cost only
+        score = ((1 - weight) * norm_dist) + (weight * norm_cost)
+
+        if score < best_score:
+            best_score = score
+            best_route = {
+                'total_distance_km': round(route['distance'], 2),
+                'total_cost': round(route['cost'], 2),
+                'weighted_score': round(score, 3),
+                'grocery_type': route['grocery_type'],
+                'grocery_coords': route['grocery_coords'],
+                'grocery_cost': route['grocery_cost'],
+                'servo_coords': route['servo_coords'],
+                'servo_cost': route['servo_cost'],
+                'route_order': route['route_order']
+            }
+
+    return best_route
@@ -0,0 +1,140 @@
+"""
+Route service for grocery + fuel trip recommendations.
+
+Builds the cost/distance Pareto frontier for a user location and caches it,
+so the frontend can move its distance/cost slider without another
+round of candidate scoring.
+"""
+
+import time
+import logging
+from typing import Dict
+
+from exceptions import ValidationError
+from services.route_optimizer import (
+    RouteFrontier,
+    build_route_candidates,
+    combine_groceries,
+    farthest_servos,
+    pareto_frontier,
+    pruned_pareto_frontier,
+)
+from services.spatial_index import GridIndex
+
+logger = logging.getLogger(__name__)
+
+# ── Frontier cache ───────────────────────────────────────────────────
+# Maps (rounded origin, stores, servos) -> {"frontier": RouteFrontier, "created": timestamp}
+_frontier_cache: Dict[tuple, dict] = {}
+FRONTIER_TTL_SECONDS = 10 * 60  # Store/fuel prices move slowly enough for 10 minutes
+FRONTIER_CACHE_MAX_ENTRIES = 256
+# ~11 m at Sydney's latitude: nearby requests from the same home share an entry
+ORIGIN_PRECISION = 4
+# Above this many store × servo pairs, prune with the spatial index first
+PRUNE_MIN_PAIRS = 100_000
+# Maps (stores, servos) -> {"pruning": (grocery GridIndex, servo GridIndex, farthest_servos),
+# "created": timestamp}; built once per candidate set and shared by every origin
+_index_cache: Dict[tuple, dict] = {}
+
+
+def _cache_key(
+    origin: tuple[float, float],
+    coles: list[tuple],
+    woolworths: list[tuple],
+    servos: list[tuple],
+) -> tuple:
+    """Key the cache on the rounded origin plus the exact candidate sets."""
+    return (
+        round(origin[0], ORIGIN_PRECISION),
+        round(origin[1], ORIGIN_PRECISION),
+        tuple(coles),
+        tuple(woolworths),
+        tuple(servos),
+    )
+
+
+def _evict_expired(cache: Dict[tuple, dict], now: float) -> None:
+    """Drop stale entries, then the oldest ones if the cache is still full."""
+    expired = [
+        key for key, entry in cache.items()
+        if now - entry["created"] > FRONTIER_TTL_SECONDS
+    ]
+    for key in expired:
+        del cache[key]
+
+    while len(cache) >= FRONTIER_CACHE_MAX_ENTRIES:
+        oldest = min(cache, key=lambda k: cache[k]["created"])
+        del cache[oldest]
+
+
+def clear_frontier_cache() -> None:
+    """Empty the frontier and spatial index caches."""
+    _frontier_cache.clear()
+    _index_cache.clear()
+
+
+def _pruning_data(key: tuple, groceries: list[tuple], servos: list[tuple], now: float) -> tuple:
+    """
+    Grid indexes over *groceries* and *servos* and each grocery's farthest
+    servo, worked out once per candidate set.
+    """
+    entry = _index_cache.get(key)
+    if entry is None or now - entry["created"] > FRONTIER_TTL_SECONDS:
+        _evict_expired(_index_cache, now)
+        pruning = (GridIndex(groceries), GridIndex(servos), farthest_servos(groceries, servos))
+        entry = {"pruning": pruning, "created": now}
+        _index_cache[key] = entry
+    return entry["pruning"]
+
+
+def get_route_frontier(
+    origin: tuple[float, float],
+    coles: list[tuple],
+    woolworths: list[tuple],
+    servos: list[tuple],
+) -> RouteFrontier:
+    """
+    Return the cost/distance Pareto frontier of store + servo trips.
+
+    Args:
+        origin: Trip start as (latitude, longitude)
+        coles: (lat, lon, cost) tuples for Coles stores
+        woolworths: (lat, lon, cost) tuples for Woolworths stores
+        servos: (lat, lon, cost) tuples for petrol stations
+
+    Returns:
+        RouteFrontier, served from cache when the same location and
+        candidates were requested recently
+
+    Raises:
+        ValidationError: No grocery stores or no servos were given
+    """
+    if not coles and not woolworths:
+        raise ValidationError("At least one Coles or Woolworths store is required")
+    if not servos:
+        raise ValidationError("At least one petrol station is required")
+
+    now = time.time()
+    key = _cache_key(origin, coles, woolworths, servos)
+    entry = _frontier_cache.get(key)
+    if entry and now - entry["created"] <= FRONTIER_TTL_SECONDS:
+        logger.info(f"Route frontier cache hit for origin {key[:2]}")
+        return entry["frontier"]
+
+    groceries = combine_groceries(coles, woolworths)
+    if len(groceries) * len(servos) >= PRUNE_MIN_PAIRS:
+        grocery_index, servo_index, farthest = _pruning_data(key[2:], groceries, servos, now)
+        frontier = pruned_pareto_frontier(
+            origin, groceries, servos, grocery_index, servo_index, farthest=farthest,
+        )
+    else:
+        frontier = pareto_frontier(build_route_candidates(origin, groceries, servos))
+    logger.info(
+        f"Route frontier for origin {key[:2]}: "
+        f"{len(frontier.routes)} of {frontier.candidate_count} candidates "
+        f"({frontier.scored_count} scored)"
+    )
+
+    _evict_expired(_frontier_cache, now)
+    _frontier_cache[key] = {"frontier": frontier, "created": now}
+    return frontier
@@ -0,0 +1,381 @@
+"""
+In-process scheduler for periodic maintenance jobs.
+
+Jobs run on the app's event loop, off the request path: every N seconds
+(add_interval) or on a cron-like schedule (add_cron, five fields, UTC).
+Each run can be delayed by a random jitter so instances don't all fire
+at once. Plain functions run in a worker thread unless they only touch
+in-process state; coroutine functions are awaited.
+
+With several workers or replicas, a single_instance job runs on one of
+them only: before each run the instance takes a lease on the job's row
+in the scheduler_locks table. The lease lasts until just after the next
+scheduled run, so the holder keeps renewing it, and another instance
+takes over if the holder stops.
+
+Runs are timed in scheduler_job_duration_seconds{job,outcome}, and runs
+skipped because another instance holds the lease are counted in
+scheduler_job_skipped_total. shutdown() cancels idle jobs, gives running
+ones a grace period to finish, and releases this instance's leases.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from database import SessionLocal
+from metrics import SCHEDULER_JOB_DURATION, SCHEDULER_JOB_SKIPPED
+from models.db_models import SchedulerLock
+
+logger = logging.getLogger(__name__)
+
+LOCK_MARGIN_SECONDS = 30       # Lease overlap past the next scheduled run
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SCHEDULER_SHUTDOWN_GRACE_SECONDS", "10"))
+
+
+# ── Cron schedules ───────────────────────────────────────────────────
+
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> frozenset[int]:
+    """Parse one cron field: *, N, N-M, lists of those, each with an optional /step."""
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Cron {name} step must be positive: {text!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(bound) for bound in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron {name} out of range {low}-{high}: {text!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """
+    A five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Day of week is 0-7 with Sunday as 0 or 7. As in cron, when both day
+    fields are restricted a time matches if either of them does.
+    """
+
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        """Raises ValueError for a malformed expression."""
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        try:
+            minutes, hours, days, months, weekdays = (
+                _parse_field(text, name, low, high) for text, (name, low, high) in zip(fields, _CRON_FIELDS)
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression {expression!r}: {e}") from None
+        return cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(d % 7 for d in weekdays),
+            any_day=fields[2] == "*",
+            any_weekday=fields[4] == "*",
+        )
+
+    def _day_matches(self, when: datetime) -> bool:
+        day = when.day in self.days
+        weekday = (when.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, when: datetime) -> datetime:
+        """The first matching minute after *when*."""
+        candidate = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = when + timedelta(days=5 * 366)
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+
+
+# ── Jobs ─────────────────────────────────────────────────────────────
+
+@dataclass
+class Job:
+    """A scheduled job and its run history."""
+
+    name: str
+    func: Callable[[], Any]
+    interval: float | None = None
+    cron: CronSchedule | None = None
+    jitter: float = 0.0
+    single_instance: bool = False
+    in_thread: bool = True
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    running: bool = False
+    next_run: datetime | None = None
+    last_started: datetime | None = None
+    last_duration: float | None = None
+    last_error: str | None = None
+    _task: asyncio.Task | None = field(default=None, repr=False)
+
+    def next_time(self, now: datetime) -> datetime:
+        """When the next run is due, before jitter."""
+        if self.cron is not None:
+            return self.cron.next_after(now)
+        return now + timedelta(seconds=self.interval)
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "schedule": self.cron.expression if self.cron is not None else f"every {self.interval:g}s",
+            "single_instance": self.single_instance,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_started": self.last_started.isoformat() if self.last_started else None,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """Runs registered jobs on the current event loop between start() and shutdown()."""
+
+    def __init__(self, owner: str | None = None):
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, Job] = {}
+        self._stopping = False
+
+    def _add(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name!r} is already scheduled")
+        self.jobs[job.name] = job
+        if self.started:
+            job._task = asyncio.get_running_loop().create_task(self._loop(job), name=f"job:{job.name}")
+        return job
+
+    def add_interval(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        seconds: float,
+        jitter: float = 0.0,
+        single_instance: bool = False,
+        in_thread: bool = True,
+    ) -> Job:
+        """
+        Run *func* every *seconds*, the first time *seconds* after start().
+
+        Args:
+            name: Unique job name, also its lock and metrics label
+            func: Function or coroutine function taking no arguments
+            seconds: Time between the end of one run and the next
+            jitter: Up to this many extra seconds, random per run
+            single_instance: Run on one app instance only (DB lease)
+            in_thread: Run a plain function in a worker thread; turn off
+                for quick jobs that touch state owned by the event loop
+        """
+        if seconds <= 0:
+            raise ValueError("Job interval must be positive")
+        return self._add(Job(name, func, interval=seconds, jitter=jitter,
+                             single_instance=single_instance, in_thread=in_thread))
+
+    def add_cron(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        expression: str,
+        jitter: float = 0.0,
+        single_instance: bool = False,
+        in_thread: bool = True,
+    ) -> Job:
+        """Run *func* at the times matching the cron *expression* (UTC); see add_interval."""
+        return self._add(Job(name, func, cron=CronSchedule.parse(expression), jitter=jitter,
+                             single_instance=single_instance, in_thread=in_thread))
+
+    @property
+    def started(self) -> bool:
+        return any(job._task is not None for job in self.jobs.values())
+
+    def start(self) -> None:
+        """Start every job's timer (call from the running event loop)."""
+        self._stopping = False
+        loop = asyncio.get_running_loop()
+        for job in self.jobs.values():
+            if job._task is None:
+                job._task = loop.create_task(self._loop(job), name=f"job:{job.name}")
+        logger.info(f"Scheduler started with {len(self.jobs)} jobs")
+
+    async def _loop(self, job: Job) -> None:
+        while not self._stopping:
+            now = datetime.utcnow()
+            job.next_run = job.next_time(now) + timedelta(seconds=random.uniform(0, job.jitter))
+            await asyncio.sleep((job.next_run - now).total_seconds())
+            await self._run(job)
+
+    async def run_now(self, name: str) -> bool:
+        """Run a job once, outside its schedule; returns False if another instance holds its lease."""
+        return await self._run(self.jobs[name])
+
+    async def _run(self, job: Job) -> bool:
+        if job.single_instance and not await asyncio.to_thread(self._acquire, job):
+            job.skipped += 1
+            SCHEDULER_JOB_SKIPPED.inc(job=job.name)
+            logger.debug(f"Job {job.name} skipped: another instance holds its lease")
+            return False
+
+        job.running = True
+        job.last_started = datetime.utcnow()
+        start = time.perf_counter()
+        try:
+            with SCHEDULER_JOB_DURATION.time(job=job.name):
+                if asyncio.iscoroutinefunction(job.func):
+                    await job.func()
+                elif job.in_thread:
+                    await asyncio.to_thread(job.func)
+                else:
+                    job.func()
+            job.runs += 1
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e) or type(e).__name__
+            logger.exception(f"Job {job.name} failed")
+        finally:
+            job.running = False
+            job.last_duration = time.perf_counter() - start
+        return True
+
+    # ── Single-instance leases ──────────────────────────────────────
+
+    def _lease_seconds(self, job: Job) -> float:
+        now = datetime.utcnow()
+        return (job.next_time(now) - now).total_seconds() + job.jitter + LOCK_MARGIN_SECONDS
+
+    def _acquire(self, job: Job) -> bool:
+        """Take or renew the job's lease; False if another instance holds it."""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self._lease_seconds(job))
+        db = SessionLocal()
+        try:
+            taken = db.execute(
+                update(SchedulerLock)
+                .where(
+                    SchedulerLock.name == job.name,
+                    or_(SchedulerLock.owner == self.owner, SchedulerLock.expires_at < now),
+                )
+                .values(owner=self.owner, expires_at=expires_at)
+            ).rowcount
+            if not taken:
+                if db.get(SchedulerLock, job.name) is not None:
+                    db.rollback()
+                    return False
+                db.add(SchedulerLock(name=job.name, owner=self.owner, expires_at=expires_at))
+            db.commit()
+            return True
+        except IntegrityError:
+            db.rollback()  # Another instance created the lease first
+            return False
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Job {job.name}: failed to take its lease: {e}")
+            return False
+        finally:
+            db.close()
+
+    def _release_all(self) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(delete(SchedulerLock).where(SchedulerLock.owner == self.owner))
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to release scheduler leases: {e}")
+        finally:
+            db.close()
+
+    # ── Shutdown and status ─────────────────────────────────────────
+
+    async def shutdown(self, grace: float = SHUTDOWN_GRACE_SECONDS) -> None:
+        """
+        Stop the scheduler.
+
+        Waiting jobs are cancelled at once; running ones get *grace*
+        seconds to finish before they are cancelled too. A job running in
+        a thread can't be interrupted: its thread finishes in the
+        background.
+        """
+        self._stopping = True
+        running = []
+        for job in self.jobs.values():
+            if job._task is None:
+                continue
+            if job.running:
+                running.append(job._task)
+            else:
+                job._task.cancel()
+        if running:
+            _, late = await asyncio.wait(running, timeout=grace)
+            for task in late:
+                logger.warning(f"Cancelling {task.get_name()} after the shutdown grace period")
+                task.cancel()
+        tasks = [job._task for job in self.jobs.values() if job._task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            job._task = None
+            job.next_run = None
+        if any(job.single_instance for job in self.jobs.values()):
+            await asyncio.to_thread(self._release_all)
+        logger.info("Scheduler stopped")
+
+    def status(self) -> list[dict]:
+        return [job.status() for job in self.jobs.values()]
+
+
+# The app's scheduler; jobs are registered in main.py
+scheduler = Scheduler()
@@ -8,25 +8,64 @@ returns it to the frontend.
 
 Uses a module-level list with a threading.Lock so that parallel
 tool calls (the Strands agent can dispatch tools concurrently)
-serialise their read-modify-write cycles correctly.
+serialise their read-modify-write cycles correctly. Take it with
+locked() so the wait shows up in the chat turn's trace.
+
+When the chat router binds a user with use_stored_list(), the same calls
+read and write that user's server-side list (services.shopping_list_store)
+instead of the module-level one.
 """
 
 import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from copy import deepcopy
 
+from services import shopping_list_store
+from services.agent_trace import record_span
+
 # Expose the lock so manage_list can hold it across get→modify→set
 lock = threading.Lock()
 _current_list: list[dict] = []
+# User whose stored list get_list()/set_list() work on; inherited by tool threads
+_stored_user: ContextVar[str | None] = ContextVar("shopping_list_user", default=None)
+
+
+@contextmanager
+def locked(holder: str):
+    """Hold the list lock, recording how long *holder* waited for it."""
+    start = time.time_ns()
+    with lock:
+        record_span("shopping_list.lock_wait", "lock", start, time.time_ns(), holder=holder)
+        yield
+
+
+@contextmanager
+def use_stored_list(user_id: str):
+    """Work on *user_id*'s stored list (already loaded) inside the block."""
+    token = _stored_user.set(user_id)
+    try:
+        yield
+    finally:
+        _stored_user.reset(token)
 
 
 def get_list() -> list[dict]:
     """Return a deep copy of the current shopping list."""
+    user_id = _stored_user.get()
+    if user_id is not None:
+        return deepcopy(shopping_list_store.cached(user_id).items)
     return deepcopy(_current_list)
 
 
 def set_list(items: list[dict]) -> None:
     """Replace the current shopping list."""
     global _current_list
+    user_id = _stored_user.get()
+    if user_id is not None:
+        shopping_list_store.replace(user_id, items)
+        return
     _current_list = deepcopy(items)
 
 
@@ -0,0 +1,277 @@
+"""
+Server-side shopping lists with versioned delta sync.
+
+Each user's list is stored in the shopping_lists table and kept in an
+in-memory cache. Every change bumps the list's version and records the
+operations that made it, so a client that knows version N only needs
+the operations after N instead of the whole list:
+
+    {"op": "upsert", "item": {"name": "Milk", "quantity": 2, "price": 3.1}}
+    {"op": "remove", "name": "Bread"}
+    {"op": "clear"}
+
+Clients send their own edits in the same form. Items are matched by
+name (case-insensitive), so operations can be replayed safely: the last
+write to an item wins.
+
+Changes are made to the cached list (manage_list edits it through
+services.shopping_list_context) and written to the database with
+flush(), once per request. The cache and the operation history are
+per process, like the chat sessions; a client whose version is older
+than the history gets the whole list.
+
+With several workers, each caches the lists it serves. load() checks
+the stored version on every request and reloads a list another worker
+has saved since, and flush() only writes over the version the cache was
+loaded from (compare-and-set). If another worker got there first, the
+unsaved operations are replayed on top of its list and the write is
+retried.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from copy import deepcopy
+from dataclasses import dataclass, field
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from exceptions import DatabaseError, NotFoundError, ValidationError
+from models.db_models import ShoppingList, User
+
+logger = logging.getLogger(__name__)
+
+# Versions of operations kept per list for delta sync
+OPS_HISTORY = int(os.getenv("SHOPPING_LIST_OPS_HISTORY", "100"))
+FLUSH_ATTEMPTS = 3          # Writes tried when other workers keep saving the same list
+
+
+@dataclass
+class StoredList:
+    """A user's cached list."""
+
+    items: list[dict]
+    version: int = 0
+    # (version, operations that produced it), oldest first
+    history: deque = field(default_factory=lambda: deque(maxlen=OPS_HISTORY))
+    dirty: bool = False
+    saved_version: int = 0  # Version in the database that the cache was loaded from or saved as
+
+
+_cache: dict[str, StoredList] = {}
+_lock = threading.Lock()
+
+
+def _key(item: dict) -> str:
+    return str(item.get("name", "")).strip().lower()
+
+
+def diff_ops(before: list[dict], after: list[dict]) -> list[dict]:
+    """The operations that turn *before* into *after*."""
+    before_by_name = {_key(item): item for item in before}
+    after_by_name = {_key(item): item for item in after}
+    if not after:
+        return [{"op": "clear"}] if before else []
+    if len(after_by_name) != len(after):
+        # Duplicate names can't be addressed by name; send the whole list
+        return [{"op": "clear"}] + [{"op": "upsert", "item": deepcopy(item)} for item in after]
+    ops = [{"op": "remove", "name": item.get("name", "")} for key, item in before_by_name.items()
+           if key not in after_by_name]
+    ops += [{"op": "upsert", "item": deepcopy(item)} for key, item in after_by_name.items()
+            if before_by_name.get(key) != item]
+    return ops
+
+
+def apply_ops(items: list[dict], ops: list[dict]) -> list[dict]:
+    """
+    A copy of *items* with *ops* applied.
+
+    Raises:
+        ValidationError: An operation is malformed
+    """
+    result = deepcopy(items)
+    for op in ops:
+        kind = op.get("op")
+        if kind == "clear":
+            result.clear()
+        elif kind == "remove":
+            name = str(op.get("name", "")).strip().lower()
+            if not name:
+                raise ValidationError("A remove operation needs an item name")
+            result = [item for item in result if _key(item) != name]
+        elif kind == "upsert":
+            item = op.get("item")
+            if not isinstance(item, dict) or not _key(item):
+                raise ValidationError("An upsert operation needs an item with a name")
+            index = next((i for i, existing in enumerate(result) if _key(existing) == _key(item)), None)
+            if index is None:
+                result.append(deepcopy(item))
+            else:
+                result[index] = deepcopy(item)
+        else:
+            raise ValidationError(f"Unknown list operation '{kind}'. Use 'upsert', 'remove' or 'clear'.")
+    return result
+
+
+async def load(db: AsyncSession, user_id: str) -> StoredList:
+    """
+    The user's list, from the cache or the database.
+
+    A cached list is reloaded if another worker has saved a newer one.
+
+    Raises:
+        NotFoundError: The user does not exist
+        DatabaseError: Database operation failed
+    """
+    stored = _cache.get(user_id)
+    try:
+        if stored is not None:
+            saved = (await db.execute(
+                select(ShoppingList.version).where(ShoppingList.user_id == user_id)
+            )).scalar()
+            if stored.dirty or (saved or 0) == stored.saved_version:
+                return stored
+        row = await db.get(ShoppingList, user_id, populate_existing=True)
+        if (stored is None and row is None
+                and (await db.execute(select(User.user_id).where(User.user_id == user_id))).first() is None):
+            raise NotFoundError(f"User with ID '{user_id}' not found")
+    except NotFoundError:
+        raise
+    except Exception as e:
+        raise DatabaseError(f"Failed to load shopping list: {str(e)}")
+
+    with _lock:
+        # Another request may have loaded it while we waited on the database
+        current = _cache.get(user_id)
+        if current is None or current is stored and not current.dirty:
+            current = _from_row(row)
+            _cache[user_id] = current
+    return current
+
+
+def _from_row(row: ShoppingList | None) -> StoredList:
+    version = row.version if row else 0
+    return StoredList(items=list(row.items) if row else [], version=version, saved_version=version)
+
+
+def cached(user_id: str) -> StoredList:
+    """The user's list, which load() must have put in the cache."""
+    return _cache[user_id]
+
+
+def replace(user_id: str, items: list[dict]) -> StoredList:
+    """Make *items* the user's list, bumping the version if anything changed."""
+    with _lock:
+        stored = _cache[user_id]
+        ops = diff_ops(stored.items, items)
+        if ops:
+            stored.items = deepcopy(items)
+            stored.version += 1
+            stored.history.append((stored.version, ops))
+            stored.dirty = True
+        return stored
+
+
+def apply(user_id: str, ops: list[dict]) -> StoredList:
+    """Apply a client's *ops* to the user's list."""
+    return replace(user_id, apply_ops(cached(user_id).items, ops))
+
+
+def changes_since(user_id: str, version: int) -> list[dict] | None:
+    """
+    The operations from *version* to the current version, or None if
+    they are no longer in the history (or *version* isn't one we gave out).
+    """
+    with _lock:
+        stored = _cache[user_id]
+        if version == stored.version:
+            return []
+        if version > stored.version or not stored.history or stored.history[0][0] > version + 1:
+            return None
+        return [deepcopy(op) for v, ops in stored.history if v > version for op in ops]
+
+
+def sync_state(user_id: str, since: int | None) -> dict:
+    """
+    What a client at version *since* needs: ``{"version", "ops"}`` when the
+    operations are still known, otherwise ``{"version", "items"}``.
+    """
+    ops = changes_since(user_id, since) if since is not None else None
+    stored = cached(user_id)
+    if ops is None:
+        return {"version": stored.version, "items": deepcopy(stored.items)}
+    return {"version": stored.version, "ops": ops}
+
+
+async def _write(db: AsyncSession, user_id: str, items: list[dict], version: int, base: int) -> bool:
+    """Save *items* as *version* if the stored list is still at *base*; False if it isn't."""
+    result = await db.execute(
+        update(ShoppingList)
+        .where(ShoppingList.user_id == user_id, ShoppingList.version == base)
+        .values(items=items, version=version)
+    )
+    if result.rowcount == 0:
+        if base != 0:
+            return False
+        db.add(ShoppingList(user_id=user_id, items=items, version=version))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()  # Another worker saved the first version
+        return False
+    return True
+
+
+async def _rebase(db: AsyncSession, user_id: str, base: int) -> None:
+    """Reload the user's list and replay the operations made since *base* on top of it."""
+    row = await db.get(ShoppingList, user_id, populate_existing=True)
+    with _lock:
+        stored = _cache[user_id]
+        pending = [op for v, ops in stored.history if v > base for op in ops]
+        complete = bool(stored.history) and stored.history[0][0] <= base + 1
+        items = deepcopy(stored.items)
+        _cache[user_id] = _from_row(row)
+    replace(user_id, apply_ops(row.items if row else [], pending) if complete else items)
+
+
+async def flush(db: AsyncSession, user_id: str) -> None:
+    """
+    Write the user's list to the database if it changed.
+
+    If another worker saved the list since it was loaded, the changes
+    made here are replayed on top of that list before writing.
+
+    Raises:
+        DatabaseError: Database operation failed, or the list kept
+            changing under us
+    """
+    for _ in range(FLUSH_ATTEMPTS):
+        with _lock:
+            stored = _cache.get(user_id)
+            if stored is None or not stored.dirty:
+                return
+            items, version, base = deepcopy(stored.items), stored.version, stored.saved_version
+            stored.dirty = False
+
+        try:
+            if await _write(db, user_id, items, version, base):
+                with _lock:
+                    stored.saved_version = max(stored.saved_version, version)
+                return
+            stored.dirty = True
+            logger.info("Shopping list for user %s changed on another worker; replaying local changes", user_id)
+            await _rebase(db, user_id, base)
+        except Exception as e:
+            await db.rollback()
+            stored.dirty = True
+            raise DatabaseError(f"Failed to save shopping list: {str(e)}")
+    raise DatabaseError("Failed to save shopping list: it kept changing on other workers")
+
+
+def evict(user_id: str) -> None:
+    """Drop the user's list from the cache (it is reloaded from the database)."""
+    with _lock:
+        _cache.pop(user_id, None)
@@ -0,0 +1,204 @@
+"""
+Grid spatial index over priced locations (stores or petrol stations).
+
+Buckets points into fixed-size latitude/longitude cells, geohash style.
+Each cell keeps its bounding box and cheapest cost, so whole cells can be
+skipped with a provable lower bound on distance (and cost) before any
+of their points are looked at.
+
+Points are ``(latitude, longitude, cost)`` tuples; query results are
+indices into the original list.
+"""
+
+import numpy as np
+
+from services.route_optimizer import haversine_matrix
+
+# 0.05° ≈ 5.5 km north-south, ≈ 4.6 km east-west around Sydney
+DEFAULT_CELL_DEGREES = 0.05
+
+# Shave lower bounds slightly so floating-point noise never prunes a point
+# that sits exactly on the boundary
+_LOWER_BOUND_SLACK = 1 - 1e-9
+
+
+def _box_lower_bound_km(
+    origin: tuple[float, float],
+    lat_lo: np.ndarray,
+    lat_hi: np.ndarray,
+    lon_lo: np.ndarray,
+    lon_hi: np.ndarray,
+) -> np.ndarray:
+    """
+    Exact great circle distance from *origin* to the nearest point of each cell.
+
+    If the origin's longitude falls inside a cell, the nearest point is
+    straight north or south. Otherwise it lies on the nearer meridian edge,
+    at the latitude where that meridian comes closest to the origin,
+    clamped to the cell.
+    """
+    lat0, lon0 = origin
+    inside_lon = (lon_lo <= lon0) & (lon0 <= lon_hi)
+
+    edge_lon = np.where(lon0 < lon_lo, lon_lo, lon_hi)
+    edge_lon = np.where(inside_lon, lon0, edge_lon)
+
+    dlon = np.radians(edge_lon - lon0)
+    closest_lat = np.degrees(np.arctan(np.tan(np.radians(lat0)) / np.cos(dlon)))
+    target_lat = np.where(inside_lon, lat0, closest_lat)
+    target_lat = np.clip(target_lat, lat_lo, lat_hi)
+
+    targets = np.column_stack((target_lat, edge_lon))
+    return haversine_matrix(np.array([origin]), targets)[0] * _LOWER_BOUND_SLACK
+
+
+class GridIndex:
+    """
+    Fixed-size lat/lon grid over priced locations.
+
+    Build once per store or station list and reuse it across requests.
+    """
+
+    def __init__(self, points: list[tuple], cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.points = np.array([p[:3] for p in points], dtype=float).reshape(-1, 3)
+
+        cell_ij = np.floor(self.points[:, :2] / cell_degrees).astype(np.int64)
+        cells, cell_of_point = np.unique(cell_ij, axis=0, return_inverse=True)
+        cell_of_point = cell_of_point.ravel()
+
+        # Points grouped by cell: cell c owns order[starts[c]:starts[c + 1]]
+        self.order = np.argsort(cell_of_point, kind="stable")
+        counts = np.bincount(cell_of_point, minlength=len(cells))
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+
+        self.lat_lo = cells[:, 0] * cell_degrees
+        self.lat_hi = self.lat_lo + cell_degrees
+        self.lon_lo = cells[:, 1] * cell_degrees
+        self.lon_hi = self.lon_lo + cell_degrees
+
+        self.min_cost = np.full(len(cells), np.inf)
+        np.minimum.at(self.min_cost, cell_of_point, self.points[:, 2])
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def cell_count(self) -> int:
+        return len(self.min_cost)
+
+    @property
+    def cheapest(self) -> float:
+        """Lowest cost of any indexed point (inf when empty)."""
+        return float(self.min_cost.min()) if self.cell_count else float("inf")
+
+    def cell_lower_bounds(self, origin: tuple[float, float]) -> np.ndarray:
+        """Distance in km from *origin* to the nearest point of every cell."""
+        return _box_lower_bound_km(origin, self.lat_lo, self.lat_hi, self.lon_lo, self.lon_hi)
+
+    def _points_in(self, cell_ids: np.ndarray) -> np.ndarray:
+        """Indices of every point in the given cells."""
+        if len(cell_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[self.starts[c]:self.starts[c + 1]] for c in cell_ids])
+
+    def _distances(self, origin: tuple[float, float], idx: np.ndarray) -> np.ndarray:
+        return haversine_matrix(np.array([origin]), self.points[idx, :2])[0]
+
+    def nearest(self, origin: tuple[float, float], k: int) -> np.ndarray:
+        """
+        Indices of the *k* points closest to *origin*, nearest first.
+
+        Visits cells in order of their distance lower bound and stops once
+        the next cell cannot hold anything closer than the current k-th point.
+        """
+        if k <= 0 or len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        bounds = self.cell_lower_bounds(origin)
+        cell_order = np.argsort(bounds, kind="stable")
+
+        found_idx = np.empty(0, dtype=np.int64)
+        found_dist = np.empty(0)
+        pos = 0
+        while pos < len(cell_order):
+            if len(found_idx) >= k and bounds[cell_order[pos]] > found_dist[k - 1]:
+                break
+            # Take every cell tied at this bound in one batch
+            stop = pos + 1
+            while stop < len(cell_order) and bounds[cell_order[stop]] == bounds[cell_order[pos]]:
+                stop += 1
+            idx = self._points_in(cell_order[pos:stop])
+            found_idx = np.concatenate((found_idx, idx))
+            found_dist = np.concatenate((found_dist, self._distances(origin, idx)))
+            keep = np.argsort(found_dist, kind="stable")[:k]
+            found_idx, found_dist = found_idx[keep], found_dist[keep]
+            pos = stop
+
+        return found_idx
+
+    def cheapest_k(self, k: int) -> np.ndarray:
+        """Indices of the *k* lowest-cost points."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        return np.argpartition(self.points[:, 2], k - 1)[:k]
+
+    def within_bound(
+        self,
+        origin: tuple[float, float],
+        max_distance_for_cost,
+        cost_offset: float = 0.0,
+    ) -> np.ndarray:
+        """
+        Indices of points that might still be worth considering.
+
+        A point survives if its distance from *origin* does not exceed
+        ``max_distance_for_cost(point_cost + cost_offset)``. Cells are first
+        checked against their own nearest-point distance and cheapest cost,
+        so most far-away cells are dropped without touching their points.
+
+        Args:
+            origin: Query location as (latitude, longitude)
+            max_distance_for_cost: Vectorized function mapping a lower bound on
+                trip cost to the largest distance that could still be useful
+            cost_offset: Added to each point's cost before the lookup
+
+        Returns:
+            Sorted array of surviving point indices
+        """
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        bounds = self.cell_lower_bounds(origin)
+        cell_ok = bounds <= max_distance_for_cost(self.min_cost + cost_offset)
+        idx = self._points_in(np.flatnonzero(cell_ok))
+        if len(idx) == 0:
+            return idx
+
+        dist = self._distances(origin, idx) * _LOWER_BOUND_SLACK
+        point_ok = dist <= max_distance_for_cost(self.points[idx, 2] + cost_offset)
+        return np.sort(idx[point_ok])
+
+
+def frontier_distance_bound(frontier_cost: np.ndarray, frontier_distance: np.ndarray):
+    """
+    Build the pruning bound for ``GridIndex.within_bound`` from a known frontier.
+
+    For a trip costing at least ``c``, return the shortest distance of any
+    known route costing no more than ``c``. A trip that is provably longer
+    than that is beaten on both axes and can never be on the frontier.
+    Costs below the cheapest known route give ``inf`` (nothing can be pruned).
+
+    Args:
+        frontier_cost: Frontier costs, ascending
+        frontier_distance: Matching distances, descending
+    """
+    def bound(cost_lower_bound):
+        cost_lower_bound = np.asarray(cost_lower_bound, dtype=float)
+        # Known routes no dearer than the bound; the last of them is the shortest
+        pos = np.searchsorted(frontier_cost, cost_lower_bound, side="right")
+        padded = np.concatenate(([np.inf], frontier_distance))
+        return padded[pos]
+
+    return bound
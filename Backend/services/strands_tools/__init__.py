@@ -7,12 +7,13 @@ NSW FuelCheck) without any n8n middleware.
 
 from .fuel_lookup import lookup_fuel_prices
 from .google_places import find_nearby_stores
-from .google_routes import get_directions
+from .google_routes import get_directions, get_route_matrix
 from .list_manager import manage_list
 
 __all__ = [
     "lookup_fuel_prices",
     "find_nearby_stores",
     "get_directions",
+    "get_route_matrix",
     "manage_list",
 ]
@@ -5,6 +5,9 @@ Calls the NSW Government FuelCheck API directly:
   1. Geocodes the user's location to lat/lng via Google Geocoding API
   2. Authenticates with the NSW FuelCheck OAuth endpoint
   3. Fetches nearby fuel prices sorted by price (ascending)
+
+Geocodes and price lookups go through services.tool_cache, so repeated
+lookups (and ones services.prefetch already made) don't call out again.
 """
 
 import os
@@ -16,8 +19,16 @@ from datetime import datetime
 import httpx
 from strands import tool
 
+from metrics import track_external
+from services import fuel_price_cycle, fuel_price_history, geo_profile
+from services.tool_cache import cached_call, normalise_key
+
 logger = logging.getLogger(__name__)
 
+# ── Endpoints (overridable so tests and benchmarks can use a stub) ───
+GEOCODE_URL = os.getenv("GOOGLE_GEOCODE_URL", "https://maps.googleapis.com/maps/api/geocode/json")
+NSW_FUEL_API_BASE_URL = os.getenv("NSW_FUEL_API_BASE_URL", "https://api.onegov.nsw.gov.au")
+
 # ── Lazy-loaded env vars ─────────────────────────────────────────────
 _NSW_FUEL_API_KEY: str | None = None
 _NSW_FUEL_AUTH_BASIC: str | None = None
@@ -57,18 +68,29 @@ def _clean_location(loc: str) -> str:
 
 # ── Helpers ──────────────────────────────────────────────────────────
 
-def _geocode(address: str) -> tuple[float, float] | None:
+def geocode(address: str, prefetch: bool = False) -> tuple[float, float] | None:
+    """Convert an address string to (latitude, longitude), cached."""
+    home = geo_profile.home_coordinates(address)
+    if home is not None:
+        return home
+    return cached_call(
+        "geocode", normalise_key(address), lambda: _fetch_geocode(address),
+        prefetch=prefetch, cacheable=lambda coords: coords is not None,
+    )
+
+
+def _fetch_geocode(address: str) -> tuple[float, float] | None:
     """Convert an address string to (latitude, longitude) via Google Geocoding."""
     api_key = _get_google_key()
     if not api_key:
         logger.warning("No GOOGLE_PLACES_API_KEY — cannot geocode for fuel lookup")
         return None
 
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    url = GEOCODE_URL
     params = {"address": address, "key": api_key}
 
     try:
-        with httpx.Client(timeout=10) as client:
+        with track_external("google_geocode"), httpx.Client(timeout=10) as client:
             resp = client.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
@@ -92,12 +114,12 @@ def _get_access_token() -> str | None:
         logger.error("NSW_FUEL_AUTH_BASIC not configured")
         return None
 
-    url = "https://api.onegov.nsw.gov.au/oauth/client_credential/accesstoken"
+    url = f"{NSW_FUEL_API_BASE_URL}/oauth/client_credential/accesstoken"
     headers = {"Authorization": auth_basic}
     params = {"grant_type": "client_credentials"}
 
     try:
-        with httpx.Client(timeout=10) as client:
+        with track_external("nsw_fuel_auth"), httpx.Client(timeout=10) as client:
             resp = client.get(url, headers=headers, params=params)
             resp.raise_for_status()
             return resp.json().get("access_token")
@@ -136,14 +158,34 @@ def lookup_fuel_prices(location: str, fuel_type: str = "unleaded") -> dict:
     Returns:
         dict with nearby fuel stations and their current prices, sorted
         cheapest first, including station name, address, distance (km),
-        price (cents/litre), and last-updated timestamp.
+        price (cents/litre), and last-updated timestamp. When there is enough
+        price history, "price_cycle" says whether the area's prices are near
+        the bottom of their cycle (advice "fill_up_now") or have just been
+        hiked or are still falling (advice "wait"), with a summary to relay.
     """
+    result = fuel_prices(location, fuel_type)
+    cycle = fuel_price_cycle.for_stations(result.get("fuel_type", ""), result.get("stations", []))
+    if cycle is not None:
+        result = {**result, "price_cycle": cycle}
+    return result
+
+
+def fuel_prices(location: str, fuel_type: str = "unleaded", prefetch: bool = False) -> dict:
+    """lookup_fuel_prices, callable outside the agent (e.g. to prefetch); cached."""
     location = _clean_location(location)
     code = FUEL_TYPE_MAP.get(fuel_type.lower(), "U91")
+    return cached_call(
+        "fuel_prices", f"{code}:{normalise_key(location)}", lambda: _fetch_fuel_prices(location, code),
+        prefetch=prefetch, cacheable=lambda result: "error" not in result,
+    )
+
+
+def _fetch_fuel_prices(location: str, code: str) -> dict:
+    """Geocode *location* and fetch the cheapest *code* prices near it."""
     logger.info(f"Looking up {code} fuel prices near: {location}")
 
     # 1. Geocode
-    coords = _geocode(location)
+    coords = geocode(location)
     if coords is None:
         return {"error": f"Could not geocode location: {location}"}
     lat, lng = coords
@@ -155,7 +197,7 @@ def lookup_fuel_prices(location: str, fuel_type: str = "unleaded") -> dict:
         return {"error": "Failed to authenticate with NSW Fuel API"}
 
     # 3. Fetch nearby prices
-    url = "https://api.onegov.nsw.gov.au/FuelPriceCheck/v2/fuel/prices/nearby"
+    url = f"{NSW_FUEL_API_BASE_URL}/FuelPriceCheck/v2/fuel/prices/nearby"
     now = datetime.now().strftime("%d/%m/%Y %I:%M:%S %p")
     headers = {
         "Authorization": f"Bearer {token}",
@@ -174,7 +216,7 @@ def lookup_fuel_prices(location: str, fuel_type: str = "unleaded") -> dict:
     }
 
     try:
-        with httpx.Client(timeout=15) as client:
+        with track_external("nsw_fuel_prices"), httpx.Client(timeout=15) as client:
             resp = client.post(url, headers=headers, json=body)
             resp.raise_for_status()
             data = resp.json()
@@ -188,6 +230,7 @@ def lookup_fuel_prices(location: str, fuel_type: str = "unleaded") -> dict:
             stn = station_map.get(p.get("stationcode"), {})
             loc_info = stn.get("location", {})
             results.append({
+                "station_code": stn.get("code"),
                 "name": stn.get("name", "Unknown"),
                 "brand": stn.get("brand", ""),
                 "address": stn.get("address", ""),
@@ -200,6 +243,7 @@ def lookup_fuel_prices(location: str, fuel_type: str = "unleaded") -> dict:
             })
 
         logger.info(f"Found {len(results)} {code} stations near ({lat}, {lng})")
+        fuel_price_history.record(code, results)
 
         cheapest = results[0] if results else None
         summary = ""
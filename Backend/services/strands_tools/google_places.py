@@ -2,7 +2,7 @@
 Strands tool: Find nearby Coles/grocery stores via Google Places API (new).
 
 Calls https://places.googleapis.com/v1/places:searchText directly,
-eliminating the n8n middleware hop.
+eliminating the n8n middleware hop. Results go through services.tool_cache.
 """
 
 import os
@@ -13,8 +13,15 @@ import logging
 
 from strands import tool
 
+from metrics import track_external
+from services import geo_profile
+from services.tool_cache import cached_call, normalise_key
+
 logger = logging.getLogger(__name__)
 
+# Overridable so tests and benchmarks can point at a local stub
+PLACES_SEARCH_URL = os.getenv("GOOGLE_PLACES_URL", "https://places.googleapis.com/v1/places:searchText")
+
 _API_KEY = None  # Lazy-loaded from env
 
 
@@ -46,15 +53,32 @@ def find_nearby_stores(location: str, store_type: str = "Coles") -> dict:
     Returns:
         dict with nearby stores including name, address, latitude, and longitude.
     """
+    return nearby_stores(location, store_type)
+
+
+def nearby_stores(location: str, store_type: str = "Coles", prefetch: bool = False) -> dict:
+    """find_nearby_stores, callable outside the agent (e.g. to prefetch); cached."""
+    location = _clean_location(location)
+    home_stores = geo_profile.home_stores(location, store_type)
+    if home_stores is not None:
+        return {"nearby_stores": home_stores}
+    return cached_call(
+        "nearby_stores", f"{normalise_key(store_type)}:{normalise_key(location)}",
+        lambda: _fetch_nearby_stores(location, store_type),
+        prefetch=prefetch, cacheable=lambda result: "error" not in result,
+    )
+
+
+def _fetch_nearby_stores(location: str, store_type: str) -> dict:
+    """Search Google Places for *store_type* stores near *location*."""
     api_key = _get_api_key()
     if not api_key:
         return {"error": "GOOGLE_PLACES_API_KEY not configured"}
 
-    location = _clean_location(location)
     query = f"{store_type} supermarket near {location}"
     logger.info(f"Google Places search: {query}")
 
-    url = "https://places.googleapis.com/v1/places:searchText"
+    url = PLACES_SEARCH_URL
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": api_key,
@@ -66,7 +90,7 @@ def find_nearby_stores(location: str, store_type: str = "Coles") -> dict:
     }
 
     try:
-        with httpx.Client(timeout=15) as client:
+        with track_external("google_places"), httpx.Client(timeout=15) as client:
             resp = client.post(url, headers=headers, json=body)
             resp.raise_for_status()
             data = resp.json()
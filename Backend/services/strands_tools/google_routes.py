@@ -2,47 +2,31 @@
 Strands tool: Directions & travel time via Google Routes API.
 
 Calls https://routes.googleapis.com/directions/v2:computeRoutes directly,
-eliminating the n8n middleware hop.
+eliminating the n8n middleware hop. get_route_matrix costs many
+origins × destinations in one computeRouteMatrix request.
 """
 
 import os
-import re
-import json
 import httpx
 import logging
 
 from strands import tool
 
-logger = logging.getLogger(__name__)
-
-_API_KEY = None  # Lazy-loaded from env
-
-
-def _get_api_key() -> str:
-    global _API_KEY
-    if _API_KEY is None:
-        _API_KEY = os.getenv("GOOGLE_ROUTES_API_KEY", "")
-    return _API_KEY
+from metrics import track_external
 
+from services import geo_profile
+from services.route_matrix_service import (
+    clean_location as _clean_location,
+    compute_route_matrix,
+    format_distance,
+    format_duration as _format_duration,
+    get_api_key,
+    normalise_travel_mode,
+)
 
-def _clean_location(loc: str) -> str:
-    """Strip [USER_HOME_ADDRESS=...] wrapper if the agent passed the tag verbatim."""
-    m = re.search(r"\[USER_HOME_ADDRESS=(.+?)\]", loc)
-    return m.group(1).strip() if m else loc
-
+logger = logging.getLogger(__name__)
 
-def _format_duration(seconds: int) -> str:
-    """Convert seconds to a human-readable duration string."""
-    if seconds < 60:
-        return f"{seconds} seconds"
-    mins = seconds // 60
-    if mins < 60:
-        return f"{mins} minute{'s' if mins != 1 else ''}"
-    hours = mins // 60
-    remaining_mins = mins % 60
-    if remaining_mins:
-        return f"{hours} hour{'s' if hours != 1 else ''} {remaining_mins} min"
-    return f"{hours} hour{'s' if hours != 1 else ''}"
+COMPUTE_ROUTES_URL = os.getenv("GOOGLE_ROUTES_URL", "https://routes.googleapis.com/directions/v2:computeRoutes")
 
 
 @tool
@@ -64,21 +48,23 @@ def get_directions(start_location: str, end_location: str, travel_mode: str = "D
         dict with route details: distance (metres and text), duration (seconds and text),
         travel mode, and a human-readable summary.
     """
-    api_key = _get_api_key()
-    if not api_key:
-        return {"error": "GOOGLE_ROUTES_API_KEY not configured"}
-
     start_location = _clean_location(start_location)
     end_location = _clean_location(end_location)
 
-    # Normalise travel mode
-    mode = travel_mode.upper().replace("WALKING", "WALK").replace("BUS", "TRANSIT").replace("PUBLIC_TRANSPORT", "TRANSIT")
-    if mode not in ("DRIVE", "WALK", "TRANSIT", "TWO_WHEELER", "BICYCLE"):
-        mode = "DRIVE"
+    mode = normalise_travel_mode(travel_mode)
+
+    # From the user's home to a store or station in their geo profile
+    home_route = geo_profile.home_route(start_location, end_location, mode)
+    if home_route is not None:
+        return _route_result(start_location, end_location, mode, **home_route)
+
+    api_key = get_api_key()
+    if not api_key:
+        return {"error": "GOOGLE_ROUTES_API_KEY not configured"}
 
     logger.info(f"Google Routes: {start_location} -> {end_location} ({mode})")
 
-    url = "https://routes.googleapis.com/directions/v2:computeRoutes"
+    url = COMPUTE_ROUTES_URL
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": api_key,
@@ -95,7 +81,7 @@ def get_directions(start_location: str, end_location: str, travel_mode: str = "D
         body.pop("routingPreference", None)
 
     try:
-        with httpx.Client(timeout=15) as client:
+        with track_external("google_routes"), httpx.Client(timeout=15) as client:
             resp = client.post(url, headers=headers, json=body)
             resp.raise_for_status()
             data = resp.json()
@@ -114,27 +100,8 @@ def get_directions(start_location: str, end_location: str, travel_mode: str = "D
         duration_str = route.get("duration", "0s")  # e.g. "542s"
         duration_secs = int(duration_str.rstrip("s")) if duration_str.endswith("s") else 0
 
-        # Human-readable distance
-        if distance_m >= 1000:
-            dist_text = f"{distance_m / 1000:.1f} km"
-        else:
-            dist_text = f"{distance_m} m"
-
-        result = {
-            "start": start_location,
-            "end": end_location,
-            "travel_mode": mode,
-            "distance_metres": distance_m,
-            "distance_text": dist_text,
-            "duration_seconds": duration_secs,
-            "duration_text": _format_duration(duration_secs),
-            "summary": (
-                f"Route from {start_location} to {end_location} by {mode.lower()}: "
-                f"~{dist_text}, ~{_format_duration(duration_secs)}."
-            ),
-        }
-
-        logger.info(f"Route: {dist_text}, {_format_duration(duration_secs)}")
+        result = _route_result(start_location, end_location, mode, distance_m, duration_secs)
+        logger.info(f"Route: {result['distance_text']}, {result['duration_text']}")
         return result
 
     except httpx.HTTPStatusError as e:
@@ -143,3 +110,50 @@ def get_directions(start_location: str, end_location: str, travel_mode: str = "D
     except Exception as e:
         logger.error(f"Google Routes lookup failed: {e}")
         return {"error": str(e)}
+
+
+def _route_result(start_location: str, end_location: str, mode: str, distance_metres: int, duration_seconds: int) -> dict:
+    dist_text = format_distance(distance_metres)
+    return {
+        "start": start_location,
+        "end": end_location,
+        "travel_mode": mode,
+        "distance_metres": distance_metres,
+        "distance_text": dist_text,
+        "duration_seconds": duration_seconds,
+        "duration_text": _format_duration(duration_seconds),
+        "summary": (
+            f"Route from {start_location} to {end_location} by {mode.lower()}: "
+            f"~{dist_text}, ~{_format_duration(duration_seconds)}."
+        ),
+    }
+
+
+@tool
+def get_route_matrix(origins: list[str], destinations: list[str], travel_mode: str = "DRIVE") -> dict:
+    """Get distance and travel time from every origin to every destination in one call.
+
+    Use this tool instead of calling get_directions repeatedly when comparing
+    several stores or fuel stations, e.g. "which of these stores is closest
+    to my home?". Results are cached per origin/destination pair.
+
+    Args:
+        origins: Starting addresses or "lat,lng" strings (e.g. ["30 Campbell St, Parramatta NSW 2150"]).
+        destinations: Destination addresses or "lat,lng" strings.
+        travel_mode: One of "DRIVE", "WALK", "TRANSIT", "TWO_WHEELER", "BICYCLE". Defaults to "DRIVE".
+
+    Returns:
+        dict with "rows": one list per origin of cells (distance and duration in
+        metres/seconds and text) in destination order. Cells with source
+        "estimate" are straight-line estimates used when Google is unavailable.
+    """
+    if not origins or not destinations:
+        return {"error": "At least one origin and one destination are required"}
+
+    result = compute_route_matrix(origins, destinations, travel_mode)
+    logger.info(
+        f"Route matrix: {len(result['origins'])}×{len(result['destinations'])}, "
+        f"{result['cache_hits']} cached, {result['upstream_elements']} fetched, "
+        f"{result['estimated_cells']} estimated"
+    )
+    return result
@@ -13,7 +13,7 @@ import logging
 from datetime import datetime, timedelta
 from strands import tool
 
-from services.shopping_list_context import get_list, set_list, lock
+from services.shopping_list_context import get_list, set_list, locked
 
 logger = logging.getLogger(__name__)
 
@@ -74,9 +74,8 @@ def _is_good_buy(item_name: str, current_price: float) -> bool:
             avg_price = sum(r.price for r in rows) / len(rows)
             is_good = current_price <= avg_price
             logger.info(
-                f"Price trend for '{item_name}' (→{hist_name}): "
-                f"${current_price:.2f} vs 7-day avg ${avg_price:.2f} → "
-                f"{'GOOD BUY' if is_good else 'above avg'}"
+                "Price trend for %r (→%s): $%.2f vs 7-day avg $%.2f → %s",
+                item_name, hist_name, current_price, avg_price, "GOOD BUY" if is_good else "above avg",
             )
             return is_good
         finally:
@@ -109,13 +108,106 @@ def _record_price(item_name: str, price: float) -> None:
             )
             db.add(record)
             db.commit()
-            logger.info(f"Recorded price ${price:.2f} for '{hist_name}'")
+            logger.info("Recorded price $%.2f for %r", price, hist_name)
         finally:
             db.close()
     except Exception as e:
         logger.warning(f"Failed to record price: {e}")
 
 
+# ── List actions ───────────────────────────────────────────────────────
+
+def apply_list_action(working_list: list[dict], action: str, item_name: str,
+                      quantity: int = 1, price: float = 0) -> str:
+    """
+    Apply one manage_list action to *working_list* in place.
+
+    Shared by the manage_list tool and the chat fast path
+    (services.intent_parser), so both edit lists the same way.
+
+    Returns:
+        A summary message describing what changed.
+    """
+    if action == "add":
+        # Check if item already exists (case-insensitive)
+        existing_idx = next(
+            (i for i, item in enumerate(working_list)
+             if item.get("name", "").lower() == item_name.lower()),
+            None
+        )
+
+        # Check price trend for gamification
+        good_buy = _is_good_buy(item_name, price) if price > 0 else False
+
+        if existing_idx is not None:
+            working_list[existing_idx]["quantity"] = (
+                working_list[existing_idx].get("quantity", 1) + quantity
+            )
+            if price > 0:
+                working_list[existing_idx]["price"] = price
+            if good_buy:
+                working_list[existing_idx]["isGoodBuy"] = True
+            message = f"Updated {item_name} quantity to {working_list[existing_idx]['quantity']}"
+        else:
+            item_entry = {"name": item_name, "quantity": quantity}
+            if price > 0:
+                item_entry["price"] = price
+            if good_buy:
+                item_entry["isGoodBuy"] = True
+            working_list.append(item_entry)
+            message = f"Added {quantity}x {item_name} to the list"
+
+        # Record price for future trend data
+        if price > 0:
+            _record_price(item_name, price)
+
+        if good_buy:
+            message += " 🌟 Great price — this item is at a low point!"
+
+        logger.info(message)
+
+    elif action == "remove":
+        original_len = len(working_list)
+        working_list[:] = [
+            item for item in working_list
+            if item.get("name", "").lower() != item_name.lower()
+        ]
+
+        if len(working_list) < original_len:
+            message = f"Removed {item_name} from the list"
+        else:
+            message = f"{item_name} was not found on the list"
+
+        logger.info(message)
+
+    elif action == "update":
+        existing_idx = next(
+            (i for i, item in enumerate(working_list)
+             if item.get("name", "").lower() == item_name.lower()),
+            None
+        )
+
+        if existing_idx is not None:
+            working_list[existing_idx]["quantity"] = quantity
+            message = f"Updated {item_name} quantity to {quantity}"
+        else:
+            message = f"{item_name} was not found on the list. Use 'add' to add it first."
+
+        logger.info(message)
+
+    elif action == "clear":
+        count = len(working_list)
+        working_list.clear()
+        message = f"Cleared {count} items from the list"
+        logger.info(message)
+
+    else:
+        message = f"Unknown action '{action}'. Use 'add', 'remove', 'update' or 'clear'."
+        logger.warning(message)
+
+    return message
+
+
 # ── Tool ───────────────────────────────────────────────────────────────
 
 @tool
@@ -123,11 +215,12 @@ def manage_list(action: str, item_name: str, quantity: int = 1, price: float = 0
     """Add, remove, or update items on the user's shopping list.
 
     Use this tool when the user wants to modify their shopping list,
-    such as adding new items, removing items, or changing quantities.
+    such as adding new items, removing items, changing quantities or
+    clearing the whole list.
 
     Args:
-        action: The action to perform. One of: "add", "remove", "update".
-        item_name: The name of the grocery item (e.g. "Milk (1L)", "Bread").
+        action: The action to perform. One of: "add", "remove", "update", "clear".
+        item_name: The name of the grocery item (e.g. "Milk (1L)", "Bread"). Ignored for "clear".
         quantity: The quantity for the item. Defaults to 1. For "update", this sets the new quantity.
         price: The unit price for the item in AUD (e.g. 3.50). Include this when you know the price from a lookup.
 
@@ -137,84 +230,14 @@ def manage_list(action: str, item_name: str, quantity: int = 1, price: float = 0
     # Hold the lock for the entire read→modify→write so parallel
     # tool calls (Strands dispatches tools concurrently) don't
     # clobber each other.
-    with lock:
+    with locked(f"manage_list.{action}"):
         working_list = get_list()
-
-        if action == "add":
-            # Check if item already exists (case-insensitive)
-            existing_idx = next(
-                (i for i, item in enumerate(working_list)
-                 if item.get("name", "").lower() == item_name.lower()),
-                None
-            )
-
-            # Check price trend for gamification
-            good_buy = _is_good_buy(item_name, price) if price > 0 else False
-
-            if existing_idx is not None:
-                working_list[existing_idx]["quantity"] = (
-                    working_list[existing_idx].get("quantity", 1) + quantity
-                )
-                if price > 0:
-                    working_list[existing_idx]["price"] = price
-                if good_buy:
-                    working_list[existing_idx]["isGoodBuy"] = True
-                message = f"Updated {item_name} quantity to {working_list[existing_idx]['quantity']}"
-            else:
-                item_entry = {"name": item_name, "quantity": quantity}
-                if price > 0:
-                    item_entry["price"] = price
-                if good_buy:
-                    item_entry["isGoodBuy"] = True
-                working_list.append(item_entry)
-                message = f"Added {quantity}x {item_name} to the list"
-
-            # Record price for future trend data
-            if price > 0:
-                _record_price(item_name, price)
-
-            if good_buy:
-                message += " 🌟 Great price — this item is at a low point!"
-
-            logger.info(message)
-
-        elif action == "remove":
-            original_len = len(working_list)
-            working_list = [
-                item for item in working_list
-                if item.get("name", "").lower() != item_name.lower()
-            ]
-
-            if len(working_list) < original_len:
-                message = f"Removed {item_name} from the list"
-            else:
-                message = f"{item_name} was not found on the list"
-
-            logger.info(message)
-
-        elif action == "update":
-            existing_idx = next(
-                (i for i, item in enumerate(working_list)
-                 if item.get("name", "").lower() == item_name.lower()),
-                None
-            )
-
-            if existing_idx is not None:
-                working_list[existing_idx]["quantity"] = quantity
-                message = f"Updated {item_name} quantity to {quantity}"
-            else:
-                message = f"{item_name} was not found on the list. Use 'add' to add it first."
-
-            logger.info(message)
-
-        else:
-            message = f"Unknown action '{action}'. Use 'add', 'remove', or 'update'."
-            logger.warning(message)
+        message = apply_list_action(working_list, action, item_name, quantity, price)
 
         # Write the updated list back so the router can read it
         set_list(working_list)
 
-        logger.info(f"Shopping list now has {len(working_list)} items")
+        logger.info("Shopping list now has %d items", len(working_list))
 
     return {
         "updated_list": working_list,
@@ -0,0 +1,151 @@
+"""
+Shared cache for the agent's location tools.
+
+Geocodes, nearby-store searches and fuel prices for an address don't
+change within a conversation, and services.prefetch fetches them before
+the agent asks. Results are cached per (cache name, key) with a TTL.
+Concurrent calls for the same key share one upstream request: a tool
+call that arrives while a prefetch is still in flight waits for it
+instead of starting its own.
+
+Lookups are counted in tool_cache_lookups_total (hit, joined, miss), and
+prefetched entries in prefetch_*_total, so the hit rate shows how many
+prefetches the agent actually used. Lookups made while fetching a
+prefetch (fuel prices geocode their location) are prefetches too, not
+tool calls.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from metrics import PREFETCH_REQUESTS, PREFETCH_USED, PREFETCH_WASTED, TOOL_CACHE_LOOKUPS
+
+# Seconds an entry stays fresh, per cache
+TTL_SECONDS = {
+    "geocode": 24 * 60 * 60,      # Addresses don't move
+    "nearby_stores": 60 * 60,
+    "fuel_prices": 10 * 60,       # Stations update prices through the day
+}
+DEFAULT_TTL_SECONDS = 10 * 60
+MAX_ENTRIES = 5_000
+
+
+@dataclass
+class _Entry:
+    future: Future
+    created: float
+    prefetched: bool
+    used: bool = False
+
+
+# Maps (cache, key) -> _Entry
+_entries: Dict[tuple, _Entry] = {}
+_lock = threading.Lock()
+# True while this thread is fetching a prefetch
+_prefetching: ContextVar[bool] = ContextVar("prefetching", default=False)
+
+
+def normalise_key(text: str) -> str:
+    """Cache key for an address or query: case and whitespace don't matter."""
+    return " ".join(text.lower().split())
+
+
+def _drop(key: tuple, entry: _Entry) -> None:
+    """Remove *entry* (lock held), counting it as wasted if nobody used its prefetch."""
+    if _entries.get(key) is entry:
+        del _entries[key]
+        if entry.prefetched and not entry.used:
+            PREFETCH_WASTED.inc(cache=key[0])
+
+
+def _prune(now: float) -> None:
+    """Drop stale entries, then the oldest ones if the cache is still full (lock held)."""
+    for key, entry in list(_entries.items()):
+        if now - entry.created > TTL_SECONDS.get(key[0], DEFAULT_TTL_SECONDS):
+            _drop(key, entry)
+    overflow = len(_entries) - MAX_ENTRIES
+    if overflow > 0:
+        for key in sorted(_entries, key=lambda k: _entries[k].created)[:overflow]:
+            _drop(key, _entries[key])
+
+
+def cached_call(
+    cache: str,
+    key: str,
+    fetch: Callable[[], Any],
+    prefetch: bool = False,
+    cacheable: Callable[[Any], bool] = lambda result: True,
+) -> Any:
+    """
+    Return the cached result for (*cache*, *key*), calling *fetch* on a miss.
+
+    Args:
+        cache: Cache name ("geocode", "nearby_stores", "fuel_prices")
+        key: Normalised lookup key
+        fetch: Does the upstream call
+        prefetch: The call is a speculative prefetch, not a tool call
+            (always, when made from inside a prefetch's *fetch*)
+        cacheable: Results it rejects (errors) are returned but not kept
+    """
+    prefetch = prefetch or _prefetching.get()
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get((cache, key))
+        if entry is not None and now - entry.created > TTL_SECONDS.get(cache, DEFAULT_TTL_SECONDS):
+            _drop((cache, key), entry)
+            entry = None
+
+        if entry is not None:
+            if not prefetch:
+                TOOL_CACHE_LOOKUPS.inc(cache=cache, outcome="hit" if entry.future.done() else "joined")
+                if entry.prefetched and not entry.used:
+                    PREFETCH_USED.inc(cache=cache)
+                entry.used = True
+            owner = False
+        else:
+            if len(_entries) >= MAX_ENTRIES:
+                _prune(now)
+            entry = _Entry(future=Future(), created=now, prefetched=prefetch)
+            _entries[(cache, key)] = entry
+            if prefetch:
+                PREFETCH_REQUESTS.inc(cache=cache)
+            else:
+                TOOL_CACHE_LOOKUPS.inc(cache=cache, outcome="miss")
+            owner = True
+
+    if not owner:
+        return entry.future.result()
+
+    token = _prefetching.set(prefetch)
+    try:
+        result = fetch()
+    except BaseException as e:
+        with _lock:
+            _drop((cache, key), entry)
+        entry.future.set_exception(e)
+        raise
+    finally:
+        _prefetching.reset(token)
+    if not cacheable(result):
+        with _lock:
+            _drop((cache, key), entry)
+    entry.future.set_result(result)
+    return result
+
+
+def prune() -> int:
+    """Drop stale entries (a scheduled job); returns how many entries are left."""
+    with _lock:
+        _prune(time.monotonic())
+        return len(_entries)
+
+
+def clear() -> None:
+    """Empty the cache."""
+    with _lock:
+        for key, entry in list(_entries.items()):
+            _drop(key, entry)
@@ -5,14 +5,14 @@ Handles transport cost comparison with n8n integration for petrol station data.
 """
 
 import os
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.schemas import PetrolStation
 from services.user_service import get_user_by_id, NotFoundError
 from services.n8n_service import call_n8n_webhook, ServiceUnavailableError
 
 
 async def compare_transport_costs(
-    db: Session,
+    db: AsyncSession,
     user_id: str,
     destination: str,
     fuel_amount_needed: float
@@ -31,7 +31,7 @@ async def compare_transport_costs(
     4. Sort by total_cost ascending
 
     Args:
-        db: Database session
+        db: Async database session
         user_id: User identifier
         destination: Destination address (for context)
         fuel_amount_needed: Liters of fuel needed
@@ -0,0 +1,214 @@
+"""
+Multi-stop trip planner for splitting a shopping list across stores.
+
+Picks which stores (and optionally which petrol station) to visit, and in
+what order, so that item cost + fuel purchase + travel cost is lowest.
+Each item is bought at the cheapest visited store that stocks it.
+
+Uses Held–Karp dynamic programming over subsets of stops:
+  - ``dp[mask][j]`` is the shortest path from the origin that visits
+    exactly the stops in ``mask`` and ends at stop ``j``.
+  - The cheapest price of every item for every subset is memoized the same
+    way, one bit at a time.
+Every subset is then scored in one vectorized pass. Work grows as
+O(2^n · n^2), so the number of candidate stops is capped.
+"""
+
+import numpy as np
+
+from exceptions import ValidationError
+from services.route_optimizer import haversine_matrix
+
+# 2^10 subsets plans in well under 100 ms; beyond that latency grows fast
+MAX_PLANNER_STOPS = 10
+
+# 8 L/100 km at 160 c/L, the same assumptions the chat agent uses
+DEFAULT_COST_PER_KM = 8 / 100 * 1.60
+
+
+def _subset_minimum(rows: np.ndarray) -> np.ndarray:
+    """
+    Elementwise minimum of ``rows`` for every subset of rows.
+
+    Result row ``mask`` is the minimum over the rows whose bits are set in
+    ``mask`` (``inf`` for the empty set). Built one bit at a time: subsets
+    containing bit ``b`` are the subsets without it, combined with row ``b``.
+    """
+    n = rows.shape[0]
+    result = np.full((1 << n,) + rows.shape[1:], np.inf)
+    for b in range(n):
+        size = 1 << b
+        result[size:2 * size] = np.minimum(result[:size], rows[b])
+    return result
+
+
+def _held_karp(dist: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Shortest open paths from node 0 through every subset of nodes 1..n.
+
+    Args:
+        dist: (n + 1, n + 1) distance matrix, node 0 is the origin
+        n: Number of stops
+
+    Returns:
+        (dp, parent) where ``dp[mask, j]`` is the shortest path visiting
+        ``mask`` and ending at stop ``j`` and ``parent[mask, j]`` is the
+        stop visited just before ``j`` (-1 for the first stop)
+    """
+    stop_dist = dist[1:, 1:]
+    dp = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int64)
+    for j in range(n):
+        dp[1 << j, j] = dist[0, j + 1]
+
+    for mask in range(1, 1 << n):
+        row = dp[mask]
+        # Best way to arrive at each stop j from any stop already in mask
+        via = row[:, None] + stop_dist
+        best_prev = np.argmin(via, axis=0)
+        arrive = via[best_prev, np.arange(n)]
+        for j in range(n):
+            if mask & (1 << j):
+                continue
+            nxt = mask | (1 << j)
+            if arrive[j] < dp[nxt, j]:
+                dp[nxt, j] = arrive[j]
+                parent[nxt, j] = best_prev[j]
+
+    return dp, parent
+
+
+def _reconstruct(parent: np.ndarray, mask: int, last: int) -> list[int]:
+    """Walk parent pointers back from (mask, last) to get the visiting order."""
+    order = []
+    while last != -1:
+        order.append(last)
+        prev = int(parent[mask, last])
+        mask &= ~(1 << last)
+        last = prev
+    return order[::-1]
+
+
+def plan_trip(
+    origin: tuple[float, float],
+    items: list[str],
+    stores: list[dict],
+    stations: list[dict] | None = None,
+    fuel_litres: float = 0.0,
+    cost_per_km: float = DEFAULT_COST_PER_KM,
+    return_home: bool = True,
+    distance_matrix: np.ndarray | None = None,
+) -> dict:
+    """
+    Choose stops and visiting order for the cheapest overall shopping trip.
+
+    Args:
+        origin: Trip start as (latitude, longitude)
+        items: Item names that must all be bought
+        stores: Dicts with ``name``, ``latitude``, ``longitude`` and
+            ``prices`` (item name -> price; missing items aren't stocked)
+        stations: Dicts with ``name``, ``latitude``, ``longitude`` and
+            ``price_per_litre``; only used when *fuel_litres* > 0
+        fuel_litres: Litres of fuel to buy at exactly one station (0 = no fuel stop)
+        cost_per_km: Travel cost in dollars per kilometre
+        return_home: Include the drive back to the origin
+        distance_matrix: Optional (n + 1, n + 1) road distances in km with the
+            origin first, then stores, then stations. Defaults to haversine.
+
+    Returns:
+        Dictionary describing the chosen stops in order, the item
+        assignment and the cost breakdown
+
+    Raises:
+        ValidationError: Too many stops, an item no store stocks, or fuel
+            requested with no stations
+    """
+    stations = list(stations or []) if fuel_litres > 0 else []
+    stops = list(stores) + list(stations)
+    n = len(stops)
+
+    if not items and fuel_litres <= 0:
+        raise ValidationError("Nothing to plan: add items or fuel to the trip")
+    if fuel_litres > 0 and not stations:
+        raise ValidationError("Fuel requested but no petrol stations were given")
+    if n > MAX_PLANNER_STOPS:
+        raise ValidationError(
+            f"Trip planner supports at most {MAX_PLANNER_STOPS} candidate stops, got {n}"
+        )
+
+    unstocked = [item for item in items if not any(item in s.get("prices", {}) for s in stores)]
+    if unstocked:
+        raise ValidationError(f"No store stocks: {', '.join(unstocked)}")
+
+    # Item prices per stop (stations stock nothing)
+    prices = np.full((n, len(items)), np.inf)
+    for s, store in enumerate(stores):
+        for i, item in enumerate(items):
+            if item in store.get("prices", {}):
+                prices[s, i] = store["prices"][item]
+
+    # Fuel purchase cost per stop (stores sell no fuel)
+    fuel = np.full(n, np.inf)
+    for k, station in enumerate(stations):
+        fuel[len(stores) + k] = station["price_per_litre"] * fuel_litres
+
+    if distance_matrix is None:
+        points = np.array([origin] + [(s["latitude"], s["longitude"]) for s in stops], dtype=float)
+        distance_matrix = haversine_matrix(points, points)
+    # Station rows/columns come last, so this also drops them when there's no fuel stop
+    dist = np.asarray(distance_matrix, dtype=float)[:n + 1, :n + 1]
+
+    dp, parent = _held_karp(dist, n)
+
+    # Memoized cheapest price of each item, and cheapest fuel, for every subset
+    best_prices = _subset_minimum(prices)
+    item_cost = best_prices.sum(axis=1) if items else np.zeros(1 << n)
+    fuel_cost = _subset_minimum(fuel[:, None])[:, 0] if fuel_litres > 0 else np.zeros(1 << n)
+
+    back_home = dist[1:, 0] if return_home else np.zeros(n)
+    tours = dp + back_home[None, :]
+    last_stop = np.argmin(tours, axis=1)
+    tour_km = tours[np.arange(1 << n), last_stop]
+    tour_km[0] = 0.0  # The empty trip has no path; it is ruled out below
+
+    total = item_cost + fuel_cost + tour_km * cost_per_km
+    total[0] = np.inf  # Must visit somewhere
+    best_mask = int(np.argmin(total))
+
+    order = _reconstruct(parent, best_mask, int(last_stop[best_mask]))
+    visited_stores = [s for s in order if s < len(stores)]
+
+    # Buy each item at the cheapest visited store
+    purchases = {s: [] for s in order}
+    spend = {s: 0.0 for s in order}
+    for i, item in enumerate(items):
+        s = visited_stores[int(np.argmin(prices[visited_stores, i]))]
+        purchases[s].append(item)
+        spend[s] += float(prices[s, i])
+    if fuel_litres > 0:
+        station_stops = [s for s in order if s >= len(stores)]
+        s = station_stops[int(np.argmin(fuel[station_stops]))]
+        spend[s] += float(fuel[s])
+
+    planned_stops = []
+    for s in order:
+        stop = stops[s]
+        planned_stops.append({
+            "name": stop["name"],
+            "kind": "store" if s < len(stores) else "station",
+            "latitude": stop["latitude"],
+            "longitude": stop["longitude"],
+            "items": purchases[s],
+            "spend": round(spend[s], 2),
+        })
+
+    travel_km = float(tour_km[best_mask])
+    return {
+        "stops": planned_stops,
+        "item_cost": round(float(item_cost[best_mask]), 2),
+        "fuel_cost": round(float(fuel_cost[best_mask]), 2),
+        "travel_distance_km": round(travel_km, 2),
+        "travel_cost": round(travel_km * cost_per_km, 2),
+        "total_cost": round(float(total[best_mask]), 2),
+        "subsets_evaluated": (1 << n) - 1,
+    }
@@ -5,14 +5,15 @@ Handles user creation, retrieval, and validation.
 """
 
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, OperationalError
 from models.db_models import User
 from exceptions import ValidationError, NotFoundError, DatabaseError
 
 
 async def create_user(
-    db: Session,
+    db: AsyncSession,
     name: str,
     weekly_budget: float,
     home_address: str
@@ -23,7 +24,7 @@ async def create_user(
     Validates input, creates User record in database.
 
     Args:
-        db: Database session
+        db: Async database session
         name: Non-empty string
         weekly_budget: Positive number
         home_address: Non-empty string
@@ -59,23 +60,23 @@ async def create_user(
     try:
         # Persist to database
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise DatabaseError(f"Failed to create user: {str(e)}")
     except OperationalError as e:
-        db.rollback()
+        await db.rollback()
         raise DatabaseError(f"Database operation failed: {str(e)}")
 
 
-async def get_user_by_id(db: Session, user_id: str) -> User:
+async def get_user_by_id(db: AsyncSession, user_id: str) -> User:
     """
     Retrieve user by ID.
 
     Args:
-        db: Database session
+        db: Async database session
         user_id: User identifier
 
     Returns:
@@ -86,7 +87,8 @@ async def get_user_by_id(db: Session, user_id: str) -> User:
         DatabaseError: Database operation failed
     """
     try:
-        user = db.query(User).filter(User.user_id == user_id).first()
+        result = await db.execute(select(User).where(User.user_id == user_id))
+        user = result.scalars().first()
         
         if user is None:
             raise NotFoundError(f"User with ID {user_id} not found")
@@ -5,14 +5,15 @@ Handles weekly plan creation, score calculation, and persistence.
 """
 
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, OperationalError
 from models.db_models import User, WeeklyPlan
 from exceptions import ValidationError, NotFoundError, DatabaseError
 
 
 async def record_weekly_plan(
-    db: Session,
+    db: AsyncSession,
     user_id: str,
     optimal_cost: float,
     actual_cost: float
@@ -27,7 +28,7 @@ async def record_weekly_plan(
     4. Persist to database
 
     Args:
-        db: Database session
+        db: Async database session
         user_id: User identifier
         optimal_cost: Optimal cost from grocery optimization
         actual_cost: Amount user actually spent
@@ -49,7 +50,8 @@ async def record_weekly_plan(
     
     # Fetch user to get weekly_budget
     try:
-        user = db.query(User).filter(User.user_id == user_id).first()
+        result = await db.execute(select(User).where(User.user_id == user_id))
+        user = result.scalars().first()
         
         if user is None:
             raise NotFoundError(f"User with ID {user_id} not found")
@@ -76,12 +78,12 @@ async def record_weekly_plan(
     try:
         # Persist to database
         db.add(weekly_plan)
-        db.commit()
-        db.refresh(weekly_plan)
+        await db.commit()
+        await db.refresh(weekly_plan)
         return weekly_plan
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise DatabaseError(f"Failed to create weekly plan: {str(e)}")
     except OperationalError as e:
-        db.rollback()
+        await db.rollback()
         raise DatabaseError(f"Database operation failed: {str(e)}")
@@ -0,0 +1,9 @@
+"""
+Local stand-ins for the backend's upstream services.
+
+Used by benchmarks and tests so the API can be exercised end to end
+without network access or API keys:
+  - upstreams: n8n, Google Places/Routes/Geocoding and NSW FuelCheck over HTTP
+  - mcp_server: Coles/Woolworths product search over MCP (create_mcp_server)
+  - fake_bedrock: a scripted model the Strands agent can run against
+"""
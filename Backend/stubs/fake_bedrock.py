@@ -0,0 +1,216 @@
+"""
+Scripted stand-in for the Bedrock model.
+
+Implements the Strands model interface without calling AWS, replaying a
+recorded conversation. A recording is a list of turns; each turn is a list
+of steps, where a step is either a set of tool calls (the agent runs them
+and calls the model again) or the final reply text:
+
+    {"turns": [{"user": "...", "steps": [
+        {"tool_calls": [{"name": "get_coles_products", "input": {"query": "milk"}}]},
+        {"text": "Milk is $3.10 at Coles."}
+    ]}]}
+
+The turn is picked from how many user messages the conversation has had
+(wrapping round), and the step from how many tool rounds the turn has
+already had. Recordings live in stubs/recordings/; capture new ones from a
+real session with recording_from_messages(agent.messages).
+
+Structured output is parsed from the step the same way: the input of a
+tool call named after the requested model, or the reply text as JSON.
+
+The agent uses this model when BEDROCK_MODEL_ID starts with "fake" (see
+services.agent._get_model); FAKE_BEDROCK_RECORDING picks the recording and
+FAKE_BEDROCK_LATENCY_MS adds a delay to every model call.
+
+Token usage is estimated at four characters per token. With a
+``cache_config`` set (as for Bedrock), the system prompt and tool specs are
+reported like Bedrock prompt caching does: written to the cache on the
+first call with a given prefix, read from it afterwards (the cache is
+shared by all fake models, as Bedrock's is by all sessions), and left out
+of ``inputTokens``.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterable
+
+from strands.models.model import Model
+
+RECORDINGS_DIR = Path(__file__).with_name("recordings")
+DEFAULT_RECORDING = RECORDINGS_DIR / "grocery_and_fuel.json"
+
+# Prompt prefixes "in the cache", shared like Bedrock's prompt cache
+_prompt_cache: set[int] = set()
+
+
+def load_recording(path: str | Path) -> dict:
+    """Read a recording by path, or by name from stubs/recordings/."""
+    path = Path(path)
+    if not path.exists():
+        path = RECORDINGS_DIR / f"{path.stem}.json"
+    return json.loads(path.read_text())
+
+
+def _is_tool_result(message: dict) -> bool:
+    return any("toolResult" in block for block in message.get("content", []))
+
+
+def recording_from_messages(messages: list, description: str = "") -> dict:
+    """
+    Turn an agent's message history into a recording.
+
+    Tool results are dropped: on replay they are produced by running the
+    tools again.
+    """
+    turns = []
+    for message in messages:
+        content = message.get("content", [])
+        if message.get("role") == "user":
+            if not _is_tool_result(message):
+                text = " ".join(block["text"] for block in content if "text" in block)
+                turns.append({"user": text, "steps": []})
+            continue
+        if not turns:
+            continue
+        calls = [
+            {"name": block["toolUse"]["name"], "input": block["toolUse"]["input"]}
+            for block in content if "toolUse" in block
+        ]
+        if calls:
+            turns[-1]["steps"].append({"tool_calls": calls})
+        else:
+            text = "".join(block["text"] for block in content if "text" in block)
+            turns[-1]["steps"].append({"text": text})
+    return {"description": description, "turns": turns}
+
+
+def _position(messages: list) -> tuple[int, int]:
+    """(turn index, tool rounds already taken in this turn)."""
+    turns = sum(1 for m in messages if m.get("role") == "user" and not _is_tool_result(m))
+    rounds = 0
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        if not _is_tool_result(message):
+            break
+        rounds += 1
+    return max(turns - 1, 0), rounds
+
+
+class FakeBedrockModel(Model):
+    """
+    Model that replays a recording instead of calling Bedrock.
+
+    Args:
+        recording: Recording dict (default: stubs/recordings/grocery_and_fuel.json)
+        latency_ms: Delay before every response; a step's own
+            ``latency_ms`` overrides it
+        model_id: Reported in the config, e.g. to tell model tiers apart
+    """
+
+    def __init__(self, recording: dict | None = None, latency_ms: float = 0.0, model_id: str = "fake-bedrock"):
+        self.config = {
+            "model_id": model_id,
+            "recording": recording or load_recording(DEFAULT_RECORDING),
+            "latency_ms": latency_ms,
+        }
+        self.calls = 0
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> dict:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """
+        Parse the scripted step for *prompt* into *output_model*: the input
+        of a tool call named after the model (as Bedrock answers), or else
+        the step's text as JSON.
+        """
+        self.calls += 1
+        step = self.next_step(prompt)
+        data = next(
+            (call["input"] for call in step.get("tool_calls", []) if call["name"] == output_model.__name__),
+            None,
+        )
+        if data is None:
+            if "text" not in step:
+                raise ValueError(f"Recorded step has no {output_model.__name__} tool call or text to parse")
+            data = json.loads(step["text"])
+        yield {"output": output_model.model_validate(data)}
+
+    def next_step(self, messages: list) -> dict:
+        """The recorded step that answers *messages*."""
+        turns = self.config["recording"]["turns"]
+        turn, rounds = _position(messages)
+        steps = turns[turn % len(turns)]["steps"]
+        return steps[min(rounds, len(steps) - 1)]
+
+    async def stream(
+        self,
+        messages,
+        tool_specs=None,
+        system_prompt=None,
+        **kwargs: Any,
+    ) -> AsyncIterable[dict]:
+        self.calls += 1
+        step = self.next_step(messages)
+        latency_ms = step.get("latency_ms", self.config["latency_ms"])
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        usage = self._usage(messages, tool_specs, system_prompt)
+        yield {"messageStart": {"role": "assistant"}}
+        if "tool_calls" in step:
+            for call in step["tool_calls"]:
+                yield {"contentBlockStart": {"start": {"toolUse": {
+                    "name": call["name"], "toolUseId": f"tooluse_{uuid.uuid4().hex[:12]}",
+                }}}}
+                yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(call["input"])}}}}
+                yield {"contentBlockStop": {}}
+            stop_reason, usage["outputTokens"] = "tool_use", 20 * len(step["tool_calls"])
+        else:
+            yield {"contentBlockStart": {"start": {}}}
+            yield {"contentBlockDelta": {"delta": {"text": step["text"]}}}
+            yield {"contentBlockStop": {}}
+            stop_reason, usage["outputTokens"] = "end_turn", len(step["text"]) // 4
+        yield {"messageStop": {"stopReason": stop_reason}}
+        usage["totalTokens"] = sum(usage.values())
+        yield {"metadata": {"usage": usage, "metrics": {"latencyMs": int(latency_ms)}}}
+
+    def _usage(self, messages, tool_specs, system_prompt) -> dict:
+        """Input token counts, split into uncached and prompt-cache read/write."""
+        system = len(system_prompt or "") // 4
+        tools = len(json.dumps(tool_specs or [])) // 4
+        usage = {"inputTokens": len(json.dumps(messages)) // 4 + system + tools, "outputTokens": 0}
+
+        cache_config = self.config.get("cache_config")
+        if cache_config:
+            cached, prefix = 0, []
+            if cache_config.system_prompt_ttl:
+                cached += system
+                prefix.append(system_prompt)
+            if cache_config.tools_ttl:
+                cached += tools
+                prefix.append(json.dumps(tool_specs, sort_keys=True))
+            key = hash(tuple(prefix))
+            kind = "cacheReadInputTokens" if key in _prompt_cache else "cacheWriteInputTokens"
+            _prompt_cache.add(key)
+            usage["inputTokens"] -= cached
+            usage[kind] = cached
+        return usage
+
+
+def create_fake_model(model_id: str = "fake-bedrock") -> FakeBedrockModel:
+    """Fake model configured from FAKE_BEDROCK_RECORDING and FAKE_BEDROCK_LATENCY_MS."""
+    recording = os.getenv("FAKE_BEDROCK_RECORDING")
+    return FakeBedrockModel(
+        recording=load_recording(recording) if recording else None,
+        latency_ms=float(os.getenv("FAKE_BEDROCK_LATENCY_MS", "0")),
+        model_id=model_id,
+    )
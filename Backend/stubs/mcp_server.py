@@ -0,0 +1,107 @@
+"""
+Local grocery MCP server with a canned catalogue.
+
+Offers the same tools as the remote Coles MCP (get_coles_products and
+get_woolworths_products) over streamable HTTP, answering from a fixed
+catalogue so chat runs are repeatable and need no network. Point the
+backend at it with COLES_MCP_URL:
+
+    python -m stubs.mcp_server --port 8765 --latency-ms 150
+    COLES_MCP_URL=http://127.0.0.1:8765/mcp uvicorn main:app
+"""
+
+import argparse
+import asyncio
+
+# search term -> (product name, Coles price, Woolworths price, unit)
+CATALOGUE = {
+    "milk": [
+        ("Full Cream Milk 2L", 3.10, 3.10, "2L"),
+        ("Dairy Farmers Full Cream Milk 2L", 4.65, 4.80, "2L"),
+        ("Lite Milk 2L", 3.10, 3.10, "2L"),
+    ],
+    "bread": [
+        ("Wholemeal Bread", 2.60, 2.70, "700g"),
+        ("Helga's Mixed Grain Bread", 5.00, 5.20, "750g"),
+    ],
+    "eggs": [
+        ("Free Range Eggs 12pk", 6.50, 6.60, "700g"),
+        ("Cage Free Eggs 12pk", 5.20, 5.30, "600g"),
+    ],
+    "chicken": [
+        ("RSPCA Chicken Breast Fillets", 12.99, 13.50, "1kg"),
+        ("Chicken Thigh Fillets", 14.00, 13.80, "1kg"),
+    ],
+    "rice": [("SunRice Long Grain White Rice", 4.50, 4.50, "1kg"), ("Basmati Rice", 5.00, 4.90, "1kg")],
+    "pasta": [("Spaghetti No.5", 1.50, 1.55, "500g"), ("San Remo Penne", 2.20, 2.20, "500g")],
+    "bananas": [("Cavendish Bananas", 4.00, 3.90, "1kg")],
+    "apples": [("Pink Lady Apples", 5.50, 5.90, "1kg")],
+    "cheese": [("Tasty Cheese Block", 8.50, 8.50, "500g"), ("Fetta Cheese", 5.00, 5.20, "200g")],
+    "butter": [("Western Star Butter", 6.20, 6.20, "500g")],
+    "yoghurt": [("Greek Yoghurt", 5.50, 5.50, "1kg")],
+    "oats": [("Rolled Oats", 2.40, 2.40, "1kg")],
+    "coffee": [("Moccona Classic Instant Coffee", 11.00, 11.50, "200g")],
+    "tomatoes": [("Truss Tomatoes", 6.90, 6.50, "1kg")],
+    "potatoes": [("Brushed Potatoes", 3.50, 3.70, "2kg")],
+    "onions": [("Brown Onions", 3.00, 3.00, "1kg")],
+}
+
+
+def search_catalogue(query: str, store: str, limit: int = 10) -> dict:
+    """Products whose search term matches any word of *query*."""
+    column = 1 if store == "Coles" else 2
+    products = []
+    for word in query.lower().split():
+        for term, items in CATALOGUE.items():
+            if term.startswith(word.rstrip("s")) or word.startswith(term.rstrip("s")):
+                products.extend(
+                    {"name": f"{store} {item[0]}" if column == 1 else item[0], "price": item[column], "unit": item[3]}
+                    for item in items
+                )
+    return {"store": store, "query": query, "products": products[:limit]}
+
+
+def create_mcp_server(latency_ms: float = 0.0):
+    """
+    Build the MCP server.
+
+    Args:
+        latency_ms: Delay added to every tool call, standing in for the
+            remote MCP and supermarket API
+    """
+    from mcp.server.fastmcp import FastMCP
+
+    mcp = FastMCP("stub-grocery", stateless_http=True, json_response=True, log_level="WARNING")
+
+    @mcp.tool()
+    async def get_coles_products(query: str, store_id: str = "0584") -> dict:
+        """Search Coles products by name. Returns product names, prices and units."""
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return search_catalogue(query, "Coles")
+
+    @mcp.tool()
+    async def get_woolworths_products(query: str, limit: int = 10) -> dict:
+        """Search Woolworths products by name. Returns product names, prices and units."""
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return search_catalogue(query, "Woolworths", limit)
+
+    return mcp
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per tool call")
+    args = parser.parse_args()
+
+    print(f"Grocery MCP stub on http://{args.host}:{args.port}/mcp")
+    uvicorn.run(create_mcp_server(args.latency_ms).streamable_http_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Stub HTTP upstreams with canned responses.
+
+One FastAPI app answers the n8n webhook, Google Places / Routes / Route
+Matrix / Geocoding and the NSW FuelCheck OAuth and price endpoints under
+path prefixes. The grocery MCP server from stubs.mcp_server runs next to
+it. Both run in background threads via uvicorn:
+
+    with StubUpstreams(latency_ms=20) as stubs:
+        os.environ.update(stubs.env())
+        ...  # import the app and send requests
+
+``latency_ms`` is added to every stubbed response to stand in for
+network and upstream time.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from stubs.mcp_server import create_mcp_server
+
+# Around UNSW Kensington, the demo user's home
+HOME = (-33.9173, 151.2313)
+
+STATIONS = [
+    {"code": 101, "name": "7-Eleven Kensington", "brand": "7-Eleven",
+     "address": "456 Anzac Parade, Kensington NSW 2033", "lat": -33.9105, "lng": 151.2240, "distance": 1.1, "price": 174.9},
+    {"code": 102, "name": "Ampol Randwick", "brand": "Ampol",
+     "address": "789 Alison Rd, Randwick NSW 2031", "lat": -33.9140, "lng": 151.2420, "distance": 1.6, "price": 179.9},
+    {"code": 103, "name": "Shell Kingsford", "brand": "Shell",
+     "address": "12 Gardeners Rd, Kingsford NSW 2032", "lat": -33.9240, "lng": 151.2270, "distance": 0.9, "price": 182.5},
+]
+
+STORES = [
+    {"name": "Coles Kensington", "address": "120 Anzac Parade, Kensington NSW 2033", "lat": -33.9110, "lng": 151.2250},
+    {"name": "Woolworths Randwick", "address": "73 Belmore Rd, Randwick NSW 2031", "lat": -33.9145, "lng": 151.2417},
+    {"name": "Coles Maroubra", "address": "Pacific Square, Maroubra NSW 2035", "lat": -33.9500, "lng": 151.2430},
+]
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    """Build the stub upstream app."""
+    app = FastAPI(title="Stub upstreams")
+
+    @app.middleware("http")
+    async def add_latency(request: Request, call_next):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return await call_next(request)
+
+    # ── n8n ────────────────────────────────────────────────────────
+    @app.post("/n8n/webhook/{path:path}")
+    async def n8n_webhook(path: str, request: Request):
+        payload = await request.json()
+        litres = float(payload.get("fuel_amount_needed") or 40)
+        return {
+            "stations": [
+                {
+                    "station_name": s["name"],
+                    "address": s["address"],
+                    "distance_from_home": s["distance"],
+                    "price_per_liter": round(s["price"] / 100, 3),
+                    "cost_to_reach_station": round(s["distance"] * 2 * 0.08 * s["price"] / 100, 2),
+                    "fuel_cost_at_station": round(litres * s["price"] / 100, 2),
+                }
+                for s in STATIONS
+            ]
+        }
+
+    # ── Google ─────────────────────────────────────────────────────
+    @app.post("/google/places:searchText")
+    async def places_search(request: Request):
+        body = await request.json()
+        brand = body.get("textQuery", "").split()[0].lower()
+        stores = [s for s in STORES if s["name"].lower().startswith(brand)] or STORES
+        return {
+            "places": [
+                {
+                    "displayName": {"text": s["name"]},
+                    "formattedAddress": s["address"],
+                    "location": {"latitude": s["lat"], "longitude": s["lng"]},
+                }
+                for s in stores[: body.get("maxResultCount", 5)]
+            ]
+        }
+
+    @app.post("/google/directions/v2:computeRoutes")
+    async def compute_routes(request: Request):
+        body = await request.json()
+        seconds = {"WALK": 1500, "TRANSIT": 900, "BICYCLE": 600}.get(body.get("travelMode"), 420)
+        return {"routes": [{"distanceMeters": 2300, "duration": f"{seconds}s"}]}
+
+    @app.post("/google/distanceMatrix/v2:computeRouteMatrix")
+    async def compute_route_matrix(request: Request):
+        body = await request.json()
+        return [
+            {
+                "originIndex": i,
+                "destinationIndex": j,
+                "condition": "ROUTE_EXISTS",
+                "distanceMeters": 1500 + 400 * j + 250 * i,
+                "duration": f"{240 + 60 * j + 30 * i}s",
+            }
+            for i in range(len(body.get("origins", [])))
+            for j in range(len(body.get("destinations", [])))
+        ]
+
+    @app.get("/google/geocode/json")
+    async def geocode(address: str = ""):
+        return {"results": [{"geometry": {"location": {"lat": HOME[0], "lng": HOME[1]}}}], "status": "OK"}
+
+    # ── NSW FuelCheck ──────────────────────────────────────────────
+    @app.get("/nsw/oauth/client_credential/accesstoken")
+    async def fuel_token():
+        return {"access_token": "stub-token", "expires_in": "43199"}
+
+    @app.post("/nsw/FuelPriceCheck/v2/fuel/prices/nearby")
+    async def fuel_prices(request: Request):
+        body = await request.json()
+        return {
+            "stations": [
+                {
+                    "code": s["code"], "name": s["name"], "brand": s["brand"], "address": s["address"],
+                    "location": {"latitude": s["lat"], "longitude": s["lng"], "distance": s["distance"]},
+                }
+                for s in STATIONS
+            ],
+            "prices": [
+                {"stationcode": s["code"], "fueltype": body.get("fueltype", "U91"),
+                 "price": s["price"], "lastupdated": "18/10/2026 08:00:00"}
+                for s in sorted(STATIONS, key=lambda s: s["price"])
+            ],
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _ThreadedServer:
+    """Run an ASGI app with uvicorn in a daemon thread."""
+
+    def __init__(self, app, port: int | None = None):
+        self.port = port or _free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Stub server on port {self.port} failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class StubUpstreams:
+    """The stub HTTP upstreams and MCP server, started together."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.http = _ThreadedServer(create_app(latency_ms))
+        self.mcp = _ThreadedServer(create_mcp_server(latency_ms).streamable_http_app())
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.http.port}"
+
+    def env(self) -> dict[str, str]:
+        """Environment variables that point the backend at the stubs."""
+        base = self.base_url
+        return {
+            "N8N_MAIN_WEBHOOK_URL": f"{base}/n8n/webhook/chat",
+            "GOOGLE_PLACES_URL": f"{base}/google/places:searchText",
+            "GOOGLE_ROUTES_URL": f"{base}/google/directions/v2:computeRoutes",
+            "GOOGLE_ROUTE_MATRIX_URL": f"{base}/google/distanceMatrix/v2:computeRouteMatrix",
+            "GOOGLE_GEOCODE_URL": f"{base}/google/geocode/json",
+            "NSW_FUEL_API_BASE_URL": f"{base}/nsw",
+            "GOOGLE_PLACES_API_KEY": "stub-key",
+            "GOOGLE_ROUTES_API_KEY": "stub-key",
+            "NSW_FUEL_API_KEY": "stub-key",
+            "NSW_FUEL_AUTH_BASIC": "Basic c3R1YjpzdHVi",
+            "COLES_MCP_URL": f"http://127.0.0.1:{self.mcp.port}/mcp",
+        }
+
+    def start(self) -> "StubUpstreams":
+        self.http.start()
+        self.mcp.start()
+        return self
+
+    def stop(self) -> None:
+        self.http.stop()
+        self.mcp.stop()
+
+    def __enter__(self) -> "StubUpstreams":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,330 @@
+"""
+Synthetic large-scale data for load and scaling tests.
+
+seed_data.py creates a couple of dozen users and a few hundred price rows,
+which is too small for slow queries to show up. This module generates
+production-sized tables (millions of HistoricalPriceData and WeeklyPlan
+rows, 100k+ users) deterministically from a seed, and streams them into
+the database in fixed-size batches so memory stays flat.
+
+Usage:
+    python synthetic_data.py --scale medium --database-url sqlite:///./synthetic.db
+    python synthetic_data.py --scale large --seed 7 --database-url postgresql://...
+    python synthetic_data.py --users 5000 --plans-per-user 4 --items 20 --days 60
+
+The same scales back the ``synthetic_db`` pytest fixtures (see
+tests/conftest.py), selected with ``--synthetic-scale``.
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from sqlalchemy import create_engine, event, func, inspect, select
+from sqlalchemy.engine import Engine
+
+from database import Base
+from models.db_models import HistoricalPriceData, User, WeeklyPlan
+
+DEFAULT_SEED = 42
+DEFAULT_BATCH_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Table sizes for one synthetic dataset."""
+    users: int
+    plans_per_user: int
+    items: int
+    days: int
+    stores: tuple[str, ...] = ("Coles", "Woolworths", "Aldi")
+
+    @property
+    def weekly_plans(self) -> int:
+        return self.users * self.plans_per_user
+
+    @property
+    def price_rows(self) -> int:
+        return self.items * self.days * len(self.stores)
+
+
+SCALES = {
+    # Fast enough for the regular test run
+    "small": Scale(users=1_000, plans_per_user=5, items=20, days=60),
+    # A large deployment after a term of use
+    "medium": Scale(users=20_000, plans_per_user=10, items=200, days=180),
+    # 100k users, 2M weekly plans, ~1.1M price rows
+    "large": Scale(users=100_000, plans_per_user=20, items=1_000, days=365),
+}
+
+# The demo items come first so services can be queried with familiar names
+BASE_ITEMS = {
+    "Milk (1L)": 5.00,
+    "Bread (Loaf)": 4.80,
+    "Eggs (Dozen)": 7.00,
+    "Chicken Breast (1kg)": 14.00,
+    "Rice (1kg)": 5.00,
+    "Bananas (1kg)": 3.90,
+    "Pasta (500g)": 2.20,
+    "Cheese (500g)": 8.50,
+    "Apples (1kg)": 5.50,
+    "Butter (250g)": 4.20,
+}
+
+FIRST_NAMES = [
+    "Alice", "Bob", "Charlie", "Diana", "Evan", "Fiona", "George", "Hannah", "Isaac", "Julia",
+    "Kevin", "Lily", "Marcus", "Nina", "Oliver", "Priya", "Quinn", "Rachel", "Sam", "Tina",
+]
+LAST_NAMES = [
+    "Chen", "Martinez", "Wong", "Patel", "Lee", "Smith", "Kim", "Brown", "Nguyen", "Garcia",
+    "O'Brien", "Zhang", "Johnson", "Wilson", "Singh", "Taylor", "Anderson", "Rodriguez",
+]
+SUBURBS = [
+    "Kensington NSW 2052", "Camperdown NSW 2006", "Broadway NSW 2007", "North Ryde NSW 2109",
+    "Parramatta NSW 2150", "Ultimo NSW 2007", "North Sydney NSW 2060", "Wollongong NSW 2522",
+    "Callaghan NSW 2308", "Randwick NSW 2031", "Newtown NSW 2042", "Bondi NSW 2026",
+]
+
+
+def user_id(index: int) -> str:
+    return f"syn_user_{index:07d}"
+
+
+def item_catalogue(count: int) -> list[tuple[str, float]]:
+    """The first *count* item names with a base price each."""
+    items = list(BASE_ITEMS.items())[:count]
+    rng = random.Random(f"items-{count}")
+    for n in range(len(items), count):
+        items.append((f"Item {n:05d}", round(rng.uniform(1.0, 25.0), 2)))
+    return items
+
+
+def _batched(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _budgets(scale: Scale, seed: int) -> list[float]:
+    rng = random.Random(f"{seed}-budgets")
+    return [float(rng.randrange(80, 405, 5)) for _ in range(scale.users)]
+
+
+def generate_users(scale: Scale, seed: int, now: datetime) -> Iterator[dict]:
+    rng = random.Random(f"{seed}-users")
+    for i, budget in enumerate(_budgets(scale, seed)):
+        yield {
+            "user_id": user_id(i),
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "weekly_budget": budget,
+            "home_address": f"{rng.randint(1, 400)} Synthetic St, {rng.choice(SUBURBS)}",
+            "created_at": now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86_399)),
+        }
+
+
+def generate_weekly_plans(scale: Scale, seed: int, now: datetime) -> Iterator[dict]:
+    """One plan per user per week, going back plans_per_user weeks."""
+    rng = random.Random(f"{seed}-plans")
+    for i, budget in enumerate(_budgets(scale, seed)):
+        uid = user_id(i)
+        # Some users are consistently better at shopping than others
+        skill = rng.uniform(0.55, 1.05)
+        for week in range(scale.plans_per_user):
+            actual = round(budget * min(1.2, skill * rng.uniform(0.9, 1.1)), 2)
+            optimal = round(actual * rng.uniform(0.6, 0.95), 2)
+            yield {
+                "user_id": uid,
+                "optimal_cost": optimal,
+                "actual_cost": actual,
+                "optimization_score": (budget - actual) / budget,
+                "created_at": now - timedelta(weeks=week, hours=rng.randint(0, 72)),
+            }
+
+
+def generate_prices(scale: Scale, seed: int, now: datetime) -> Iterator[dict]:
+    """A daily price per item per store, ±10% around the item's base price."""
+    rng = random.Random(f"{seed}-prices")
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=scale.days - 1)
+    for item_name, base_price in item_catalogue(scale.items):
+        for day in range(scale.days):
+            date = start + timedelta(days=day)
+            for store in scale.stores:
+                yield {
+                    "item_name": item_name,
+                    "price": max(0.50, round(base_price * (1 + rng.uniform(-0.10, 0.10)), 2)),
+                    "store_name": store,
+                    "recorded_date": date + timedelta(hours=rng.randint(8, 18)),
+                }
+
+
+# Fuel price regions and the day of their first price hike (None: prices
+# wander without a cycle)
+FUEL_REGIONS = (
+    ("sydney", 0),
+    ("newcastle", 12),
+    ("wollongong", 20),
+    ("nsw_280x", None),
+)
+
+
+def generate_fuel_prices(
+    stations: int,
+    days: int,
+    seed: int,
+    now: datetime,
+    cycle_days: int = 35,
+    hike_cents: float = 25.0,
+    fuel_type: str = "U91",
+) -> Iterator[dict]:
+    """
+    Fuel price change points for *stations* stations over *days* days.
+
+    Stations are spread over FUEL_REGIONS. In a cycling region every
+    station's price jumps by *hike_cents* every *cycle_days* days and
+    then falls back a little each day; each station sits a fixed amount
+    above or below the regional price. A row is produced only when a
+    station's price changes, as services.fuel_price_history stores them.
+    """
+    rng = random.Random(f"{seed}-fuel")
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    for code in range(stations):
+        region, first_hike = FUEL_REGIONS[code % len(FUEL_REGIONS)]
+        offset = rng.uniform(-5, 5)
+        wander = 0.0
+        last = None
+        for day in range(days):
+            if first_hike is None:
+                wander = max(-6.0, min(6.0, wander + rng.uniform(-1, 1)))
+                price = 185 + offset + wander
+            else:
+                into_cycle = (day - first_hike) % cycle_days
+                price = 170 + offset + hike_cents * (1 - into_cycle / cycle_days)
+            price = round(price, 1)
+            if price != last:
+                yield {
+                    "station_code": str(1000 + code),
+                    "fuel_type": fuel_type,
+                    "region": region,
+                    "price": price,
+                    "recorded_at": start + timedelta(days=day, hours=rng.randint(6, 20)),
+                }
+                last = price
+
+
+def create_load_engine(database_url: str) -> Engine:
+    """
+    Engine for bulk loading.
+
+    For SQLite, fsync and the rollback journal are switched off: a crash
+    mid-load only loses data that can be regenerated.
+    """
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _pragmas(dbapi_conn, connection_record):
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+            cursor.close()
+    return engine
+
+
+def populate(
+    engine: Engine,
+    scale: Scale,
+    seed: int = DEFAULT_SEED,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    now: datetime | None = None,
+    progress: bool = False,
+) -> dict[str, int]:
+    """
+    Create the tables and stream a synthetic dataset into them.
+
+    Each batch is one executemany committed on its own, so memory use
+    doesn't grow with the dataset. The same seed, scale and *now* always
+    produce the same rows.
+
+    Args:
+        engine: Target database (tables are created if missing)
+        scale: Table sizes
+        seed: Random seed
+        batch_size: Rows per insert
+        now: Reference time the generated dates lead up to (default: utcnow)
+        progress: Print rows/s per table
+
+    Returns:
+        Rows inserted per table
+    """
+    now = now or datetime.utcnow()
+    Base.metadata.create_all(bind=engine)
+
+    tables = [
+        (User.__table__, generate_users(scale, seed, now)),
+        (WeeklyPlan.__table__, generate_weekly_plans(scale, seed, now)),
+        (HistoricalPriceData.__table__, generate_prices(scale, seed, now)),
+    ]
+    counts = {}
+    for table, rows in tables:
+        start = time.perf_counter()
+        inserted = 0
+        with engine.connect() as conn:
+            for batch in _batched(rows, batch_size):
+                conn.execute(table.insert(), batch)
+                conn.commit()
+                inserted += len(batch)
+        counts[table.name] = inserted
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"✓ {table.name}: {inserted:,} rows in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/s)")
+    return counts
+
+
+def table_counts(engine: Engine) -> dict[str, int]:
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.scalar(select(func.count()).select_from(model))
+            for model in (User, WeeklyPlan, HistoricalPriceData)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./synthetic.db", help="Target database (default: ./synthetic.db)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Preset sizes (default: small)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--users", type=int, help="Override the preset user count")
+    parser.add_argument("--plans-per-user", type=int, help="Override weekly plans per user")
+    parser.add_argument("--items", type=int, help="Override the number of grocery items")
+    parser.add_argument("--days", type=int, help="Override days of price history")
+    args = parser.parse_args()
+
+    overrides = {
+        field: getattr(args, field)
+        for field in ("users", "plans_per_user", "items", "days")
+        if getattr(args, field) is not None
+    }
+    scale = replace(SCALES[args.scale], **overrides)
+
+    engine = create_load_engine(args.database_url)
+    if inspect(engine).has_table("users") and any(table_counts(engine).values()):
+        parser.error(f"{args.database_url} already has data; use an empty database")
+
+    print(
+        f"Generating {scale.users:,} users, {scale.weekly_plans:,} weekly plans, "
+        f"{scale.price_rows:,} price rows (seed {args.seed})"
+    )
+    populate(engine, scale, args.seed, args.batch_size, progress=True)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
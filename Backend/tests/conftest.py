@@ -4,13 +4,24 @@ Pytest configuration and fixtures for test suite.
 Provides shared database fixtures with proper setup and cleanup.
 """
 
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from database import Base
 from models.db_models import User, WeeklyPlan, HistoricalPriceData
 
 
+# Onboarding would build geo profiles against the app database in the
+# background; tests that want them turn this back on
+os.environ.setdefault("GEO_PROFILE", "off")
+
 # Use a file-based SQLite database for tests so it persists across connections
 TEST_DATABASE_URL = "sqlite:///./test.db"
 
@@ -30,6 +41,24 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
 # Create test session factory
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# Async engine on the same file for endpoints and async services.
+# NullPool: TestClient runs each request on a fresh event loop, and an
+# aiosqlite connection can't move between loops.
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+test_async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+
+
+@event.listens_for(test_async_engine.sync_engine, "connect")
+def set_async_sqlite_pragma(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+TestAsyncSessionLocal = async_sessionmaker(
+    test_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function", autouse=True)
 def setup_database():
@@ -67,22 +96,40 @@ def db_session():
         session.close()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db_session():
+    """
+    Provide an async database session for tests of async services.
+
+    Connected to the same test database as db_session.
+    """
+    async with TestAsyncSessionLocal() as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
 def seed_demo_data(db_session):
     """
     Seed demo historical price data for tests that need it.
     
-    Creates 4 weeks of historical price data for 5 common items.
+    Loads 4 weeks of historical price data for 5 common items from the
+    seed snapshot, building it if the snapshot is missing.
     """
-    from seed_data import seed_historical_prices
-    seed_historical_prices(db_session)
+    from seed_data import load_snapshot, seed_historical_prices
+    if not load_snapshot(db_session, tables=("historical_price_data",)):
+        seed_historical_prices(db_session)
     return db_session
 
 
 # Override the database dependency for FastAPI TestClient
 from fastapi.testclient import TestClient
 from main import app
-from database import get_db
+import database
+from database import get_db, get_async_db, get_read_db
+import log_config
+
+# main.py sends logs through a queue to stderr; tests read them with caplog
+log_config.shutdown()
 
 
 def override_get_db():
@@ -94,8 +141,24 @@ def override_get_db():
         db.close()
 
 
-# Apply the override
+async def override_get_async_db():
+    """Override get_async_db dependency to use test database."""
+    async with TestAsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def test_async_session():
+    """database.async_session on the test database."""
+    async with TestAsyncSessionLocal() as db:
+        yield db
+
+
+# Apply the overrides
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.dependency_overrides[get_read_db] = override_get_async_db
+database.async_session = test_async_session  # Handlers that open their own sessions (chat)
 
 
 @pytest.fixture(scope="module")
@@ -106,3 +169,119 @@ def client():
     This client uses the test database via the dependency override.
     """
     return TestClient(app)
+
+
+# ── Synthetic data tier ─────────────────────────────────────────────
+# Production-sized datasets from synthetic_data.py for benchmarking the
+# leaderboard and price services. Choose the size with
+# --synthetic-scale=small|medium|large (or SYNTHETIC_SCALE); set
+# SYNTHETIC_DATA_DIR to keep generated databases between runs.
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--synthetic-scale",
+        default=os.getenv("SYNTHETIC_SCALE", "small"),
+        choices=["small", "medium", "large"],
+        help="Size of the synthetic dataset behind the synthetic_db fixtures",
+    )
+
+
+@pytest.fixture(scope="session")
+def synthetic_scale(request):
+    """Name of the synthetic dataset size in use."""
+    return request.config.getoption("--synthetic-scale")
+
+
+@pytest.fixture(scope="session")
+def synthetic_db_path(synthetic_scale, tmp_path_factory):
+    """
+    SQLite file holding the synthetic dataset, generated once per session.
+
+    Dates lead up to midnight today, so a database kept in
+    SYNTHETIC_DATA_DIR is reused for the rest of the day.
+    """
+    from synthetic_data import DEFAULT_SEED, SCALES, create_load_engine, populate
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    directory = os.getenv("SYNTHETIC_DATA_DIR") or str(tmp_path_factory.mktemp("synthetic"))
+    path = os.path.join(directory, f"synthetic_{synthetic_scale}_{DEFAULT_SEED}_{today:%Y%m%d}.db")
+    if not os.path.exists(path):
+        # Build under a temporary name so an interrupted run isn't reused
+        partial = path + ".partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        engine = create_load_engine(f"sqlite:///{partial}")
+        populate(engine, SCALES[synthetic_scale], DEFAULT_SEED, now=today)
+        engine.dispose()
+        os.replace(partial, path)
+    return path
+
+
+@pytest.fixture
+def synthetic_db_session(synthetic_db_path):
+    """Sync session on the synthetic dataset. Treat it as read-only."""
+    engine = create_engine(f"sqlite:///{synthetic_db_path}")
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def synthetic_async_db_session(synthetic_db_path):
+    """Async session on the synthetic dataset. Treat it as read-only."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{synthetic_db_path}", poolclass=NullPool)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+# ── Stubbed upstreams ───────────────────────────────────────────────
+# Local n8n/Google/NSW FuelCheck/grocery MCP servers (stubs/upstreams.py)
+# and the scripted fake Bedrock model, for running the chat agent offline.
+
+@pytest.fixture(scope="module")
+def stubs():
+    from stubs.upstreams import StubUpstreams
+
+    with StubUpstreams() as running:
+        yield running
+
+
+@pytest.fixture
+def fake_agent(stubs, monkeypatch):
+    """
+    Chat agent on the fake model, with every tool pointed at the stubs.
+
+    Uses the default recording; patch services.agent._get_model to replay
+    another one. Each model tier's fake reports model id "fake-<tier>".
+    """
+    import services.agent as agent
+    import services.strands_tools.fuel_lookup as fuel_lookup
+    import services.strands_tools.google_places as google_places
+    import services.route_matrix_service as route_matrix_service
+    import services.strands_tools.google_routes as google_routes
+    from stubs.fake_bedrock import FakeBedrockModel
+
+    from services import prefetch, tool_cache
+
+    env = stubs.env()
+    agent.shutdown_mcp_client()
+    tool_cache.clear()
+    monkeypatch.setattr(agent, "COLES_MCP_URL", env["COLES_MCP_URL"])
+    monkeypatch.setattr(agent, "_get_model", lambda tier="small": FakeBedrockModel(model_id=f"fake-{tier}"))
+    monkeypatch.setattr(fuel_lookup, "GEOCODE_URL", env["GOOGLE_GEOCODE_URL"])
+    monkeypatch.setattr(fuel_lookup, "NSW_FUEL_API_BASE_URL", env["NSW_FUEL_API_BASE_URL"])
+    monkeypatch.setattr(fuel_lookup, "_GOOGLE_API_KEY", "stub-key")
+    monkeypatch.setattr(fuel_lookup, "_NSW_FUEL_AUTH_BASIC", "Basic stub")
+    monkeypatch.setattr(fuel_lookup, "_NSW_FUEL_API_KEY", "stub-key")
+    monkeypatch.setattr(google_places, "PLACES_SEARCH_URL", env["GOOGLE_PLACES_URL"])
+    monkeypatch.setattr(google_places, "_API_KEY", "stub-key")
+    monkeypatch.setattr(google_routes, "COMPUTE_ROUTES_URL", env["GOOGLE_ROUTES_URL"])
+    monkeypatch.setattr(route_matrix_service, "ROUTE_MATRIX_URL", env["GOOGLE_ROUTE_MATRIX_URL"])
+    monkeypatch.setattr(route_matrix_service, "_API_KEY", "stub-key")
+    yield
+    prefetch.shutdown(wait=True)
+    agent.shutdown_mcp_client()
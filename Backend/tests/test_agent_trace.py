@@ -0,0 +1,81 @@
+"""
+Tests for per-turn chat agent traces and the /debug/trace endpoint.
+"""
+
+import contextlib
+import io
+import json
+import time
+
+import services.agent_trace as agent_trace
+from services.agent_trace import args_hash, get_traces, record_span, trace_turn
+
+
+def _chat(client, session_id=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = client.post("/chat", json={
+            "message": "Add milk and check fuel",
+            "shoppingList": [],
+            "homeAddress": "UNSW Sydney, Kensington NSW 2052",
+            "sessionId": session_id,
+        })
+    assert response.status_code == 200
+    return response.json()["sessionId"]
+
+
+def test_chat_turn_trace(fake_agent, client):
+    session_id = _chat(client)
+    _chat(client, session_id)
+
+    response = client.get(f"/debug/trace/{session_id}")
+
+    assert response.status_code == 200
+    turns = response.json()["turns"]
+    assert len(turns) == 2
+    spans = turns[-1]["spans"]
+    root = spans[0]
+    assert root["name"] == "chat.turn" and root["parentSpanId"] is None
+    assert all(span["parentSpanId"] == root["spanId"] for span in spans[1:])
+
+    # The default recording: three model calls, three tools, lock waits
+    assert [s["name"] for s in spans if s["kind"] == "model"] == ["model.call"] * 3
+    tools = {s["attributes"]["tool.name"]: s for s in spans if s["kind"] == "tool"}
+    assert set(tools) == {"get_coles_products", "lookup_fuel_prices", "manage_list"}
+    assert tools["manage_list"]["attributes"]["tool.args_hash"] == args_hash(
+        {"action": "add", "item_name": "Milk", "quantity": 1, "price": 3.10}
+    )
+    assert tools["lookup_fuel_prices"]["attributes"]["tool.output.bytes"] > 0
+    holders = [s["attributes"]["holder"] for s in spans if s["kind"] == "lock"]
+    assert holders == ["chat.seed_list", "manage_list.add", "chat.read_list"]
+    assert set(turns[-1]["totalsMs"]) == {"model", "tool", "lock"}
+
+
+def test_unknown_session_has_no_trace(client):
+    response = client.get("/debug/trace/no-such-session")
+
+    assert response.status_code == 404
+
+
+def test_args_hash_ignores_key_order():
+    assert args_hash({"a": 1, "b": [2]}) == args_hash({"b": [2], "a": 1})
+    assert args_hash({"a": 1}) != args_hash({"a": 2})
+
+
+def test_otel_export(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(agent_trace, "AGENT_TRACE_FILE", str(path))
+
+    with trace_turn("otel-session", "hello"):
+        start = time.time_ns()
+        record_span("tool.manage_list", "tool", start, start + 2_000_000, status="error", **{"tool.input.bytes": 12})
+    record_span("outside", "tool", 0, 1)  # no turn in progress: dropped
+
+    assert len(get_traces("otel-session")[0]["spans"]) == 2
+    [line] = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, tool = spans
+    assert len(root["traceId"]) == 32 and tool["traceId"] == root["traceId"]
+    assert tool["parentSpanId"] == root["spanId"]
+    assert int(tool["endTimeUnixNano"]) - int(tool["startTimeUnixNano"]) == 2_000_000
+    assert tool["status"] == {"code": 2}
+    assert {"key": "tool.input.bytes", "value": {"intValue": "12"}} in tool["attributes"]
@@ -217,13 +217,13 @@ class TestConstraintErrorHandling:
         assert existing_user is not None
         assert existing_user.name == "Alice"
     
-    def test_service_layer_handles_foreign_key_violation(self, db_session):
+    @pytest.mark.asyncio
+    async def test_service_layer_handles_foreign_key_violation(self, async_db_session):
         """
         Test that the service layer properly handles foreign key violations.
         
         Requirements: 7.3
         """
-        import asyncio
         from services.weekly_plan_service import record_weekly_plan
         from exceptions import NotFoundError
         
@@ -231,12 +231,12 @@ class TestConstraintErrorHandling:
         # The service layer checks for user existence first, so it raises NotFoundError
         # before hitting the database constraint
         with pytest.raises(NotFoundError) as exc_info:
-            asyncio.run(record_weekly_plan(
-                db=db_session,
+            await record_weekly_plan(
+                db=async_db_session,
                 user_id="nonexistent-user",
                 optimal_cost=50.0,
                 actual_cost=45.0
-            ))
+            )
         
         assert "User" in str(exc_info.value) and "not found" in str(exc_info.value)
 
@@ -0,0 +1,112 @@
+"""
+Tests for database session dependencies and pool configuration.
+"""
+
+import pytest
+from sqlalchemy.exc import DBAPIError, OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import database
+
+
+class FlakySession:
+    """Stands in for AsyncSession; connection() fails a set number of times."""
+
+    def __init__(self, failures, error=None):
+        self.failures = failures
+        self.error = error or OperationalError("connect", {}, Exception("connection refused"))
+        self.attempts = 0
+        self.rollbacks = 0
+
+    async def connection(self):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of waiting."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(database.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(database, "DB_CONNECT_RETRIES", 2)
+    monkeypatch.setattr(database, "DB_RETRY_BACKOFF_SECONDS", 0.2)
+    return delays
+
+
+@pytest.mark.asyncio
+async def test_connect_retries_with_exponential_backoff(sleeps):
+    session = FlakySession(failures=2)
+    await database.connect_with_retry(session)
+
+    assert session.attempts == 3
+    assert sleeps == [0.2, 0.4]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [
+    ConnectionRefusedError(111, "Connection refused"),
+    DBAPIError("SELECT 1", {}, Exception("server closed the connection"), connection_invalidated=True),
+])
+async def test_connect_retries_dropped_connections(sleeps, error):
+    session = FlakySession(failures=1, error=error)
+    await database.connect_with_retry(session)
+
+    assert session.attempts == 2
+    assert sleeps == [0.2]
+
+
+@pytest.mark.asyncio
+async def test_connect_does_not_retry_other_database_errors(sleeps):
+    session = FlakySession(failures=1, error=ProgrammingError("SELECT 1", {}, Exception("syntax error")))
+    with pytest.raises(ProgrammingError):
+        await database.connect_with_retry(session)
+
+    assert session.attempts == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_connect_gives_up_after_retries(sleeps):
+    session = FlakySession(failures=5)
+    with pytest.raises(OperationalError):
+        await database.connect_with_retry(session)
+
+    assert session.attempts == 3
+    assert session.rollbacks == 3
+
+
+@pytest.mark.asyncio
+async def test_connect_retry_with_unreachable_database(sleeps, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/app.db")
+    async with AsyncSession(engine) as session:
+        with pytest.raises(OperationalError):
+            await database.connect_with_retry(session)
+    await engine.dispose()
+
+    assert sleeps == [0.2, 0.4]
+
+
+def test_get_db_runs_no_query():
+    """Opening a session doesn't touch the database until it's used."""
+    gen = database.get_db()
+    session = next(gen)
+    assert not session.in_transaction()
+    gen.close()
+
+
+def test_pool_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    settings = database.pool_settings()
+
+    assert settings["pool_size"] == 20
+    assert settings["max_overflow"] == 0
+    assert settings["pool_pre_ping"] is True
@@ -0,0 +1,103 @@
+"""
+Tests for the scripted fake Bedrock model, recording replay and the
+grocery MCP stub.
+"""
+
+import asyncio
+import contextlib
+import io
+
+from pydantic import BaseModel
+
+import services.agent as agent
+from stubs.fake_bedrock import FakeBedrockModel, load_recording, recording_from_messages
+from stubs.mcp_server import search_catalogue
+
+
+def _user(text):
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _tool_round():
+    return [
+        {"role": "assistant", "content": [{"toolUse": {"name": "x", "toolUseId": "1", "input": {}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": "1", "content": [], "status": "success"}}]},
+    ]
+
+
+def test_get_model_switches_to_fake(monkeypatch):
+    monkeypatch.setenv("BEDROCK_MODEL_ID", "fake")
+    monkeypatch.setenv("FAKE_BEDROCK_RECORDING", "weekly_shop")
+    monkeypatch.setenv("FAKE_BEDROCK_LATENCY_MS", "15")
+
+    model = agent._get_model()
+
+    assert isinstance(model, FakeBedrockModel)
+    assert model.get_config()["latency_ms"] == 15.0
+    assert len(model.get_config()["recording"]["turns"]) == 3
+
+
+def test_steps_follow_turns_and_tool_rounds():
+    model = FakeBedrockModel(load_recording("weekly_shop"))
+
+    first = [_user("add milk, bread and eggs")]
+    assert len(model.next_step(first)["tool_calls"]) == 3
+    assert model.next_step(first + _tool_round())["tool_calls"][0]["name"] == "manage_list"
+    assert "text" in model.next_step(first + _tool_round() + _tool_round())
+
+    second = first + _tool_round() + _tool_round() + [{"role": "assistant", "content": [{"text": "ok"}]}]
+    second.append(_user("nearest coles?"))
+    assert model.next_step(second)["tool_calls"][0]["name"] == "find_nearby_stores"
+
+
+class Basket(BaseModel):
+    items: list[str]
+    total: float
+
+
+def test_structured_output_parses_the_scripted_step():
+    def parse(step):
+        model = FakeBedrockModel({"turns": [{"user": "basket?", "steps": [step]}]})
+
+        async def last_event():
+            return [event async for event in model.structured_output(Basket, [_user("basket?")])][-1]
+
+        return asyncio.run(last_event())["output"]
+
+    reply = {"text": '{"items": ["milk"], "total": 3.1}'}
+    call = {"tool_calls": [{"name": "Basket", "input": {"items": ["eggs", "bread"], "total": 9.5}}]}
+
+    assert parse(reply) == Basket(items=["milk"], total=3.1)
+    assert parse(call) == Basket(items=["eggs", "bread"], total=9.5)
+
+
+def test_catalogue_search():
+    coles = search_catalogue("free range eggs", "Coles")
+    woolworths = search_catalogue("eggs", "Woolworths", limit=1)
+
+    assert coles["products"][0] == {"name": "Coles Free Range Eggs 12pk", "price": 6.50, "unit": "700g"}
+    assert woolworths["products"] == [{"name": "Free Range Eggs 12pk", "price": 6.60, "unit": "700g"}]
+    assert search_catalogue("caviar", "Coles")["products"] == []
+
+
+def test_recorded_conversation_replays_through_agent(fake_agent, monkeypatch):
+    """Replaying a recording and re-recording the session gives the same tool calls."""
+    recording = load_recording("weekly_shop")
+    monkeypatch.setattr(agent, "_get_model", lambda tier="small": FakeBedrockModel(recording))
+
+    session = agent.create_agent()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for turn in recording["turns"]:
+            session(turn["user"])
+
+    replayed = recording_from_messages(session.messages)
+    assert [t["user"] for t in replayed["turns"]] == [t["user"] for t in recording["turns"]]
+    assert [t["steps"] for t in replayed["turns"]] == [t["steps"] for t in recording["turns"]]
+
+    # Tool results came from the stubs, not the recording
+    results = [
+        block["toolResult"] for message in session.messages
+        for block in message["content"] if "toolResult" in block
+    ]
+    assert all(result["status"] == "success" for result in results)
+    assert any("Coles Kensington" in str(result["content"]) for result in results)
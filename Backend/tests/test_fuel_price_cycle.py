@@ -0,0 +1,107 @@
+"""
+Tests for fuel price history and the price cycle detector.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from models.db_models import FuelPriceSeries
+from services import fuel_price_cycle, fuel_price_history
+from services.fuel_price_cycle import analyse, daily_prices
+from services.strands_tools.fuel_lookup import lookup_fuel_prices
+from synthetic_data import generate_fuel_prices
+from tests.conftest import TestSessionLocal
+
+NOW = datetime(2024, 6, 30, 21, 0)
+HOME = "UNSW Sydney, Kensington NSW 2052"
+
+
+@pytest.fixture
+def history(monkeypatch):
+    """Price history and cycle results stored in the test database."""
+    monkeypatch.setattr(fuel_price_history, "SessionLocal", TestSessionLocal)
+    monkeypatch.setattr(fuel_price_cycle, "SessionLocal", TestSessionLocal)
+    fuel_price_history.clear()
+    fuel_price_cycle.clear()
+    yield
+    fuel_price_history.clear()
+    fuel_price_cycle.clear()
+
+
+def _load_synthetic(db_session, now=NOW):
+    db_session.execute(
+        FuelPriceSeries.__table__.insert(),
+        fuel_price_history.series_rows(generate_fuel_prices(80, 90, seed=1, now=now)),
+    )
+    db_session.commit()
+
+
+_change_points = st.lists(
+    st.tuples(st.integers(0, 3), st.integers(-2, 7), st.floats(150, 220)), max_size=40,
+).map(lambda points: sorted(points, key=lambda p: p[1]))
+
+
+@settings(max_examples=100, deadline=None)
+@given(points=_change_points)
+def test_property_daily_prices_match_step_function(points):
+    station_idx = np.array([p[0] for p in points], dtype=int)
+    day_idx = np.array([p[1] for p in points], dtype=int)
+    prices = np.array([p[2] for p in points], dtype=float)
+
+    matrix = daily_prices(station_idx, day_idx, prices, 4, 8)
+
+    for station in range(4):
+        for day in range(8):
+            seen = [price for s, d, price in points if s == station and d <= day]
+            expected = seen[-1] if seen else np.nan
+            assert matrix[station, day] == expected or (np.isnan(expected) and np.isnan(matrix[station, day]))
+
+
+def test_analyse_finds_each_regions_place_in_its_cycle(history, db_session):
+    _load_synthetic(db_session)
+
+    regions = {r["region"]: r for r in analyse(db_session, "U91", NOW)}
+
+    # Day 89 is today: Sydney hiked 19 days ago, Wollongong 34 days ago with a 35-day cycle
+    assert regions["sydney"]["cycle_days"] == 35 and regions["sydney"]["days_since_hike"] == 19
+    assert regions["sydney"]["phase"] == "falling" and regions["sydney"]["advice"] == "wait"
+    assert regions["wollongong"]["phase"] == "bottom" and regions["wollongong"]["advice"] == "fill_up_now"
+    assert regions["nsw_280x"]["phase"] == "no_cycle"
+    assert regions["sydney"]["stations"] == 20
+
+
+def test_history_stores_only_price_changes(history, db_session):
+    stations = [
+        {"station_code": 101, "address": "456 Anzac Parade, Kensington NSW 2033", "price_cents_per_litre": 174.9},
+        {"station_code": 102, "address": "No postcode", "price_cents_per_litre": 179.9},
+    ]
+    seen_at = datetime(2024, 6, 3, 7, 30)
+    fuel_price_history.record("U91", stations, seen_at)
+    fuel_price_history.record("U91", stations, seen_at)
+    assert fuel_price_history.flush() == 1
+
+    fuel_price_history.record("U91", [{**stations[0], "price_cents_per_litre": 169.9}], seen_at.replace(day=5))
+    fuel_price_history.record("U91", stations, seen_at.replace(day=6))
+    assert fuel_price_history.flush() == 2
+
+    series = db_session.query(FuelPriceSeries).one()
+    minutes, prices = fuel_price_history.unpack(series.minutes, series.prices)
+    assert (series.station_code, series.region, series.month) == ("101", "sydney", datetime(2024, 6, 1))
+    assert prices.tolist() == [174.9, 169.9, 174.9]
+    assert minutes.tolist() == [(2 * 24 + 7) * 60 + 30, (4 * 24 + 7) * 60 + 30, (5 * 24 + 7) * 60 + 30]
+
+
+def test_fuel_tool_records_prices_and_attaches_cycle(history, fake_agent, db_session):
+    _load_synthetic(db_session, now=datetime.utcnow())
+    assert fuel_price_cycle.run_batch() == 4
+
+    result = lookup_fuel_prices(HOME)
+
+    assert result["price_cycle"]["region"] == "sydney"
+    assert result["price_cycle"]["advice"] in ("fill_up_now", "wait")
+    assert "Sydney" in result["price_cycle"]["summary"]
+    assert fuel_price_history.flush() == len(result["stations"])
@@ -0,0 +1,90 @@
+"""
+Tests for per-user geo profiles and the location tools reading them.
+"""
+
+import pytest
+
+import metrics
+from models.db_models import User, UserGeoProfile
+from services import geo_profile
+from services.strands_tools.fuel_lookup import geocode
+from services.strands_tools.google_places import nearby_stores
+from services.strands_tools.google_routes import get_directions
+from tests.conftest import TestSessionLocal
+
+HOME = "UNSW Sydney, Kensington NSW 2052"
+
+
+@pytest.fixture
+def geo(fake_agent, monkeypatch):
+    """Geo profiles built against the stubs and stored in the test database."""
+    monkeypatch.setenv("GEO_PROFILE", "on")
+    monkeypatch.setattr(geo_profile, "SessionLocal", TestSessionLocal)
+    geo_profile.clear_index()
+    yield
+    geo_profile.shutdown(wait=True)
+    geo_profile.clear_index()
+
+
+def _onboard(client) -> str:
+    response = client.post("/onboard", json={"name": "Sam Student", "weekly_budget": 120, "home_address": HOME})
+    geo_profile.shutdown(wait=True)  # Let the background build finish
+    return response.json()["user_id"]
+
+
+def test_onboarding_builds_profile(geo, client, db_session):
+    user_id = _onboard(client)
+
+    profile = db_session.get(UserGeoProfile, user_id)
+    assert profile.home_address == HOME
+    assert [s["name"] for s in profile.stores["Coles"]] == ["Coles Kensington", "Coles Maroubra"]
+    assert [s["name"] for s in profile.stores["Woolworths"]] == ["Woolworths Randwick"]
+    assert len(profile.stations) == 3
+    assert set(profile.stations[0]["travel"]) == set(geo_profile.TRAVEL_MODES)
+    assert "price_cents_per_litre" not in profile.stations[0]
+
+
+def test_tools_answer_home_lookups_from_profile(geo, client):
+    _onboard(client)
+    hits = {name: metrics.GEO_PROFILE_HITS.value(lookup=name) for name in ("geocode", "nearby_stores", "route")}
+
+    stores = nearby_stores(f"  {HOME.upper()} ", "woolworths")["nearby_stores"]
+    route = get_directions(HOME, stores[0]["address"], "walk")
+
+    profile = geo_profile.lookup(HOME)
+    assert geocode(HOME) == (profile["latitude"], profile["longitude"])
+    assert route["duration_seconds"] == stores[0]["travel"]["WALK"]["duration_seconds"]
+    assert all(metrics.GEO_PROFILE_HITS.value(lookup=name) == hits[name] + 1 for name in hits)
+    # Anywhere else still goes upstream
+    assert geo_profile.lookup("Parramatta NSW 2150") is None
+    assert nearby_stores("Parramatta NSW 2150", "Woolworths")["nearby_stores"]
+    assert metrics.GEO_PROFILE_HITS.value(lookup="nearby_stores") == hits["nearby_stores"] + 1
+
+
+def test_refresh_rebuilds_moved_and_missing_profiles(geo, client, db_session):
+    user_id = _onboard(client)
+    assert geo_profile.refresh_stale() == 0
+
+    moved = "1 Anzac Parade, Kensington NSW 2033"
+    db_session.get(User, user_id).home_address = moved
+    db_session.add(User(user_id="no-profile", name="Alex", weekly_budget=80, home_address=HOME))
+    db_session.commit()
+
+    assert geo_profile.refresh_stale() == 2
+    assert geo_profile.lookup(moved)["user_id"] == user_id
+    assert geo_profile.lookup(HOME)["user_id"] == "no-profile"
+
+
+def test_neighbours_moving_out_keep_the_address_indexed(geo):
+    """Two users at one address: each moving away leaves the other indexed."""
+    def profile(user_id, address):
+        return {"user_id": user_id, "home_address": address, "latitude": -33.9, "longitude": 151.2}
+
+    geo_profile._index(profile("a", HOME))
+    geo_profile._index(profile("b", HOME))
+    geo_profile._index(profile("b", "Parramatta NSW 2150"))
+    assert geo_profile.lookup(HOME)["user_id"] == "a"
+
+    geo_profile._index(profile("a", "Parramatta NSW 2150"))
+    assert geo_profile.lookup(HOME) is None
+    assert geo_profile.lookup("Parramatta NSW 2150")["user_id"] == "a"
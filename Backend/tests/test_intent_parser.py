@@ -0,0 +1,98 @@
+"""
+Tests for the list-command fast path in front of the chat agent.
+"""
+
+import pytest
+
+import metrics
+import routers.chat as chat_router
+from services.intent_parser import ListCommand, apply_list_commands, parse_list_command
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("add 2 milk", [ListCommand("add", "milk", 2)]),
+    ("Add milk, bread and eggs to my list", [
+        ListCommand("add", "milk"), ListCommand("add", "bread"), ListCommand("add", "eggs"),
+    ]),
+    ("please add a dozen eggs", [ListCommand("add", "eggs", 12)]),
+    ("put 3 bananas on my shopping list.", [ListCommand("add", "bananas", 3)]),
+    ("remove bread", [ListCommand("remove", "bread")]),
+    ("take bread off my list", [ListCommand("remove", "bread")]),
+    ("set eggs to 3", [ListCommand("update", "eggs", 3)]),
+    ("Clear my list!", [ListCommand("clear")]),
+])
+def test_recognises_list_commands(message, expected):
+    assert parse_list_command(message) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "Add milk to my list and check fuel prices near me",
+    "What's the cheapest milk?",
+    "add milk to my list for tomorrow",
+    "add 2 milk and bread",
+    "take the bus",
+    "add milk from Coles",
+    "How do I get to Woolworths",
+    "hello",
+])
+def test_unsure_messages_go_to_agent(message):
+    assert parse_list_command(message) is None
+
+
+def test_commands_use_manage_list_semantics():
+    shopping_list = [{"name": "Bread (Loaf)", "quantity": 1, "price": 2.6}, {"name": "Milk", "quantity": 1}]
+
+    reply = apply_list_commands(shopping_list, parse_list_command("add 2 milk"))
+    assert reply == "Updated Milk quantity to 3."
+    apply_list_commands(shopping_list, parse_list_command("remove bread"))
+    apply_list_commands(shopping_list, parse_list_command("add brown rice"))
+
+    assert shopping_list == [{"name": "Milk", "quantity": 3}, {"name": "Brown Rice", "quantity": 1}]
+
+
+def test_ambiguous_item_is_left_to_agent():
+    shopping_list = [{"name": "Full Cream Milk", "quantity": 1}, {"name": "Lite Milk", "quantity": 1}]
+
+    assert apply_list_commands(shopping_list, parse_list_command("remove milk")) is None
+    assert len(shopping_list) == 2
+
+
+def test_chat_fast_path_skips_agent(client, monkeypatch):
+    def no_agent():
+        raise AssertionError("the agent should not be created")
+
+    monkeypatch.setattr(chat_router, "create_agent", no_agent)
+    hits = metrics.CHAT_TURNS.value(path="fast_path")
+
+    response = client.post("/chat", json={
+        "message": "add 2 milk",
+        "shoppingList": [{"name": "Bread", "quantity": 1, "price": 2.6}],
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["reply"] == "Added 2x Milk to the list."
+    assert data["updatedList"] == [
+        {"name": "Bread", "quantity": 1, "price": 2.6}, {"name": "Milk", "quantity": 2},
+    ]
+    assert data["sessionId"]
+    assert metrics.CHAT_TURNS.value(path="fast_path") == hits + 1
+
+
+def test_fast_path_turn_joins_agent_history(fake_agent, client):
+    first = client.post("/chat", json={"message": "Add milk and check fuel", "shoppingList": []})
+    session_id = first.json()["sessionId"]
+    agent = chat_router._sessions[session_id]["agent"]
+    history = len(agent.messages)
+
+    response = client.post("/chat", json={
+        "message": "clear my list", "shoppingList": first.json()["updatedList"], "sessionId": session_id,
+    })
+
+    assert response.json()["updatedList"] == []
+    assert agent.messages[history:] == [
+        {"role": "user", "content": [{"text": "User message: clear my list"}]},
+        {"role": "assistant", "content": [{"text": "Cleared 1 items from the list."}]},
+    ]
+    assert metrics.CHAT_FAST_PATH_SAVED.value() > 0
+    assert 0 < metrics.fast_path_hit_rate() < 1
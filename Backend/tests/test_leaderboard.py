@@ -11,36 +11,36 @@ from services.leaderboard_service import calculate_leaderboard
 
 
 @pytest.mark.asyncio
-async def test_leaderboard_integration(db_session):
+async def test_leaderboard_integration(async_db_session):
     """Test complete leaderboard flow with multiple users and plans."""
     
     try:
         # Create test users
-        user1 = await create_user(db_session, "Alice", 100.0, "123 Main St")
-        user2 = await create_user(db_session, "Bob", 150.0, "456 Oak Ave")
-        user3 = await create_user(db_session, "Charlie", 200.0, "789 Pine Rd")
-        user4 = await create_user(db_session, "Diana", 120.0, "321 Elm St")
+        user1 = await create_user(async_db_session, "Alice", 100.0, "123 Main St")
+        user2 = await create_user(async_db_session, "Bob", 150.0, "456 Oak Ave")
+        user3 = await create_user(async_db_session, "Charlie", 200.0, "789 Pine Rd")
+        user4 = await create_user(async_db_session, "Diana", 120.0, "321 Elm St")
         
         # Record weekly plans
         # Alice: excellent optimization (2 weeks)
-        await record_weekly_plan(db_session, user1.user_id, 80.0, 75.0)   # score: 0.25
-        await record_weekly_plan(db_session, user1.user_id, 85.0, 80.0)   # score: 0.20
+        await record_weekly_plan(async_db_session, user1.user_id, 80.0, 75.0)   # score: 0.25
+        await record_weekly_plan(async_db_session, user1.user_id, 85.0, 80.0)   # score: 0.20
         # Average: 0.225
         
         # Bob: good optimization (3 weeks)
-        await record_weekly_plan(db_session, user2.user_id, 120.0, 130.0) # score: 0.133
-        await record_weekly_plan(db_session, user2.user_id, 125.0, 135.0) # score: 0.10
-        await record_weekly_plan(db_session, user2.user_id, 130.0, 140.0) # score: 0.067
+        await record_weekly_plan(async_db_session, user2.user_id, 120.0, 130.0) # score: 0.133
+        await record_weekly_plan(async_db_session, user2.user_id, 125.0, 135.0) # score: 0.10
+        await record_weekly_plan(async_db_session, user2.user_id, 130.0, 140.0) # score: 0.067
         # Average: 0.10
         
         # Charlie: poor optimization (1 week, overspent)
-        await record_weekly_plan(db_session, user3.user_id, 180.0, 220.0) # score: -0.10
+        await record_weekly_plan(async_db_session, user3.user_id, 180.0, 220.0) # score: -0.10
         # Average: -0.10
         
         # Diana: no weekly plans (should not appear in leaderboard)
         
         # Calculate leaderboard
-        leaderboard = await calculate_leaderboard(db_session)
+        leaderboard = await calculate_leaderboard(async_db_session)
         
         # Verify results
         assert len(leaderboard) == 3, f"Expected 3 entries, got {len(leaderboard)}"
@@ -73,16 +73,16 @@ async def test_leaderboard_integration(db_session):
 
 
 @pytest.mark.asyncio
-async def test_leaderboard_empty(db_session):
+async def test_leaderboard_empty(async_db_session):
     """Test leaderboard with no users having weekly plans."""
     
     try:
         # Create users but no weekly plans
-        await create_user(db_session, "Alice", 100.0, "123 Main St")
-        await create_user(db_session, "Bob", 150.0, "456 Oak Ave")
+        await create_user(async_db_session, "Alice", 100.0, "123 Main St")
+        await create_user(async_db_session, "Bob", 150.0, "456 Oak Ave")
         
         # Calculate leaderboard
-        leaderboard = await calculate_leaderboard(db_session)
+        leaderboard = await calculate_leaderboard(async_db_session)
         
         # Should be empty since no one has weekly plans
         assert len(leaderboard) == 0, "Expected empty leaderboard"
@@ -92,16 +92,16 @@ async def test_leaderboard_empty(db_session):
 
 
 @pytest.mark.asyncio
-async def test_leaderboard_single_user(db_session):
+async def test_leaderboard_single_user(async_db_session):
     """Test leaderboard with single user."""
     
     try:
         # Create single user with plans
-        user = await create_user(db_session, "Alice", 100.0, "123 Main St")
-        await record_weekly_plan(db_session, user.user_id, 80.0, 75.0)
+        user = await create_user(async_db_session, "Alice", 100.0, "123 Main St")
+        await record_weekly_plan(async_db_session, user.user_id, 80.0, 75.0)
         
         # Calculate leaderboard
-        leaderboard = await calculate_leaderboard(db_session)
+        leaderboard = await calculate_leaderboard(async_db_session)
         
         # Verify single entry
         assert len(leaderboard) == 1
@@ -113,20 +113,20 @@ async def test_leaderboard_single_user(db_session):
 
 
 @pytest.mark.asyncio
-async def test_leaderboard_tie_scores(db_session):
+async def test_leaderboard_tie_scores(async_db_session):
     """Test leaderboard with users having identical average scores."""
     
     try:
         # Create users with identical scores
-        user1 = await create_user(db_session, "Alice", 100.0, "123 Main St")
-        user2 = await create_user(db_session, "Bob", 100.0, "456 Oak Ave")
+        user1 = await create_user(async_db_session, "Alice", 100.0, "123 Main St")
+        user2 = await create_user(async_db_session, "Bob", 100.0, "456 Oak Ave")
         
         # Both have same optimization score
-        await record_weekly_plan(db_session, user1.user_id, 80.0, 80.0)  # score: 0.20
-        await record_weekly_plan(db_session, user2.user_id, 80.0, 80.0)  # score: 0.20
+        await record_weekly_plan(async_db_session, user1.user_id, 80.0, 80.0)  # score: 0.20
+        await record_weekly_plan(async_db_session, user2.user_id, 80.0, 80.0)  # score: 0.20
         
         # Calculate leaderboard
-        leaderboard = await calculate_leaderboard(db_session)
+        leaderboard = await calculate_leaderboard(async_db_session)
         
         # Both should appear with sequential ranks
         assert len(leaderboard) == 2
@@ -141,12 +141,12 @@ async def test_leaderboard_tie_scores(db_session):
 # Standalone test runner for manual execution
 async def run_integration_test():
     """Run integration test with detailed output."""
-    from database import SessionLocal, init_db
+    from database import AsyncSessionLocal, init_db
     
     print("Initializing database...")
     init_db(seed_demo_data=False)
     
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     
     try:
         print("\n1. Creating users...")
@@ -222,7 +222,7 @@ async def run_integration_test():
         return False
         
     finally:
-        db.close()
+        await db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""
+Tests for the compact, delta-based shopping-list context in chat prompts.
+"""
+
+import contextlib
+import io
+
+import routers.chat as chat_router
+from services.list_prompt import ListContextState, build_turn_context, encode_list, list_changes
+
+HOME = "UNSW Sydney, Kensington NSW 2052"
+MILK = {"name": "Milk", "quantity": 2, "price": 3.1}
+BREAD = {"name": "Bread", "quantity": 1, "price": 2.6}
+EGGS = {"name": "Eggs", "quantity": 12}
+
+
+def test_encode_list():
+    assert encode_list([MILK, EGGS]) == "Shopping list (2 items, name xqty $price): Milk x2 $3.10; Eggs x12"
+    assert encode_list([]) == "Shopping list (0 items, name xqty $price): empty"
+
+
+def test_list_changes():
+    changed = [{"name": "milk", "quantity": 3, "price": 3.1}, EGGS]
+
+    assert list_changes([MILK, BREAD], changed) == ["+Eggs x12", "-Bread", "~milk x3 $3.10"]
+    assert list_changes([MILK], [MILK]) == []
+    assert list_changes([MILK, dict(MILK)], [MILK]) is None
+
+
+def test_later_turns_only_send_changes():
+    state = ListContextState()
+
+    first = build_turn_context("hi", [MILK, BREAD], HOME, state)
+    assert first == (
+        f"[USER_HOME_ADDRESS={HOME}] — Whenever you call a tool that needs the user's location or "
+        f"start address, pass the exact string \"{HOME}\".\n\n"
+        "Shopping list (2 items, name xqty $price): Milk x2 $3.10; Bread x1 $2.60\n\n"
+        "User message: hi"
+    )
+    assert build_turn_context("thanks", [MILK, BREAD], HOME, state) == "User message: thanks"
+    assert build_turn_context("and eggs?", [MILK, BREAD, EGGS], HOME, state) == (
+        "Shopping list changes since last turn (+ added, - removed, ~ changed): +Eggs x12\n\n"
+        "User message: and eggs?"
+    )
+
+
+def test_new_address_and_trimmed_history_are_resent():
+    state = ListContextState()
+    build_turn_context("hi", [MILK], HOME, state)
+
+    moved = build_turn_context("hi", [MILK], "Newcastle NSW", state)
+    assert moved.startswith("[USER_HOME_ADDRESS=Newcastle NSW]") and "Shopping list" not in moved
+
+    trimmed = build_turn_context("hi", [MILK], "Newcastle NSW", state, removed_messages=2)
+    assert "[USER_HOME_ADDRESS=Newcastle NSW]" in trimmed and "Milk x2 $3.10" in trimmed
+    assert build_turn_context("hi", [MILK], "Newcastle NSW", state, removed_messages=2) == "User message: hi"
+
+
+def test_chat_sends_list_once(fake_agent, client):
+    shopping_list = [{"name": f"Item {i}", "quantity": 1, "price": 1.5} for i in range(50)]
+
+    def chat(message, session_id=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.post("/chat", json={
+                "message": message, "shoppingList": shopping_list, "homeAddress": HOME, "sessionId": session_id,
+            })
+        return response.json()
+
+    first = chat("Add milk and check fuel")
+    shopping_list = first["updatedList"] + [{"name": "Apples", "quantity": 6}]
+    chat("and apples", first["sessionId"])
+
+    agent = chat_router._sessions[first["sessionId"]]["agent"]
+    prompts = [
+        m["content"][0]["text"] for m in agent.messages
+        if m["role"] == "user" and "text" in m["content"][0]
+    ]
+    assert "Item 49 x1 $1.50" in prompts[0]
+    assert prompts[1] == (
+        "Shopping list changes since last turn (+ added, - removed, ~ changed): +Apples x6\n\n"
+        "User message: and apples"
+    )
@@ -0,0 +1,103 @@
+"""
+Tests for structured, sampled, queued logging.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+import log_config
+import metrics
+from log_config import SamplingFilter, parse_sample
+
+HOME = "UNSW Sydney, Kensington NSW 2052"
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    """log_config writing JSON to a buffer; yields a function returning the records written so far."""
+    stream = io.StringIO()
+    log_config.configure(stream=stream, fmt="json", sample={"test.sampled": 3})
+    logger = logging.getLogger("test")
+    monkeypatch.setattr(logger, "level", logging.DEBUG)
+
+    def written():
+        log_config.shutdown()  # Drains the queue
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield written
+    log_config.shutdown()
+
+
+def test_sampling_keeps_one_in_n_per_call_site():
+    sampling = SamplingFilter(parse_sample("test.sampled=3, other=1"))
+    logger = logging.getLogger("test.sampled.child")
+
+    def records(level, line):
+        return [logger.makeRecord(logger.name, level, "f.py", line, "msg", (), None) for _ in range(9)]
+
+    before = metrics.LOG_RECORDS_DROPPED.value(logger="test.sampled.child", reason="sampled")
+    assert sum(map(sampling.filter, records(logging.INFO, 1))) == 3
+    assert sum(map(sampling.filter, records(logging.INFO, 2))) == 3   # Counted per call site
+    assert sum(map(sampling.filter, records(logging.WARNING, 1))) == 9
+    assert metrics.LOG_RECORDS_DROPPED.value(logger="test.sampled.child", reason="sampled") - before == 12
+
+    with pytest.raises(ValueError):
+        parse_sample("httpx=0")
+
+
+def test_records_are_json_with_extra_fields(configured):
+    logger = logging.getLogger("test.sampled")
+    for i in range(4):
+        logger.info("Turn %d", i, extra={"session_id": "abc", "tokens": {"input": 10}})
+    try:
+        raise RuntimeError("upstream down")
+    except RuntimeError:
+        logging.getLogger("test").exception("Lookup failed")
+
+    records = configured()
+    assert [r["message"] for r in records] == ["Turn 0", "Turn 3", "Lookup failed"]
+    assert records[0]["session_id"] == "abc" and records[0]["tokens"] == {"input": 10}
+    assert records[0]["sampled"] == 3 and records[0]["level"] == "INFO"
+    assert "RuntimeError: upstream down" in records[2]["exception"]
+
+
+def test_slow_output_does_not_block_logging_calls(monkeypatch):
+    release = threading.Event()
+
+    class StuckStream(io.StringIO):
+        def write(self, text):
+            release.wait(5)
+            return super().write(text)
+
+    monkeypatch.setenv("LOG_QUEUE_SIZE", "5")
+    log_config.configure(stream=StuckStream(), sample={})
+    logger = logging.getLogger("test.stuck")
+    before = metrics.LOG_RECORDS_DROPPED.value(logger="test.stuck", reason="queue_full")
+    try:
+        start = time.perf_counter()
+        for i in range(50):
+            logger.warning("Record %d", i)
+        assert time.perf_counter() - start < 1
+        assert metrics.LOG_RECORDS_DROPPED.value(logger="test.stuck", reason="queue_full") - before >= 40
+    finally:
+        release.set()
+        log_config.shutdown()
+
+
+def test_chat_logs_sizes_not_bodies(fake_agent, client, caplog):
+    shopping_list = [{"name": "Secret Sauce", "quantity": 1, "price": 4.5}]
+
+    with caplog.at_level(logging.INFO), contextlib.redirect_stdout(io.StringIO()):
+        client.post("/chat", json={
+            "message": "Add milk and check fuel", "shoppingList": shopping_list, "homeAddress": HOME,
+        })
+
+    logged = " ".join(f"{r.getMessage()} {vars(r)}" for r in caplog.records if r.name == "routers.chat")
+    assert "Processing chat message" in logged and "<32 chars>" in logged
+    assert HOME not in logged and "Secret Sauce" not in logged and "check fuel" not in logged
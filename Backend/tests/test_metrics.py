@@ -0,0 +1,88 @@
+"""
+Tests for the request/DB/tool timing metrics and the /metrics endpoint.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+import metrics
+from metrics import Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0)))
+    calls = registry.register(Counter("demo_total", "Demo calls.", ("route",)))
+    for value in (0.05, 0.5, 2.0):
+        latency.observe(value, route='/a"b')
+    calls.inc(route="/a")
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'demo_seconds_bucket{route="/a\\"b",le="1"} 2',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 3',
+        'demo_seconds_sum{route="/a\\"b"} 2.55',
+        'demo_seconds_count{route="/a\\"b"} 3',
+        "# HELP demo_total Demo calls.",
+        "# TYPE demo_total counter",
+        'demo_total{route="/a"} 1',
+    ]
+
+
+def test_time_records_outcome():
+    histogram = Histogram("demo_call_seconds", "Demo.", ("service", "outcome"))
+    with histogram.time(service="x"):
+        pass
+    with pytest.raises(RuntimeError):
+        with histogram.time(service="x"):
+            raise RuntimeError("boom")
+
+    assert histogram.count(service="x", outcome="ok") == 1
+    assert histogram.count(service="x", outcome="error") == 1
+
+
+def test_requests_labelled_by_route_with_db_totals(client):
+    before = metrics.HTTP_REQUEST_DB_QUERIES.count(route="/onboard")
+    queries_before = metrics.HTTP_REQUEST_DB_QUERIES.sum(route="/onboard")
+
+    response = client.post("/onboard", json={
+        "name": "Metrics", "weekly_budget": 100.0, "home_address": "1 Test St, Sydney NSW 2000"
+    })
+    client.get("/no-such-page")
+
+    assert response.status_code == 201
+    assert metrics.HTTP_REQUESTS.value(method="POST", route="/onboard", status="201") >= 1
+    assert metrics.HTTP_REQUEST_DB_QUERIES.count(route="/onboard") == before + 1
+    assert metrics.HTTP_REQUEST_DB_QUERIES.sum(route="/onboard") > queries_before
+    assert metrics.HTTP_REQUESTS.value(method="GET", route="unmatched", status="404") >= 1
+
+
+def test_metrics_endpoint(client):
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+
+
+def test_chat_records_tool_and_upstream_timings(fake_agent, client):
+    tools_before = metrics.TOOL_CALL_DURATION.count(tool="lookup_fuel_prices", status="success")
+    fuel_before = metrics.EXTERNAL_HTTP_DURATION.count(service="nsw_fuel_prices", outcome="ok")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = client.post("/chat", json={
+            "message": "Add milk and check fuel",
+            "shoppingList": [],
+            "homeAddress": "UNSW Sydney, Kensington NSW 2052",
+        })
+
+    assert response.status_code == 200
+    assert metrics.TOOL_CALL_DURATION.count(tool="lookup_fuel_prices", status="success") == tools_before + 1
+    assert metrics.TOOL_CALL_DURATION.count(tool="manage_list", status="success") >= 1
+    assert metrics.EXTERNAL_HTTP_DURATION.count(service="nsw_fuel_prices", outcome="ok") == fuel_before + 1
@@ -0,0 +1,88 @@
+"""
+Tests for routing chat turns to the small or large Bedrock model.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+import metrics
+import routers.chat as chat_router
+from services.agent import tier_model_id
+from services.model_router import TierDecision, choose_tier, classify_turn
+
+
+@pytest.mark.parametrize("message, decision", [
+    ("thanks!", TierDecision("small", "chat")),
+    ("What about walking?", TierDecision("small", "single_tool")),
+    ("How much is milk at Coles?", TierDecision("small", "single_tool")),
+    ("Add milk and check fuel", TierDecision("large", "multi_tool")),
+    ("Find the nearest Coles and give me driving directions", TierDecision("large", "multi_tool")),
+    ("Plan the best day to fill up", TierDecision("large", "planning")),
+    ("word " * 41, TierDecision("large", "long")),
+])
+def test_classify_turn(message, decision):
+    assert classify_turn(message) == decision
+
+
+def test_override_wins_over_classifier():
+    assert choose_tier("thanks", "large") == TierDecision("large", "override")
+    assert choose_tier("thanks", "auto") == TierDecision("small", "chat")
+
+
+def test_tier_model_ids(monkeypatch):
+    for name in ("BEDROCK_MODEL_ID", "BEDROCK_SMALL_MODEL_ID", "BEDROCK_LARGE_MODEL_ID"):
+        monkeypatch.delenv(name, raising=False)
+    assert (tier_model_id("small"), tier_model_id("large")) == ("amazon.nova-lite-v1:0", "amazon.nova-pro-v1:0")
+
+    monkeypatch.setenv("BEDROCK_MODEL_ID", "fake")
+    assert tier_model_id("large") == "fake"
+
+    monkeypatch.setenv("BEDROCK_LARGE_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
+    assert tier_model_id("large") == "anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+
+def _chat(client, message, session_id=None, **extra):
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = client.post("/chat", json={
+            "message": message, "shoppingList": [], "sessionId": session_id, **extra,
+        })
+    assert response.status_code == 200
+    session_id = response.json()["sessionId"]
+    return session_id, chat_router._sessions[session_id]["agent"]
+
+
+def test_turns_switch_tier_and_keep_history(fake_agent, client):
+    small_turns = metrics.CHAT_MODEL_TIER_DURATION.count(tier="small")
+
+    session_id, agent = _chat(client, "Add milk and check fuel")
+    assert agent.model.get_config()["model_id"] == "fake-large"
+    history = len(agent.messages)
+
+    _, same_agent = _chat(client, "thanks", session_id)
+
+    assert same_agent is agent
+    assert agent.model.get_config()["model_id"] == "fake-small"
+    assert len(agent.messages) > history
+    assert metrics.CHAT_MODEL_TIER_DURATION.count(tier="small") == small_turns + 1
+    assert metrics.CHAT_MODEL_TIER_TURNS.value(tier="large", reason="multi_tool") >= 1
+    root = client.get(f"/debug/trace/{session_id}").json()["turns"][-1]["spans"][0]
+    assert root["attributes"]["model.tier"] == "small"
+
+
+def test_session_override_sticks_until_auto(fake_agent, client):
+    session_id, agent = _chat(client, "thanks", modelTier="large")
+    assert agent.model.get_config()["model_id"] == "fake-large"
+
+    _chat(client, "thanks again", session_id)
+    assert agent.model.get_config()["model_id"] == "fake-large"
+
+    _chat(client, "thanks again", session_id, modelTier="auto")
+    assert agent.model.get_config()["model_id"] == "fake-small"
+
+
+def test_unknown_tier_is_rejected(client):
+    response = client.post("/chat", json={"message": "hi", "modelTier": "huge"})
+
+    assert response.status_code == 400
@@ -0,0 +1,123 @@
+"""
+Tests for the tool cache and speculative location prefetch.
+"""
+
+import contextlib
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import metrics
+from services import prefetch, tool_cache
+from services.strands_tools.fuel_lookup import lookup_fuel_prices
+
+HOME = "UNSW Sydney, Kensington NSW 2052"
+
+
+def test_concurrent_calls_share_one_fetch():
+    tool_cache.clear()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"ok": True}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(tool_cache.cached_call, "test", "k", fetch, prefetch=True)
+        started.wait(5)
+        joined = [pool.submit(tool_cache.cached_call, "test", "k", fetch) for _ in range(3)]
+        release.set()
+
+    assert [f.result() for f in [first, *joined]] == [{"ok": True}] * 4
+    assert len(calls) == 1
+    assert metrics.TOOL_CACHE_LOOKUPS.value(cache="test", outcome="joined") >= 3
+
+
+def test_errors_are_not_cached():
+    tool_cache.clear()
+    results = iter([{"error": "upstream down"}, {"stations": []}])
+
+    def fetch():
+        return next(results)
+
+    def lookup():
+        return tool_cache.cached_call("test", "err", fetch, cacheable=lambda r: "error" not in r)
+
+    assert lookup() == {"error": "upstream down"}
+    assert lookup() == {"stations": []}
+    assert lookup() == {"stations": []}
+
+
+def test_expired_prefetch_counts_as_wasted(monkeypatch):
+    tool_cache.clear()
+    monkeypatch.setitem(tool_cache.TTL_SECONDS, "stale", -1)
+    wasted = metrics.PREFETCH_WASTED.value(cache="stale")
+
+    tool_cache.cached_call("stale", "k", lambda: 1, prefetch=True)
+    tool_cache.cached_call("stale", "k", lambda: 2)
+
+    assert metrics.PREFETCH_WASTED.value(cache="stale") == wasted + 1
+
+
+def test_lookups_inside_a_prefetch_are_not_tool_calls():
+    tool_cache.clear()
+    before = {
+        "misses": metrics.TOOL_CACHE_LOOKUPS.value(cache="inner", outcome="miss"),
+        "hits": metrics.TOOL_CACHE_LOOKUPS.value(cache="inner", outcome="hit"),
+        "used": metrics.PREFETCH_USED.value(cache="inner"),
+        "requests": metrics.PREFETCH_REQUESTS.value(cache="inner"),
+    }
+
+    tool_cache.cached_call("inner", "k", lambda: 1, prefetch=True)
+    tool_cache.cached_call("outer", "k", lambda: tool_cache.cached_call("inner", "k", lambda: 2), prefetch=True)
+    tool_cache.cached_call("outer", "other", lambda: tool_cache.cached_call("inner", "new", lambda: 3), prefetch=True)
+
+    assert metrics.TOOL_CACHE_LOOKUPS.value(cache="inner", outcome="miss") == before["misses"]
+    assert metrics.TOOL_CACHE_LOOKUPS.value(cache="inner", outcome="hit") == before["hits"]
+    assert metrics.PREFETCH_USED.value(cache="inner") == before["used"]
+    assert metrics.PREFETCH_REQUESTS.value(cache="inner") == before["requests"] + 2
+
+
+def test_prefetched_lookups_answer_tool_calls(fake_agent):
+    used = metrics.PREFETCH_USED.value(cache="fuel_prices")
+
+    futures = prefetch.start("session-1", HOME)
+    wait(futures, timeout=10)
+    result = lookup_fuel_prices(HOME.upper())
+
+    assert result["stations"]
+    assert metrics.PREFETCH_USED.value(cache="fuel_prices") == used + 1
+    assert metrics.PREFETCH_REQUESTS.value(cache="geocode") >= 1
+    assert 0 < metrics.prefetch_hit_rate("fuel_prices") <= 1
+    assert prefetch.start("session-1", HOME) is futures  # same address: nothing new
+
+
+def test_prefetch_is_cancellable(monkeypatch):
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(prefetch, "_executor", executor)
+    monkeypatch.setattr(prefetch, "PREFETCHES", {name: lambda address: release.wait(5) for name in "abc"})
+
+    futures = prefetch.start("session-2", HOME)
+    cancelled = prefetch.cancel("session-2")
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert cancelled == 2
+    assert sum(f.cancelled() for f in futures) == 2
+
+
+def test_new_chat_session_prefetches(fake_agent, client):
+    hits = sum(
+        metrics.TOOL_CACHE_LOOKUPS.value(cache="fuel_prices", outcome=outcome) for outcome in ("hit", "joined")
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.post("/chat", json={"message": "Add milk and check fuel", "homeAddress": HOME})
+
+    assert sum(
+        metrics.TOOL_CACHE_LOOKUPS.value(cache="fuel_prices", outcome=outcome) for outcome in ("hit", "joined")
+    ) == hits + 1
@@ -0,0 +1,89 @@
+"""
+Tests for Bedrock prompt-cache checkpoints and per-turn token accounting.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+import metrics
+import routers.chat as chat_router
+import services.agent as agent
+from services.agent import SYSTEM_PROMPT, prompt_cache_config, prompt_cache_sections
+from stubs.fake_bedrock import FakeBedrockModel
+
+TOOL_SPEC = {"name": "manage_list", "description": "Edit the list", "inputSchema": {"json": {"type": "object"}}}
+
+
+@pytest.mark.parametrize("model_id, sections", [
+    ("amazon.nova-lite-v1:0", {"system"}),
+    ("apac.amazon.nova-pro-v1:0", {"system"}),
+    ("anthropic.claude-3-5-haiku-20241022-v1:0", {"system", "tools"}),
+    ("us.anthropic.claude-sonnet-4-20250514-v1:0", {"system", "tools"}),
+    ("meta.llama3-70b-instruct-v1:0", set()),
+])
+def test_sections_by_model_family(model_id, sections, monkeypatch):
+    monkeypatch.delenv("BEDROCK_PROMPT_CACHE", raising=False)
+    assert prompt_cache_sections(model_id) == sections
+
+
+def test_env_overrides_model_table(monkeypatch):
+    monkeypatch.setenv("BEDROCK_PROMPT_CACHE", "off")
+    assert prompt_cache_config("anthropic.claude-3-5-haiku-20241022-v1:0") is None
+
+    monkeypatch.setenv("BEDROCK_PROMPT_CACHE", "system, tools")
+    config = prompt_cache_config("meta.llama3-70b-instruct-v1:0")
+    assert config.system_prompt_ttl is True and config.tools_ttl is True
+
+
+@pytest.mark.parametrize("model_id, tools_cached", [
+    ("amazon.nova-lite-v1:0", False),
+    ("anthropic.claude-3-5-haiku-20241022-v1:0", True),
+])
+def test_bedrock_request_has_checkpoints(model_id, tools_cached, monkeypatch):
+    monkeypatch.delenv("BEDROCK_PROMPT_CACHE", raising=False)
+    monkeypatch.setenv("BEDROCK_MODEL_ID", model_id)
+
+    request = agent._get_model().format_request(
+        [{"role": "user", "content": [{"text": "add milk"}]}],
+        [TOOL_SPEC],
+        system_prompt_content=[{"text": SYSTEM_PROMPT}],
+    )
+
+    assert request["system"] == [{"text": SYSTEM_PROMPT}, {"cachePoint": {"type": "default"}}]
+    assert ({"cachePoint": {"type": "default"}} in request["toolConfig"]["tools"]) is tools_cached
+
+
+def _cached_model(tier="small"):
+    model = FakeBedrockModel()
+    model.update_config(cache_config=prompt_cache_config("anthropic.claude-3-5-haiku-20241022-v1:0"))
+    return model
+
+
+def _turn_usage(client, session_id=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = client.post("/chat", json={
+            "message": "Add milk and check fuel", "shoppingList": [], "sessionId": session_id,
+        })
+    session_id = response.json()["sessionId"]
+    return session_id, agent.turn_token_usage(chat_router._sessions[session_id]["agent"])
+
+
+def test_turn_accounts_cached_and_uncached_tokens(fake_agent, client, monkeypatch):
+    _, uncached = _turn_usage(client)
+
+    monkeypatch.setattr(agent, "_get_model", _cached_model)
+    reads_before = metrics.MODEL_INPUT_TOKENS.value(model="fake-bedrock", kind="cache_read")
+    session_id, first = _turn_usage(client)
+    _, second = _turn_usage(client, session_id)
+
+    assert uncached["cache_read"] == uncached["cache_write"] == 0
+    # The system prompt and tool specs move out of the uncached input
+    assert first["input"] < uncached["input"] / 2
+    assert first["cache_read"] + first["cache_write"] > 0
+    assert second["cache_write"] == 0 and second["cache_read"] > len(SYSTEM_PROMPT) // 4
+    assert metrics.MODEL_INPUT_TOKENS.value(model="fake-bedrock", kind="cache_read") > reads_before
+
+    trace = client.get(f"/debug/trace/{session_id}").json()["turns"][-1]
+    assert trace["spans"][0]["attributes"]["tokens.cache_read"] == second["cache_read"]
@@ -0,0 +1,110 @@
+"""
+Property-based tests for the vectorized route optimizer.
+
+Feature: closest-store route optimization
+Property: Vectorized scoring matches the scalar reference implementation
+"""
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from services.route_optimizer import (
+    build_route_candidates,
+    combine_groceries,
+    find_balanced_route,
+    find_balanced_route_reference,
+    haversine_distance,
+)
+
+
+# Demo data from closest-store.py (Footscray / Maidstone, VIC)
+START_LOC = (-37.7651, 144.9229)
+COLES = [
+    (-37.764632, 144.921957, 50),
+    (-37.775320, 144.886866, 50),
+    (-37.743837, 144.910707, 50),
+    (-37.782222, 144.915000, 50),
+    (-37.775, 144.887, 50),
+]
+WOOLWORTHS = [
+    (-37.767827, 144.921414, 45),
+    (-37.776000, 144.913000, 45),
+    (-37.770000, 144.916000, 45),
+    (-37.766, 144.922, 45),
+    (-37.782, 144.887, 45),
+]
+SERVOS = [
+    (-37.757668, 144.919842, 30),
+    (-37.771020, 144.925570, 27),
+    (-37.766000, 144.915000, 30),
+    (-37.765000, 144.914000, 50),
+    (-37.770000, 144.910000, 23),
+]
+
+
+# Points within roughly 20 km of Sydney CBD
+latitudes = st.floats(min_value=-34.05, max_value=-33.70, allow_nan=False)
+longitudes = st.floats(min_value=150.95, max_value=151.30, allow_nan=False)
+costs = st.floats(min_value=0, max_value=200, allow_nan=False).map(lambda c: round(c, 2))
+locations = st.tuples(latitudes, longitudes)
+sites = st.tuples(latitudes, longitudes, costs)
+
+
+@pytest.mark.parametrize("weight", [0, 0.25, 0.5, 0.75, 1])
+def test_demo_data_matches_reference(weight):
+    """The closest-store.py demo data gives identical answers from both implementations."""
+    expected = find_balanced_route_reference(START_LOC, COLES, WOOLWORTHS, SERVOS, weight=weight)
+    actual = find_balanced_route(START_LOC, COLES, WOOLWORTHS, SERVOS, weight=weight)
+    assert actual == expected
+
+
+def test_no_servos_returns_none():
+    """With nothing to pair against there is no route."""
+    assert find_balanced_route(START_LOC, COLES, WOOLWORTHS, []) is None
+    assert find_balanced_route_reference(START_LOC, COLES, WOOLWORTHS, []) is None
+
+
+@given(
+    address=locations,
+    coles=st.lists(sites, min_size=0, max_size=6),
+    woolworths=st.lists(sites, min_size=1, max_size=6),
+    servos=st.lists(sites, min_size=1, max_size=6),
+)
+@settings(max_examples=100, deadline=None)
+def test_property_candidate_matrix_matches_scalar(address, coles, woolworths, servos):
+    """
+    Every cell of the distance matrix equals the shorter of the two
+    scalar haversine routes for that (grocery, servo) pair.
+    """
+    groceries = combine_groceries(coles, woolworths)
+    candidates = build_route_candidates(address, groceries, servos)
+
+    assert candidates.distance.shape == (len(groceries), len(servos))
+
+    for i, grocery in enumerate(groceries):
+        for j, servo in enumerate(servos):
+            g, s = grocery[:2], servo[:2]
+            route1 = haversine_distance(address, g) + haversine_distance(g, s)
+            route2 = haversine_distance(address, s) + haversine_distance(s, g)
+            assert candidates.distance[i, j] == pytest.approx(min(route1, route2), abs=1e-9)
+            assert candidates.cost[i, j] == pytest.approx(grocery[2] + servo[2])
+
+
+@given(
+    address=locations,
+    coles=st.lists(sites, min_size=0, max_size=6),
+    woolworths=st.lists(sites, min_size=1, max_size=6),
+    servos=st.lists(sites, min_size=1, max_size=6),
+    weight=st.floats(min_value=0, max_value=1, allow_nan=False),
+)
+@settings(max_examples=100, deadline=None)
+def test_property_best_route_matches_reference(address, coles, woolworths, servos, weight):
+    """
+    The vectorized optimizer finds a route with the same weighted score as
+    the scalar reference. Near-exact ties may resolve to a different pair,
+    so only the score is compared.
+    """
+    expected = find_balanced_route_reference(address, coles, woolworths, servos, weight=weight)
+    actual = find_balanced_route(address, coles, woolworths, servos, weight=weight)
+
+    assert actual["weighted_score"] == pytest.approx(expected["weighted_score"], abs=1e-3)
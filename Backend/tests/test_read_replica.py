@@ -0,0 +1,124 @@
+"""
+Tests for read-replica routing in database.get_read_db.
+
+Replicas are simulated with separate SQLite files holding older data than
+the primary, which stands in for replica lag.
+"""
+
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import database
+from database import Base, configure_read_replicas, get_read_db
+from models.db_models import User, WeeklyPlan
+from services.historical_price_service import get_price_history_overview
+from services.leaderboard_service import calculate_leaderboard
+from tests.conftest import TestAsyncSessionLocal
+
+
+def _make_replica(path, username):
+    """Create a SQLite file with one user on the leaderboard."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(User(user_id=f"{username}-id", name=username, weekly_budget=100.0, home_address="1 Replica Rd"))
+        db.add(WeeklyPlan(user_id=f"{username}-id", optimal_cost=80.0, actual_cost=90.0, optimization_score=0.1))
+        db.commit()
+    engine.dispose()
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+
+@pytest.fixture
+def primary(db_session, monkeypatch):
+    """The test database is the primary; it has one up-to-date user."""
+    db_session.add(User(user_id="fresh-id", name="Fresh Fran", weekly_budget=100.0, home_address="1 Primary St"))
+    db_session.add(WeeklyPlan(user_id="fresh-id", optimal_cost=80.0, actual_cost=70.0, optimization_score=0.3))
+    db_session.commit()
+    monkeypatch.setattr(database, "AsyncSessionLocal", TestAsyncSessionLocal)
+    yield
+    configure_read_replicas([])
+
+
+async def _leaderboard_names():
+    gen = get_read_db()
+    db = await gen.__anext__()
+    try:
+        return [entry.username for entry in await calculate_leaderboard(db)]
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_without_replicas_reads_use_primary(primary):
+    configure_read_replicas([])
+    assert await _leaderboard_names() == ["Fresh Fran"]
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(primary, tmp_path):
+    configure_read_replicas([_make_replica(tmp_path / "replica.db", "Stale Sam")])
+    assert await _leaderboard_names() == ["Stale Sam"]
+
+
+@pytest.mark.asyncio
+async def test_replicas_are_used_round_robin(primary, tmp_path):
+    configure_read_replicas([
+        _make_replica(tmp_path / "a.db", "Replica A"),
+        _make_replica(tmp_path / "b.db", "Replica B"),
+    ])
+    names = [(await _leaderboard_names())[0] for _ in range(4)]
+    assert names == ["Replica A", "Replica B", "Replica A", "Replica B"]
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_falls_back_to_primary(primary, tmp_path):
+    configure_read_replicas([f"sqlite:///file:{tmp_path}/missing.db?mode=ro&uri=true"])
+
+    assert await _leaderboard_names() == ["Fresh Fran"]
+    assert database._read_replicas[0]["down_until"] > time.monotonic()
+
+
+@pytest.mark.asyncio
+async def test_replica_is_retried_after_cooldown(primary, tmp_path):
+    path = tmp_path / "late.db"
+    configure_read_replicas([f"sqlite:///file:{path}?mode=ro&uri=true"])
+    assert await _leaderboard_names() == ["Fresh Fran"]
+
+    # Replica comes back; it's skipped until the cooldown ends
+    _make_replica(path, "Late Lou")
+    assert await _leaderboard_names() == ["Fresh Fran"]
+
+    database._read_replicas[0]["down_until"] = 0.0
+    assert await _leaderboard_names() == ["Late Lou"]
+
+
+@pytest.mark.asyncio
+async def test_replica_sessions_reject_writes(primary, tmp_path):
+    configure_read_replicas([_make_replica(tmp_path / "replica.db", "Stale Sam").replace("mode=ro", "mode=rw")])
+
+    gen = get_read_db()
+    db = await gen.__anext__()
+    try:
+        with pytest.raises(OperationalError):
+            await db.execute(text("DELETE FROM weekly_plans"))
+    finally:
+        await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_price_history_overview(seed_demo_data, async_db_session):
+    overview = await get_price_history_overview(async_db_session)
+
+    assert overview["total_records"] > 0
+    assert "Milk (1L)" in overview["items_available"]
+    assert len(overview["sample_data"]["Milk (1L)"]) == 3
+
+
+def test_debug_price_history_endpoint(client, seed_demo_data):
+    response = client.get("/debug/historical-prices")
+    assert response.status_code == 200
+    assert response.json()["total_records"] > 0
@@ -0,0 +1,150 @@
+"""
+Tests for the cost/distance Pareto frontier and the /transport/routes endpoint.
+"""
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from services.route_optimizer import (
+    best_weighted_route,
+    build_route_candidates,
+    combine_groceries,
+    pareto_frontier,
+)
+from services import route_service
+from services.route_service import clear_frontier_cache, get_route_frontier
+from services.spatial_index import GridIndex
+from exceptions import ValidationError
+from tests.test_property_route_optimizer import START_LOC, COLES, WOOLWORTHS, SERVOS
+
+
+latitudes = st.floats(min_value=-34.05, max_value=-33.70, allow_nan=False)
+longitudes = st.floats(min_value=150.95, max_value=151.30, allow_nan=False)
+# Whole-dollar costs so ties on cost are common
+costs = st.integers(min_value=0, max_value=60).map(float)
+sites = st.tuples(latitudes, longitudes, costs)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_frontier_cache()
+    yield
+    clear_frontier_cache()
+
+
+@given(
+    address=st.tuples(latitudes, longitudes),
+    groceries=st.lists(sites, min_size=1, max_size=6),
+    servos=st.lists(sites, min_size=1, max_size=6),
+)
+@settings(max_examples=100, deadline=None)
+def test_property_frontier_is_exactly_the_non_dominated_set(address, groceries, servos):
+    """
+    Every frontier route is undominated, and every undominated
+    (cost, distance) pair appears on the frontier exactly once.
+    """
+    candidates = build_route_candidates(address, combine_groceries(groceries, []), servos)
+    frontier = pareto_frontier(candidates)
+
+    points = list(zip(candidates.cost.ravel().tolist(), candidates.distance.ravel().tolist()))
+    undominated = {
+        (c, d) for c, d in points
+        if not any(c2 <= c and d2 <= d and (c2, d2) != (c, d) for c2, d2 in points)
+    }
+    on_frontier = list(zip(frontier.cost.tolist(), frontier.distance.tolist()))
+
+    assert set(on_frontier) == undominated
+    assert len(on_frontier) == len(undominated)
+    assert on_frontier == sorted(on_frontier)
+
+
+@given(
+    address=st.tuples(latitudes, longitudes),
+    groceries=st.lists(sites, min_size=1, max_size=6),
+    servos=st.lists(sites, min_size=1, max_size=6),
+    weight=st.floats(min_value=0, max_value=1, allow_nan=False),
+)
+@settings(max_examples=100, deadline=None)
+def test_property_frontier_select_matches_full_scan(address, groceries, servos, weight):
+    """Selecting from the frontier gives the same score as scoring all candidates."""
+    candidates = build_route_candidates(address, combine_groceries(groceries, []), servos)
+
+    expected = best_weighted_route(candidates, weight)
+    actual = pareto_frontier(candidates).select(weight)
+
+    assert actual["weighted_score"] == pytest.approx(expected["weighted_score"], abs=1e-3)
+
+
+def test_frontier_is_cached_per_location():
+    """A repeat request for the same location returns the cached frontier."""
+    first = get_route_frontier(START_LOC, COLES, WOOLWORTHS, SERVOS)
+    again = get_route_frontier((START_LOC[0] + 1e-6, START_LOC[1]), COLES, WOOLWORTHS, SERVOS)
+    elsewhere = get_route_frontier((-33.8688, 151.2093), COLES, WOOLWORTHS, SERVOS)
+
+    assert again is first
+    assert elsewhere is not first
+
+
+def test_spatial_indexes_are_shared_across_origins(monkeypatch):
+    """Pruned lookups from different origins reuse one index per candidate set."""
+    monkeypatch.setattr(route_service, "PRUNE_MIN_PAIRS", 1)
+    built = []
+    monkeypatch.setattr(route_service, "GridIndex", lambda sites: built.append(sites) or GridIndex(sites))
+
+    here = get_route_frontier(START_LOC, COLES, WOOLWORTHS, SERVOS)
+    there = get_route_frontier((-33.8688, 151.2093), COLES, WOOLWORTHS, SERVOS)
+
+    assert len(built) == 2
+    assert here.candidate_count == there.candidate_count == (len(COLES) + len(WOOLWORTHS)) * len(SERVOS)
+
+
+def test_frontier_requires_a_grocery_store():
+    with pytest.raises(ValidationError):
+        get_route_frontier(START_LOC, [], [], SERVOS)
+
+
+def _payload(**overrides):
+    def to_sites(items):
+        return [{"latitude": lat, "longitude": lon, "cost": cost} for lat, lon, cost in items]
+
+    payload = {
+        "origin": {"latitude": START_LOC[0], "longitude": START_LOC[1]},
+        "coles": to_sites(COLES),
+        "woolworths": to_sites(WOOLWORTHS),
+        "servos": to_sites(SERVOS),
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_routes_endpoint_returns_frontier(client):
+    """POST /transport/routes returns frontier routes cheapest first."""
+    response = client.post("/transport/routes", json=_payload())
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["candidate_count"] == 50
+    assert data["recommended"] is None
+    costs_on_front = [r["total_cost"] for r in data["routes"]]
+    distances_on_front = [r["total_distance_km"] for r in data["routes"]]
+    assert costs_on_front == sorted(costs_on_front)
+    assert distances_on_front == sorted(distances_on_front, reverse=True)
+    assert costs_on_front[0] == data["min_cost"]
+    assert distances_on_front[-1] == data["min_distance_km"]
+
+
+def test_routes_endpoint_recommends_for_weight(client):
+    """A weight picks the same route as the single-weight optimizer."""
+    response = client.post("/transport/routes", json=_payload(weight=0.5))
+    assert response.status_code == 200
+
+    recommended = response.json()["recommended"]
+    assert recommended["grocery_type"] == "Woolworths"
+    assert recommended["total_cost"] == 68.0
+    assert recommended["weighted_score"] == 0.066
+
+
+def test_routes_endpoint_without_stores_is_400(client):
+    response = client.post("/transport/routes", json=_payload(coles=[], woolworths=[]))
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "VALIDATION_ERROR"
@@ -0,0 +1,164 @@
+"""
+Tests for the batched route matrix service.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+import services.route_matrix_service as route_matrix_service
+from services.route_matrix_service import (
+    ROAD_DETOUR_FACTOR,
+    clear_route_matrix_cache,
+    compute_route_matrix,
+)
+from services.route_optimizer import haversine_distance
+
+
+HOME = "-33.9173,151.2313"
+COLES = "-33.9110,151.2250"
+WOOLWORTHS = "-33.9145,151.2417"
+ALDI = "-33.9200,151.2400"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    clear_route_matrix_cache()
+    monkeypatch.setattr(route_matrix_service, "_API_KEY", "test-key")
+    yield
+    clear_route_matrix_cache()
+
+
+def _mock_client(post):
+    """Patch httpx.Client so every POST goes to *post(json) -> elements*."""
+    calls = []
+
+    def fake_post(url, headers=None, json=None):
+        calls.append(json)
+        response = MagicMock()
+        response.json.return_value = post(json)
+        response.raise_for_status = MagicMock()
+        return response
+
+    client = MagicMock()
+    client.post.side_effect = fake_post
+    client.__enter__.return_value = client
+    return patch("httpx.Client", return_value=client), calls
+
+
+def _elements(body):
+    """Fake Google response: distance grows with origin and destination index."""
+    return [
+        {
+            "originIndex": i,
+            "destinationIndex": j,
+            "condition": "ROUTE_EXISTS",
+            "distanceMeters": 1000 * (i + 1) + 100 * j,
+            "duration": f"{60 * (i + 1) + j}s",
+        }
+        for i in range(len(body["origins"]))
+        for j in range(len(body["destinations"]))
+    ]
+
+
+def test_whole_matrix_in_one_request():
+    patcher, calls = _mock_client(_elements)
+    with patcher:
+        result = compute_route_matrix([HOME, "1 George St, Sydney"], [COLES, WOOLWORTHS, ALDI])
+
+    assert len(calls) == 1
+    assert result["upstream_elements"] == 6
+    assert result["rows"][1][2]["distance_metres"] == 2200
+    assert result["rows"][1][2]["source"] == "google"
+    assert calls[0]["origins"][1] == {"waypoint": {"address": "1 George St, Sydney"}}
+    assert calls[0]["destinations"][0]["waypoint"]["location"]["latLng"]["latitude"] == -33.9110
+    assert calls[0]["routingPreference"] == "TRAFFIC_AWARE"
+
+
+def test_partial_requery_only_fetches_missing_cells():
+    patcher, calls = _mock_client(_elements)
+    with patcher:
+        compute_route_matrix([HOME], [COLES, WOOLWORTHS])
+        result = compute_route_matrix([HOME], [COLES, WOOLWORTHS, ALDI])
+
+    assert len(calls) == 2
+    assert len(calls[1]["destinations"]) == 1
+    assert result["cache_hits"] == 2
+    assert result["upstream_elements"] == 1
+    assert [cell["source"] for cell in result["rows"][0]] == ["cache", "cache", "google"]
+
+
+def test_fully_cached_query_makes_no_request():
+    patcher, calls = _mock_client(_elements)
+    with patcher:
+        compute_route_matrix([HOME], [COLES, WOOLWORTHS])
+        result = compute_route_matrix(["[USER_HOME_ADDRESS=-33.9173,151.2313]"], [WOOLWORTHS])
+
+    assert len(calls) == 1
+    assert result["cache_hits"] == 1
+    assert result["upstream_elements"] == 0
+
+
+def test_offline_falls_back_to_estimate(monkeypatch):
+    monkeypatch.setattr(route_matrix_service, "_API_KEY", "")
+    result = compute_route_matrix([HOME], [COLES, "Coles Randwick"], "walking")
+
+    estimate, unplaced = result["rows"][0]
+    km = haversine_distance((-33.9173, 151.2313), (-33.9110, 151.2250)) * ROAD_DETOUR_FACTOR
+    assert result["travel_mode"] == "WALK"
+    assert estimate["source"] == "estimate"
+    assert estimate["distance_metres"] == pytest.approx(km * 1000, abs=1)
+    assert estimate["duration_seconds"] == pytest.approx(km / 5.0 * 3600, abs=1)
+    assert "error" in unplaced
+
+
+def test_upstream_failure_falls_back_and_is_not_cached():
+    def fail(body):
+        request = httpx.Request("POST", route_matrix_service.ROUTE_MATRIX_URL)
+        raise httpx.ConnectError("offline", request=request)
+
+    patcher, _ = _mock_client(fail)
+    with patcher:
+        result = compute_route_matrix([HOME], [COLES])
+
+    assert result["rows"][0][0]["source"] == "estimate"
+    assert result["estimated_cells"] == 1
+
+    patcher, calls = _mock_client(_elements)
+    with patcher:
+        result = compute_route_matrix([HOME], [COLES])
+    assert len(calls) == 1
+    assert result["rows"][0][0]["source"] == "google"
+
+
+def test_large_matrix_is_chunked(monkeypatch):
+    monkeypatch.setattr(route_matrix_service, "MAX_MATRIX_ELEMENTS", 4)
+    origins = [f"-33.9{i},151.2" for i in range(3)]
+    destinations = [f"-33.8{j},151.3" for j in range(3)]
+
+    patcher, calls = _mock_client(_elements)
+    with patcher:
+        result = compute_route_matrix(origins, destinations)
+
+    assert all(len(c["origins"]) * len(c["destinations"]) <= 4 for c in calls)
+    assert result["upstream_elements"] == 9
+    assert all(cell["source"] == "google" for row in result["rows"] for cell in row)
+
+
+def test_address_matrix_respects_waypoint_limit():
+    """Google takes at most 50 address waypoints per request, origins and destinations together."""
+    origins = [f"{n} George St, Sydney NSW 2000" for n in range(20)]
+    destinations = [f"{n} Anzac Pde, Kensington NSW 2033" for n in range(40)] + [COLES]
+
+    patcher, calls = _mock_client(_elements)
+    with patcher:
+        result = compute_route_matrix(origins, destinations)
+
+    def addresses(waypoints):
+        return sum("address" in w["waypoint"] for w in waypoints)
+
+    assert all(addresses(c["origins"]) + addresses(c["destinations"]) <= 50 for c in calls)
+    assert all(len(c["origins"]) * len(c["destinations"]) <= 625 for c in calls)
+    assert result["upstream_elements"] == 20 * 41
+    assert all(cell["source"] == "google" for row in result["rows"] for cell in row)
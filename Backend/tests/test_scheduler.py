@@ -0,0 +1,106 @@
+"""
+Tests for the in-process job scheduler.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from functools import partial
+
+import pytest
+
+import metrics
+from routers import chat
+from services import scheduler as scheduler_module
+from services.scheduler import CronSchedule, Scheduler
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture
+def locks_in_test_db(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "SessionLocal", TestSessionLocal)
+
+
+def test_cron_next_after():
+    weekdays = CronSchedule.parse("*/15 9-17 * * 1-5")
+    assert weekdays.next_after(datetime(2024, 6, 7, 17, 50)) == datetime(2024, 6, 10, 9, 0)  # Fri -> Mon
+    assert weekdays.next_after(datetime(2024, 6, 10, 9, 0, 30)) == datetime(2024, 6, 10, 9, 15)
+
+    monthly = CronSchedule.parse("0 3 1 * *")
+    assert monthly.next_after(datetime(2024, 12, 15)) == datetime(2025, 1, 1, 3, 0)
+    # Either day field matches when both are restricted
+    assert CronSchedule.parse("0 0 13 * 5").next_after(datetime(2024, 6, 1)) == datetime(2024, 6, 7)
+
+    for bad in ("* * * *", "60 * * * *", "*/0 * * * *", "0 0 30 2 *"):
+        with pytest.raises(ValueError):
+            CronSchedule.parse(bad).next_after(datetime(2024, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_interval_jobs_run_and_are_timed():
+    scheduler = Scheduler()
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("upstream down")
+
+    scheduler.add_interval("test_flaky", flaky, 0.01)
+    scheduler.add_interval("test_thread", lambda: time.sleep(0.001), 0.01, jitter=0.01)
+    scheduler.start()
+    await asyncio.sleep(0.2)
+    await scheduler.shutdown()
+
+    status = {job["name"]: job for job in scheduler.status()}
+    assert status["test_flaky"]["failures"] == 1 and status["test_flaky"]["runs"] >= 2
+    assert status["test_flaky"]["last_error"] is None
+    assert status["test_thread"]["runs"] >= 2 and status["test_thread"]["next_run"] is None
+    assert metrics.SCHEDULER_JOB_DURATION.count(job="test_flaky", outcome="error") >= 1
+    assert metrics.SCHEDULER_JOB_DURATION.count(job="test_thread", outcome="ok") >= 2
+
+
+@pytest.mark.asyncio
+async def test_single_instance_jobs_run_on_one_instance(locks_in_test_db):
+    first, second = Scheduler(owner="first"), Scheduler(owner="second")
+    for instance in (first, second):
+        instance.add_interval("test_locked", lambda: None, 60, single_instance=True)
+
+    assert await first.run_now("test_locked")
+    assert not await second.run_now("test_locked")
+    assert await first.run_now("test_locked")  # The holder renews its lease
+
+    await first.shutdown()  # Releases the lease
+    assert await second.run_now("test_locked")
+    assert second.jobs["test_locked"].skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_lets_running_jobs_finish_within_grace():
+    scheduler = Scheduler()
+    finished = []
+
+    async def slow(seconds):
+        await asyncio.sleep(seconds)
+        finished.append(seconds)
+
+    scheduler.add_interval("test_quick", partial(slow, 0.05), 0.01)
+    scheduler.add_interval("test_stuck", partial(slow, 10), 0.01)
+    scheduler.add_interval("test_idle", lambda: None, 60)
+    scheduler.start()
+    await asyncio.sleep(0.03)
+
+    started = time.perf_counter()
+    await scheduler.shutdown(grace=0.2)
+
+    assert time.perf_counter() - started < 1
+    assert 0.05 in finished and 10 not in finished
+    assert scheduler.jobs["test_idle"].runs == 0
+
+
+def test_session_cleanup_evicts_idle_sessions(monkeypatch):
+    monkeypatch.setitem(chat._sessions, "idle", {"last_used": time.time() - chat.SESSION_TTL_SECONDS - 1})
+    monkeypatch.setitem(chat._sessions, "active", {"last_used": time.time()})
+
+    assert chat.cleanup_sessions() == 1
+    assert "idle" not in chat._sessions and "active" in chat._sessions
@@ -0,0 +1,65 @@
+"""
+Tests for loading demo data from the pre-built seed snapshot.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from models.db_models import HistoricalPriceData, User, WeeklyPlan
+from seed_data import SNAPSHOT_PATH, load_snapshot, regenerate_snapshot, seed_all
+
+
+def _counts(db):
+    return {
+        model.__tablename__: db.scalar(select(func.count()).select_from(model))
+        for model in (HistoricalPriceData, User, WeeklyPlan)
+    }
+
+
+def test_snapshot_matches_seed_all(db_session):
+    """The committed snapshot holds exactly what seed_all would create."""
+    assert load_snapshot(db_session)
+    loaded = _counts(db_session)
+
+    for model in (WeeklyPlan, User, HistoricalPriceData):
+        db_session.query(model).delete()
+    db_session.commit()
+    seed_all(db_session)
+
+    assert loaded == _counts(db_session)
+
+
+def test_snapshot_dates_are_shifted_to_now(db_session, tmp_path):
+    """Price history always ends today, however old the snapshot file is."""
+    snapshot = json.loads(SNAPSHOT_PATH.read_text())
+    old = datetime.fromisoformat(snapshot["generated_at"]) - timedelta(days=365)
+    snapshot["generated_at"] = old.isoformat()
+    for row in snapshot["tables"]["historical_price_data"]["rows"]:
+        row[3] = (datetime.fromisoformat(row[3]) - timedelta(days=365)).isoformat()
+    path = tmp_path / "old_snapshot.json"
+    path.write_text(json.dumps(snapshot))
+
+    assert load_snapshot(db_session, path, tables=("historical_price_data",))
+
+    newest = db_session.scalar(select(func.max(HistoricalPriceData.recorded_date)))
+    oldest = db_session.scalar(select(func.min(HistoricalPriceData.recorded_date)))
+    assert datetime.utcnow() - newest < timedelta(days=1)
+    assert datetime.utcnow() - oldest < timedelta(days=29)
+    assert db_session.scalar(select(func.count()).select_from(User)) == 0
+
+
+def test_missing_snapshot_is_reported(db_session, tmp_path):
+    assert load_snapshot(db_session, tmp_path / "nope.json") is False
+
+
+def test_regeneration_is_deterministic(tmp_path):
+    first, second = tmp_path / "a.json", tmp_path / "b.json"
+    counts = regenerate_snapshot(first)
+    regenerate_snapshot(second)
+
+    a, b = json.loads(first.read_text()), json.loads(second.read_text())
+    prices = lambda s: [row[:3] for row in s["tables"]["historical_price_data"]["rows"]]
+    assert prices(a) == prices(b)
+    assert counts == {"historical_price_data": 420, "users": 22, "weekly_plans": 63}
@@ -0,0 +1,140 @@
+"""
+Tests for server-side shopping lists and the delta sync protocol.
+"""
+
+import contextlib
+import io
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import database
+from models.db_models import ShoppingList
+from services import shopping_list_store
+from services.shopping_list_store import apply_ops, diff_ops
+
+MILK = {"name": "Milk", "quantity": 2, "price": 3.1}
+BREAD = {"name": "Bread", "quantity": 1, "price": 2.6}
+EGGS = {"name": "Eggs", "quantity": 12}
+
+
+def _onboard(client) -> str:
+    response = client.post("/onboard", json={
+        "name": "Sam Student", "weekly_budget": 120, "home_address": "UNSW Sydney, Kensington NSW 2052",
+    })
+    return response.json()["user_id"]
+
+
+_items = st.dictionaries(
+    st.sampled_from(["milk", "bread", "eggs", "rice", "apples"]),
+    st.fixed_dictionaries({"quantity": st.integers(1, 5), "price": st.sampled_from([0, 1.5, 3.1])}),
+).map(lambda d: [{"name": name.title(), **fields} for name, fields in d.items()])
+
+
+@settings(max_examples=100, deadline=None)
+@given(before=_items, after=_items)
+def test_property_diff_ops_round_trip(before, after):
+    assert sorted(apply_ops(before, diff_ops(before, after)), key=str) == sorted(after, key=str)
+
+
+def test_ops_match_names_case_insensitively():
+    ops = [{"op": "upsert", "item": {"name": "MILK", "quantity": 5}}, {"op": "remove", "name": "bread"}]
+
+    assert apply_ops([MILK, BREAD], ops) == [{"name": "MILK", "quantity": 5}]
+    assert diff_ops([MILK, BREAD], []) == [{"op": "clear"}]
+
+
+def test_sync_over_rest(client):
+    user_id = _onboard(client)
+
+    assert client.get(f"/shopping-list/{user_id}").json() == {"user_id": user_id, "version": 0, "items": []}
+
+    edit = client.post(f"/shopping-list/{user_id}/ops", json={
+        "ops": [{"op": "upsert", "item": MILK}, {"op": "upsert", "item": BREAD}], "since": 0,
+    }).json()
+    assert edit["version"] == 1 and len(edit["ops"]) == 2
+
+    client.post(f"/shopping-list/{user_id}/ops", json={"ops": [{"op": "remove", "name": "bread"}]})
+    assert client.get(f"/shopping-list/{user_id}", params={"since": 1}).json()["ops"] == [
+        {"op": "remove", "name": "Bread"},
+    ]
+    assert client.get(f"/shopping-list/{user_id}", params={"since": 2}).json()["ops"] == []
+
+    # A fresh cache reloads from the database, without the op history
+    shopping_list_store.evict(user_id)
+    reloaded = client.get(f"/shopping-list/{user_id}", params={"since": 1}).json()
+    assert reloaded == {"user_id": user_id, "version": 2, "items": [MILK]}
+
+
+def test_rest_errors(client):
+    user_id = _onboard(client)
+
+    assert client.get("/shopping-list/no-such-user").status_code == 404
+    response = client.post(f"/shopping-list/{user_id}/ops", json={"ops": [{"op": "rename"}]})
+    assert response.status_code == 400
+
+
+def test_chat_fast_path_uses_stored_list(client):
+    user_id = _onboard(client)
+    client.post(f"/shopping-list/{user_id}/ops", json={"ops": [{"op": "upsert", "item": BREAD}]})
+
+    data = client.post("/chat", json={"message": "add 2 milk", "userId": user_id, "listVersion": 1}).json()
+
+    assert data["updatedList"] == []
+    assert data["listVersion"] == 2
+    assert data["listOps"] == [{"op": "upsert", "item": {"name": "Milk", "quantity": 2}}]
+    shopping_list_store.evict(user_id)
+    assert client.get(f"/shopping-list/{user_id}").json()["items"] == [BREAD, {"name": "Milk", "quantity": 2}]
+
+
+def test_manage_list_edits_stored_list(fake_agent, client):
+    user_id = _onboard(client)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = client.post("/chat", json={
+            "message": "Add milk and check fuel",
+            "userId": user_id,
+            "shoppingList": [BREAD],  # seeds the empty stored list
+            "listOps": [{"op": "upsert", "item": {**BREAD, "quantity": 3}}],
+        }).json()
+
+    names = [item["name"] for item in data["updatedList"]]
+    assert names == ["Bread", "Milk"] and data["updatedList"][0]["quantity"] == 3
+    assert client.get(f"/shopping-list/{user_id}").json()["version"] == data["listVersion"]
+
+
+def test_chat_without_user_id_does_not_touch_the_database(client, monkeypatch):
+    def unavailable():
+        raise AssertionError("chat opened a database session")
+
+    monkeypatch.setattr(database, "async_session", unavailable)
+
+    data = client.post("/chat", json={"message": "add 2 milk", "shoppingList": []}).json()
+
+    assert data["updatedList"] == [{"name": "Milk", "quantity": 2}]
+
+
+@pytest.mark.asyncio
+async def test_workers_do_not_overwrite_each_others_lists(client, async_db_session):
+    user_id = _onboard(client)
+    client.post(f"/shopping-list/{user_id}/ops", json={"ops": [{"op": "upsert", "item": BREAD}]})
+
+    # Another worker saves version 2 with milk added, behind this worker's cache
+    row = await async_db_session.get(ShoppingList, user_id)
+    row.items, row.version = [BREAD, MILK], 2
+    await async_db_session.commit()
+
+    # Reads see the other worker's list...
+    assert client.get(f"/shopping-list/{user_id}").json()["items"] == [BREAD, MILK]
+
+    # ...and a write racing with it is replayed on top, not dropped
+    row.items, row.version = [BREAD, MILK, EGGS], 3
+    await async_db_session.commit()
+    shopping_list_store.apply(user_id, [{"op": "remove", "name": "Bread"}])
+    await shopping_list_store.flush(async_db_session, user_id)
+
+    async_db_session.expire_all()
+    saved = await async_db_session.get(ShoppingList, user_id)
+    assert saved.version == 4 and saved.items == [MILK, EGGS]
+    assert shopping_list_store.cached(user_id).items == [MILK, EGGS]
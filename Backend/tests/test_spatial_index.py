@@ -0,0 +1,124 @@
+"""
+Tests for the grid spatial index and spatially pruned route frontier.
+"""
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from services.route_optimizer import (
+    build_route_candidates,
+    farthest_servos,
+    haversine_distance,
+    longest_trip,
+    pareto_frontier,
+    pruned_pareto_frontier,
+)
+from services.spatial_index import GridIndex, frontier_distance_bound
+
+
+# Anywhere in NSW
+latitudes = st.floats(min_value=-37.5, max_value=-28.2, allow_nan=False)
+longitudes = st.floats(min_value=141.0, max_value=153.6, allow_nan=False)
+locations = st.tuples(latitudes, longitudes)
+costs = st.integers(min_value=0, max_value=60).map(float)
+sites = st.tuples(latitudes, longitudes, costs)
+cell_sizes = st.sampled_from([0.05, 0.5, 2.0])
+
+
+@given(origin=locations, points=st.lists(sites, min_size=1, max_size=40), cell=cell_sizes)
+@settings(max_examples=100, deadline=None)
+def test_property_cell_bound_never_exceeds_true_distance(origin, points, cell):
+    """The nearest-point bound of a cell is a lower bound for every point in it."""
+    index = GridIndex(points, cell_degrees=cell)
+    bounds = index.cell_lower_bounds(origin)
+
+    for c in range(index.cell_count):
+        for i in index.order[index.starts[c]:index.starts[c + 1]]:
+            assert bounds[c] <= haversine_distance(origin, points[i][:2]) + 1e-9
+
+
+@given(
+    origin=locations,
+    points=st.lists(sites, min_size=0, max_size=40),
+    k=st.integers(min_value=1, max_value=10),
+    cell=cell_sizes,
+)
+@settings(max_examples=100, deadline=None)
+def test_property_nearest_matches_brute_force(origin, points, k, cell):
+    """nearest() returns the same distances as sorting every point."""
+    index = GridIndex(points, cell_degrees=cell)
+    found = index.nearest(origin, k)
+
+    expected = sorted(haversine_distance(origin, p[:2]) for p in points)[:k]
+    actual = [haversine_distance(origin, points[i][:2]) for i in found]
+    assert actual == pytest.approx(expected, abs=1e-9)
+
+
+@given(
+    origin=locations,
+    groceries=st.lists(sites.map(lambda s: s + ("Coles",)), min_size=1, max_size=25),
+    servos=st.lists(sites, min_size=1, max_size=25),
+    seed_k=st.integers(min_value=1, max_value=4),
+    cell=cell_sizes,
+)
+@settings(max_examples=100, deadline=None)
+def test_property_pruned_frontier_matches_brute_force(origin, groceries, servos, seed_k, cell):
+    """Pruning never drops a (cost, distance) point from the frontier."""
+    full = pareto_frontier(build_route_candidates(origin, groceries, servos))
+    pruned = pruned_pareto_frontier(
+        origin,
+        groceries,
+        servos,
+        grocery_index=GridIndex(groceries, cell_degrees=cell),
+        servo_index=GridIndex(servos, cell_degrees=cell),
+        seed_k=seed_k,
+        farthest=farthest_servos(groceries, servos, cell_degrees=cell),
+    )
+
+    assert pruned.cost.tolist() == full.cost.tolist()
+    assert pruned.distance.tolist() == pytest.approx(full.distance.tolist(), abs=1e-9)
+    # Scores don't depend on pruning: bounds and count cover every pair
+    assert pruned.candidate_count == full.candidate_count
+    assert pruned.select(0.3) == full.select(0.3)
+    for bound in ("min_distance", "max_distance", "min_cost", "max_cost"):
+        assert getattr(pruned, bound) == pytest.approx(getattr(full, bound), abs=1e-9)
+
+
+@given(
+    origin=locations,
+    groceries=st.lists(sites.map(lambda s: s + ("Coles",)), min_size=1, max_size=40),
+    servos=st.lists(sites, min_size=1, max_size=40),
+    block_rows=st.integers(min_value=1, max_value=8),
+    cell=cell_sizes,
+)
+@settings(max_examples=100, deadline=None)
+def test_property_longest_trip_matches_brute_force(origin, groceries, servos, block_rows, cell):
+    """Stopping early on the per-cell bound still finds the longest trip."""
+    farthest = farthest_servos(groceries, servos, cell_degrees=cell)
+    expected = build_route_candidates(origin, groceries, servos).distance.max()
+
+    assert longest_trip(origin, groceries, servos, farthest, block_rows=block_rows) == expected
+
+
+def test_frontier_distance_bound_staircase():
+    """The bound is the shortest known distance at or below each cost."""
+    bound = frontier_distance_bound(np.array([10.0, 20.0, 30.0]), np.array([9.0, 5.0, 1.0]))
+
+    assert bound(5.0) == np.inf     # Nothing known this cheap
+    assert bound(10.0) == 9.0
+    assert bound(25.0) == 5.0
+    assert bound(99.0) == 1.0
+
+
+def test_pruning_skips_far_expensive_stores():
+    """Stores far away and no cheaper than a nearby one are never scored."""
+    home = (-33.8688, 151.2093)
+    near = [(-33.87, 151.21, 50.0, "Coles")]
+    far = [(-30.0 - i * 0.01, 150.0, 55.0, "Woolworths") for i in range(100)]
+    servos = [(-33.868, 151.208, 30.0), (-29.0, 150.0, 35.0)]
+
+    frontier = pruned_pareto_frontier(home, near + far, servos, seed_k=1)
+
+    assert frontier.scored_count == 1 and frontier.candidate_count == 202
+    assert [r["grocery_type"] for r in frontier.routes] == ["Coles"]
@@ -0,0 +1,82 @@
+"""
+Tests for the file-backed SQLite mode (WAL journaling and tuned pragmas).
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from database import sqlite_pragmas
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=0.1, isolation_level=None)
+    for pragma in sqlite_pragmas(file_backed=True):
+        conn.execute(pragma)
+    return conn
+
+
+def test_memory_database_only_enables_foreign_keys():
+    assert sqlite_pragmas(file_backed=False) == ["PRAGMA foreign_keys=ON"]
+
+
+def test_file_pragmas_are_applied(tmp_path):
+    conn = _connect(tmp_path / "app.db")
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+
+def test_reads_proceed_while_a_write_is_open(tmp_path):
+    writer = _connect(tmp_path / "app.db")
+    writer.execute("CREATE TABLE prices (item TEXT, price REAL)")
+    writer.execute("INSERT INTO prices VALUES ('Milk (1L)', 3.10)")
+
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO prices VALUES ('Bread (Loaf)', 3.80)")
+
+    # With a rollback journal this read would fail with "database is locked"
+    reader = _connect(tmp_path / "app.db")
+    assert reader.execute("SELECT COUNT(*) FROM prices").fetchone()[0] == 1
+
+    writer.execute("COMMIT")
+    assert reader.execute("SELECT COUNT(*) FROM prices").fetchone()[0] == 2
+
+
+def test_sqlite_path_selects_file_mode(tmp_path):
+    """SQLITE_PATH makes both engines use the tuned file database."""
+    script = textwrap.dedent("""
+        import asyncio
+        from sqlalchemy import text
+        import database
+
+        database.init_db(seed_demo_data=False)
+        with database.engine.connect() as conn:
+            print(conn.execute(text("PRAGMA journal_mode")).scalar())
+
+        async def check():
+            async with database.async_engine.connect() as conn:
+                print((await conn.execute(text("PRAGMA synchronous"))).scalar())
+            await database.async_engine.dispose()
+
+        asyncio.run(check())
+        print(database.is_sqlite_file, type(database.engine.pool).__name__)
+    """)
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    env["SQLITE_PATH"] = str(tmp_path / "budget.db")
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["wal", "1", "True", "QueuePool"]
+    assert (tmp_path / "budget.db").exists()
@@ -0,0 +1,66 @@
+"""
+Tests for the local upstream stubs and the endpoint benchmark's regression
+check. The stubs and fake_agent fixtures live in conftest.py.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import services.strands_tools.fuel_lookup as fuel_lookup
+
+
+def test_fuel_lookup_against_stub(fake_agent):
+    result = fuel_lookup.lookup_fuel_prices(location="UNSW Sydney, Kensington NSW 2052")
+
+    assert result["fuel_type"] == "U91"
+    assert result["stations"][0]["name"] == "7-Eleven Kensington"
+    assert result["stations"][0]["price_dollars_per_litre"] == 1.749
+
+
+def test_chat_runs_scripted_turn(fake_agent, client):
+    response = client.post("/chat", json={
+        "message": "Add milk and check fuel",
+        "shoppingList": [],
+        "homeAddress": "UNSW Sydney, Kensington NSW 2052",
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["name"] for item in data["updatedList"]] == ["Milk"]
+    assert "7-Eleven Kensington" in data["reply"]
+
+
+def _benchmark_module():
+    path = Path(__file__).resolve().parent.parent / "scripts" / "benchmark_endpoints.py"
+    spec = importlib.util.spec_from_file_location("benchmark_endpoints", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_regression_check():
+    bench = _benchmark_module()
+    stats = {"requests": 2000, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "throughput_rps": 100.0, "errors": 0}
+    baseline = {"endpoints": {"leaderboard": stats}}
+
+    within = dict(stats, p95_ms=23.0, throughput_rps=85.0)
+    assert bench.compare_to_baseline({"endpoints": {"leaderboard": within}}, baseline, 0.2) == []
+
+    slower = dict(stats, p99_ms=40.0, throughput_rps=70.0)
+    regressions = bench.compare_to_baseline({"endpoints": {"leaderboard": slower}}, baseline, 0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("leaderboard p99_ms")
+
+
+def test_regression_check_allows_for_noise():
+    bench = _benchmark_module()
+    rounds = [([0.010] * 95 + [0.020] * 5, 0, 1.0), ([0.014] * 95 + [0.020] * 5, 0, 1.0)]
+    stats = bench.combine_rounds(rounds)
+    assert stats["requests"] == 200 and stats["p50_ms"] == 14.0
+    assert stats["spread"]["p50_ms"] == round(4 / 14, 3)
+
+    # p50 is within the baseline's spread; p99 of 200 requests isn't compared
+    slower = dict(stats, p50_ms=17.5, p99_ms=90.0)
+    assert bench.compare_to_baseline({"endpoints": {"chat": slower}}, {"endpoints": {"chat": stats}}, 0.2) == []
+    slower["p50_ms"] = 18.5
+    assert len(bench.compare_to_baseline({"endpoints": {"chat": slower}}, {"endpoints": {"chat": stats}}, 0.2)) == 1
@@ -0,0 +1,81 @@
+"""
+Tests for the synthetic data generator, plus leaderboard and price service
+benchmarks on the synthetic dataset.
+
+The benchmarks run on the small tier by default. For realistic sizes:
+
+    pytest tests/test_synthetic_data.py --synthetic-scale=large -s
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from models.db_models import HistoricalPriceData, User, WeeklyPlan
+from services.historical_price_service import get_historical_average
+from services.leaderboard_service import calculate_leaderboard
+from synthetic_data import SCALES, Scale, populate, table_counts
+
+
+TINY = Scale(users=30, plans_per_user=3, items=12, days=5)
+NOW = datetime(2026, 3, 1)
+
+
+def _dump(engine):
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.execute(select(model.__table__)).all()
+            for model in (User, WeeklyPlan, HistoricalPriceData)
+        }
+
+
+def _populated(scale=TINY, seed=1, batch_size=7):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    populate(engine, scale, seed, batch_size=batch_size, now=NOW)
+    return engine
+
+
+def test_counts_match_scale():
+    counts = table_counts(_populated())
+    assert counts == {"users": 30, "weekly_plans": 90, "historical_price_data": 12 * 5 * 3}
+
+
+def test_same_seed_gives_same_rows():
+    assert _dump(_populated(batch_size=7)) == _dump(_populated(batch_size=1000))
+
+
+def test_different_seed_gives_different_rows():
+    assert _dump(_populated(seed=1)) != _dump(_populated(seed=2))
+
+
+def test_plans_reference_generated_users():
+    with _populated().connect() as conn:
+        orphans = conn.execute(
+            select(WeeklyPlan.id).where(WeeklyPlan.user_id.not_in(select(User.user_id)))
+        ).all()
+    assert orphans == []
+
+
+@pytest.mark.asyncio
+async def test_benchmark_leaderboard(synthetic_async_db_session, synthetic_scale):
+    start = time.perf_counter()
+    leaderboard = await calculate_leaderboard(synthetic_async_db_session)
+    elapsed = time.perf_counter() - start
+
+    print(f"\ncalculate_leaderboard ({synthetic_scale}): {len(leaderboard):,} users in {elapsed * 1000:.1f} ms")
+    assert len(leaderboard) == SCALES[synthetic_scale].users
+    scores = [entry.average_score for entry in leaderboard]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_historical_average(synthetic_db_session, synthetic_scale):
+    start = time.perf_counter()
+    average = await get_historical_average(synthetic_db_session, "Milk (1L)")
+    elapsed = time.perf_counter() - start
+
+    print(f"\nget_historical_average ({synthetic_scale}): {elapsed * 1000:.1f} ms")
+    assert average == pytest.approx(5.00, rel=0.1)
@@ -0,0 +1,199 @@
+"""
+Tests for the multi-stop trip planner and the /transport/plan-trip endpoint.
+"""
+
+import itertools
+import time
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from exceptions import ValidationError
+from services.route_optimizer import haversine_distance
+from services.trip_planner import MAX_PLANNER_STOPS, plan_trip
+
+
+HOME = (-33.9173, 151.2313)
+ITEMS = ["Milk (1L)", "Bread (Loaf)", "Eggs (Dozen)"]
+
+
+def _brute_force_total(origin, items, stores, stations, fuel_litres, cost_per_km, return_home):
+    """Try every subset and permutation of stops; return the cheapest total."""
+    stops = list(stores) + (list(stations) if fuel_litres > 0 else [])
+    best = float("inf")
+    for r in range(1, len(stops) + 1):
+        for perm in itertools.permutations(range(len(stops)), r):
+            visited = [stops[i] for i in perm]
+            visited_stores = [s for s in visited if "prices" in s]
+            item_cost = 0.0
+            for item in items:
+                offers = [s["prices"][item] for s in visited_stores if item in s["prices"]]
+                if not offers:
+                    item_cost = float("inf")
+                    break
+                item_cost += min(offers)
+            fuel_cost = 0.0
+            if fuel_litres > 0:
+                offers = [s["price_per_litre"] for s in visited if "price_per_litre" in s]
+                fuel_cost = min(offers) * fuel_litres if offers else float("inf")
+
+            path = [origin] + [(s["latitude"], s["longitude"]) for s in visited]
+            if return_home:
+                path.append(origin)
+            km = sum(haversine_distance(a, b) for a, b in zip(path, path[1:]))
+            best = min(best, item_cost + fuel_cost + km * cost_per_km)
+    return best
+
+
+lat = st.floats(min_value=-33.95, max_value=-33.88, allow_nan=False)
+lon = st.floats(min_value=151.20, max_value=151.27, allow_nan=False)
+price = st.floats(min_value=1, max_value=15, allow_nan=False).map(lambda p: round(p, 2))
+
+
+@st.composite
+def store_lists(draw):
+    count = draw(st.integers(min_value=1, max_value=4))
+    stores = []
+    for i in range(count):
+        stocked = draw(st.lists(st.sampled_from(ITEMS), unique=True, max_size=len(ITEMS)))
+        stores.append({
+            "name": f"Store {i}",
+            "latitude": draw(lat),
+            "longitude": draw(lon),
+            "prices": {item: draw(price) for item in stocked},
+        })
+    # Make sure every item is stocked somewhere
+    for item in ITEMS:
+        stores[0]["prices"].setdefault(item, draw(price))
+    return stores
+
+
+stations_strategy = st.lists(
+    st.builds(
+        lambda i, la, lo, p: {"name": f"Servo {i}", "latitude": la, "longitude": lo, "price_per_litre": p},
+        st.integers(min_value=0, max_value=99), lat, lon, st.floats(min_value=1.6, max_value=2.2),
+    ),
+    min_size=1,
+    max_size=2,
+)
+
+
+@given(
+    stores=store_lists(),
+    stations=stations_strategy,
+    fuel_litres=st.sampled_from([0.0, 20.0]),
+    cost_per_km=st.sampled_from([0.0, 0.128, 2.0]),
+    return_home=st.booleans(),
+)
+@settings(max_examples=60, deadline=None)
+def test_property_planner_matches_brute_force(stores, stations, fuel_litres, cost_per_km, return_home):
+    """Held–Karp finds the same minimum total as enumerating every route."""
+    plan = plan_trip(HOME, ITEMS, stores, stations, fuel_litres, cost_per_km, return_home)
+    expected = _brute_force_total(HOME, ITEMS, stores, stations, fuel_litres, cost_per_km, return_home)
+
+    assert plan["total_cost"] == pytest.approx(expected, abs=0.01)
+    assert sorted(i for stop in plan["stops"] for i in stop["items"]) == sorted(ITEMS)
+
+
+def test_splits_list_when_savings_beat_travel():
+    """Two nearby stores with different specials are both visited."""
+    stores = [
+        {"name": "Coles", "latitude": -33.9110, "longitude": 151.2250,
+         "prices": {"Milk (1L)": 3.10, "Bread (Loaf)": 9.00}},
+        {"name": "Woolworths", "latitude": -33.9145, "longitude": 151.2417,
+         "prices": {"Milk (1L)": 9.00, "Bread (Loaf)": 3.50}},
+    ]
+    plan = plan_trip(HOME, ["Milk (1L)", "Bread (Loaf)"], stores)
+
+    assert {stop["name"] for stop in plan["stops"]} == {"Coles", "Woolworths"}
+    assert plan["item_cost"] == 6.60
+
+
+def test_skips_second_store_when_travel_costs_more():
+    """A far-away store isn't worth a detour for a few cents."""
+    stores = [
+        {"name": "Near", "latitude": -33.9170, "longitude": 151.2310,
+         "prices": {"Milk (1L)": 3.10, "Bread (Loaf)": 3.60}},
+        {"name": "Far", "latitude": -33.60, "longitude": 151.00,
+         "prices": {"Milk (1L)": 3.00, "Bread (Loaf)": 3.50}},
+    ]
+    plan = plan_trip(HOME, ["Milk (1L)", "Bread (Loaf)"], stores)
+
+    assert [stop["name"] for stop in plan["stops"]] == ["Near"]
+
+
+def test_fuel_stop_is_included():
+    stores = [{"name": "Coles", "latitude": -33.9110, "longitude": 151.2250, "prices": {"Milk (1L)": 3.10}}]
+    stations = [
+        {"name": "Cheap", "latitude": -33.9120, "longitude": 151.2260, "price_per_litre": 1.70},
+        {"name": "Dear", "latitude": -33.9121, "longitude": 151.2261, "price_per_litre": 2.10},
+    ]
+    plan = plan_trip(HOME, ["Milk (1L)"], stores, stations, fuel_litres=30)
+
+    kinds = {stop["name"]: stop["kind"] for stop in plan["stops"]}
+    assert kinds == {"Coles": "store", "Cheap": "station"}
+    assert plan["fuel_cost"] == 51.0
+
+
+def test_max_stops_within_latency_budget():
+    """The largest allowed problem plans in well under a second."""
+    stores = [
+        {"name": f"Store {i}", "latitude": -33.90 - i * 0.003, "longitude": 151.22 + i * 0.003,
+         "prices": {item: 3.0 + (i + j) % 4 for j, item in enumerate(ITEMS)}}
+        for i in range(MAX_PLANNER_STOPS - 2)
+    ]
+    stations = [
+        {"name": f"Servo {i}", "latitude": -33.91, "longitude": 151.23 + i * 0.01, "price_per_litre": 1.8 + i * 0.1}
+        for i in range(2)
+    ]
+
+    start = time.perf_counter()
+    plan = plan_trip(HOME, ITEMS, stores, stations, fuel_litres=20)
+    elapsed = time.perf_counter() - start
+
+    assert plan["subsets_evaluated"] == 2 ** MAX_PLANNER_STOPS - 1
+    assert elapsed < 1.0
+
+
+def test_too_many_stops_is_rejected():
+    stores = [{"name": f"S{i}", "latitude": -33.9, "longitude": 151.2, "prices": {"Milk (1L)": 3}}
+              for i in range(MAX_PLANNER_STOPS + 1)]
+    with pytest.raises(ValidationError):
+        plan_trip(HOME, ["Milk (1L)"], stores)
+
+
+def test_unstocked_item_is_rejected():
+    stores = [{"name": "Coles", "latitude": -33.9, "longitude": 151.2, "prices": {"Milk (1L)": 3}}]
+    with pytest.raises(ValidationError, match="Tim Tams"):
+        plan_trip(HOME, ["Milk (1L)", "Tim Tams"], stores)
+
+
+def test_plan_trip_endpoint(client):
+    payload = {
+        "origin": {"latitude": HOME[0], "longitude": HOME[1]},
+        "items": ["Milk (1L)", "Bread (Loaf)"],
+        "stores": [
+            {"name": "Coles Kensington", "latitude": -33.9110, "longitude": 151.2250,
+             "prices": {"Milk (1L)": 3.10, "Bread (Loaf)": 9.00}},
+            {"name": "Woolworths Randwick", "latitude": -33.9145, "longitude": 151.2417,
+             "prices": {"Milk (1L)": 9.00, "Bread (Loaf)": 3.50}},
+        ],
+    }
+    response = client.post("/transport/plan-trip", json=payload)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["item_cost"] == 6.60
+    assert data["total_cost"] == pytest.approx(data["item_cost"] + data["travel_cost"], abs=0.01)
+    assert len(data["stops"]) == 2
+
+
+def test_plan_trip_endpoint_rejects_unstocked_item(client):
+    payload = {
+        "origin": {"latitude": HOME[0], "longitude": HOME[1]},
+        "items": ["Tim Tams"],
+        "stores": [{"name": "Coles", "latitude": -33.9, "longitude": 151.2, "prices": {"Milk (1L)": 3}}],
+    }
+    response = client.post("/transport/plan-trip", json=payload)
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "VALIDATION_ERROR"